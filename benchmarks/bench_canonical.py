@@ -0,0 +1,151 @@
+"""
+Benchmark for canonical result cache keys: generates a corpus of variants
+of a few base expressions (with other white spaces, redundant parentheses,
+double unary minuses and commuted operands), and compares how many of its
+expressions a cache hits with exact keys and with canonical keys. Then
+times canonicalization, and two runs over the corpus with a result store
+(the second one with a warm store).
+
+Run with: python -m benchmarks.bench_canonical [expressions] [bases]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.canonicalizer import ArithmeticCanonicalizer
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.result_store import SQLiteResultStore
+
+_TERMS = 6
+
+
+def generate_bases(amount: int, generator: random.Random) -> list:
+    """
+    :param amount: Amount of base expressions.
+    :type amount: int
+    :param generator: Random generator.
+    :type generator: random.Random
+    :return: Base expressions, each one as a list of terms and a list of
+        the operators between them.
+    :rtype: list
+    """
+
+    bases = []
+    for _ in range(amount):
+        terms = [f"{generator.randint(1, 99)}*{generator.randint(1, 9)}"
+                 for _ in range(generator.randint(2, _TERMS))]
+        operators = [generator.choice('+*@') for _ in range(len(terms) - 1)]
+        bases.append((terms, operators))
+    return bases
+
+
+def write_variant(base: tuple, generator: random.Random) -> str:
+    """
+    :param base: Terms and operators of a base expression.
+    :type base: tuple
+    :param generator: Random generator.
+    :type generator: random.Random
+    :return: An expression equivalent to the base expression.
+    :rtype: str
+    """
+
+    terms, operators = base
+    expression = f"({terms[0]})"
+    for term, operator in zip(terms[1:], operators):
+        term = f"({term})"
+        if generator.random() < 0.3:
+            term = f"(-(-{term}))"
+        if generator.random() < 0.5:
+            expression = f"({expression}){operator}{term}"
+        else:
+            expression = f"{term}{operator}({expression})"
+    if generator.random() < 0.5:
+        expression = expression.replace('*', ' * ')
+    return expression
+
+
+def generate_corpus(size: int, bases: int, seed: int = 0) -> list:
+    """
+    :param size: Amount of expressions.
+    :type size: int
+    :param bases: Amount of base expressions the corpus varies.
+    :type bases: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Expressions.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    base_expressions = generate_bases(bases, generator)
+    return [write_variant(generator.choice(base_expressions), generator)
+            for _ in range(size)]
+
+
+def compile_corpus(corpus: list) -> list:
+    """
+    :param corpus: Expressions.
+    :type corpus: list
+    :return: Postfix representation of every expression.
+    :rtype: list
+    """
+
+    calculator_core = create_calculator_core()
+    return [EquationSolver(calculator_core.process(expression)).compile()
+            for expression in corpus]
+
+
+def run(corpus: list, path: str) -> tuple:
+    """
+    :param corpus: Expressions to evaluate.
+    :type corpus: list
+    :param path: File of the result store.
+    :type path: str
+    :return: Time of the run, and the hits of the store.
+    :rtype: tuple
+    """
+
+    start = time.perf_counter()
+    with SQLiteResultStore(path) as result_store:
+        calculator_core = create_calculator_core(result_store=result_store)
+        for expression in corpus:
+            calculator_core.evaluate(expression)
+        hits = result_store.get_stats()['hits']
+    return time.perf_counter() - start, hits
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    bases = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    corpus = generate_corpus(size, bases)
+    postfixes = compile_corpus(corpus)
+    canonicalizer = ArithmeticCanonicalizer()
+
+    start = time.perf_counter()
+    forms = [canonicalizer.canonicalize(postfix) for postfix in postfixes]
+    canonicalize_time = time.perf_counter() - start
+
+    exact_keys = len(set(corpus))
+    canonical_keys = len(set(forms))
+    print(f"{size} expressions varying {bases} bases")
+    print(f"{'exact keys':>16}: {exact_keys} distinct, hit rate "
+          f"{1 - exact_keys / size:.1%}")
+    print(f"{'canonical keys':>16}: {canonical_keys} distinct, hit rate "
+          f"{1 - canonical_keys / size:.1%}")
+    print(f"{'canonicalization':>16}: {canonicalize_time:.3f}s "
+          f"({size / canonicalize_time:.0f} expressions/s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        for name in ('cold store', 'warm store'):
+            elapsed, hits = run(corpus, path)
+            print(f"{name:>16}: {elapsed:.3f}s ({size / elapsed:.0f} "
+                  f"expressions/s, {hits} hits)")
+
+
+if __name__ == '__main__':
+    main()
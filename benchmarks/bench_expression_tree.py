@@ -0,0 +1,65 @@
+"""
+Benchmark for ExpressionTree: compares building the optimized tree of a
+machine-generated expression with repeated sub-terms against interpreting
+its postfix stream, and measures time per evaluation of the cached tree.
+
+Run with: python -m benchmarks.bench_expression_tree [terms] [repeats]
+"""
+
+import random
+import sys
+
+from benchmarks.bench_token_stream import best_time
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+
+SUB_TERMS = ['(3!^2)', '(12.5*4-7)', '(~2+5!)', '(81^0.5%7)', '(9$4&6)']
+
+
+def generate_repetitive_expression(terms: int, seed: int = 0) -> str:
+    """
+    Generates an expression made of a few sub-terms repeated many times.
+
+    :param terms: Amount of sub-terms in expression.
+    :type terms: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expression.
+    :rtype: str
+    """
+
+    generator = random.Random(seed)
+    expression = [generator.choice(SUB_TERMS)]
+    for _ in range(terms - 1):
+        expression.append(generator.choice('+-*@'))
+        expression.append(generator.choice(SUB_TERMS))
+    return ''.join(expression)
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    expression = generate_repetitive_expression(terms)
+    tokens = ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+    postfix = EquationSolver(tokens).compile()
+    tree = ExpressionTree.from_postfix(postfix)
+    assert tree.evaluate() == EquationSolver([]).solve_compiled(postfix)
+
+    interpret_time = best_time(
+        lambda: EquationSolver([]).solve_compiled(postfix), repeats)
+    build_time = best_time(lambda: ExpressionTree.from_postfix(postfix),
+                           repeats)
+    evaluate_time = best_time(tree.evaluate, repeats)
+    print(f"{len(postfix)} postfix tokens, {len(tree)} tree nodes to solve")
+    print(f"{'interpret postfix':>22}: "
+          f"{interpret_time * 1e9 / len(postfix):8.1f} ns/token")
+    print(f"{'build optimized tree':>22}: "
+          f"{build_time * 1e9 / len(postfix):8.1f} ns/token")
+    print(f"{'evaluate cached tree':>22}: {evaluate_time * 1e9:8.1f} ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark for the factorial engines: compares the multiplication loop the
+factorial operator used to run, the table engine, the exact engine (with a
+cold and a warm memo) and math.factorial.
+
+Run with: python -m benchmarks.bench_factorial [repeats]
+"""
+
+import math
+import sys
+
+from benchmarks.bench_token_stream import best_time
+from calculator.utils.factorial_engine import TableFactorialEngine, \
+    ExactFactorialEngine
+
+OPERANDS = [20, 170, 1_000, 10_000, 100_000]
+
+
+def loop_factorial(operand: int) -> int:
+    """
+    :param operand: Non negative integer.
+    :type operand: int
+    :return: Factorial of operand, multiplied in a loop.
+    :rtype: int
+    """
+
+    result = 1
+    for index in range(1, operand + 1):
+        result = result * index
+    return result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    table_engine = TableFactorialEngine()
+    warm_engine = ExactFactorialEngine(max_operand=max(OPERANDS))
+    print(f"{'operand':>8} {'loop':>12} {'table':>12} {'exact cold':>12} "
+          f"{'exact warm':>12} {'math':>12}  (us)")
+    for operand in OPERANDS:
+        warm_engine.factorial(operand)
+        timings = [
+            best_time(lambda: loop_factorial(operand), repeats),
+            (best_time(lambda: table_engine.factorial(operand), repeats)
+             if operand <= table_engine.max_operand else None),
+            best_time(lambda: ExactFactorialEngine(
+                max_operand=operand).factorial(operand), repeats),
+            best_time(lambda: warm_engine.factorial(operand), repeats),
+            best_time(lambda: math.factorial(operand), repeats),
+        ]
+        print(f"{operand:>8} " + ' '.join(
+            f"{'-':>12}" if timing is None else f"{timing * 1e6:12.2f}"
+            for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark for ArithmeticIncrementalEvaluator: compares the latency of
+re-evaluating a large expression after editing a single number in it, with
+and without incremental evaluation, and the latency of an expression which
+is new except for its parenthesized spans.
+
+Run with: python -m benchmarks.bench_incremental [terms] [edits]
+"""
+
+import random
+import re
+import sys
+import time
+
+from calculator.calculator_factory import create_calculator_core
+
+_NUMBER_PATTERN = re.compile('[0-9]+')
+
+
+def generate_term(generator: random.Random, depth: int = 0) -> str:
+    """
+    :param generator: Random generator.
+    :type generator: random.Random
+    :param depth: Depth of brackets of the term.
+    :type depth: int
+    :return: Operand, or parenthesized expression of a few terms.
+    :rtype: str
+    """
+
+    if depth < 3 and generator.random() < 0.5:
+        terms = [generate_term(generator, depth + 1) for _ in range(3)]
+        return f"({generator.choice('+*$&@').join(terms)})"
+    return str(generator.randint(1, 99))
+
+
+def generate_edits(expression: str, edits: int, seed: int = 0) -> list:
+    """
+    Generates versions of an expression, each of which changes a single
+    number of the previous version.
+
+    :param expression: Expression to edit.
+    :type expression: str
+    :param edits: Amount of versions.
+    :type edits: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Edited versions of expression.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    versions = []
+    for _ in range(edits):
+        number = generator.choice(list(_NUMBER_PATTERN.finditer(expression)))
+        expression = (expression[:number.start()]
+                      + str(generator.randint(1, 99))
+                      + expression[number.end():])
+        versions.append(expression)
+    return versions
+
+
+def time_versions(calculator_core, versions: list) -> float:
+    """
+    :param calculator_core: Calculator core to evaluate with.
+    :type calculator_core: CalculatorCore
+    :param versions: Expressions to evaluate one after the other.
+    :type versions: list
+    :return: Mean latency of an evaluation, in seconds.
+    :rtype: float
+    """
+
+    start = time.perf_counter()
+    for expression in versions:
+        calculator_core.evaluate(expression)
+    return (time.perf_counter() - start) / len(versions)
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    generator = random.Random(0)
+    expression = '+'.join(generate_term(generator) for _ in range(terms))
+    versions = generate_edits(expression, edits)
+
+    plain_core = create_calculator_core()
+    incremental_core = create_calculator_core(incremental=True)
+    incremental_core.evaluate(expression)
+    plain_time = time_versions(plain_core, versions)
+    incremental_time = time_versions(incremental_core, versions)
+    for version in versions[-3:]:
+        assert plain_core.evaluate(version) == incremental_core.evaluate(
+            version)
+
+    # Operators between spans edited: parsed again, spans are memoized.
+    operator_versions = [version.replace(')+(', ')-(')
+                         for version in versions[:3]]
+    plain_operator_time = time_versions(plain_core, operator_versions)
+    incremental_operator_time = time_versions(incremental_core,
+                                              operator_versions)
+
+    evaluator = incremental_core.incremental_evaluator
+    print(f"expression of {len(expression)} characters, {edits} edits")
+    print(f"{'':>22} {'plain ms':>10} {'incremental ms':>15} {'speedup':>8}")
+    print(f"{'edited number':>22} {plain_time * 1e3:>10.2f} "
+          f"{incremental_time * 1e3:>15.2f} "
+          f"{plain_time / incremental_time:>7.1f}x")
+    print(f"{'edited operators':>22} {plain_operator_time * 1e3:>10.2f} "
+          f"{incremental_operator_time * 1e3:>15.2f} "
+          f"{plain_operator_time / incremental_operator_time:>7.1f}x")
+    print(f"full parses: {evaluator.full_parses}, incremental updates: "
+          f"{evaluator.incremental_updates}, solved spans: "
+          f"{evaluator.solved_spans}, fallbacks: {evaluator.fallbacks}")
+
+
+if __name__ == '__main__':
+    main()
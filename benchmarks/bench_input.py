@@ -0,0 +1,131 @@
+"""
+Benchmark for the bulk input handlers: compares the throughput of reading a
+corpus file with the console handler (input() per line), a text file
+(readline() per line), the block handler and the mapped file handler (lines
+and memoryview slices) with the raw bandwidth of reading the file at once.
+The file is read once before timing, so it comes from the page cache.
+
+Run with: python -m benchmarks.bench_input [lines] [repeats]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from calculator.interaction.input_handler import ConsoleInputHandler, \
+    BlockInputHandler, MappedFileInputHandler
+
+
+def write_corpus(path: str, size: int, seed: int = 0):
+    """
+    :param path: Path of the corpus file.
+    :type path: str
+    :param size: Amount of lines.
+    :type size: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    """
+
+    generator = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        for _ in range(size):
+            file.write('+'.join(f"({generator.randint(1, 999)}*"
+                                f"{generator.randint(1, 99)}.5)"
+                                for _ in range(generator.randint(1, 10))))
+            file.write('\n')
+
+
+def read_raw(path: str) -> int:
+    with open(path, 'rb') as file:
+        return len(file.read())
+
+
+def read_console(path: str) -> int:
+    count = 0
+    input_handler = ConsoleInputHandler()
+    stdin = sys.stdin
+    with open(path, encoding='utf-8') as sys.stdin:
+        try:
+            while True:
+                input_handler.get_input()
+                count += 1
+        except EOFError:
+            pass
+        finally:
+            sys.stdin = stdin
+    return count
+
+
+def read_lines(path: str) -> int:
+    count = 0
+    with open(path, encoding='utf-8') as file:
+        for line in iter(file.readline, ''):
+            line.rstrip('\r\n')
+            count += 1
+    return count
+
+
+def read_blocks(path: str) -> int:
+    with open(path, 'rb') as file:
+        return sum(1 for _ in BlockInputHandler(file).lines())
+
+
+def read_mapped(path: str) -> int:
+    with MappedFileInputHandler(path) as input_handler:
+        return sum(1 for _ in input_handler.lines())
+
+
+def read_views(path: str) -> int:
+    with MappedFileInputHandler(path) as input_handler:
+        return sum(1 for _ in input_handler.views())
+
+
+def best_time(repeats: int, read, path: str) -> float:
+    """
+    :param repeats: Amount of runs.
+    :type repeats: int
+    :param read: Function which reads the corpus file.
+    :type read: Callable
+    :param path: Path of the corpus file.
+    :type path: str
+    :return: Best time of reading the file, in seconds.
+    :rtype: float
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        read(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    readers = {
+        'raw read': read_raw,
+        'console (input)': read_console,
+        'text file (readline)': read_lines,
+        'block': read_blocks,
+        'mapped file': read_mapped,
+        'mapped file, views': read_views,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'corpus.txt')
+        write_corpus(path, size)
+        megabytes = read_raw(path) / (1 << 20)
+        times = {name: best_time(repeats, read, path)
+                 for name, read in readers.items()}
+
+    print(f"{size} lines, {megabytes:.1f} MB")
+    print(f"{'':>20} {'MB/s':>10} {'lines/s':>12}")
+    for name, elapsed in times.items():
+        print(f"{name:>20} {megabytes / elapsed:>10.0f} "
+              f"{size / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark for the numeric backends: measures the cost of parsing and
+solving the same expressions with the float, decimal and fraction
+backends.
+
+Run with: python -m benchmarks.bench_numeric_backend [expressions] [repeats]
+"""
+
+import random
+import sys
+
+from benchmarks.bench_token_stream import best_time
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.utils.numeric_backend import FLOAT_BACKEND, \
+    FRACTION_BACKEND, DecimalBackend
+
+
+def generate_terms(amount: int, seed: int = 0) -> list:
+    """
+    Generates short expressions with decimal operands.
+
+    :param amount: Amount of expressions.
+    :type amount: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expressions.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    expressions = []
+    for _ in range(amount):
+        parts = [f"{generator.randint(1, 999)}.{generator.randint(1, 99)}"]
+        for _ in range(8):
+            parts.append(generator.choice('+-*/@$&'))
+            parts.append(f"{generator.randint(1, 99)}."
+                         f"{generator.randint(1, 9)}")
+        parts.append(f"^{generator.randint(1, 3)}")
+        expressions.append(''.join(parts))
+    return expressions
+
+
+def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    processed = [ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+        for expression in generate_terms(amount)]
+    tokens = sum(len(expression_tokens) for expression_tokens in processed)
+    print(f"{amount} expressions, {tokens} tokens")
+
+    float_time = None
+    for backend in [FLOAT_BACKEND, DecimalBackend(), DecimalBackend(100),
+                    FRACTION_BACKEND]:
+        solve_time = best_time(
+            lambda: [EquationSolver(expression_tokens, backend).solve()
+                     for expression_tokens in processed], repeats)
+        float_time = float_time or solve_time
+        name = backend.name
+        if isinstance(backend, DecimalBackend):
+            name += f" ({backend.context.prec} digits)"
+        print(f"{name:>20}: {solve_time * 1e9 / tokens:8.1f} ns/token "
+              f"({solve_time / float_time:5.2f}x float)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark for BufferedMessageHandler and NumericResultFormatter: compares
+the time of displaying many results with a print per (colored) message, as
+ConsoleMessageHandler does, with writing them through the buffered handler,
+which formats them in bulk. Output goes to the null device, so the time is
+spent formatting and writing, not storing the output. Also times the whole
+interactive loop over piped input with both handlers.
+
+Run with: python -m benchmarks.bench_output [results] [repeats]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.interaction.input_handler import BlockInputHandler
+from calculator.interaction.message_handler import ConsoleMessageHandler, \
+    BufferedMessageHandler
+from calculator.interaction.result_formatter import NumericResultFormatter
+
+
+def display_all(message_handler, results: list) -> float:
+    """
+    :param message_handler: Handler to display results with.
+    :type message_handler: MessageHandler
+    :param results: Results to display.
+    :type results: list
+    :return: Time of displaying every result, in seconds.
+    :rtype: float
+    """
+
+    start = time.perf_counter()
+    for result in results:
+        message_handler.display_result(result)
+    message_handler.display_quit_message()
+    return time.perf_counter() - start
+
+
+def run_piped(message_handler, expressions: list) -> float:
+    """
+    :param message_handler: Handler to display messages with.
+    :type message_handler: MessageHandler
+    :param expressions: Expressions to read as piped input.
+    :type expressions: list
+    :return: Time of the interactive loop over expressions, in seconds.
+    :rtype: float
+    """
+
+    calculator_core = create_calculator_core(
+        message_handler=message_handler,
+        input_handler=BlockInputHandler(io.BytesIO(
+            ('\n'.join(expressions) + '\n').encode())))
+    start = time.perf_counter()
+    calculator_core.run()
+    return time.perf_counter() - start
+
+
+def best_of(repeats: int, function, *arguments) -> float:
+    """
+    :param repeats: Amount of runs.
+    :type repeats: int
+    :param function: Function which runs once and returns its time.
+    :type function: Callable
+    :return: Best time of function.
+    :rtype: float
+    """
+
+    return min(function(*arguments) for _ in range(repeats))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    generator = random.Random(0)
+    results = [generator.choice([generator.random() * 1000,
+                                 float(generator.randint(0, 999))])
+               for _ in range(size)]
+    expressions = [f"{generator.randint(1, 999)}*{generator.randint(1, 99)}"
+                   f"/{generator.randint(1, 9)}" for _ in range(size // 10)]
+
+    with open(os.devnull, 'w', encoding='utf-8') as null_stream, \
+            contextlib.redirect_stdout(null_stream):
+        handlers = {
+            'print, colored': lambda: ConsoleMessageHandler(colored=True),
+            'print': lambda: ConsoleMessageHandler(colored=False),
+            'buffered': lambda: BufferedMessageHandler(null_stream),
+            'buffered, 4 digits': lambda: BufferedMessageHandler(
+                null_stream, NumericResultFormatter(digits=4)),
+        }
+        times = {name: (best_of(repeats, lambda: display_all(
+                            create(), results)),
+                        best_of(repeats, lambda: run_piped(
+                            create(), expressions)))
+                 for name, create in handlers.items()}
+
+    print(f"{size} results, {len(expressions)} piped expressions")
+    print(f"{'':>20} {'results/s':>12} {'piped lines/s':>14}")
+    for name, (display_time, piped_time) in times.items():
+        print(f"{name:>20} {size / display_time:>12.0f} "
+              f"{len(expressions) / piped_time:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark for ParallelEvaluator: measures batch throughput for an increasing
+amount of worker processes, up to the amount of CPUs.
+
+Run with: python -m benchmarks.bench_parallel [expressions] [chunk size]
+"""
+
+import os
+import random
+import sys
+import time
+
+from calculator.parallel_evaluator import ParallelEvaluator
+
+OPERATORS = '+-*/^%$&@'
+
+
+def generate_expressions(amount: int, seed: int = 0) -> list:
+    """
+    Generates distinct expressions, so the workers' caches do not help.
+
+    :param amount: Amount of expressions to generate.
+    :type amount: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expressions.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    expressions = []
+    for index in range(amount):
+        terms = [str(index)] + [f"{generator.choice(OPERATORS)}"
+                                f"({generator.randint(1, 9)}"
+                                f"{generator.choice('+-*')}"
+                                f"{generator.randint(1, 9)})"
+                                for _ in range(8)]
+        expressions.append(''.join(terms))
+    return expressions
+
+
+def measure(expressions: list, workers: int, chunk_size: int) -> float:
+    """
+    Evaluates expressions with a given amount of workers.
+
+    :param expressions: Expressions to evaluate.
+    :type expressions: list
+    :param workers: Amount of worker processes.
+    :type workers: int
+    :param chunk_size: Amount of expressions sent to a worker at once.
+    :type chunk_size: int
+    :return: Throughput in expressions per second.
+    :rtype: float
+    """
+
+    evaluator = ParallelEvaluator(workers=workers, chunk_size=chunk_size)
+    start_time = time.perf_counter()
+    for _ in evaluator.evaluate(expressions):
+        pass
+    return len(expressions) / (time.perf_counter() - start_time)
+
+
+def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    expressions = generate_expressions(amount)
+    cpu_count = os.cpu_count() or 1
+    workers_options = sorted({1, 2, 4, 8, 16, 32, 64, cpu_count}
+                             & set(range(1, cpu_count + 1)))
+    base_throughput = None
+    print(f"{amount} expressions, chunk size {chunk_size}, "
+          f"{cpu_count} CPUs")
+    print(f"{'workers':>8} {'expr/s':>12} {'speedup':>8} {'efficiency':>10}")
+    for workers in workers_options:
+        throughput = measure(expressions, workers, chunk_size)
+        base_throughput = base_throughput or throughput
+        speedup = throughput / base_throughput
+        print(f"{workers:>8} {throughput:>12.0f} {speedup:>8.2f} "
+              f"{speedup / workers:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
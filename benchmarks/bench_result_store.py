@@ -0,0 +1,88 @@
+"""
+Benchmark for SQLiteResultStore: times separate runs over the same corpus,
+each with a fresh calculator core (as separate CLI runs have): without a
+store, with a cold store (which writes every outcome) and with a warm store
+(which has every outcome from the previous run).
+
+Run with: python -m benchmarks.bench_result_store [expressions] [terms]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.result_store import SQLiteResultStore
+
+
+def generate_corpus(size: int, terms: int, seed: int = 0) -> list:
+    """
+    :param size: Amount of expressions.
+    :type size: int
+    :param terms: Max amount of parenthesized terms of an expression.
+    :type terms: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Expressions, a tenth of which divide by zero.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        expression = generator.choice('+*$&@').join(
+            f"(~{generator.randint(1, 99)}.5-{generator.randint(1, 9)}^2)"
+            for _ in range(generator.randint(1, terms)))
+        if index % 10 == 0:
+            expression += '/0'
+        corpus.append(expression)
+    return corpus
+
+
+def run(corpus: list, path: str = None) -> float:
+    """
+    :param corpus: Expressions to evaluate.
+    :type corpus: list
+    :param path: File of the result store, or None to not use a store.
+    :type path: str
+    :return: Time of the run, including opening and closing the store.
+    :rtype: float
+    """
+
+    start = time.perf_counter()
+    result_store = None if path is None else SQLiteResultStore(path)
+    calculator_core = create_calculator_core(result_store=result_store)
+    for expression in corpus:
+        try:
+            calculator_core.evaluate(expression)
+        except Exception:
+            pass
+    if result_store is not None:
+        result_store.close()
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    terms = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    corpus = generate_corpus(size, terms)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        times = {
+            'no store': run(corpus),
+            'cold store': run(corpus, path),
+            'warm store': run(corpus, path),
+        }
+        megabytes = os.path.getsize(path) / (1 << 20)
+
+    print(f"{size} expressions (up to {terms} terms), store of "
+          f"{megabytes:.1f} MB")
+    for name, elapsed in times.items():
+        print(f"{name:>12}: {elapsed:.3f}s ({size / elapsed:.0f} "
+              f"expressions/s)")
+
+
+if __name__ == '__main__':
+    main()
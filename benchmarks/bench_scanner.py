@@ -0,0 +1,90 @@
+"""
+Benchmark for ArithmeticScanner: compares the per-character cost of the
+single-pass scanner with the separate preprocessor, processor and tokenizer
+stages.
+
+Run with: python -m benchmarks.bench_scanner [size in bytes] [repeats]
+"""
+
+import random
+import sys
+import time
+
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+
+
+def generate_expression(size: int, seed: int = 0) -> str:
+    """
+    Generates a valid expression of (at least) a given size.
+
+    :param size: Size of the expression, in characters.
+    :type size: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expression.
+    :rtype: str
+    """
+
+    generator = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        part = (f"({generator.randint(1, 999)}.{generator.randint(0, 99)} "
+                f"{generator.choice('+-*/^%$&@')} "
+                f"{generator.randint(1, 99)}) {generator.choice('+-*')} ")
+        parts.append(part)
+        length += len(part)
+    parts.append('1')
+    return ''.join(parts)
+
+
+def separate_stages(expression: str) -> list:
+    """
+    Runs the separate preprocessor, processor and tokenizer stages.
+
+    :param expression: Expression to tokenize.
+    :type expression: str
+    :return: Tokenized expression.
+    :rtype: list
+    """
+
+    ArithmeticStringPreprocessor().preprocess(expression)
+    processed_expression = ArithmeticStringProcessor().process(expression)
+    return ArithmeticTokenizer().tokenize(processed_expression)
+
+
+def measure(stages, expression: str, repeats: int) -> float:
+    """
+    :return: Best time of running stages on expression, in seconds.
+    :rtype: float
+    """
+
+    best_time = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        stages(expression)
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 20
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    expression = generate_expression(size)
+    if ArithmeticScanner().scan(expression) != separate_stages(expression):
+        raise AssertionError("Scanner and separate stages disagree")
+    separate_time = measure(separate_stages, expression, repeats)
+    scanner_time = measure(ArithmeticScanner().scan, expression, repeats)
+    print(f"{len(expression)} characters, best of {repeats}")
+    for name, elapsed in (('separate stages', separate_time),
+                          ('scanner', scanner_time)):
+        print(f"{name:>16}: {elapsed * 1000:8.1f} ms "
+              f"{elapsed * 1e9 / len(expression):6.1f} ns/char")
+    print(f"{'speedup':>16}: {separate_time / scanner_time:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
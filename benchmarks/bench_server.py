@@ -0,0 +1,122 @@
+"""
+Load test for the evaluation server: many concurrent connections, each
+pipelining requests (keeping a window of requests in flight), against a
+server on localhost. Reports requests per second and latency percentiles.
+The clients run on the server's event loop, so the results include their
+cost as well.
+
+Run with: python -m benchmarks.bench_server [connections]
+    [requests per connection] [window]
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+from calculator.evaluation_server import EvaluationServer
+
+
+def generate_requests(amount: int, seed: int) -> list:
+    """
+    Generates encoded request lines of short expressions.
+
+    :param amount: Amount of requests.
+    :type amount: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Request lines.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    return [json.dumps({
+        'id': index,
+        'expression': f"({generator.randint(1, 999)}"
+                      f"{generator.choice('+-*/^$&@')}"
+                      f"{generator.randint(1, 9)})*~{generator.randint(1, 99)}"
+                      f"+{generator.randint(1, 9)}!"}).encode() + b'\n'
+        for index in range(amount)]
+
+
+async def run_client(port: int, requests: list, window: int) -> list:
+    """
+    Sends requests over a single connection, keeping at most window of them
+    in flight.
+
+    :param port: Port of the server.
+    :type port: int
+    :param requests: Request lines.
+    :type requests: list
+    :param window: Maximal amount of requests in flight.
+    :type window: int
+    :return: Latency of every request, in seconds.
+    :rtype: list
+    """
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    send_times = []
+    latencies = []
+    sent = 0
+    while len(latencies) < len(requests):
+        while sent < len(requests) and sent - len(latencies) < window:
+            writer.write(requests[sent])
+            send_times.append(time.perf_counter())
+            sent += 1
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - send_times[len(latencies)])
+    writer.close()
+    await writer.wait_closed()
+    return latencies
+
+
+async def run_load_test(connections: int, requests_per_connection: int,
+                        window: int):
+    """
+    Runs the load test and prints its results.
+
+    :param connections: Amount of concurrent connections.
+    :type connections: int
+    :param requests_per_connection: Requests sent over each connection.
+    :type requests_per_connection: int
+    :param window: Requests in flight per connection.
+    :type window: int
+    """
+
+    evaluation_server = EvaluationServer(workers=1)
+    await evaluation_server.start('127.0.0.1', 0)
+    try:
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(
+            run_client(evaluation_server.get_port(),
+                       generate_requests(requests_per_connection, seed),
+                       window)
+            for seed in range(connections)))
+        elapsed = time.perf_counter() - start_time
+    finally:
+        await evaluation_server.close()
+
+    latencies = sorted(latency for latencies in results
+                       for latency in latencies)
+    print(f"{connections} connections x {requests_per_connection} requests, "
+          f"window {window}")
+    print(f"{len(latencies) / elapsed:10.0f} requests/s")
+    for percentile in [0.5, 0.9, 0.99, 0.999]:
+        latency = latencies[min(len(latencies) - 1,
+                                int(percentile * len(latencies)))]
+        print(f"{'p' + format(percentile * 100, 'g'):>10}: "
+              f"{latency * 1e3:8.3f} ms")
+    print(f"{'max':>10}: {latencies[-1] * 1e3:8.3f} ms")
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    requests_per_connection = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    asyncio.run(run_load_test(connections, requests_per_connection, window))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+Benchmark suite which times each pipeline stage separately and end to end,
+across expression sizes and operator mixes.
+Stages: preprocessor, string processor, tokenizer, token processor,
+infix to postfix conversion and postfix evaluation (plus the single-pass
+scanner, the optimized tree and a full uncached evaluation).
+
+Results are written as JSON (nanoseconds per token of each stage, by mix and
+size). Given a baseline JSON, every stage is compared with it, and the run
+fails (exit status 1) if a stage is slower than its baseline by more than
+the threshold.
+
+Run with: python -m benchmarks.bench_stages [--sizes 10 100 ...]
+    [--mixes additive ...] [--output results.json]
+    [--baseline benchmarks/baseline.json] [--threshold 0.5]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Minimal time spent measuring each stage, in seconds, in each round.
+MIN_MEASURE_TIME = 0.05
+
+# Stages are measured one after the other, several rounds, so a transient
+# slowdown of the machine affects a single round of a stage.
+MEASURE_ROUNDS = 4
+
+# Stages slower than baseline by more than this fraction are regressions.
+DEFAULT_THRESHOLD = 0.5
+
+# Smallest size compared with baseline by default (tiny expressions are
+# dominated by timer noise).
+DEFAULT_MIN_COMPARED_SIZE = 100
+
+
+def _additive_group(generator: random.Random) -> str:
+    return (f"{generator.randint(1, 999)}.{generator.randint(0, 9)}"
+            f"{generator.choice('+-')}{generator.randint(1, 999)}")
+
+
+def _multiplicative_group(generator: random.Random) -> str:
+    # Multiplying and dividing by numbers close to 1 keeps results bounded.
+    return (f"1.00{generator.randint(1, 9)}*1.00{generator.randint(1, 9)}"
+            f"/1.00{generator.randint(1, 9)}")
+
+
+def _power_group(generator: random.Random) -> str:
+    return (f"({generator.randint(2, 9)}^{generator.randint(1, 3)}"
+            f"%{generator.randint(2, 97)})")
+
+
+def _unary_group(generator: random.Random) -> str:
+    return (f"(~{generator.randint(1, 99)}+{generator.randint(1, 9)}!"
+            f"+{generator.randint(1, 999)}#)")
+
+
+def _mixed_group(generator: random.Random) -> str:
+    return (f"({generator.choice(list(MIXES.values())[:-1])(generator)}"
+            f"{generator.choice('$&@')}{generator.randint(1, 99)})")
+
+
+# Generator of a group of tokens, by operator mix.
+MIXES = {
+    'additive': _additive_group,
+    'multiplicative': _multiplicative_group,
+    'power': _power_group,
+    'unary': _unary_group,
+    'mixed': _mixed_group,
+}
+
+# Separators of groups, by operator mix.
+_MIX_SEPARATORS = {
+    'additive': '+-',
+    'multiplicative': '*/',
+    'power': '+-',
+    'unary': '+-',
+    'mixed': '+-',
+}
+
+
+def generate_expression(mix: str, tokens: int, seed: int = 0) -> str:
+    """
+    Generates a valid expression which evaluates without errors.
+
+    :param mix: Operator mix of expression (a key of MIXES).
+    :type mix: str
+    :param tokens: Approximate amount of tokens in expression.
+    :type tokens: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expression.
+    :rtype: str
+    """
+
+    generator = random.Random(seed)
+    create_group = MIXES[mix]
+    group = create_group(generator)
+    group_tokens = len(ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(group))) + 1
+    groups = [group]
+    for _ in range(max(0, round(tokens / group_tokens) - 1)):
+        groups.append(generator.choice(_MIX_SEPARATORS[mix]))
+        groups.append(create_group(generator))
+    return ''.join(groups)
+
+
+def measure(function, size: int) -> float:
+    """
+    Measures the time of a function: calls it repeatedly for at least
+    MIN_MEASURE_TIME (at least once) and takes the best time of a call.
+    Garbage collection is disabled while measuring (as timeit does), so
+    results do not depend on objects left by previous measurements.
+
+    :param function: Function to measure.
+    :type function: Callable
+    :param size: Amount of tokens the function handles.
+    :type size: int
+    :return: Best time of a call, in nanoseconds per token.
+    :rtype: float
+    """
+
+    best = float('inf')
+    total = 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        while total < MIN_MEASURE_TIME:
+            start_time = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start_time
+            best = min(best, elapsed)
+            total += elapsed
+    finally:
+        gc.enable()
+    return best * 1e9 / size
+
+
+def benchmark_stages(expression: str) -> dict:
+    """
+    Times every stage of the pipeline on an expression. Each stage gets the
+    output of the previous stage, computed in advance. The best time of
+    MEASURE_ROUNDS rounds is taken.
+
+    :param expression: Expression to benchmark.
+    :type expression: str
+    :return: Amount of tokens, and nanoseconds per token of each stage.
+    :rtype: dict
+    """
+
+    ArithmeticStringPreprocessor().preprocess(expression)
+    processed_expression = ArithmeticStringProcessor().process(expression)
+    tokens = ArithmeticTokenizer().tokenize(processed_expression)
+    processed_tokens = ArithmeticTokenProcessor().process(list(tokens))
+    postfix = EquationSolver(processed_tokens).compile()
+    calculator_core = create_calculator_core()
+    calculator_core.expression_cache = None
+    size = len(processed_tokens)
+
+    stages = {
+        'preprocessor': lambda: ArithmeticStringPreprocessor().preprocess(
+            expression),
+        'string_processor': lambda: ArithmeticStringProcessor().process(
+            expression),
+        'tokenizer': lambda: ArithmeticTokenizer().tokenize(
+            processed_expression),
+        'token_processor': lambda: ArithmeticTokenProcessor().process(
+            list(tokens)),
+        'scanner': lambda: ArithmeticScanner().scan(expression),
+        'infix_to_postfix': lambda: EquationSolver(
+            processed_tokens).compile(),
+        'postfix_evaluation': lambda: EquationSolver(
+            []).solve_compiled(postfix),
+        'tree_build': lambda: ExpressionTree.from_postfix(postfix),
+        'end_to_end': lambda: calculator_core.evaluate(expression),
+    }
+    results = {name: float('inf') for name in stages}
+    for _ in range(MEASURE_ROUNDS):
+        for name, stage in stages.items():
+            results[name] = min(results[name], measure(stage, size))
+    return {'tokens': size,
+            'stages': {name: round(result, 1)
+                       for name, result in results.items()}}
+
+
+def run(sizes: list, mixes: list, report_stream=sys.stderr) -> dict:
+    """
+    Runs the benchmark suite.
+
+    :param sizes: Expression sizes, in tokens.
+    :type sizes: list
+    :param mixes: Operator mixes.
+    :type mixes: list
+    :param report_stream: Text stream which progress is written to.
+    :type report_stream: TextIO
+    :return: Results: {mix: {size: {'tokens': ..., 'stages': {...}}}}.
+    :rtype: dict
+    """
+
+    results = {}
+    for mix in mixes:
+        results[mix] = {}
+        for size in sizes:
+            expression = generate_expression(mix, size)
+            results[mix][str(size)] = benchmark_stages(expression)
+            report_stream.write(
+                f"{mix:>14} {size:>9}: " + ' '.join(
+                    f"{name}={value}" for name, value
+                    in results[mix][str(size)]['stages'].items()) + '\n')
+    return {'python': platform.python_version(), 'unit': 'ns/token',
+            'results': results}
+
+
+def compare(results: dict, baseline: dict,
+            threshold: float = DEFAULT_THRESHOLD,
+            min_size: int = DEFAULT_MIN_COMPARED_SIZE) -> list:
+    """
+    Compares results with a baseline. Only mixes, sizes and stages which
+    exist in both are compared.
+
+    :param results: Results of run.
+    :type results: dict
+    :param baseline: Baseline results (of run as well).
+    :type baseline: dict
+    :param threshold: Allowed slowdown, as a fraction of baseline time.
+    :type threshold: float
+    :param min_size: Smallest compared size.
+    :type min_size: int
+    :return: Regressions: (mix, size, stage, baseline, current) tuples.
+    :rtype: list
+    """
+
+    regressions = []
+    for mix, sizes in results['results'].items():
+        for size, result in sizes.items():
+            baseline_result = baseline['results'].get(mix, {}).get(size)
+            if baseline_result is None or int(size) < min_size:
+                continue
+            for stage, current in result['stages'].items():
+                expected = baseline_result['stages'].get(stage)
+                if expected is not None and current > expected * (
+                        1 + threshold):
+                    regressions.append((mix, int(size), stage, expected,
+                                        current))
+    return regressions
+
+
+def parse_arguments():
+    """
+    Parses command line arguments.
+
+    :return: Parsed arguments.
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_stages')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        metavar='N', help="expression sizes, in tokens")
+    parser.add_argument('--mixes', nargs='+', default=list(MIXES),
+                        choices=list(MIXES), help="operator mixes")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write results to FILE (standard output if "
+                             "not given)")
+    parser.add_argument('--baseline', metavar='FILE',
+                        help="compare results with baseline FILE")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of a stage, as a fraction of "
+                             "its baseline time")
+    parser.add_argument('--min-compared-size', type=int,
+                        default=DEFAULT_MIN_COMPARED_SIZE, metavar='N',
+                        help="smallest size compared with baseline")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    results = run(arguments.sizes, arguments.mixes)
+    if arguments.output:
+        with open(arguments.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+            output_file.write('\n')
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, arguments.threshold,
+                              arguments.min_compared_size)
+        for mix, size, stage, expected, current in regressions:
+            sys.stderr.write(f"Regression: {stage} ({mix}, {size} tokens): "
+                             f"{expected} -> {current} ns/token\n")
+        if regressions:
+            sys.exit(1)
+        sys.stderr.write("No regressions.\n")
+
+
+if __name__ == '__main__':
+    main()
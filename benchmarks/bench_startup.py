@@ -0,0 +1,124 @@
+"""
+Startup benchmark: runs a one-shot evaluation
+(python -m calculator.main --eval EXPRESSION) in new interpreters with
+-X importtime, and reports the wall time of the process, the total import
+time and the modules which took longest to import.
+The run fails (exit status 1) if the median import time is over the budget,
+or if a module which only other modes need is imported.
+
+Run with: python -m benchmarks.bench_startup [--runs N] [--budget MS]
+    [--top N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Default budget of the import time of a one-shot evaluation, in
+# milliseconds (the interpreter's own startup imports included).
+IMPORT_BUDGET_MS = 60.0
+
+# Modules a one-shot evaluation must not import.
+FORBIDDEN_MODULES = ['asyncio', 'colorama', 'concurrent.futures',
+                     'multiprocessing', 'calculator.evaluation_server',
+                     'calculator.parallel_evaluator',
+                     'calculator.logic.stream_evaluator']
+
+EXPRESSION = '2*(3+4)-5!'
+
+
+def parse_importtime(report: str) -> list:
+    """
+    Parses the report -X importtime writes to standard error.
+
+    :param report: Standard error of the process.
+    :type report: str
+    :return: (module, self microseconds, cumulative microseconds, depth) of
+        every imported module, in the order of the report.
+    :rtype: list
+    """
+
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative_time, name = line[len('import time:'):].split(
+            '|')
+        if not self_time.strip().isdigit():  # Header line
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(self_time), int(cumulative_time),
+                        depth))
+    return imports
+
+
+def run_once(expression: str) -> tuple:
+    """
+    :param expression: Expression to evaluate.
+    :type expression: str
+    :return: Wall time of the process in seconds, and its parsed import
+        report.
+    :rtype: tuple
+    """
+
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'calculator.main',
+         '--eval', expression], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, parse_importtime(process.stderr)
+
+
+def parse_arguments():
+    """
+    :return: Parsed command line arguments.
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_startup')
+    parser.add_argument('--runs', type=int, default=10,
+                        help="amount of processes to run")
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS,
+                        metavar='MS', help="allowed median import time")
+    parser.add_argument('--top', type=int, default=10, metavar='N',
+                        help="amount of slowest modules to report")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    wall_times = []
+    import_times = []
+    imports = []
+    for _ in range(arguments.runs):
+        wall_time, imports = run_once(EXPRESSION)
+        wall_times.append(wall_time)
+        import_times.append(sum(cumulative for _, _, cumulative, depth
+                                in imports if depth == 0))
+    import_time_ms = statistics.median(import_times) / 1e3
+    print(f"median wall time: {statistics.median(wall_times) * 1e3:.1f} ms,"
+          f" median import time: {import_time_ms:.1f} ms"
+          f" (budget {arguments.budget:.1f} ms)")
+    print(f"slowest imports of the last run (cumulative ms):")
+    for name, _, cumulative, _ in sorted(
+            (entry for entry in imports if entry[3] == 0),
+            key=lambda entry: entry[2], reverse=True)[:arguments.top]:
+        print(f"{cumulative / 1e3:>8.2f}  {name}")
+
+    failed = False
+    imported = {name for name, _, _, _ in imports}
+    for module in FORBIDDEN_MODULES:
+        if module in imported:
+            print(f"{module} is imported", file=sys.stderr)
+            failed = True
+    if import_time_ms > arguments.budget:
+        print("import time is over budget", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
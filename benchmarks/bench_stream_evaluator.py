@@ -0,0 +1,82 @@
+"""
+Benchmark for ArithmeticStreamEvaluator: compares time and peak memory of
+evaluating a large generated expression as a stream of chunks with
+evaluating it as a whole string with the calculator core (the whole string
+is generated first, and counted, only for the core).
+
+Run with: python -m benchmarks.bench_stream_evaluator [terms]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.stream_evaluator import ArithmeticStreamEvaluator
+
+SIZES = [1_000, 10_000, 100_000]
+TERMS_PER_CHUNK = 1000
+
+
+def generate_chunks(terms: int, seed: int = 0):
+    """
+    Lazily generates an expression of mixed operators and bracketed terms.
+
+    :param terms: Amount of operands in expression.
+    :type terms: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Chunks of the expression, of TERMS_PER_CHUNK terms each.
+    :rtype: Iterator[str]
+    """
+
+    generator = random.Random(seed)
+    for start in range(0, terms, TERMS_PER_CHUNK):
+        parts = []
+        for index in range(start, min(start + TERMS_PER_CHUNK, terms)):
+            if index:
+                parts.append(generator.choice('+-*$&@'))
+            parts.append(f"(~{generator.randint(1, 99)}.5 "
+                         f"- -{generator.randint(1, 9)})")
+        yield ''.join(parts)
+
+
+def measure(function) -> tuple:
+    """
+    :param function: Function to measure.
+    :type function: Callable
+    :return: Result of function, its run time in seconds and the peak size
+        of memory allocated while it ran, in bytes.
+    :rtype: tuple
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else SIZES
+    stream_evaluator = ArithmeticStreamEvaluator()
+    calculator_core = create_calculator_core()
+    print(f"{'terms':>10} {'stream s':>10} {'stream MB':>10}"
+          f" {'core s':>10} {'core MB':>10}")
+    for size in sizes:
+        stream_result, stream_time, stream_peak = measure(
+            lambda: stream_evaluator.evaluate(generate_chunks(size)))
+        calculator_core.expression_cache.clear()
+        core_result, core_time, core_peak = measure(
+            lambda: calculator_core.evaluate(
+                ''.join(generate_chunks(size))))
+        assert stream_result == core_result
+        print(f"{size:>10} {stream_time:>10.3f} {stream_peak / 1e6:>10.2f}"
+              f" {core_time:>10.3f} {core_peak / 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark for ReentrantEvaluator: evaluates a corpus of distinct
+expressions with a growing amount of threads of a ThreadPoolExecutor, all
+sharing a single evaluator, and reports throughput and speedup over a
+single thread.
+With the GIL, threads take turns, so throughput does not scale; on
+free-threaded Python (3.13t and later, with the GIL disabled) it scales
+with the amount of cores.
+
+Run with: python -m benchmarks.bench_threads [expressions] [max threads]
+"""
+
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from calculator.reentrant_evaluator import ReentrantEvaluator
+
+
+def generate_corpus(size: int, seed: int = 0) -> list:
+    """
+    :param size: Amount of expressions.
+    :type size: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Distinct expressions, so no evaluation is a cache hit.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    return [f"{index}+" + '*'.join(
+        f"({generator.randint(1, 99)}-{generator.randint(1, 9)}^2)"
+        for _ in range(generator.randint(5, 15))) for index in range(size)]
+
+
+def evaluate_chunk(evaluator: ReentrantEvaluator, chunk: list) -> int:
+    """
+    :param evaluator: Shared evaluator.
+    :type evaluator: ReentrantEvaluator
+    :param chunk: Expressions to evaluate.
+    :type chunk: list
+    :return: Amount of evaluated expressions.
+    :rtype: int
+    """
+
+    for expression in chunk:
+        evaluator.evaluate(expression)
+    return len(chunk)
+
+
+def run(corpus: list, threads: int) -> float:
+    """
+    :param corpus: Expressions to evaluate.
+    :type corpus: list
+    :param threads: Amount of threads.
+    :type threads: int
+    :return: Time it took the threads to evaluate the corpus.
+    :rtype: float
+    """
+
+    evaluator = ReentrantEvaluator(cached=False)
+    chunks = [corpus[index::threads] for index in range(threads)]
+    with ThreadPoolExecutor(threads) as executor:
+        start = time.perf_counter()
+        evaluated = sum(executor.map(evaluate_chunk,
+                                     [evaluator] * threads, chunks))
+        elapsed = time.perf_counter() - start
+    assert evaluated == len(corpus)
+    return elapsed
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    corpus = generate_corpus(size)
+    print(f"{size} expressions, Python {sys.version.split()[0]}, GIL "
+          f"{'enabled' if is_gil_enabled else 'disabled'}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'threads':>8} {'expressions/s':>14} {'speedup':>8}")
+    single_thread_time = None
+    threads = 1
+    while threads <= max_threads:
+        elapsed = run(corpus, threads)
+        if single_thread_time is None:
+            single_thread_time = elapsed
+        print(f"{threads:>8} {size / elapsed:>14.0f} "
+              f"{single_thread_time / elapsed:>8.2f}")
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark for ArithmeticTokenProcessor: measures processing time per token
+for expressions with many sign minuses, from 10^3 to 10^6 tokens.
+
+Run with: python -m benchmarks.bench_token_processor [max power of 10]
+"""
+
+import sys
+import time
+
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+
+EXPRESSIONS = {
+    'minus chain (1--2--3...)':
+        lambda size: '--'.join(['1'] * (size // 3)),
+    'sign minus brackets (2*-(2*-(...)))':
+        lambda size: '2*-(' * (size // 5) + '1' + ')' * (size // 5),
+}
+
+
+def main():
+    max_power = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    for name, create_expression in EXPRESSIONS.items():
+        print(name)
+        print(f"{'tokens':>10} {'ms':>10} {'ns/token':>10}")
+        for power in range(3, max_power + 1):
+            tokens = ArithmeticScanner().scan(create_expression(10 ** power))
+            start_time = time.perf_counter()
+            ArithmeticTokenProcessor().process(tokens)
+            elapsed = time.perf_counter() - start_time
+            print(f"{len(tokens):>10} {elapsed * 1000:>10.1f} "
+                  f"{elapsed * 1e9 / len(tokens):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for TokenStream: compares memory per token of string tokens and
+of a token stream, and measures time per evaluation.
+
+Run with: python -m benchmarks.bench_token_stream [tokens] [repeats]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_scanner import generate_expression
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.token_stream import TokenStream
+
+
+def allocated_bytes(create) -> int:
+    """
+    Measures memory retained by an object after creating it.
+
+    :param create: Function which creates the object.
+    :type create: Callable
+    :return: Allocated bytes.
+    :rtype: int
+    """
+
+    tracemalloc.start()
+    created = create()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del created
+    return allocated
+
+
+def best_time(function, repeats: int) -> float:
+    """
+    Calls a function several times.
+
+    :param function: Function to call.
+    :type function: Callable
+    :param repeats: Amount of calls.
+    :type repeats: int
+    :return: Best time of calling function, in seconds.
+    :rtype: float
+    """
+
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    expression = generate_expression(size * 2)
+    tokens = ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+
+    string_bytes = allocated_bytes(
+        lambda: ArithmeticTokenProcessor().process(
+            ArithmeticScanner().scan(expression)))
+    stream_bytes = allocated_bytes(lambda: TokenStream.from_tokens(tokens))
+    print(f"{len(tokens)} tokens")
+    print(f"{'string tokens':>22}: {string_bytes / len(tokens):6.1f} "
+          f"bytes/token")
+    print(f"{'token stream':>22}: {stream_bytes / len(tokens):6.1f} "
+          f"bytes/token")
+
+    postfix = EquationSolver(tokens).compile()
+    solve_tokens_time = best_time(lambda: EquationSolver(tokens).solve(),
+                                  repeats)
+    solve_compiled_time = best_time(
+        lambda: EquationSolver([]).solve_compiled(postfix), repeats)
+    print(f"{'solve string tokens':>22}: "
+          f"{solve_tokens_time * 1e9 / len(tokens):6.1f} ns/token")
+    print(f"{'solve compiled stream':>22}: "
+          f"{solve_compiled_time * 1e9 / len(tokens):6.1f} ns/token")
+
+
+if __name__ == '__main__':
+    main()
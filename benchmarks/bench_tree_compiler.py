@@ -0,0 +1,71 @@
+"""
+Benchmark for PythonTreeCompiler: compares evaluating hot expressions
+by interpreting their postfix stream, interpreting their tree and calling
+their compiled function. Trees are built without folding, so every
+operator is left to solve (as it is for expressions which cannot be
+folded), and the one-time cost of compiling is reported as well.
+
+Run with: python -m benchmarks.bench_tree_compiler [repeats]
+"""
+
+import random
+import sys
+
+from benchmarks.bench_token_stream import best_time
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tree_compiler import PythonTreeCompiler
+
+SIZES = [10, 100, 1_000, 10_000]
+
+
+def generate_expression(operators: int, seed: int = 0) -> str:
+    """
+    Generates an expression of mixed operators.
+
+    :param operators: Approximate amount of operators in expression.
+    :type operators: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Generated expression.
+    :rtype: str
+    """
+
+    generator = random.Random(seed)
+    parts = [str(generator.randint(1, 99))]
+    for _ in range(operators // 2):
+        parts.append(generator.choice('+-*$&@'))
+        parts.append(f"~{generator.randint(1, 99)}.{generator.randint(1, 9)}")
+    return ''.join(parts)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    compiler = PythonTreeCompiler()
+    print(f"{'operators':>10} {'postfix':>10} {'tree':>10} {'compiled':>10}"
+          f" {'speedup':>8} {'compile':>10}  (us per evaluation)")
+    for size in SIZES:
+        tokens = ArithmeticTokenProcessor().process(
+            ArithmeticScanner().scan(generate_expression(size)))
+        postfix = EquationSolver(tokens).compile()
+        tree = ExpressionTree.from_postfix(postfix, fold=False)
+        function = compiler.compile(tree)
+        assert function() == tree.evaluate() == EquationSolver(
+            []).solve_compiled(postfix)
+
+        rounds = max(1, repeats * 100 // size)
+        postfix_time = best_time(
+            lambda: EquationSolver([]).solve_compiled(postfix), rounds)
+        tree_time = best_time(tree.evaluate, rounds)
+        function_time = best_time(function, rounds)
+        compile_time = best_time(lambda: compiler.compile(tree), 3)
+        print(f"{len(tree.operations):>10} {postfix_time * 1e6:>10.2f} "
+              f"{tree_time * 1e6:>10.2f} {function_time * 1e6:>10.2f} "
+              f"{tree_time / function_time:>7.1f}x "
+              f"{compile_time * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
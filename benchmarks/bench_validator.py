@@ -0,0 +1,97 @@
+"""
+Benchmark for ArithmeticValidator: compares the throughput of validating a
+corpus of which half of the expressions are invalid, in fail-fast and
+collect-all modes, with evaluating it with the calculator core and catching
+the errors.
+
+Run with: python -m benchmarks.bench_validator [expressions] [repeats]
+"""
+
+import random
+import sys
+import time
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.validator import ArithmeticValidator
+
+# Edits which make a valid expression invalid.
+_BREAKERS = ['a', ')', '(', '..', '*', '~', '!3', '()']
+
+
+def generate_corpus(size: int, seed: int = 0) -> list:
+    """
+    :param size: Amount of expressions.
+    :type size: int
+    :param seed: Seed of the random generator.
+    :type seed: int
+    :return: Expressions, every second one of which is invalid.
+    :rtype: list
+    """
+
+    generator = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        terms = [f"(~{generator.randint(1, 99)}.5-{generator.randint(1, 9)})"
+                 for _ in range(generator.randint(5, 30))]
+        expression = generator.choice('+*$&@').join(terms)
+        if index % 2:
+            position = generator.randrange(len(expression))
+            expression = (expression[:position]
+                          + generator.choice(_BREAKERS)
+                          + expression[position:])
+        corpus.append(expression)
+    return corpus
+
+
+def time_function(function, corpus: list, repeats: int) -> float:
+    """
+    :param function: Function to call on every expression.
+    :type function: Callable
+    :param corpus: Expressions.
+    :type corpus: list
+    :param repeats: Amount of passes over corpus.
+    :type repeats: int
+    :return: Best throughput, in expressions per second.
+    :rtype: float
+    """
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for expression in corpus:
+            function(expression)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    corpus = generate_corpus(size)
+    validator = ArithmeticValidator()
+    calculator_core = create_calculator_core()
+
+    def evaluate(expression):
+        # Compiled without the cache, so repeats are not cache hits.
+        try:
+            calculator_core.compile(expression).evaluate()
+        except Exception:
+            pass
+
+    invalid = sum(not validator.validate(expression).is_valid()
+                  for expression in corpus)
+    diagnostics = sum(len(validator.validate(
+        expression, collect_all=True).diagnostics) for expression in corpus)
+    print(f"{size} expressions, {invalid} invalid, {diagnostics} "
+          f"diagnostics in collect-all mode")
+    print(f"{'':>20} {'expressions/s':>14}")
+    for name, function in (
+            ('evaluate + except', evaluate),
+            ('fail-fast', validator.validate),
+            ('collect-all', lambda expression: validator.validate(
+                expression, collect_all=True))):
+        print(f"{name:>20} {time_function(function, corpus, repeats):>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
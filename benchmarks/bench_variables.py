@@ -0,0 +1,111 @@
+"""
+Benchmark for variable sessions: builds sheets of formulas of growing size
+(independent groups of an input and formulas which use it), and times
+assigning a new value to a single input, which recomputes only its group.
+For comparison, times re-submitting every formula of the sheet with its
+inputs written as numbers (what had to be done without variables).
+
+Run with: python -m benchmarks.bench_variables [max formulas] [updates]
+"""
+
+import random
+import sys
+import time
+
+from calculator.calculator_factory import create_calculator_core
+
+# Formulas of a group, which use its input (and each other).
+_GROUP_FORMULAS = (
+    ('double{0}', 'input{0} * 2 + 1'),
+    ('mean{0}', 'double{0} @ input{0}'),
+    ('square{0}', '(mean{0} - double{0}) ^ 2'),
+)
+_GROUP_SIZE = len(_GROUP_FORMULAS) + 1
+
+
+def build_sheet(groups: int):
+    """
+    :param groups: Amount of groups.
+    :type groups: int
+    :return: Calculator core with a sheet of formulas, and the time it
+        took to assign them.
+    :rtype: tuple
+    """
+
+    calculator_core = create_calculator_core(variables=True)
+    start = time.perf_counter()
+    for group in range(groups):
+        calculator_core.evaluate(f"input{group} = {group}")
+        for name, formula in _GROUP_FORMULAS:
+            calculator_core.evaluate(
+                f"{name.format(group)} = {formula.format(group)}")
+    return calculator_core, time.perf_counter() - start
+
+
+def time_updates(calculator_core, groups: int, updates: int) -> tuple:
+    """
+    :param calculator_core: Calculator core with a sheet of formulas.
+    :type calculator_core: CalculatorCore
+    :param groups: Amount of groups of the sheet.
+    :type groups: int
+    :param updates: Amount of inputs to assign.
+    :type updates: int
+    :return: Average time of an update, and the average amount of formulas
+        it recomputed.
+    :rtype: tuple
+    """
+
+    generator = random.Random(0)
+    lines = [f"input{generator.randrange(groups)} = {generator.random()}"
+             for _ in range(updates)]
+    session = calculator_core.variable_session
+    computations = session.computations
+    start = time.perf_counter()
+    for line in lines:
+        calculator_core.evaluate(line)
+    elapsed = time.perf_counter() - start
+    return (elapsed / updates,
+            (session.computations - computations) / updates)
+
+
+def time_resubmission(groups: int) -> float:
+    """
+    :param groups: Amount of groups of the sheet.
+    :type groups: int
+    :return: Time of evaluating every formula of the sheet, with the values
+        it uses written as numbers.
+    :rtype: float
+    """
+
+    calculator_core = create_calculator_core()
+    expressions = []
+    for group in range(groups):
+        double = f"({group} * 2 + 1)"
+        mean = f"({double} @ {group})"
+        expressions.extend([str(group), double, mean,
+                            f"({mean} - {double}) ^ 2"])
+    start = time.perf_counter()
+    for expression in expressions:
+        calculator_core.evaluate(expression)
+    return time.perf_counter() - start
+
+
+def main():
+    max_formulas = int(sys.argv[1]) if len(sys.argv) > 1 else 40_000
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"{'formulas':>9} {'build (s)':>10} {'update (us)':>12} "
+          f"{'recomputed':>11} {'resubmit (ms)':>14}")
+    formulas = 400
+    while formulas <= max_formulas:
+        groups = formulas // _GROUP_SIZE
+        calculator_core, build_time = build_sheet(groups)
+        update_time, recomputed = time_updates(calculator_core, groups,
+                                               updates)
+        resubmission_time = time_resubmission(groups)
+        print(f"{formulas:>9} {build_time:>10.2f} {update_time * 1e6:>12.1f} "
+              f"{recomputed:>11.1f} {resubmission_time * 1e3:>14.1f}")
+        formulas *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Module contains BatchRunner class which evaluates a stream of expressions
+non-interactively, one expression per line.
+"""
+
+import json
+import math
+import sys
+import time
+
+from calculator.calculator_core import CalculatorCore
+from calculator.utils import general_utils
+
+
+def evaluate_expression(calculator_core: CalculatorCore,
+                        expression: str) -> dict:
+    """
+    Evaluates a single expression and describes its outcome.
+
+    :param calculator_core: Calculator core used to evaluate the expression.
+    :type calculator_core: CalculatorCore
+    :param expression: Expression to evaluate.
+    :type expression: str
+    :return: Either result or error class name and message.
+    :rtype: dict
+    """
+
+    return describe_evaluation(calculator_core.evaluate, expression)
+
+
+def describe_evaluation(evaluate, *arguments) -> dict:
+    """
+    Calls an evaluation function and describes its outcome.
+
+    :param evaluate: Function which evaluates an expression.
+    :type evaluate: Callable
+    :param arguments: Arguments of evaluate.
+    :type arguments: tuple
+    :return: Either result or error class name and message. Results which
+        are not JSON numbers (of decimal / fraction backends) are strings,
+        and results which are not finite are out of calculator's range.
+    :rtype: dict
+    """
+
+    try:
+        result = evaluate(*arguments)
+        # Converting a huge exact result may fail too (integers longer than
+        # the interpreter's limit), so it is converted here.
+        if result.__class__ is int:
+            str(result)  # Raises if JSON can not write it either.
+        elif isinstance(result, float):
+            if not math.isfinite(result):  # Float arithmetic overflows to inf
+                raise OverflowError('math range error')
+        elif not isinstance(result, str):
+            result = str(result)  # Decimal / Fraction results.
+    except Exception as e:
+        return {'error': type(e).__name__,
+                'message': CalculatorCore.get_error_message(e)}
+    return {'result': result}
+
+
+def create_record(calculator_core: CalculatorCore, index: int,
+                  expression: str) -> dict:
+    """
+    Evaluates a single expression and creates its record.
+
+    :param calculator_core: Calculator core used to evaluate the expression.
+    :type calculator_core: CalculatorCore
+    :param index: Index of the expression in the input.
+    :type index: int
+    :param expression: Expression to evaluate.
+    :type expression: str
+    :return: Record of the evaluation: index and either result or error
+        class name and message (see evaluate_expression).
+    :rtype: dict
+    """
+
+    return {'index': index,
+            **evaluate_expression(calculator_core, expression)}
+
+
+class BatchRunner:
+    """
+    Class responsible for streaming expressions through the calculator
+    pipeline and writing one JSON record per expression.
+    Lines are read and written lazily, so memory usage does not depend on
+    the size of the input.
+    """
+
+    def __init__(self, calculator_core: CalculatorCore, output_stream,
+                 report_stream=None,
+                 flush_size: int = general_utils.BATCH_FLUSH_SIZE,
+                 parallel_evaluator=None):
+        """
+        :param calculator_core: Calculator core used to evaluate
+            expressions.
+        :type calculator_core: CalculatorCore
+        :param output_stream: Text stream which records are written to.
+        :type output_stream: TextIO
+        :param report_stream: Text stream which throughput report is written
+            to. If not provided, no report is written.
+        :type report_stream: TextIO
+        :param flush_size: Amount of records kept in memory before they are
+            written to output stream.
+        :type flush_size: int
+        :param parallel_evaluator: Evaluator which spreads expressions over
+            worker processes. If not provided, expressions are evaluated
+            sequentially with calculator_core.
+        :type parallel_evaluator: ParallelEvaluator
+        """
+
+        self._calculator_core = calculator_core
+        self._output_stream = output_stream
+        self._report_stream = report_stream
+        self._flush_size = flush_size
+        self._parallel_evaluator = parallel_evaluator
+
+    def run(self, input_stream) -> int:
+        """
+        Evaluates every line of input stream and writes its record.
+
+        :param input_stream: Iterable of lines (e.g. text file).
+        :type input_stream: Iterable[str]
+        :return: Amount of evaluated expressions.
+        :rtype: int
+        """
+
+        start_time = time.perf_counter()
+        records = []
+        count = 0
+        for record in self._evaluate(input_stream):
+            records.append(json.dumps(record, allow_nan=False))
+            count += 1
+            if len(records) >= self._flush_size:
+                self._write_records(records)
+                records.clear()
+        self._write_records(records)
+        self._output_stream.flush()
+        self._report(count, time.perf_counter() - start_time)
+        return count
+
+    def _evaluate(self, input_stream):
+        """
+        Lazily evaluates every line of input stream.
+
+        :param input_stream: Iterable of lines.
+        :type input_stream: Iterable[str]
+        :return: Records of evaluations.
+        :rtype: Iterator[dict]
+        """
+
+        expressions = (line.rstrip('\r\n') for line in input_stream)
+        if self._parallel_evaluator is not None:
+            return self._parallel_evaluator.evaluate(expressions)
+        return (create_record(self._calculator_core, index, expression)
+                for index, expression in enumerate(expressions))
+
+    def _write_records(self, records: list):
+        """
+        Writes a block of records to output stream.
+
+        :param records: JSON records to write.
+        :type records: list
+        """
+
+        if records:
+            self._output_stream.write('\n'.join(records))
+            self._output_stream.write('\n')
+
+    def _report(self, count: int, elapsed: float):
+        """
+        Writes throughput report to report stream.
+
+        :param count: Amount of evaluated expressions.
+        :type count: int
+        :param elapsed: Time it took to evaluate expressions, in seconds.
+        :type elapsed: float
+        """
+
+        if self._report_stream is None:
+            return
+        throughput = count / elapsed if elapsed > 0 else float('inf')
+        print(f"Evaluated {count} expressions in {elapsed:.3f}s "
+              f"({throughput:.0f} expressions/s)", file=self._report_stream)
+
+
+def open_batch_input(path: str):
+    """
+    Opens input of batch mode.
+
+    :param path: Path of input file, or '-' for standard input.
+    :type path: str
+    :return: Text stream of input, in which bytes which are not UTF-8 are
+        replaced with U+FFFD. Standard input is not closed with it.
+    :rtype: TextIO
+    """
+
+    closefd = True
+    if path == general_utils.STDIN_PATH:
+        path, closefd = sys.stdin.fileno(), False
+    return open(path, encoding='utf-8', errors='replace', closefd=closefd,
+                buffering=general_utils.BATCH_IO_BUFFER_SIZE)
@@ -2,23 +2,31 @@
 Module contains CalculatorCore class which ensures correct calcultor workflow.
 """
 
+import functools
+import time
+
+from calculator.instrumentation import StageHook, PREPROCESSOR_STAGE, \
+    STRING_PROCESSOR_STAGE, TOKENIZER_STAGE, SCANNER_STAGE, \
+    TOKEN_PROCESSOR_STAGE, INFIX_TO_POSTFIX_STAGE, TREE_BUILD_STAGE, \
+    EVALUATION_STAGE
 from calculator.interaction import input_handler, message_handler
 
+from calculator.logic.canonicalizer import Canonicalizer
 from calculator.logic.equation_solver import EquationSolver
-from calculator.logic.exceptions import EmptyParenthesesError, UnaryError, \
-    NegativeFactorialError, LargeFactorialError, \
-    NegativeSumError, LargeSumError, InvalidInputError, \
-    UnmatchedOpeningParenthesesError, NonIntFactorialError, \
-    UnmatchedClosingParenthesesError, NegativeRootError, ZeroBaseNegExError, \
-    MultipleDotsError, \
-    MultipleDotsOperandError, SingleDotError, DivisionByZeroError, \
-    OperatorUsageError, ModuloByZeroError, EmptyEquationError, \
-    WrongParenthesesUsageError, ExpectedOperandError
+from calculator.logic.expression_cache import ExpressionCache, \
+    CompiledExpression, POSITIONAL_ERRORS, make_key
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.incremental_evaluator import IncrementalEvaluator
+from calculator.logic.scanner import Scanner
 from calculator.logic.string_processor import StringProcessor
 from calculator.logic.token_processor import TokenProcessor
 from calculator.logic.string_preprocessor import StringPreprocessor
 from calculator.logic.tokenizer import Tokenizer
+from calculator.logic.tree_compiler import TreeCompiler
+from calculator.logic.variable_session import VariableSession
 from calculator.utils import general_utils
+from calculator.utils.evaluation_limits import EvaluationLimits, get_budget
+from calculator.utils.numeric_backend import NumericBackend, FLOAT_BACKEND
 
 
 class CalculatorCore:
@@ -31,7 +39,17 @@ class CalculatorCore:
                  input_handler: input_handler.InputHandler,
                  string_preprocessor: StringPreprocessor,
                  string_processor: StringProcessor,
-                 tokenizer: Tokenizer, token_processor: TokenProcessor):
+                 tokenizer: Tokenizer, token_processor: TokenProcessor,
+                 expression_cache: ExpressionCache = None,
+                 scanner: Scanner = None,
+                 numeric_backend: NumericBackend = FLOAT_BACKEND,
+                 instrumentation: StageHook = None,
+                 tree_compiler: TreeCompiler = None,
+                 incremental_evaluator: IncrementalEvaluator = None,
+                 limits: EvaluationLimits = None,
+                 result_store=None,
+                 canonicalizer: Canonicalizer = None,
+                 variable_session: VariableSession = None):
         """
         Initializes the calculator core with required components.
 
@@ -53,6 +71,56 @@ class CalculatorCore:
         :param token_processor: An instance of the TokenProcessor class
             to process tokenized user's input
         :type token_processor: TokenProcessor
+        :param expression_cache: An instance of the ExpressionCache class
+            to reuse compiled expressions. If not provided, every
+            expression is compiled from scratch.
+        :type expression_cache: ExpressionCache
+        :param scanner: An instance of the Scanner class to validate and
+            tokenize user's input in a single stage. If provided, it is used
+            instead of string_preprocessor, string_processor and tokenizer.
+        :type scanner: Scanner
+        :param numeric_backend: An instance of the NumericBackend class to
+            parse operands and calculate with.
+        :type numeric_backend: NumericBackend
+        :param instrumentation: An instance of the StageHook class which
+            gets the timing of every stage of every evaluation. If not
+            provided, stages are not timed.
+        :type instrumentation: StageHook
+        :param tree_compiler: An instance of the TreeCompiler class to
+            compile the trees of cached expressions once they are hot. If
+            not provided, cached trees are always interpreted.
+        :type tree_compiler: TreeCompiler
+        :param incremental_evaluator: An instance of the IncrementalEvaluator
+            class which keeps the parse of the previous expression, so
+            edited expressions are re-evaluated incrementally. If not
+            provided, every expression is evaluated on its own. Not used
+            when stages are timed.
+        :type incremental_evaluator: IncrementalEvaluator
+        :param limits: An instance of the EvaluationLimits class which
+            limits the deadline, tokens, nesting depth and operations of
+            every evaluation. If not provided, evaluations are not limited.
+            Tokens and depth are checked when an expression is compiled, so
+            expressions reused from the cache only spend their operations.
+            The incremental evaluator is not used while limits are active.
+        :type limits: EvaluationLimits
+        :param result_store: An instance of the ResultStore class which
+            keeps outcomes of evaluations persistently, across runs. It is
+            consulted before the pipeline runs (outcomes it has are not
+            timed by instrumentation). If not provided, outcomes are not
+            stored.
+        :type result_store: ResultStore
+        :param canonicalizer: An instance of the Canonicalizer class which
+            gives equivalent expressions the same canonical form, so they
+            share their results in the result store. If not provided,
+            results are only shared by expressions of the same text (but
+            white spaces).
+        :type canonicalizer: Canonicalizer
+        :param variable_session: An instance of the VariableSession class
+            which keeps named variables, so expressions may assign and use
+            them. If not provided, names are invalid input. Expressions
+            which do not use variables (or are evaluated with another
+            backend) are evaluated like without a session.
+        :type variable_session: VariableSession
         """
 
         self.message_handler = message_handler
@@ -61,6 +129,16 @@ class CalculatorCore:
         self.string_processor = string_processor
         self.tokenizer = tokenizer
         self.token_processor = token_processor
+        self.expression_cache = expression_cache
+        self.scanner = scanner
+        self.numeric_backend = numeric_backend
+        self.instrumentation = instrumentation
+        self.tree_compiler = tree_compiler
+        self.incremental_evaluator = incremental_evaluator
+        self.limits = limits
+        self.result_store = result_store
+        self.canonicalizer = canonicalizer
+        self.variable_session = variable_session
 
     def run(self):
         """
@@ -71,70 +149,12 @@ class CalculatorCore:
             expression = self.get_input_loop()
             while expression != general_utils.QUIT_STR:
                 try:
-                    self.string_preprocessor.preprocess(expression)
-                    expression = self.string_processor.process(expression)
-                    tokenized_equation = self.tokenizer.tokenize(
-                        expression)
-                    processed_tokenized_equation = (
-                        self.token_processor.process(tokenized_equation))
-                    equation_solver = EquationSolver(
-                        processed_tokenized_equation)
-                    solution = equation_solver.solve()
+                    solution = self.evaluate(expression)
                     if solution is not None:
-                        self.message_handler.display_result_message(
-                            str(solution))
-                except InvalidInputError as iie:
-                    self.handle_display_error(iie)
-                except EmptyEquationError as eee:
-                    self.handle_display_error(eee)
-                except NonIntFactorialError as nife:
-                    self.handle_display_error(nife)
-                except UnmatchedOpeningParenthesesError as uope:
-                    self.handle_display_error(uope)
-                except UnmatchedClosingParenthesesError as ucpe:
-                    self.handle_display_error(ucpe)
-                except WrongParenthesesUsageError as wpue:
-                    self.handle_display_error(wpue)
-                except EmptyParenthesesError as epe:
-                    self.handle_display_error(epe)
-                except SingleDotError as sde:
-                    self.handle_display_error(sde)
-                except MultipleDotsError as mde:
-                    self.handle_display_error(mde)
-                except MultipleDotsOperandError as mdoe:
-                    self.handle_display_error(mdoe)
-                except UnaryError as ue:
-                    self.handle_display_error(ue)
-                except DivisionByZeroError as dbze:
-                    self.handle_display_error(dbze)
-                except ModuloByZeroError as mbze:
-                    self.handle_display_error(mbze)
-                except ZeroBaseNegExError as zbnee:
-                    self.handle_display_error(zbnee)
-                except NegativeRootError as nre:
-                    self.handle_display_error(nre)
-                except NegativeFactorialError as nfe:
-                    self.handle_display_error(nfe)
-                except LargeFactorialError as lfe:
-                    self.handle_display_error(lfe)
-                except NegativeSumError as nse:
-                    self.handle_display_error(nse)
-                except LargeSumError as lse:
-                    self.handle_display_error(lse)
-                except OperatorUsageError as oue:
-                    self.handle_display_error(oue)
-                except ExpectedOperandError as eoe:
-                    self.handle_display_error(eoe)
-                except IndexError as ie:
-                    self.handle_display_error(ie)
+                        self.message_handler.display_result(solution)
                 except OverflowError as oe:
-                    # oe.args[-1] = error message
-                    if oe.args[-1] == 'math range error':
-                        self.handle_display_error(f"Error! result is out of "
-                                                  f"calculator's range")
-                    else:
-                        self.handle_display_error(f"Error! {oe.args[-1]}")
-                except Exception as e:
+                    self.handle_display_error(self.get_error_message(oe))
+                except Exception as e:  # Errors' messages are their str.
                     self.handle_display_error(e)
 
                 self.message_handler.display_input_message()
@@ -145,6 +165,333 @@ class CalculatorCore:
 
         self.message_handler.display_quit_message()
 
+    def evaluate(self, expression: str, backend: NumericBackend = None):
+        """
+        Evaluates a single expression, reusing its compiled form from the
+        expression cache when possible.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param backend: Numeric backend to evaluate with, instead of the
+            core's backend. Expressions evaluated with another backend are
+            not cached.
+        :type backend: NumericBackend
+        :return: Solution to expression.
+        :rtype: float
+        :raises EvaluationLimitError: If the evaluation exceeded its limits.
+        """
+
+        if self.limits is not None:
+            with self.limits.activate():
+                return self._evaluate(expression, backend)
+        return self._evaluate(expression, backend)
+
+    def _evaluate(self, expression: str, backend: NumericBackend = None):
+        """
+        Evaluates a single expression like evaluate, with the active
+        evaluation limits (if there are any).
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param backend: Numeric backend to evaluate with, instead of the
+            core's backend.
+        :type backend: NumericBackend
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        if backend is None:
+            backend = self.numeric_backend
+        if (self.variable_session is not None
+                and backend is self.numeric_backend):
+            with backend.activate():
+                return self.variable_session.execute(
+                    expression, self.process,
+                    functools.partial(self._evaluate_expression, expression,
+                                      backend))
+        return self._evaluate_expression(expression, backend)
+
+    def _evaluate_expression(self, expression: str, backend: NumericBackend):
+        """
+        Evaluates a single expression which does not use variables, with
+        the result store (if there is one) or the pipeline.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param backend: Numeric backend to evaluate with.
+        :type backend: NumericBackend
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        if (self.result_store is not None
+                and backend is self.numeric_backend):
+            return self._evaluate_stored(expression)
+        return self._evaluate_pipeline(expression, backend)
+
+    def _evaluate_stored(self, expression: str):
+        """
+        Gets the outcome of an expression from the result store, or
+        evaluates it with the core's backend and stores its outcome.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        key = make_key(expression)
+        exact_key = general_utils.EXACT_KEY_PREFIX + key
+        # The key has no white spaces, so errors which point into the
+        # expression are used (and stored) only if it has none either.
+        is_white_space_free = key == expression
+        stored_outcome = self.result_store.get(exact_key)
+        if stored_outcome is not None and (
+                is_white_space_free
+                or not isinstance(stored_outcome.error, POSITIONAL_ERRORS)):
+            return stored_outcome.get_result()
+        try:
+            if (self.canonicalizer is not None
+                    and self.instrumentation is None):
+                with self.numeric_backend.activate():
+                    result = self._evaluate_canonical(key, expression)
+            else:
+                result = self._evaluate_pipeline(expression,
+                                                 self.numeric_backend)
+        except Exception as error:
+            if is_white_space_free or not isinstance(error, POSITIONAL_ERRORS):
+                self.result_store.put_error(exact_key, error)
+            raise
+        self.result_store.put_result(exact_key, result)
+        return result
+
+    def _evaluate_canonical(self, key: str, expression: str):
+        """
+        Evaluates an expression which is not in the result store, unless
+        the result of an equivalent expression (of the same canonical form)
+        is. Results are stored by canonical form too, but errors are not:
+        their messages may depend on the order of operands.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        postfix = EquationSolver(self.process(expression)).compile()
+        canonical_form = self.canonicalizer.canonicalize(postfix)
+        canonical_key = None
+        if canonical_form is not None:
+            canonical_key = (general_utils.CANONICAL_KEY_PREFIX
+                             + canonical_form.text)
+            stored_outcome = self.result_store.get(canonical_key)
+            if stored_outcome is not None and stored_outcome.error is None:
+                return stored_outcome.result
+        compiled_expression = CompiledExpression(
+            ExpressionTree.from_postfix(postfix), self.tree_compiler)
+        if self.expression_cache is not None:
+            self.expression_cache.put(key, compiled_expression)
+        result = compiled_expression.evaluate()
+        if canonical_key is not None:
+            self.result_store.put_result(canonical_key, result)
+        return result
+
+    def _evaluate_pipeline(self, expression: str, backend: NumericBackend):
+        """
+        Evaluates a single expression with the pipeline (and the expression
+        cache).
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param backend: Numeric backend to evaluate with.
+        :type backend: NumericBackend
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        if self.instrumentation is not None:
+            return self._evaluate_instrumented(expression, backend)
+        with backend.activate():
+            if backend is not self.numeric_backend:
+                return self.compile(expression).evaluate()
+            if (self.incremental_evaluator is not None
+                    and get_budget() is None):
+                return self.incremental_evaluator.evaluate(
+                    expression, self.process,
+                    functools.partial(self._evaluate_cached, expression))
+            return self._evaluate_cached(expression)
+
+    def _evaluate_cached(self, expression: str):
+        """
+        Evaluates a single expression with the active (core's) backend,
+        reusing its compiled form from the expression cache when possible.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        if self.expression_cache is None:
+            return self.compile(expression).evaluate()
+
+        key = make_key(expression)
+        compiled_expression = self.expression_cache.get(key)
+        if compiled_expression is None:
+            compiled_expression = CompiledExpression(
+                self.compile(expression), self.tree_compiler)
+            self.expression_cache.put(key, compiled_expression)
+        return compiled_expression.evaluate()
+
+    def _evaluate_instrumented(self, expression: str,
+                               backend: NumericBackend):
+        """
+        Evaluates a single expression like evaluate, reporting every stage
+        to the instrumentation hook. Cache hits report only the evaluation
+        stage.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param backend: Numeric backend to evaluate with.
+        :type backend: NumericBackend
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        with backend.activate():
+            if (self.expression_cache is None
+                    or backend is not self.numeric_backend):
+                tree = self._compile_instrumented(expression)
+                return self._run_stage(EVALUATION_STAGE, tree.evaluate,
+                                       len(tree))
+
+            key = make_key(expression)
+            compiled_expression = self.expression_cache.get(key)
+            if compiled_expression is None:
+                compiled_expression = CompiledExpression(
+                    self._compile_instrumented(expression),
+                    self.tree_compiler)
+                self.expression_cache.put(key, compiled_expression)
+            return self._run_stage(EVALUATION_STAGE,
+                                   compiled_expression.evaluate,
+                                   len(compiled_expression.tree))
+
+    def _compile_instrumented(self, expression: str) -> ExpressionTree:
+        """
+        Compiles an expression like compile, reporting every stage to the
+        instrumentation hook.
+
+        :param expression: Expression to compile.
+        :type expression: str
+        :return: Optimized tree of expression.
+        :rtype: ExpressionTree
+        """
+
+        if self.scanner is not None:
+            tokenized_equation = self._run_stage(
+                SCANNER_STAGE, self.scanner.scan, len(expression),
+                expression)
+        else:
+            self._run_stage(PREPROCESSOR_STAGE,
+                            self.string_preprocessor.preprocess,
+                            len(expression), expression)
+            expression = self._run_stage(
+                STRING_PROCESSOR_STAGE, self.string_processor.process,
+                len(expression), expression)
+            tokenized_equation = self._run_stage(
+                TOKENIZER_STAGE, self.tokenizer.tokenize, len(expression),
+                expression)
+        processed_tokenized_equation = self._run_stage(
+            TOKEN_PROCESSOR_STAGE, self.token_processor.process,
+            len(tokenized_equation), tokenized_equation)
+        postfix = self._run_stage(
+            INFIX_TO_POSTFIX_STAGE,
+            EquationSolver(processed_tokenized_equation).compile,
+            len(processed_tokenized_equation))
+        return self._run_stage(TREE_BUILD_STAGE, ExpressionTree.from_postfix,
+                               len(postfix), postfix)
+
+    def _run_stage(self, stage: str, function, size: int, *arguments):
+        """
+        Runs a stage, timing it and reporting it (or its error) to the
+        instrumentation hook.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :param function: Function which runs the stage.
+        :type function: Callable
+        :param size: Size of the stage's input.
+        :type size: int
+        :param arguments: Arguments of function.
+        :return: Result of function.
+        """
+
+        start_time = time.perf_counter_ns()
+        try:
+            result = function(*arguments)
+        except Exception as error:
+            self.instrumentation.on_error(
+                stage, time.perf_counter_ns() - start_time, error)
+            raise
+        self.instrumentation.on_stage(
+            stage, time.perf_counter_ns() - start_time, size)
+        return result
+
+    def compile(self, expression: str) -> ExpressionTree:
+        """
+        Runs the expression through the scanning (or preprocessing,
+        processing and tokenizing) and token processing stages, compiles it
+        to postfix and builds its optimized tree, with the active numeric
+        backend.
+
+        :param expression: Expression to compile.
+        :type expression: str
+        :return: Optimized tree of expression.
+        :rtype: ExpressionTree
+        """
+
+        return ExpressionTree.from_postfix(
+            EquationSolver(self.process(expression)).compile())
+
+    def process(self, expression: str) -> list:
+        """
+        Runs the expression through the scanning (or preprocessing,
+        processing and tokenizing) and token processing stages.
+
+        :param expression: Expression to process.
+        :type expression: str
+        :return: Processed tokens of expression.
+        :rtype: list
+        """
+
+        if self.scanner is not None:
+            tokenized_equation = self.scanner.scan(expression)
+        else:
+            self.string_preprocessor.preprocess(expression)
+            expression = self.string_processor.process(expression)
+            tokenized_equation = self.tokenizer.tokenize(expression)
+        return self.token_processor.process(tokenized_equation)
+
+    @staticmethod
+    def get_error_message(error: Exception) -> str:
+        """
+        Creates the message which describes an evaluation error.
+
+        :param error: Error raised while evaluating an expression.
+        :type error: Exception
+        :return: Message describing the error.
+        :rtype: str
+        """
+
+        if isinstance(error, OverflowError):
+            # error.args[-1] = error message
+            if error.args[-1] == 'math range error':
+                return "Error! result is out of calculator's range"
+            return f"Error! {error.args[-1]}"
+        return str(error)
+
     def handle_display_error(self, error):
         """
         Helper method to display error messages.
@@ -0,0 +1,87 @@
+"""
+Module for creating a CalculatorCore wired with the arithmetic
+implementations of every pipeline stage.
+"""
+
+from calculator.calculator_core import CalculatorCore
+from calculator.instrumentation import StageHook
+from calculator.interaction.input_handler import InputHandler
+from calculator.interaction.message_handler import MessageHandler
+from calculator.logic.canonicalizer import ArithmeticCanonicalizer
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.expression_cache import LRUExpressionCache
+from calculator.logic.incremental_evaluator import \
+    ArithmeticIncrementalEvaluator
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+from calculator.logic.tree_compiler import PythonTreeCompiler
+from calculator.logic.variable_session import DependencyGraphSession
+from calculator.utils.evaluation_limits import EvaluationLimits
+from calculator.utils.numeric_backend import NumericBackend, FLOAT_BACKEND
+
+
+def create_calculator_core(message_handler: MessageHandler = None,
+                           input_handler: InputHandler = None,
+                           numeric_backend: NumericBackend = FLOAT_BACKEND,
+                           instrumentation: StageHook = None,
+                           incremental: bool = False,
+                           limits: EvaluationLimits = None,
+                           result_store=None,
+                           variables: bool = False) -> CalculatorCore:
+    """
+    Creates a calculator core with arithmetic pipeline stages, a single-pass
+    scanner, an expression cache and a compiler of hot cached trees.
+
+    :param message_handler: Handler to display messages with. Not needed
+        for non-interactive usage.
+    :type message_handler: MessageHandler
+    :param input_handler: Handler to get input with. Not needed for
+        non-interactive usage.
+    :type input_handler: InputHandler
+    :param numeric_backend: Backend to parse operands and calculate with.
+    :type numeric_backend: NumericBackend
+    :param instrumentation: Hook which gets the timing of every stage. If
+        not provided, stages are not timed.
+    :type instrumentation: StageHook
+    :param incremental: Whether the core keeps the parse of the previous
+        expression, to re-evaluate edited expressions incrementally (meant
+        for interactive usage).
+    :type incremental: bool
+    :param limits: Limits of every evaluation. If not provided, evaluations
+        are not limited.
+    :type limits: EvaluationLimits
+    :param result_store: Persistent store of evaluations' outcomes, which
+        is consulted before the pipeline runs. Results are shared by
+        expressions of the same canonical form. Its numeric backend must be
+        numeric_backend. If not provided, outcomes are not stored.
+    :type result_store: ResultStore
+    :param variables: Whether the core keeps a session of named variables,
+        which expressions may assign (name = expression) and use (meant
+        for interactive usage).
+    :type variables: bool
+    :return: Calculator core.
+    :rtype: CalculatorCore
+    """
+
+    return CalculatorCore(
+        message_handler=message_handler,
+        input_handler=input_handler,
+        string_preprocessor=ArithmeticStringPreprocessor(),
+        string_processor=ArithmeticStringProcessor(),
+        tokenizer=ArithmeticTokenizer(),
+        token_processor=ArithmeticTokenProcessor(),
+        expression_cache=LRUExpressionCache(OPERATOR_REGISTRY),
+        scanner=ArithmeticScanner(),
+        numeric_backend=numeric_backend,
+        instrumentation=instrumentation,
+        tree_compiler=PythonTreeCompiler(),
+        incremental_evaluator=(ArithmeticIncrementalEvaluator()
+                               if incremental else None),
+        limits=limits,
+        result_store=result_store,
+        canonicalizer=ArithmeticCanonicalizer(),
+        variable_session=DependencyGraphSession() if variables else None
+    )
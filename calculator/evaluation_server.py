@@ -0,0 +1,347 @@
+"""
+Module contains EvaluationServer class which serves expression evaluations
+over TCP with asyncio.
+
+Protocol: newline-delimited JSON. Every request line is an object with an
+"expression" string and an optional "id" of any JSON type, and is answered
+by a response line with the same "id" and either "result" or "error" and
+"message" (see batch_runner.evaluate_expression). Requests may be
+pipelined: a client may send any amount of requests without waiting, and
+responses of a connection are written in request order.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from calculator.batch_runner import evaluate_expression
+from calculator.calculator_factory import create_calculator_core
+from calculator.calculator_core import CalculatorCore
+from calculator.utils import general_utils, operator_utils
+from calculator.utils.numeric_backend import FloatBackend
+
+# Error name of requests which are not valid JSON request objects.
+INVALID_REQUEST_ERROR = 'InvalidRequestError'
+
+# Error name of requests whose worker process died while evaluating them.
+WORKER_ERROR = 'WorkerError'
+
+# Calculator core of the current worker process, built once per worker.
+_worker_calculator_core = None
+
+
+def _init_worker(core_factory):
+    """
+    Builds the calculator core of a worker process.
+
+    :param core_factory: Function which creates a calculator core.
+    :type core_factory: Callable[[], CalculatorCore]
+    """
+
+    global _worker_calculator_core
+    _worker_calculator_core = core_factory()
+
+
+def _evaluate_in_worker(expression: str) -> dict:
+    """
+    Evaluates an expression in a worker process.
+
+    :param expression: Expression to evaluate.
+    :type expression: str
+    :return: Outcome of the evaluation (see evaluate_expression).
+    :rtype: dict
+    """
+
+    return evaluate_expression(_worker_calculator_core, expression)
+
+
+def _reject_constant(name: str):
+    """
+    :param name: Non-finite JSON constant ('NaN', 'Infinity' or
+        '-Infinity').
+    :type name: str
+    :raises ValueError: Always, since responses can not contain it.
+    """
+
+    raise ValueError(f"Request must not contain {name}")
+
+
+def parse_request(line: bytes) -> tuple:
+    """
+    Parses a request line.
+
+    :param line: Request line, with or without its line break.
+    :type line: bytes
+    :return: Id and expression of request.
+    :rtype: tuple
+    :raises ValueError: if line is not a valid request.
+    """
+
+    request = json.loads(line, parse_constant=_reject_constant)
+    if not isinstance(request, dict):
+        raise ValueError("Request must be a JSON object")
+    expression = request.get('expression')
+    if not isinstance(expression, str):
+        raise ValueError("Request must have an 'expression' string")
+    return request.get('id'), expression
+
+
+class EvaluationServer:
+    """
+    Class responsible for serving evaluations to many concurrent
+    connections on a single event loop.
+    Cheap expressions are evaluated on the event loop, which is cheaper
+    than sending them elsewhere. Expressions whose estimated cost is at
+    least offload_size are evaluated on a pool of worker processes, so a
+    heavy expression does not stall the other connections. The cost of an
+    expression is its length, plus SERVER_FACTORIAL_COST per factorial.
+    With backends other than float (exact fractions, or decimals of any
+    precision), powers take time which depends on their operands and the
+    precision rather than on the length, so expressions with powers are
+    always offloaded.
+    Every connection has at most max_pending requests in flight: a client
+    which does not read its responses stops being read from.
+    """
+
+    def __init__(self, core_factory=create_calculator_core,
+                 workers: int = None,
+                 offload_size: int = general_utils.SERVER_OFFLOAD_SIZE,
+                 max_pending: int = general_utils.SERVER_MAX_PENDING):
+        """
+        :param core_factory: Picklable function which creates the
+            calculator core of the event loop and of each worker.
+        :type core_factory: Callable[[], CalculatorCore]
+        :param workers: Amount of worker processes for long expressions.
+            Defaults to the amount of CPUs.
+        :type workers: int
+        :param offload_size: Estimated cost from which expressions are
+            evaluated on worker processes.
+        :type offload_size: int
+        :param max_pending: Amount of requests in flight per connection.
+        :type max_pending: int
+        """
+
+        self._core_factory = core_factory
+        self._calculator_core = core_factory()
+        self._offloads_powers = not isinstance(
+            self._calculator_core.numeric_backend, FloatBackend)
+        self._workers = workers or os.cpu_count() or 1
+        self._offload_size = offload_size
+        self._max_pending = max_pending
+        self._executor = None
+        self._server = None
+        self._connections = {}
+
+    async def start(self, host: str = general_utils.SERVER_HOST,
+                    port: int = general_utils.SERVER_PORT):
+        """
+        Starts accepting connections.
+
+        :param host: Address to bind.
+        :type host: str
+        :param port: Port to bind (0 for any free port).
+        :type port: int
+        """
+
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port,
+            limit=general_utils.SERVER_MAX_LINE_SIZE)
+
+    def get_port(self) -> int:
+        """
+        :return: Port the server is bound to.
+        :rtype: int
+        """
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Serves connections until cancelled.
+        """
+
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops accepting connections, closes open connections and shuts the
+        worker processes down.
+        """
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """
+        Reads the requests of a connection and queues their responses,
+        which another task writes in request order.
+
+        :param reader: Reader of the connection.
+        :type reader: asyncio.StreamReader
+        :param writer: Writer of the connection.
+        :type writer: asyncio.StreamWriter
+        """
+
+        self._connections[asyncio.current_task()] = writer
+        responses = asyncio.Queue(self._max_pending)
+        writer_task = asyncio.create_task(
+            self._write_responses(responses, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Line longer than the stream limit.
+                    await responses.put(
+                        {'id': None, 'error': INVALID_REQUEST_ERROR,
+                         'message': "Request line is too long"})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await responses.put(self._handle_request(line))
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await writer_task
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            del self._connections[asyncio.current_task()]
+
+    def _handle_request(self, line: bytes):
+        """
+        Starts handling a request.
+
+        :param line: Request line.
+        :type line: bytes
+        :return: Response, or a future of response for offloaded requests.
+        :rtype: dict or asyncio.Future
+        """
+
+        try:
+            request_id, expression = parse_request(line)
+        except Exception as e:  # e.g. RecursionError of deeply nested JSON
+            return {'id': None, 'error': INVALID_REQUEST_ERROR,
+                    'message': str(e)}
+        if not self._is_heavy(expression):
+            return self._evaluate_inline(request_id, expression)
+        return asyncio.ensure_future(self._offload(request_id, expression))
+
+    def _is_heavy(self, expression: str) -> bool:
+        """
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Whether expression is estimated to be too costly for the
+            event loop.
+        :rtype: bool
+        """
+
+        if (self._offloads_powers
+                and operator_utils.POW_SYMBOL in expression):
+            return True
+        cost = (len(expression) + general_utils.SERVER_FACTORIAL_COST
+                * expression.count(operator_utils.FAC_SYMBOL))
+        return cost >= self._offload_size
+
+    def _evaluate_inline(self, request_id, expression: str) -> dict:
+        """
+        Evaluates an expression on the event loop.
+
+        :param request_id: Id of request.
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Response.
+        :rtype: dict
+        """
+
+        try:
+            outcome = evaluate_expression(self._calculator_core, expression)
+        except Exception as e:  # An error the connection must outlive.
+            outcome = {'error': type(e).__name__,
+                       'message': CalculatorCore.get_error_message(e)}
+        return {'id': request_id, **outcome}
+
+    async def _offload(self, request_id, expression: str) -> dict:
+        """
+        Evaluates an expression on a worker process.
+
+        :param request_id: Id of request.
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Response.
+        :rtype: dict
+        """
+
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = self._create_executor()
+        executor = self._executor
+        try:
+            outcome = await loop.run_in_executor(
+                executor, _evaluate_in_worker, expression)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                executor.shutdown(wait=False)
+                self._executor = None
+            outcome = {'error': WORKER_ERROR,
+                       'message': "Worker process died while evaluating"}
+        return {'id': request_id, **outcome}
+
+    @staticmethod
+    async def _write_responses(responses: asyncio.Queue,
+                               writer: asyncio.StreamWriter):
+        """
+        Writes responses in order until a None is queued. Responses are
+        flushed whenever no other response is ready. After the connection
+        fails, responses are dropped, so the reading side never blocks.
+
+        :param responses: Queue of responses (or futures of responses).
+        :type responses: asyncio.Queue
+        :param writer: Writer of the connection.
+        :type writer: asyncio.StreamWriter
+        """
+
+        connected = True
+        while True:
+            response = await responses.get()
+            if response is None:
+                return
+            if not isinstance(response, dict):
+                response = await response
+            if not connected:
+                continue
+            try:
+                writer.write(json.dumps(response, allow_nan=False).encode()
+                             + b'\n')
+                if responses.empty():
+                    await writer.drain()
+            except ConnectionError:
+                connected = False
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """
+        :return: Pool of worker processes, each with its own calculator core.
+            Workers are spawned rather than forked, so they do not inherit
+            (and keep open) the sockets of the server.
+        :rtype: ProcessPoolExecutor
+        """
+
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(self._core_factory,))
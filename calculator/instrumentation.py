@@ -0,0 +1,204 @@
+"""
+Module for instrumenting the stages of the calculator pipeline.
+Contains an abstract hook which CalculatorCore reports every stage to, and
+an implementation which accumulates per-stage latency histograms, sizes and
+error counts.
+"""
+
+import json
+from abc import ABC, abstractmethod
+
+# Names of the pipeline stages, in pipeline order.
+PREPROCESSOR_STAGE = 'preprocessor'
+STRING_PROCESSOR_STAGE = 'string_processor'
+TOKENIZER_STAGE = 'tokenizer'
+SCANNER_STAGE = 'scanner'
+TOKEN_PROCESSOR_STAGE = 'token_processor'
+INFIX_TO_POSTFIX_STAGE = 'infix_to_postfix'
+TREE_BUILD_STAGE = 'tree_build'
+EVALUATION_STAGE = 'evaluation'
+
+
+class StageHook(ABC):
+    """
+    Abstract class for a hook which gets the timing of every pipeline stage.
+    """
+
+    @abstractmethod
+    def on_stage(self, stage: str, elapsed_ns: int, size: int):
+        """
+        Abstract method called after a stage completed.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :param elapsed_ns: Time the stage took, in nanoseconds.
+        :type elapsed_ns: int
+        :param size: Size of the stage's input: characters for string
+            stages, tokens for the other stages.
+        :type size: int
+        """
+
+    @abstractmethod
+    def on_error(self, stage: str, elapsed_ns: int, error: Exception):
+        """
+        Abstract method called after a stage raised an error.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :param elapsed_ns: Time until the error was raised, in nanoseconds.
+        :type elapsed_ns: int
+        :param error: Error raised by the stage.
+        :type error: Exception
+        """
+
+
+class StageStatistics(StageHook):
+    """
+    Stage hook which accumulates, for every stage: amount of calls, total
+    time, total size, a latency histogram and error counts by error class.
+    Calls, time, size and histogram are of completed stages only; the time
+    of stages which raised an error is accumulated apart, as error_ns.
+    Histogram buckets are powers of two of nanoseconds: bucket b counts
+    calls which took less than 2^b ns (and at least 2^(b-1) ns).
+    """
+
+    def __init__(self):
+        self._stages = {}
+
+    def on_stage(self, stage: str, elapsed_ns: int, size: int):
+        """
+        Records a completed stage.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :param elapsed_ns: Time the stage took, in nanoseconds.
+        :type elapsed_ns: int
+        :param size: Size of the stage's input.
+        :type size: int
+        """
+
+        statistics = self._get_stage(stage)
+        statistics['calls'] += 1
+        statistics['total_ns'] += elapsed_ns
+        statistics['size'] += size
+        histogram = statistics['histogram']
+        bucket = elapsed_ns.bit_length()
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def on_error(self, stage: str, elapsed_ns: int, error: Exception):
+        """
+        Records a stage which raised an error.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :param elapsed_ns: Time until the error was raised, in nanoseconds.
+        :type elapsed_ns: int
+        :param error: Error raised by the stage.
+        :type error: Exception
+        """
+
+        statistics = self._get_stage(stage)
+        statistics['error_ns'] += elapsed_ns
+        errors = statistics['errors']
+        error_name = type(error).__name__
+        errors[error_name] = errors.get(error_name, 0) + 1
+
+    def get_stats(self) -> dict:
+        """
+        :return: Statistics of every stage which was recorded, in pipeline
+            order: calls, errors, total_ns, mean_ns, size, histogram
+            (bucket upper bound in ns -> calls), p50 / p99 upper bounds
+            and error_ns.
+        :rtype: dict
+        """
+
+        stats = {}
+        for stage, statistics in self._stages.items():
+            calls = statistics['calls']
+            histogram = {1 << bucket: count for bucket, count
+                         in sorted(statistics['histogram'].items())}
+            stats[stage] = {
+                'calls': calls,
+                'errors': dict(statistics['errors']),
+                'total_ns': statistics['total_ns'],
+                'mean_ns': statistics['total_ns'] // calls if calls else 0,
+                'size': statistics['size'],
+                'histogram': histogram,
+                'p50_ns': self._get_percentile(histogram, calls, 0.5),
+                'p99_ns': self._get_percentile(histogram, calls, 0.99),
+                'error_ns': statistics['error_ns'],
+            }
+        return stats
+
+    def format_report(self) -> str:
+        """
+        :return: Human readable table of stage statistics.
+        :rtype: str
+        """
+
+        lines = [f"{'stage':>18} {'calls':>9} {'errors':>7} "
+                 f"{'mean us':>10} {'p50 us':>10} {'p99 us':>10} "
+                 f"{'size':>11}"]
+        for stage, stats in self.get_stats().items():
+            lines.append(f"{stage:>18} {stats['calls']:>9} "
+                         f"{sum(stats['errors'].values()):>7} "
+                         f"{stats['mean_ns'] / 1000:>10.2f} "
+                         f"{stats['p50_ns'] / 1000:>10.2f} "
+                         f"{stats['p99_ns'] / 1000:>10.2f} "
+                         f"{stats['size']:>11}")
+        return '\n'.join(lines)
+
+    def dump(self, stream):
+        """
+        Writes the statistics to a stream as JSON.
+
+        :param stream: Text stream to write to.
+        :type stream: TextIO
+        """
+
+        json.dump(self.get_stats(), stream, indent=2)
+        stream.write('\n')
+
+    def clear(self):
+        """
+        Removes all recorded statistics.
+        """
+
+        self._stages.clear()
+
+    def _get_stage(self, stage: str) -> dict:
+        """
+        :param stage: Name of the stage.
+        :type stage: str
+        :return: Accumulated statistics of stage (created if missing).
+        :rtype: dict
+        """
+
+        statistics = self._stages.get(stage)
+        if statistics is None:
+            statistics = self._stages[stage] = {
+                'calls': 0, 'total_ns': 0, 'size': 0, 'histogram': {},
+                'errors': {}, 'error_ns': 0}
+        return statistics
+
+    @staticmethod
+    def _get_percentile(histogram: dict, calls: int,
+                        percentile: float) -> int:
+        """
+        :param histogram: Bucket upper bound -> calls, sorted by bound.
+        :type histogram: dict
+        :param calls: Total amount of calls.
+        :type calls: int
+        :param percentile: Percentile, between 0 and 1.
+        :type percentile: float
+        :return: Upper bound of the bucket which contains the percentile
+            (0 if there are no calls).
+        :rtype: int
+        """
+
+        counted = 0
+        for upper_bound, count in histogram.items():
+            counted += count
+            if counted >= percentile * calls:
+                return upper_bound
+        return 0
@@ -1,10 +1,19 @@
 """
 Module for user input handling.
-Contains an abstract base class and a console-specific implementation.
+Contains an abstract base class, a console-specific implementation, and
+implementations which read input which is not a terminal (a pipe or a
+file) in bulk.
 """
 
+import functools
+import itertools
+import mmap
+import os
+import sys
 from abc import ABC, abstractmethod
 
+from calculator.utils import general_utils
+
 
 class InputHandler(ABC):
     """
@@ -34,3 +43,237 @@ class ConsoleInputHandler(InputHandler):
         """
 
         return input()
+
+
+class BulkInputHandler(InputHandler):
+    """
+    Abstract class for obtaining input lines from bytes which are read in
+    large blocks. Every block is decoded and split into lines at once, so
+    lines are neither read nor decoded one by one. The end of the input
+    ends the program, as if the user typed the quit string.
+    Handlers are context managers, which close their input on exit.
+    """
+
+    def __init__(self):
+        self._lines = None  # Iterator of the lines get_input returns
+
+    @abstractmethod
+    def read_blocks(self):
+        """
+        Abstract method for reading the input in blocks.
+
+        :return: Blocks of the input, in order.
+        :rtype: Iterator[bytes]
+        """
+
+        pass
+
+    def lines(self):
+        """
+        :return: Lines of the input, without their line breaks.
+        :rtype: Iterator[str]
+        """
+
+        return itertools.chain.from_iterable(
+            split_blocks(self.read_blocks()))
+
+    def get_input(self) -> str:
+        """
+        Get the next line of the input.
+
+        :return: Line without its line break, or the quit string at the end
+            of the input.
+        :rtype: str
+        """
+
+        if self._lines is None:
+            self._lines = self.lines()
+        return next(self._lines, general_utils.QUIT_STR)
+
+    def close(self):
+        """
+        Closes the input, if the handler owns it.
+        """
+
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BlockInputHandler(BulkInputHandler):
+    """
+    Concrete class responsible for obtaining input lines from a binary
+    stream (a pipe or a file), which is read in large blocks.
+    """
+
+    def __init__(self, stream=None,
+                 block_size: int = general_utils.INPUT_BLOCK_SIZE):
+        """
+        :param stream: Binary stream to read. Defaults to the standard
+            input's buffer. It is not closed by the handler.
+        :type stream: BinaryIO
+        :param block_size: Max amount of bytes read at once.
+        :type block_size: int
+        """
+
+        super().__init__()
+        if stream is None:
+            stream = sys.stdin.buffer
+        self._stream = stream
+        self._block_size = block_size
+
+    def read_blocks(self):
+        """
+        Reads the stream in blocks. A read returns the bytes which are
+        available (up to block size), so lines of a pipe are not held back
+        until a whole block arrives.
+
+        :return: Blocks of the stream, in order.
+        :rtype: Iterator[bytes]
+        """
+
+        read = getattr(self._stream, 'read1', self._stream.read)
+        return iter(functools.partial(read, self._block_size), b'')
+
+
+class MappedFileInputHandler(BulkInputHandler):
+    """
+    Concrete class responsible for obtaining input lines from a file,
+    which is memory-mapped: blocks are slices of the map, so the file is
+    read by the operating system's paging, without a read call per block.
+    """
+
+    def __init__(self, path: str,
+                 block_size: int = general_utils.INPUT_BLOCK_SIZE):
+        """
+        Opens and maps the file.
+
+        :param path: Path of the file.
+        :type path: str
+        :param block_size: Amount of bytes a block has (blocks are extended
+            to the end of their last line).
+        :type block_size: int
+        """
+
+        super().__init__()
+        self._block_size = block_size
+        self._map = None  # Empty files can't be mapped.
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size:
+                self._map = mmap.mmap(file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+    def read_blocks(self):
+        """
+        :return: Blocks of the file, in order. Every block (but the last)
+            ends with a line break.
+        :rtype: Iterator[bytes]
+        """
+
+        if self._map is None:
+            return
+        size = len(self._map)
+        start = 0
+        while start < size:
+            end = self._map.find(b'\n', start + self._block_size) + 1
+            if not end:
+                end = size
+            yield self._map[start:end]
+            start = end
+
+    def views(self):
+        """
+        Lines of the file as slices of the map, which are not copied nor
+        decoded. Every view must be released before the handler is closed.
+        Unlike lines, only '\n' and '\r\n' end views.
+
+        :return: Lines of the file, without their line breaks.
+        :rtype: Iterator[memoryview]
+        """
+
+        if self._map is None:
+            return
+        find = self._map.find
+        size = len(self._map)
+        with memoryview(self._map) as view:
+            start = 0
+            while start < size:
+                end = find(b'\n', start)
+                if end < 0:
+                    end = size
+                line_end = end
+                if line_end > start and view[line_end - 1] == ord('\r'):
+                    line_end -= 1
+                yield view[start:line_end]
+                start = end + 1
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def split_blocks(blocks):
+    """
+    Splits blocks of UTF-8 encoded lines. Lines end with '\n', '\r\n' or
+    a lone '\r' (like universal newlines of text files). A line which does
+    not end in its block is completed by the next blocks. Bytes which are
+    not UTF-8 are replaced with U+FFFD, so their line is an invalid
+    expression instead of ending the input.
+
+    :param blocks: Blocks of bytes, in order.
+    :type blocks: Iterable[bytes]
+    :return: Lines of every block (which ends a line), without their line
+        breaks.
+    :rtype: Iterator[list]
+    """
+
+    rest = b''  # Start of a line which did not end in previous blocks
+    for block in blocks:
+        if rest.endswith(b'\r') and block:
+            # A line break, unless the block starts with the '\n' of '\r\n'
+            block, rest = rest + block, b''
+        # A '\r' at the end of the block may be the start of '\r\n'.
+        end = max(block.rfind(b'\n'),
+                  block.rfind(b'\r', 0, len(block) - 1)) + 1
+        if not end:
+            rest += block
+            continue
+        if rest:
+            end += len(rest)
+            block, rest = rest + block, b''
+        text = str(block[:end], 'utf-8', 'replace') if end < len(block) \
+            else str(block, 'utf-8', 'replace')
+        rest += block[end:]
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        lines = text.split('\n')
+        lines.pop()  # Empty string after the last line break
+        yield lines
+    if rest:
+        # Only the last character of rest may be a line break ('\r').
+        yield [str(rest.removesuffix(b'\r'), 'utf-8', 'replace')]
+
+
+def open_input_handler(path: str) -> BulkInputHandler:
+    """
+    Opens a bulk input handler of a file, or of standard input.
+
+    :param path: Path of the file, or '-' for standard input.
+    :type path: str
+    :return: Mapped file input handler, or block input handler of the
+        standard input.
+    :rtype: BulkInputHandler
+    """
+
+    if path == general_utils.STDIN_PATH:
+        return BlockInputHandler()
+    return MappedFileInputHandler(path)
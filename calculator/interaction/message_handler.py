@@ -3,14 +3,27 @@ Module for displaying messages to the user.
 Contains an abstract base class and a console-specific implementation.
 """
 
+import sys
 from abc import ABC, abstractmethod
 
-import colorama
-from colorama import Fore, Back
-
+from calculator.interaction.result_formatter import ResultFormatter, \
+    NumericResultFormatter
 from calculator.utils import general_utils
 
 
+class _NoColors:
+    """
+    Stands for colorama's Fore and Back when messages are not colored:
+    every color is an empty string.
+    """
+
+    def __getattr__(self, name: str) -> str:
+        return general_utils.EMPTY_STR
+
+
+_NO_COLORS = _NoColors()
+
+
 class MessageHandler(ABC):
     """
     Abstract class for displaying messages to user.
@@ -44,6 +57,15 @@ class MessageHandler(ABC):
 
         pass
 
+    def display_result(self, result):
+        """
+        Displays an equation result (as a result message of its str).
+
+        :param result: Result to display.
+        """
+
+        self.display_result_message(str(result))
+
     @abstractmethod
     def display_error_message(self, error_message: str):
         """
@@ -69,16 +91,46 @@ class ConsoleMessageHandler(MessageHandler):
     entering an input.
     """
 
-    def __init__(self):
+    def __init__(self, colored: bool = None,
+                 result_formatter: ResultFormatter = None):
         """
-        Initialize the first message when creating a new instance of
-        MessageHandler class.
+        Initializes the handler. colorama is only imported when messages
+        are colored, and the messages are only created when the first one
+        is displayed.
+
+        :param colored: Whether to color messages. Defaults to whether the
+            standard output is a terminal.
+        :type colored: bool
+        :param result_formatter: Formatter of results. Defaults to
+            formatting results like str does.
+        :type result_formatter: ResultFormatter
         """
 
-        colorama.init()  # Used for colored console text
+        if result_formatter is None:
+            result_formatter = NumericResultFormatter()
+        self._result_formatter = result_formatter
+
+        if colored is None:
+            colored = sys.stdout.isatty()
+        if colored:
+            import colorama  # Used for colored console text
+
+            colorama.init()
+            self._fore, self._back = colorama.Fore, colorama.Back
+        else:
+            self._fore = self._back = _NO_COLORS
         self._quit = general_utils.QUIT_STR
+        self._message_to_display = None
+        self._prompt = None
+
+    def _create_messages(self) -> dict:
+        """
+        :return: Welcome message (0) and input message (1).
+        :rtype: dict
+        """
 
-        self._message_to_display = {
+        Fore, Back = self._fore, self._back
+        return {
             0: f'''         {Back.LIGHTWHITE_EX + Fore.RED}  Welcome to Amir's Advanced Calculator!  {Fore.LIGHTGREEN_EX + Back.RESET}
                         This program simulates an improved calculator, which
                         means it supports a wide range of operations, including:{Fore.LIGHTCYAN_EX}
@@ -94,14 +146,15 @@ class ConsoleMessageHandler(MessageHandler):
                                 between two operands.{Fore.LIGHTGREEN_EX}
                         Make sure to follow the rules when inserting mathematical expressions:{Fore.LIGHTCYAN_EX}
                             •  The only valid form of brackets is () (Parentheses / Round Brackets).
-                            •  Use negation correctly by placing ~ (Tilde) directly before a number.{Fore.RED}
+                            •  Use negation correctly by placing ~ (Tilde) directly before a number.
+                            •  Assign variables with name = expression (e.g., rate = 3.5),
+                                and use them in later expressions (e.g., total = rate * 12).{Fore.RED}
                         To stop the program from running, simply type "{self._quit}".{Fore.LIGHTMAGENTA_EX}
                         Start calculating by typing a mathematical expression below,
                         then press enter to send input to program.{Fore.LIGHTYELLOW_EX}
                         Enjoy! :){Fore.RESET}''',
             1: 'Please enter an input:'
         }
-        self._prompt = self._message_to_display[0]
 
     def display_input_message(self):
         """
@@ -110,6 +163,9 @@ class ConsoleMessageHandler(MessageHandler):
         which means - for the first time, the output is different).
         """
 
+        if self._message_to_display is None:
+            self._message_to_display = self._create_messages()
+            self._prompt = self._message_to_display[0]
         print(self._prompt)
         if self._prompt != self._message_to_display[1]:
             self._prompt = self._message_to_display[1]
@@ -132,7 +188,16 @@ class ConsoleMessageHandler(MessageHandler):
         :type result_message: str
         """
 
-        print(Fore.LIGHTGREEN_EX + result_message + Fore.RESET)
+        print(self._fore.LIGHTGREEN_EX + result_message + self._fore.RESET)
+
+    def display_result(self, result):
+        """
+        Displays an equation result in console.
+
+        :param result: Result to display.
+        """
+
+        self.display_result_message(self._result_formatter.format(result))
 
     def display_error_message(self, error_message: str):
         """
@@ -142,10 +207,138 @@ class ConsoleMessageHandler(MessageHandler):
         :type error_message: str
         """
 
-        print(Fore.RED + error_message + Fore.RESET)
+        print(self._fore.RED + error_message + self._fore.RESET)
 
     def display_quit_message(self):
         """
         Displays a console exit message when program ends.
         """
-        print(Fore.MAGENTA + "Program Ended." + Fore.RESET)
+        print(self._fore.MAGENTA + "Program Ended." + self._fore.RESET)
+
+
+class BufferedMessageHandler(MessageHandler):
+    """
+    Class responsible for displaying messages when the output is not a
+    terminal (a pipe or a file): messages are not colored, there are no
+    prompts, and lines are written through a buffer, in blocks.
+    Results are kept as they are until their block is written, and then
+    formatted in bulk.
+    """
+
+    def __init__(self, stream=None, result_formatter: ResultFormatter = None,
+                 block_lines: int = general_utils.OUTPUT_BLOCK_LINES):
+        """
+        :param stream: Text stream to write to. Defaults to the standard
+            output.
+        :type stream: TextIO
+        :param result_formatter: Formatter of results. Defaults to
+            formatting results like str does.
+        :type result_formatter: ResultFormatter
+        :param block_lines: Amount of lines written at once.
+        :type block_lines: int
+        """
+
+        if stream is None:
+            stream = sys.stdout
+        if result_formatter is None:
+            result_formatter = NumericResultFormatter()
+        self._stream = stream
+        self._result_formatter = result_formatter
+        self._block_lines = block_lines
+        self._lines = []  # Lines to write
+        self._results = []  # Results to format, which come after the lines
+
+    def display_input_message(self):
+        """
+        Displays nothing: output which is not a terminal gets no prompts.
+        """
+
+        pass
+
+    def display_custom_message(self, message: str):
+        """
+        Adds a custom message to the buffer.
+
+        :param message: Custom message to display
+        :type message: str
+        """
+
+        self._add_line(message)
+
+    def display_result_message(self, result_message: str):
+        """
+        Adds an equation result message to the buffer.
+
+        :param result_message: Result message to display.
+        :type result_message: str
+        """
+
+        self._add_line(result_message)
+
+    def display_result(self, result):
+        """
+        Adds an equation result to the buffer. Float results are formatted
+        with the rest of their block, other results are formatted at once,
+        so an error formatting them (e.g. an exact integer too long to
+        convert) is raised to the caller, like an evaluation error.
+
+        :param result: Result to display.
+        """
+
+        if result.__class__ is not float:
+            self._add_line(self._result_formatter.format(result))
+            return
+        self._results.append(result)
+        if len(self._lines) + len(self._results) >= self._block_lines:
+            self.flush()
+
+    def display_error_message(self, error_message: str):
+        """
+        Adds an error message to the buffer.
+
+        :param error_message: Error message to display.
+        :type error_message: str
+        """
+
+        self._add_line(error_message)
+
+    def display_quit_message(self):
+        """
+        Writes the buffered lines when program ends (no exit message is
+        displayed).
+        """
+
+        self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered lines to the stream, and flushes it.
+        """
+
+        self._format_results()
+        if self._lines:
+            self._lines.append(general_utils.EMPTY_STR)  # Last line break
+            self._stream.write('\n'.join(self._lines))
+            self._lines = []
+        self._stream.flush()
+
+    def _add_line(self, line: str):
+        """
+        :param line: Line to add to the buffer.
+        :type line: str
+        """
+
+        self._format_results()  # Results come before the line.
+        self._lines.append(line)
+        if len(self._lines) >= self._block_lines:
+            self.flush()
+
+    def _format_results(self):
+        """
+        Formats the buffered results in bulk, and adds them to the lines.
+        """
+
+        if self._results:
+            self._lines.extend(self._result_formatter.format_all(
+                self._results))
+            self._results = []
@@ -0,0 +1,124 @@
+"""
+Module for formatting results before they are displayed.
+Contains an abstract base class and a numeric implementation.
+"""
+
+import decimal
+from abc import ABC, abstractmethod
+
+_FRACTION_PART = '.0'
+
+
+class ResultFormatter(ABC):
+    """
+    Abstract class for formatting results.
+    """
+
+    @abstractmethod
+    def format(self, result) -> str:
+        """
+        Abstract method for formatting a single result.
+
+        :param result: Result to format.
+        :return: Text of result.
+        :rtype: str
+        """
+
+    def format_all(self, results: list) -> list:
+        """
+        Formats a list of results.
+
+        :param results: Results to format.
+        :type results: list
+        :return: Text of every result.
+        :rtype: list
+        """
+
+        return [self.format(result) for result in results]
+
+
+class NumericResultFormatter(ResultFormatter):
+    """
+    Class for formatting numeric results.
+    By default results are formatted like str does. Float results may be
+    rounded to significant digits, and integral float results may be
+    rendered without their fraction part ('3' instead of '3.0').
+    Lists of float results are formatted in bulk, with a single map of a
+    built-in formatting function over the whole list.
+    """
+
+    def __init__(self, digits: int = None, integers: bool = False):
+        """
+        :param digits: Significant digits of float (and decimal) results.
+            If not provided, floats are formatted in their shortest exact
+            form.
+        :type digits: int
+        :param integers: Whether integral float results are rendered
+            without their fraction part.
+        :type integers: bool
+        """
+
+        self._format_spec = None
+        if digits is not None:
+            self._format_spec = f'{{:.{digits}g}}'.format
+        self._integers = integers
+
+    def format(self, result) -> str:
+        """
+        Formats a single result.
+
+        :param result: Result to format.
+        :return: Text of result.
+        :rtype: str
+        """
+
+        if result.__class__ is float:
+            return self._format_floats([result])[0]
+        return self._format_other(result)
+
+    def format_all(self, results: list) -> list:
+        """
+        Formats a list of results, in bulk if they are all floats.
+
+        :param results: Results to format.
+        :type results: list
+        :return: Text of every result.
+        :rtype: list
+        """
+
+        if set(map(type, results)) <= {float}:
+            return self._format_floats(results)
+        return [self.format(result) for result in results]
+
+    def _format_floats(self, results: list) -> list:
+        """
+        :param results: Float results to format.
+        :type results: list
+        :return: Text of every result.
+        :rtype: list
+        """
+
+        if self._format_spec is None:
+            strings = list(map(repr, results))  # The same as str for floats
+            if self._integers:
+                return [string[:-2] if string.endswith(_FRACTION_PART)
+                        else string for string in strings]
+            return strings
+        strings = list(map(self._format_spec, results))
+        if self._integers:  # 'g' formatting drops zero fraction parts.
+            return strings
+        return [string + _FRACTION_PART if string.lstrip('-').isdigit()
+                else string for string in strings]
+
+    def _format_other(self, result) -> str:
+        """
+        :param result: Result which is not a float (an exact integer,
+            decimal, fraction or message).
+        :return: Text of result.
+        :rtype: str
+        """
+
+        if (self._format_spec is not None
+                and isinstance(result, decimal.Decimal)):
+            return self._format_spec(result)
+        return str(result)
@@ -0,0 +1,225 @@
+"""
+Module for canonicalizing expressions: equivalent expressions which differ
+in their text (white spaces, redundant parentheses, order of operands of
+commutative operators, double unary minuses) get the same normal form and
+the same 64-bit hash, which caches key their outcomes by.
+Contains an abstract base class and an arithmetic implementation.
+"""
+
+import struct
+import zlib
+from abc import ABC, abstractmethod
+
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.token_stream import TokenStream, OPERAND_KIND, \
+    KIND_SYMBOLS
+from calculator.utils import operator_utils
+from calculator.utils.numeric_backend import FloatBackend, get_backend
+
+_MASK = (1 << 64) - 1
+_MULTIPLIER = 0x9E3779B97F4A7C15  # 2^64 / golden ratio
+_DOUBLE = struct.Struct('<d')
+
+
+def _mix(value: int) -> int:
+    """
+    Finalizer of splitmix64: spreads every bit of value over the result.
+
+    :param value: 64-bit value.
+    :type value: int
+    :return: Mixed 64-bit value.
+    :rtype: int
+    """
+
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+class CanonicalForm:
+    """
+    Class which stores the canonical form of an expression: its normal
+    form (operands and operator symbols in prefix order, separated by
+    spaces) and its 64-bit hash.
+    Equal normal forms always have equal results, and equal hashes almost
+    always have equal normal forms.
+    """
+
+    __slots__ = ('text', 'hash')
+
+    def __init__(self, text: str, hash_value: int):
+        """
+        :param text: Normal form.
+        :type text: str
+        :param hash_value: 64-bit hash of normal form.
+        :type hash_value: int
+        """
+
+        self.text = text
+        self.hash = hash_value
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CanonicalForm)
+                and self.hash == other.hash and self.text == other.text)
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __repr__(self) -> str:
+        return f'CanonicalForm({self.text!r}, {self.hash:#018x})'
+
+
+class Canonicalizer(ABC):
+    """
+    Abstract class for canonicalizing compiled expressions.
+    """
+
+    @abstractmethod
+    def canonicalize(self, postfix: TokenStream):
+        """
+        Abstract method for canonicalizing an expression.
+
+        :param postfix: Postfix representation of the expression.
+        :type postfix: TokenStream
+        :return: Canonical form, or None if the expression has none (it is
+            not a valid expression).
+        :rtype: CanonicalForm or None
+        """
+
+
+class ArithmeticCanonicalizer(Canonicalizer):
+    """
+    Class responsible for canonicalizing arithmetic expressions, from their
+    postfix stream (which has no parentheses left):
+    - Float operands are written in their shortest exact form (2, 2. and
+      02 are 2.0). Other operands keep their text, since equal decimals
+      may differ in their exponent.
+    - Operands of commutative operators are ordered by their hash.
+    - Unary minuses of float operands become negative operands, and double
+      unary minuses of float expressions are removed.
+    Hashes are combined bottom-up, so every operand and operator is hashed
+    once.
+    """
+
+    def __init__(self, commutative_operators: set =
+                 operator_utils.COMMUTATIVE_OPERATORS):
+        """
+        :param commutative_operators: Symbols of binary operators whose
+            operands are ordered.
+        :type commutative_operators: set
+        """
+
+        self._commutative_operators = frozenset(commutative_operators)
+
+    def canonicalize(self, postfix: TokenStream):
+        """
+        Canonicalizes an expression which was compiled with the active
+        numeric backend.
+
+        :param postfix: Postfix representation of the expression.
+        :type postfix: TokenStream
+        :return: Canonical form, or None if the expression has none (it has
+            invalid operands, or it is not a valid tree).
+        :rtype: CanonicalForm or None
+        """
+
+        if postfix.invalid_operands:
+            return None
+        values = postfix.values
+        is_float = isinstance(get_backend(), FloatBackend)
+        arities = OPERATOR_REGISTRY.get_dispatch_table().arities
+        commutative_operators = self._commutative_operators
+        unary_minus = operator_utils.UNARY_MINUS_SYMBOL
+        # Every entry is a (hash, node) pair. A node is the text of an
+        # operand, or the symbol of an operator and its operands' entries.
+        stack = []
+        for index, kind in enumerate(postfix.kinds):
+            if kind == OPERAND_KIND:
+                stack.append(_create_operand_entry(values[index]))
+                continue
+            arity = arities[kind]
+            if arity == 0 or len(stack) < arity:  # Not a valid tree
+                return None
+            symbol = KIND_SYMBOLS[kind]
+            if arity == 1:
+                operand = stack[-1]
+                if symbol == unary_minus and is_float:
+                    stack[-1] = _negate(operand)
+                    continue
+                stack[-1] = (_mix((operand[0] * _MULTIPLIER + ord(symbol))
+                                  & _MASK), (symbol, (operand,)))
+                continue
+            right = stack.pop()
+            left = stack[-1]
+            if symbol in commutative_operators and right[0] < left[0]:
+                left, right = right, left
+            stack[-1] = (_mix((_mix(left[0] ^ ord(symbol)) * _MULTIPLIER
+                               + right[0]) & _MASK), (symbol, (left, right)))
+        if len(stack) != 1:
+            return None
+        return CanonicalForm(_write_prefix(stack[0]), stack[0][0])
+
+
+def _create_operand_entry(value) -> tuple:
+    """
+    :param value: Value of an operand.
+    :type value: float or Decimal or Fraction
+    :return: Entry of the operand.
+    :rtype: tuple
+    """
+
+    if value.__class__ is float:
+        if value == 0:
+            value = 0.0  # Like the expression tree, -0 operands are 0.
+        return (_mix(int.from_bytes(_DOUBLE.pack(value), 'little')),
+                repr(value))
+    text = str(value)
+    encoded_text = text.encode()
+    return (_mix(zlib.crc32(encoded_text) | (len(encoded_text) << 32)),
+            text)
+
+
+def _negate(entry: tuple) -> tuple:
+    """
+    Applies a unary minus to the entry of a float expression.
+
+    :param entry: Entry of the expression.
+    :type entry: tuple
+    :return: Entry of a negative operand (for non-zero operands, since
+        minus zero is not zero), the entry of the expression inside a
+        double unary minus, or the entry of a unary minus operator.
+    :rtype: tuple
+    """
+
+    hash_value, node = entry
+    if node.__class__ is str:
+        value = float(node)
+        if value != 0:
+            return (_mix(int.from_bytes(_DOUBLE.pack(-value), 'little')),
+                    repr(-value))
+    elif node[0] == operator_utils.UNARY_MINUS_SYMBOL:
+        return node[1][0]
+    return (_mix((hash_value * _MULTIPLIER
+                  + ord(operator_utils.UNARY_MINUS_SYMBOL)) & _MASK),
+            (operator_utils.UNARY_MINUS_SYMBOL, (entry,)))
+
+
+def _write_prefix(entry: tuple) -> str:
+    """
+    :param entry: Entry of the root of an expression.
+    :type entry: tuple
+    :return: Operands and operator symbols of the expression in prefix
+        order, separated by spaces.
+    :rtype: str
+    """
+
+    parts = []
+    pending = [entry]
+    while pending:
+        node = pending.pop()[1]
+        if node.__class__ is str:
+            parts.append(node)
+        else:
+            parts.append(node[0])
+            pending.extend(reversed(node[1]))
+    return ' '.join(parts)
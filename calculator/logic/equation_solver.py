@@ -2,14 +2,20 @@
 Module purpose is to store class which is responsible for equation-solving.
 """
 
+from array import array
+
 from calculator.logic.exceptions import OperatorUsageError, \
     WrongParenthesesUsageError, ExpectedOperandError
-from calculator.utils import operator_utils, operand_utils, general_utils, \
-    operators
+from calculator.logic.token_stream import TokenStream, KIND_SYMBOLS, \
+    OPERAND_KIND, INVALID_OPERAND_KIND, OPEN_BRACKETS_KIND, \
+    CLOSE_BRACKETS_KIND
+from calculator.utils.evaluation_limits import get_budget
+from calculator.utils.numeric_backend import NumericBackend, get_backend
 from calculator.utils.operator_registry import OperatorRegistry
 
-# Merges both dictionaries into a single dictionary
-OPERATOR_REGISTRY = OperatorRegistry()
+# Registry of the operators used by the calculator. Plugins add operators
+# with OPERATOR_REGISTRY.register_operator.
+OPERATOR_REGISTRY = OperatorRegistry(owns_symbols=True)
 
 
 class EquationSolver:
@@ -18,15 +24,24 @@ class EquationSolver:
     It uses a postfix-notation approach to solve the equation.
     Converts an infix equation to postfix, then evaluates the result.
     """
-    def __init__(self, equation: list):
+    def __init__(self, equation, backend: NumericBackend = None):
         """
         Initializes a tokenized equation.
 
-        :param equation: A list of tokens representing a mathematical equation.
-        :type equation: list
+        :param equation: A list of tokens (or a token stream) representing
+            a mathematical equation.
+        :type equation: list or TokenStream
+        :param backend: Numeric backend to parse and solve the equation
+            with. Defaults to the active backend.
+        :type backend: NumericBackend
         """
+        if backend is None:
+            backend = get_backend()
+        self._backend = backend
+        if not isinstance(equation, TokenStream):
+            equation = TokenStream.from_tokens(equation, backend.parse)
         self._tokens = equation
-        self._postfix_stack = []
+        self._postfix_stack = TokenStream()
         self._result = None
 
     def solve(self):
@@ -37,107 +52,120 @@ class EquationSolver:
         :rtype: float
         """
         self._infix_to_postfix()
-        self._solve_postfix()
+        with self._backend.activate():
+            self._solve_postfix()
         return self._result
 
-    def _infix_to_postfix(self):
-        """
-        Converts the tokenized infix equation to a postfix stack.
+    def compile(self) -> TokenStream:
         """
-        stack = []
-        postfix = []
-        index = 0
-        for token in self._tokens:
-            if operand_utils.is_operand(token):  # Operand
-                #  removed: or operator_utils.SIGN_MINUS_SYMBOL in token
-                postfix.append(token)
-            elif token is operators.UnaryOperator:
-                self._unary_operator_to_postfix(token, index, stack, postfix)
-            elif token == general_utils.OPEN_BRACKETS:
-                stack.append(token)
-            elif token == general_utils.CLOSE_BRACKETS:
-                self._close_bracket_to_postfix(index, stack, postfix)
-            else:  # Operator
-                while (stack and stack[-1]
-                       != general_utils.OPEN_BRACKETS
-                       and OPERATOR_REGISTRY.get_precedence(
-                            token) <= OPERATOR_REGISTRY.get_precedence(
-                            stack[-1])):
-                    postfix.append(stack.pop())
-                stack.append(token)
-            index += 1
-
-        while stack:
-            postfix.append(stack.pop())
+        Converts the equation to postfix without solving it.
 
-        self._postfix_stack = postfix
+        :return: Postfix representation of equation.
+        :rtype: TokenStream
+        """
+        self._infix_to_postfix()
+        return self._postfix_stack
 
-    def _unary_operator_to_postfix(self, token: str, index: int, stack: list,
-                                   postfix: list):
+    def solve_compiled(self, postfix: TokenStream):
         """
-        Handles unary operators when converting infix equation to postfix.
+        Solves an equation which was already compiled to postfix.
 
-        :param token: symbol of operator
-        :type token: str
-        :param index: index of current token in self._tokens
-        :type index: int
-        :param stack: The stack used for infix-to-postfix equation convertion.
-        :type stack: list
         :param postfix: Postfix representation of equation.
-        :type postfix: list
+        :type postfix: TokenStream
+        :return: Solution to equation
+        :rtype: float
         """
+        self._postfix_stack = postfix
+        with self._backend.activate():
+            self._solve_postfix()
+        return self._result
 
-        if token in operator_utils.LEFT_UNARY_OPERATORS:
-            # Push left-sided unary operator
-            stack.append(token)
-        else:  # Right-sided unary operators
-            if index > 0 and operand_utils.is_operand(
-                    self._tokens[index - 1]):
-                postfix.append(token)
-            else:
-                stack.append(token)
+    def _infix_to_postfix(self):
+        """
+        Converts the tokenized infix equation to a postfix stack.
+        """
+        values = self._tokens.values
+        invalid_operands = self._tokens.invalid_operands
+        precedences = OPERATOR_REGISTRY.get_dispatch_table().precedences
+        stack = []
+        postfix_kinds = []
+        postfix_values = []
+        postfix_invalid_operands = {}
+        for index, kind in enumerate(self._tokens.kinds):
+            if kind == OPERAND_KIND:
+                postfix_kinds.append(kind)
+                postfix_values.append(values[index])
+            elif kind == INVALID_OPERAND_KIND:
+                postfix_invalid_operands[len(postfix_kinds)] = (
+                    invalid_operands[index])
+                postfix_kinds.append(kind)
+                postfix_values.append(0.0)
+            elif kind == OPEN_BRACKETS_KIND:
+                stack.append(kind)
+            elif kind == CLOSE_BRACKETS_KIND:
+                self._close_bracket_to_postfix(stack, postfix_kinds,
+                                               postfix_values)
+            else:  # Operator
+                self._operator_to_postfix(kind, precedences, stack,
+                                          postfix_kinds, postfix_values)
 
-    def _close_bracket_to_postfix(self, index: int, stack: list,
-                                  postfix: list):
+        while stack:
+            postfix_kinds.append(stack.pop())
+            postfix_values.append(0.0)
+
+        if isinstance(values, array):
+            postfix_values = array('d', postfix_values)
+        self._postfix_stack = TokenStream(array('b', postfix_kinds),
+                                          postfix_values,
+                                          postfix_invalid_operands)
+
+    @staticmethod
+    def _close_bracket_to_postfix(stack: list, postfix_kinds: list,
+                                  postfix_values: list):
         """
         Handles closing brackets when converting infix equation to postfix.
 
-        :param index: The index of current token in the equation.
-        :type index: int
         :param stack: The stack used for infix-to-postfix equation convertion.
         :type stack: list
-        :param postfix: Postfix representation of equation.
-        :type postfix: list
+        :param postfix_kinds: Kinds of postfix representation of equation.
+        :type postfix_kinds: list
+        :param postfix_values: Values of postfix representation of equation.
+        :type postfix_values: list
         """
 
-        while (stack[-1] != general_utils.OPEN_BRACKETS and stack[-1]
-               != operator_utils.SIGN_MINUS_SYMBOL
-               + general_utils.OPEN_BRACKETS):
-            postfix.append(stack.pop())
+        while stack[-1] != OPEN_BRACKETS_KIND:
+            postfix_kinds.append(stack.pop())
+            postfix_values.append(0.0)
         stack.pop()
 
-    def _operator_to_postfix(self, token: str, index: int, stack: list,
-                             postfix: list):
+    @staticmethod
+    def _operator_to_postfix(kind: int, precedences: tuple, stack: list,
+                             postfix_kinds: list, postfix_values: list):
         """
         Handles operators when converting infix equation to postfix.
 
-        :param token: The symbol of operator to handle.
-        :type token: str
-        :param index: The index of current token in the equation.
-        :type index: int
+        :param kind: The kind of operator to handle.
+        :type kind: int
+        :param precedences: Precedence of operator per kind.
+        :type precedences: tuple
         :param stack: The stack used for infix-to-postfix equation convertion.
         :type stack: list
-        :param postfix: Postfix representation of equation.
-        :type postfix: list
+        :param postfix_kinds: Kinds of postfix representation of equation.
+        :type postfix_kinds: list
+        :param postfix_values: Values of postfix representation of equation.
+        :type postfix_values: list
+        :raises OperatorUsageError: If no operator of kind is registered.
         """
 
-        while (stack and stack[-1]
-               != general_utils.OPEN_BRACKETS
-               and OPERATOR_REGISTRY.get_precedence(
-                    token) <= OPERATOR_REGISTRY.get_precedence(
-                    stack[-1])):
-            postfix.append(stack.pop())
-        stack.append(token)
+        precedence = precedences[kind] if kind < len(precedences) else None
+        if precedence is None:  # A symbol which has no registered operator.
+            raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                     "Not a registered operator")
+        while (stack and stack[-1] != OPEN_BRACKETS_KIND
+               and precedence <= precedences[stack[-1]]):
+            postfix_kinds.append(stack.pop())
+            postfix_values.append(0.0)
+        stack.append(kind)
 
     def _solve_postfix(self):
         """
@@ -147,43 +175,51 @@ class EquationSolver:
         :raises OperatorUsageError: If misused operators exist.
         :raises WrongParenthesesUsageError: if equations contains wrong
             parentheses usage.
+        :raises ExpectedOperandError: If an operand is not a valid number.
+        :raises EvaluationLimitError: If evaluation limits are active and
+            were exceeded.
         """
 
+        values = self._postfix_stack.values
+        budget = get_budget()
+        dispatch_table = OPERATOR_REGISTRY.get_dispatch_table()
+        arities = dispatch_table.arities
+        solvers = dispatch_table.solvers
         stack = []
-        for token in self._postfix_stack:
-            if (operand_utils.is_operand(token)
-                    or operator_utils.SIGN_MINUS_SYMBOL in token):
-                # Operand
-                fixed_token = token.replace(operator_utils.SIGN_MINUS_SYMBOL,
-                                            operator_utils.SUB_SYMBOL)
-                try:
-                    token_as_number = float(fixed_token)
-                except ValueError:
-                    raise ExpectedOperandError(fixed_token)
+        for index, kind in enumerate(self._postfix_stack.kinds):
+            if kind == OPERAND_KIND:
+                token_as_number = values[index]
                 if token_as_number == -0:
                     token_as_number = 0
                 stack.append(token_as_number)
+            elif kind == INVALID_OPERAND_KIND:
+                raise ExpectedOperandError(
+                    self._postfix_stack.invalid_operands[index])
             else:  # Operator
+                if budget is not None:
+                    budget.spend()
+                arity = arities[kind]
+                if arity == 0:  # A symbol which has no registered operator.
+                    raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                             "Not a registered operator")
                 try:
                     operand1 = stack.pop()
                 except IndexError:
-                    if token in operator_utils.ALL_UNARY_OPERATORS:
-                        raise OperatorUsageError(token, "No operand")
+                    if arity == 1:
+                        raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                                 "No operand")
                     else:
-                        raise OperatorUsageError(token, "No operands")
-                if token in operator_utils.ALL_UNARY_OPERATORS:
-                    unary_result = (OPERATOR_REGISTRY.get_unary_operators()
-                                    .get(token).solve(operand1))
-                    stack.append(unary_result)
-                elif token in operator_utils.BINARY_OPERATORS:
+                        raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                                 "No operands")
+                if arity == 1:
+                    stack.append(solvers[kind](operand1))
+                elif arity == 2:
                     try:
                         operand2 = stack.pop()
                     except IndexError:
-                        raise OperatorUsageError(token,
+                        raise OperatorUsageError(KIND_SYMBOLS[kind],
                                                  "Missing operand")
-                    binary_result = (OPERATOR_REGISTRY.get_binary_operators()
-                                     .get(token).solve(operand2, operand1))
-                    stack.append(binary_result)
+                    stack.append(solvers[kind](operand2, operand1))
         if len(stack) >= 2:
             raise WrongParenthesesUsageError()
         else:
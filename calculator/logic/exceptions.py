@@ -365,6 +365,14 @@ class UnmatchedOpeningParenthesesError(Exception):
 
         self._index = index
 
+    def get_indexes(self) -> tuple:
+        """
+        :return: Index of the parentheses.
+        :rtype: tuple
+        """
+
+        return (self._index,)
+
     def __str__(self):
         """
         :return: Message about the cause of the exception.
@@ -389,6 +397,14 @@ class UnmatchedClosingParenthesesError(Exception):
 
         self._index = index
 
+    def get_indexes(self) -> tuple:
+        """
+        :return: Index of the parentheses.
+        :rtype: tuple
+        """
+
+        return (self._index,)
+
     def __str__(self):
         """
         :return: Message about the cause of the exception.
@@ -415,6 +431,14 @@ class EmptyParenthesesError(Exception):
         self._closing_index = closing_index
         self._opening_index = opening_index
 
+    def get_indexes(self) -> tuple:
+        """
+        :return: Indexes of opening and closing parentheses.
+        :rtype: tuple
+        """
+
+        return self._opening_index, self._closing_index
+
     def __str__(self):
         """
         :return: Message about the cause of the exception.
@@ -512,3 +536,102 @@ class ExpectedOperandError(Exception):
         if self._token == '--':
             return f'Error! Expected an operator after {self._token}'
         return f'Error! Expected an operator instead of {self._token}'
+
+
+class EvaluationLimitError(Exception):
+    """
+    Exception for an evaluation which exceeded one of its limits.
+    """
+
+    def __init__(self, limit: str, maximum):
+        """
+        :param limit: Name of the exceeded limit ('deadline', 'tokens',
+            'depth' or 'operations').
+        :type limit: str
+        :param maximum: Value of the exceeded limit.
+        :type maximum: int or float
+        """
+
+        self.limit = limit
+        self.maximum = maximum
+
+    def __str__(self):
+        """
+        :return: Message about the cause of the exception.
+        :rtype: str
+        """
+
+        if self.limit == 'deadline':
+            return (f'Error! Evaluation did not finish within its deadline '
+                    f'of {self.maximum} seconds')
+        return (f'Error! Evaluation exceeded its {self.limit} limit '
+                f'({self.maximum})')
+
+
+class InvalidAssignmentError(Exception):
+    """
+    Exception for an assignment to something which is not a variable name.
+    """
+
+    def __init__(self, target: str):
+        """
+        :param target: Left side of the assignment.
+        :type target: str
+        """
+
+        self._target = target
+
+    def __str__(self):
+        """
+        :return: Message about the cause of the exception.
+        :rtype: str
+        """
+
+        return (f"Error! Can not assign to '{self._target}', variable names "
+                f"are letters, digits and underscores, and do not start "
+                f"with a digit")
+
+
+class UndefinedVariableError(Exception):
+    """
+    Exception for using a variable which was not assigned.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: Name of the variable.
+        :type name: str
+        """
+
+        self._name = name
+
+    def __str__(self):
+        """
+        :return: Message about the cause of the exception.
+        :rtype: str
+        """
+
+        return f"Error! Variable '{self._name}' is not defined"
+
+
+class CyclicDependencyError(Exception):
+    """
+    Exception for an assignment which makes a variable depend on itself.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: Name of the assigned variable.
+        :type name: str
+        """
+
+        self._name = name
+
+    def __str__(self):
+        """
+        :return: Message about the cause of the exception.
+        :rtype: str
+        """
+
+        return (f"Error! Assigning '{self._name}' would make it depend on "
+                f"itself")
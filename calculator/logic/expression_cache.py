@@ -0,0 +1,258 @@
+"""
+Module for caching compiled expressions.
+Contains an abstract base class and an LRU implementation.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from calculator.logic.exceptions import EmptyParenthesesError, \
+    UnmatchedClosingParenthesesError, UnmatchedOpeningParenthesesError
+from calculator.utils import general_utils
+
+# Errors whose messages hold indexes into the raw expression, so they depend
+# on the white spaces which keys leave out.
+POSITIONAL_ERRORS = (UnmatchedOpeningParenthesesError,
+                     UnmatchedClosingParenthesesError, EmptyParenthesesError)
+
+def make_key(expression: str) -> str:
+    """
+    Creates a cache key from a raw expression by removing its white spaces.
+
+    :param expression: Raw expression entered by the user.
+    :type expression: str
+    :return: Expression without white spaces.
+    :rtype: str
+    """
+
+    for char in general_utils.EMPTY_CHARACTERS:
+        expression = expression.replace(char, general_utils.EMPTY_STR)
+    return expression
+
+
+class CompiledExpression:
+    """
+    Class which stores the compiled (optimized tree) form of an expression.
+    Evaluation is tiered: the tree is interpreted while the expression is
+    cold, and compiled into a function once it was evaluated
+    compile_threshold times.
+    Threads may evaluate it at once: a race on the countdown only makes the
+    tree compile a few evaluations later (or twice), and the function is
+    stored in a single assignment.
+    """
+
+    def __init__(self, tree, compiler=None,
+                 compile_threshold: int =
+                 general_utils.TREE_COMPILE_THRESHOLD):
+        """
+        :param tree: Optimized tree of the expression.
+        :type tree: ExpressionTree
+        :param compiler: Compiler of hot trees. If not provided, the tree is
+            always interpreted.
+        :type compiler: TreeCompiler
+        :param compile_threshold: Amount of evaluations after which the tree
+            is compiled.
+        :type compile_threshold: int
+        """
+
+        self.tree = tree
+        self._compiler = compiler
+        self._evaluations_left = compile_threshold
+        self._function = None
+
+    def evaluate(self):
+        """
+        Evaluates the expression, with its compiled function if it has one.
+
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        if self._function is not None:
+            return self._function()
+        if self._compiler is not None:
+            self._evaluations_left -= 1
+            if self._evaluations_left <= 0:
+                self._function = self._compiler.compile(self.tree)
+                return self._function()
+        return self.tree.evaluate()
+
+    def get_size(self) -> int:
+        """
+        :return: Size of the entry, measured in size of its tree.
+        :rtype: int
+        """
+
+        return len(self.tree)
+
+
+class ExpressionCache(ABC):
+    """
+    Abstract class for caching compiled expressions.
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """
+        Abstract method for getting a compiled expression from cache.
+
+        :param key: Key of the expression.
+        :type key: str
+        :return: Compiled expression, or None if it is not cached.
+        :rtype: CompiledExpression or None
+        """
+
+    @abstractmethod
+    def put(self, key: str, compiled_expression: CompiledExpression):
+        """
+        Abstract method for storing a compiled expression in cache.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param compiled_expression: Compiled expression to store.
+        :type compiled_expression: CompiledExpression
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Abstract method for removing all entries from cache.
+        """
+
+
+class LRUExpressionCache(ExpressionCache):
+    """
+    Bounded least-recently-used cache of compiled expressions.
+    Bounded both by amount of entries and by total size of entries (key
+    length + tree size). Entries are invalidated when the contents of
+    the operator registry change.
+    Every operation holds a lock, so threads can share the cache.
+    """
+
+    def __init__(self, registry,
+                 capacity: int = general_utils.EXPRESSION_CACHE_CAPACITY,
+                 max_size: int = general_utils.EXPRESSION_CACHE_MAX_SIZE):
+        """
+        :param registry: Operator registry which compiled expressions
+            depend on.
+        :type registry: OperatorRegistry
+        :param capacity: Maximal amount of cached entries.
+        :type capacity: int
+        :param max_size: Maximal total size of cached entries.
+        :type max_size: int
+        """
+
+        self._registry = registry
+        self._registry_version = registry.get_version()
+        self._capacity = capacity
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """
+        Gets a compiled expression from cache and marks it as most recently
+        used.
+
+        :param key: Key of the expression.
+        :type key: str
+        :return: Compiled expression, or None if it is not cached.
+        :rtype: CompiledExpression or None
+        """
+
+        with self._lock:
+            self._validate_registry_version()
+            compiled_expression = self._entries.get(key)
+            if compiled_expression is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compiled_expression
+
+    def put(self, key: str, compiled_expression: CompiledExpression):
+        """
+        Stores a compiled expression in cache, evicting least recently used
+        entries if cache's bounds are exceeded.
+        Entries which are larger than max size on their own are not cached.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param compiled_expression: Compiled expression to store.
+        :type compiled_expression: CompiledExpression
+        """
+
+        entry_size = len(key) + compiled_expression.get_size()
+        if self._capacity <= 0 or entry_size > self._max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = compiled_expression
+            self._size += entry_size
+            while (len(self._entries) > self._capacity
+                   or self._size > self._max_size):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all entries from cache (counters are kept).
+        """
+
+        with self._lock:
+            self._clear()
+
+    def get_stats(self) -> dict:
+        """
+        :return: Cache counters and current occupancy.
+        :rtype: dict
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self._size,
+                'capacity': self._capacity,
+                'max_size': self._max_size
+            }
+
+    def _clear(self):
+        """
+        Removes all entries from cache, while the lock is held.
+        """
+
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: str):
+        """
+        Removes an entry from cache and updates cache's size, while the
+        lock is held.
+
+        :param key: Key of the entry to remove.
+        :type key: str
+        """
+
+        compiled_expression = self._entries.pop(key)
+        self._size -= len(key) + compiled_expression.get_size()
+
+    def _validate_registry_version(self):
+        """
+        Clears cache if the operator registry changed since entries were
+        compiled, while the lock is held.
+        """
+
+        registry_version = self._registry.get_version()
+        if registry_version != self._registry_version:
+            self._clear()
+            self._registry_version = registry_version
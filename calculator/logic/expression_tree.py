@@ -0,0 +1,188 @@
+"""
+Module for the optimized, tree form of a compiled equation.
+The tree is built from the postfix token stream. While it is built,
+identical subexpressions are shared (so each one is solved once) and
+subexpressions whose operands are all constants are folded into a constant.
+"""
+
+from array import array
+
+from calculator.logic.equation_solver import EquationSolver, \
+    OPERATOR_REGISTRY
+from calculator.logic.token_stream import TokenStream, OPERAND_KIND
+from calculator.utils.evaluation_limits import get_budget
+
+
+class ConstantNode:
+    """
+    Node of a constant value (an operand, or a folded subexpression).
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """
+        :param value: Value of the node.
+        :type value: float
+        """
+
+        self.value = value
+
+
+class OperatorNode:
+    """
+    Node of an operator which could not be folded, applied to its operand
+    nodes.
+    """
+
+    __slots__ = ('kind', 'solve', 'operands')
+
+    def __init__(self, kind: int, solve, operands: tuple):
+        """
+        :param kind: Token kind of the operator.
+        :type kind: int
+        :param solve: Solve function of the operator.
+        :type solve: Callable
+        :param operands: Operand nodes, in the order solve gets them.
+        :type operands: tuple
+        """
+
+        self.kind = kind
+        self.solve = solve
+        self.operands = operands
+
+
+class ExpressionTree:
+    """
+    Class which stores the optimized form of an equation: a DAG of nodes
+    and the operator nodes which are left to solve, in postfix order.
+    A fully folded equation is a single constant node, so evaluating it
+    costs nothing.
+    Postfix streams which are not a valid tree (misused operators or
+    parentheses, invalid operands) keep their postfix form, and are solved
+    by the equation solver so the same errors are raised.
+    """
+
+    __slots__ = ('root', 'operations', 'postfix')
+
+    def __init__(self, root=None, operations: tuple = (),
+                 postfix: TokenStream = None):
+        """
+        :param root: Root node of the tree, None if the tree is not valid.
+        :type root: ConstantNode or OperatorNode
+        :param operations: Operator nodes left to solve, in postfix order.
+        :type operations: tuple
+        :param postfix: Postfix stream to solve if the tree is not valid.
+        :type postfix: TokenStream
+        """
+
+        self.root = root
+        self.operations = operations
+        self.postfix = postfix
+
+    @classmethod
+    def from_postfix(cls, postfix: TokenStream, fold: bool = True):
+        """
+        Builds an optimized tree out of a postfix stream.
+        Operators are assumed to be pure (same operands give the same
+        result or error), which is what makes sharing and folding safe.
+        Once an operator fails to fold, later operators are not folded, so
+        the error is raised only when the tree is evaluated, exactly as the
+        postfix solver would raise it.
+        Folding uses the active numeric backend, so the tree has to be built
+        and evaluated with the same backend.
+
+        :param postfix: Postfix representation of equation.
+        :type postfix: TokenStream
+        :param fold: Whether constant subexpressions are folded (if not,
+            every operator is left to solve, but still shared).
+        :type fold: bool
+        :return: Optimized tree of the equation.
+        :rtype: ExpressionTree
+        """
+
+        dispatch_table = OPERATOR_REGISTRY.get_dispatch_table()
+        arities = dispatch_table.arities
+        solvers = dispatch_table.solvers
+        values = postfix.values
+        # Equal decimals may differ in their exponent (1.0 and 1), which
+        # shows in results, so non-float operands are keyed by text too.
+        is_float = isinstance(values, array)
+        constants = {}  # Operand value -> node
+        nodes = {}  # (kind, operand nodes) -> node
+        operations = []
+        is_folding = fold
+        budget = get_budget()
+        stack = []
+        for index, kind in enumerate(postfix.kinds):
+            if kind == OPERAND_KIND:
+                value = values[index]
+                if value == -0:
+                    value = 0
+                constant_key = value if is_float else (value, str(value))
+                node = constants.get(constant_key)
+                if node is None:
+                    node = constants[constant_key] = ConstantNode(value)
+                stack.append(node)
+                continue
+            arity = arities[kind]
+            if arity == 0 or len(stack) < arity:  # Not a valid tree
+                return cls(postfix=postfix)
+            if arity == 1:
+                operands = (stack[-1],)
+            else:
+                operands = (stack[-2], stack.pop())
+            key = (kind, operands)
+            node = nodes.get(key)
+            if node is None:
+                if is_folding:
+                    if budget is not None:
+                        budget.spend()
+                    try:
+                        node = ConstantNode(solvers[kind](
+                            *[operand.value for operand in operands]))
+                    except Exception:
+                        is_folding = False
+                if node is None:
+                    node = OperatorNode(kind, solvers[kind], operands)
+                    operations.append(node)
+                nodes[key] = node
+            stack[-1] = node
+        if len(stack) != 1:
+            return cls(postfix=postfix)
+        return cls(stack[0], tuple(operations))
+
+    def evaluate(self):
+        """
+        Solves the operator nodes which were not folded, each one once.
+
+        :return: Solution to equation
+        :rtype: float
+        """
+
+        if self.root is None:
+            return EquationSolver([]).solve_compiled(self.postfix)
+        budget = get_budget()
+        if budget is not None:
+            budget.spend(len(self.operations))
+        results = {}
+        for node in self.operations:
+            if budget is not None:
+                budget.check_deadline()
+            results[node] = node.solve(
+                *[results[operand] if operand in results else operand.value
+                  for operand in node.operands])
+        if isinstance(self.root, ConstantNode):
+            return self.root.value
+        return results[self.root]
+
+    def __len__(self) -> int:
+        """
+        :return: Size of the tree, measured in operator nodes left to solve
+            (or in postfix tokens, if the tree is not valid).
+        :rtype: int
+        """
+
+        if self.root is None:
+            return len(self.postfix)
+        return len(self.operations) + 1
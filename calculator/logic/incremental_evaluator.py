@@ -0,0 +1,418 @@
+"""
+Module for re-evaluating edited expressions incrementally.
+Contains an abstract base class and an arithmetic implementation, which
+keeps the parse of the previous expression and memoizes the results of its
+parenthesized spans.
+"""
+
+import itertools
+import re
+from abc import ABC, abstractmethod
+
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.token_stream import SYMBOL_KINDS
+from calculator.utils import general_utils, operator_utils
+from calculator.utils.numeric_backend import get_backend
+
+_NUMBER_CHARACTERS = frozenset('0123456789' + general_utils.DOT)
+_OPERAND_CHARACTERS = _NUMBER_CHARACTERS | general_utils.EMPTY_CHARACTERS
+
+# Operand of raw input. Operand parts split by white spaces are scanned as
+# a single operand.
+_OPERAND_PATTERN = re.compile('[0-9.](?:[ \t]*[0-9.])*')
+
+_FAILED = object()  # Value of a span which can not be solved on its own.
+
+
+class _Span:
+    """
+    Balanced parenthesized span of processed tokens (or the whole
+    expression). Its items are tokens and nested spans, and its id
+    identifies its normalized text: the tokens, and the ids of the nested
+    spans.
+    """
+
+    __slots__ = ('parent', 'items', 'id')
+
+    def __init__(self, parent):
+        """
+        :param parent: Span which contains the span (None for the whole
+            expression).
+        :type parent: _Span
+        """
+
+        self.parent = parent
+        self.items = []
+        self.id = None
+
+
+class IncrementalEvaluator(ABC):
+    """
+    Abstract class for evaluating expressions which are edited versions of
+    each other.
+    """
+
+    @abstractmethod
+    def evaluate(self, expression: str, process, fallback):
+        """
+        Abstract method for evaluating an expression, reusing the work done
+        for previous expressions.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param fallback: Function which evaluates the expression through
+            the whole pipeline, for expressions which can not be evaluated
+            incrementally.
+        :type fallback: Callable
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+
+class ArithmeticIncrementalEvaluator(IncrementalEvaluator):
+    """
+    Class for re-evaluating edited arithmetic expressions.
+    Every balanced parenthesized span of the processed tokens is solved on
+    its own, and its result is memoized by its normalized text, so spans
+    which did not change (anywhere in the expression) are not solved again.
+    When an edit changes a single operand, the parse of the previous
+    expression is kept, and only the span of the operand and the spans
+    which contain it are solved again.
+    A span which can not be solved on its own (an error, or operators which
+    take operands from outside the span) makes the whole expression
+    evaluate through the fallback, so results and errors are exactly those
+    of the pipeline.
+    """
+
+    def __init__(self, max_spans: int = general_utils.INCREMENTAL_MAX_SPANS):
+        """
+        :param max_spans: Amount of memoized spans after which the memo is
+            cleared (before the next expression).
+        :type max_spans: int
+        """
+
+        self._max_spans = max_spans
+        self._span_ids = {}  # Normalized text of span -> id
+        self._values = {}  # Id of span -> result of span
+        self._new_ids = itertools.count()  # Ids are never reused.
+        self._backend = None
+        self._registry_version = None
+        self._expression = None  # Previous expression, if it was parsed.
+        self._root = None
+        self._operands = []  # (span, index in span) of every operand
+        self.full_parses = 0
+        self.incremental_updates = 0
+        self.solved_spans = 0
+        self.fallbacks = 0
+
+    def evaluate(self, expression: str, process, fallback):
+        """
+        Evaluates an expression with the active numeric backend, reusing
+        the parse of the previous expression and the memoized spans.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param fallback: Function which evaluates the expression through
+            the whole pipeline.
+        :type fallback: Callable
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        self._validate_memo()
+        if not self._update(expression):
+            self._parse(expression, process)
+        value = _FAILED
+        if self._root is not None:
+            value = self._values.get(self._root.id, _FAILED)
+        if value is _FAILED:
+            self.fallbacks += 1
+            return fallback()
+        return value
+
+    def clear(self):
+        """
+        Forgets the previous expression and all memoized spans (counters
+        are kept).
+        """
+
+        self._span_ids.clear()
+        self._values.clear()
+        self._expression = None
+        self._root = None
+        self._operands = []
+
+    def _validate_memo(self):
+        """
+        Clears the memo if the numeric backend or the operator registry
+        changed since the spans were solved, or if it is full.
+        """
+
+        backend = get_backend()
+        registry_version = OPERATOR_REGISTRY.get_version()
+        if (backend is not self._backend
+                or registry_version != self._registry_version
+                or len(self._span_ids) > self._max_spans):
+            self.clear()
+            self._backend = backend
+            self._registry_version = registry_version
+
+    def _parse(self, expression: str, process):
+        """
+        Parses an expression into spans, and solves every span which is not
+        memoized, innermost spans first.
+
+        :param expression: Expression to parse.
+        :type expression: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        """
+
+        tokens = process(expression)
+        self.full_parses += 1
+        self._expression = None
+        self._root = None
+        self._operands = []
+        root = _Span(None)
+        operands = []
+        stack = [root]
+        for token in tokens:
+            if token == general_utils.OPEN_BRACKETS:
+                span = _Span(stack[-1])
+                stack[-1].items.append(span)
+                stack.append(span)
+            elif token == general_utils.CLOSE_BRACKETS:
+                if len(stack) == 1:
+                    return  # Not balanced, parse is not kept.
+                self._solve(stack.pop())
+            else:
+                span = stack[-1]
+                if token[-1] in _NUMBER_CHARACTERS:
+                    operands.append((span, len(span.items)))
+                span.items.append(token)
+        if len(stack) != 1:
+            return
+        self._solve(root)
+        self._expression = expression
+        self._root = root
+        self._operands = operands
+
+    def _update(self, expression: str) -> bool:
+        """
+        Updates the parse of the previous expression, if the expression is
+        the same except for a single operand.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Whether the parse was updated.
+        :rtype: bool
+        """
+
+        previous_expression = self._expression
+        if previous_expression is None:
+            return False
+        if expression == previous_expression:
+            return True
+        prefix_length = _get_common_prefix_length(previous_expression,
+                                                  expression)
+        suffix_length = min(
+            _get_common_suffix_length(previous_expression, expression),
+            len(previous_expression) - prefix_length,
+            len(expression) - prefix_length)
+        if not (_OPERAND_CHARACTERS.issuperset(
+                expression[prefix_length:len(expression) - suffix_length])
+                and _OPERAND_CHARACTERS.issuperset(
+                    previous_expression[
+                        prefix_length:
+                        len(previous_expression) - suffix_length])):
+            return False
+
+        # Extend the edit to the whole operand it is in.
+        start = prefix_length
+        while start and expression[start - 1] in _OPERAND_CHARACTERS:
+            start -= 1
+        end = len(expression) - suffix_length
+        while end < len(expression) and expression[end] in _OPERAND_CHARACTERS:
+            end += 1
+        previous_end = end - len(expression) + len(previous_expression)
+        operand = _remove_white_spaces(expression[start:end])
+        previous_operand = _remove_white_spaces(
+            previous_expression[start:previous_end])
+        if (not operand or not previous_operand
+                or operand.count(general_utils.DOT) > 1
+                or operand == general_utils.DOT):
+            return False
+
+        # Find the operand by the amount of operands before (or after) it.
+        if start <= len(expression) - end:
+            operand_index = len(_OPERAND_PATTERN.findall(expression, 0,
+                                                         start))
+        else:
+            operand_index = (len(self._operands) - 1
+                             - len(_OPERAND_PATTERN.findall(expression, end)))
+        if not 0 <= operand_index < len(self._operands):
+            return False
+        span, index = self._operands[operand_index]
+        token = span.items[index]
+        sign = token[:-len(previous_operand)]
+        if (not token.endswith(previous_operand)
+                or sign not in (general_utils.EMPTY_STR,
+                                operator_utils.SIGN_MINUS_SYMBOL)):
+            return False
+
+        self.incremental_updates += 1
+        span.items[index] = sign + operand
+        while span is not None:  # The span and the spans which contain it
+            self._solve(span)
+            span = span.parent
+        self._expression = expression
+        return True
+
+    def _solve(self, span: _Span):
+        """
+        Identifies a span by its normalized text, and solves it if its
+        result is not memoized. Nested spans have to be solved first.
+
+        :param span: Span to solve.
+        :type span: _Span
+        """
+
+        key = tuple([item if item.__class__ is str else item.id
+                     for item in span.items])
+        span_id = self._span_ids.get(key)
+        if span_id is None:
+            span_id = self._span_ids[key] = next(self._new_ids)
+        span.id = span_id
+        if span_id not in self._values:
+            self.solved_spans += 1
+            try:
+                value = self._solve_items(span.items)
+            except Exception:
+                value = _FAILED
+            self._values[span_id] = value
+
+    def _solve_items(self, items: list):
+        """
+        Solves the items of a span (infix, like the equation solver, with
+        every operator solved as soon as it would be added to the postfix
+        representation).
+
+        :param items: Tokens and solved nested spans.
+        :type items: list
+        :return: Result of the items, or _FAILED if they can not be solved
+            on their own.
+        """
+
+        parse = self._backend.parse
+        dispatch_table = OPERATOR_REGISTRY.get_dispatch_table()
+        arities = dispatch_table.arities
+        precedences = dispatch_table.precedences
+        solvers = dispatch_table.solvers
+        get_kind = SYMBOL_KINDS.get
+        operators = []
+        operands = []
+        for item in itertools.chain(items, (None,)):
+            if item is None:  # End of items, solve remaining operators.
+                kind = None
+                precedence = -1
+            elif item.__class__ is _Span:
+                value = self._values.get(item.id, _FAILED)
+                if value is _FAILED:
+                    return _FAILED
+                operands.append(value)
+                continue
+            else:
+                kind = get_kind(item)
+                if kind is None:  # Operand
+                    value = parse(item.replace(
+                        operator_utils.SIGN_MINUS_SYMBOL,
+                        operator_utils.SUB_SYMBOL))
+                    operands.append(0 if value == -0 else value)
+                    continue
+                precedence = (precedences[kind] if kind < len(precedences)
+                              else None)
+                if precedence is None:  # No registered operator.
+                    return _FAILED
+            while operators and precedence <= precedences[operators[-1]]:
+                operator_kind = operators.pop()
+                arity = arities[operator_kind]
+                operand = operands.pop()
+                if arity == 1:
+                    operands.append(solvers[operator_kind](operand))
+                elif arity == 2:
+                    operands.append(solvers[operator_kind](operands.pop(),
+                                                           operand))
+            if kind is not None:
+                operators.append(kind)
+        if len(operands) != 1:
+            return _FAILED
+        return operands[0]
+
+
+def _remove_white_spaces(string: str) -> str:
+    """
+    :param string: String to remove white spaces from.
+    :type string: str
+    :return: String without white spaces.
+    :rtype: str
+    """
+
+    for char in general_utils.EMPTY_CHARACTERS:
+        string = string.replace(char, general_utils.EMPTY_STR)
+    return string
+
+
+def _get_common_prefix_length(first: str, second: str) -> int:
+    """
+    Finds the length of the common prefix of two strings with a binary
+    search, so characters are compared by slice comparisons.
+
+    :param first: First string.
+    :type first: str
+    :param second: Second string.
+    :type second: str
+    :return: Length of common prefix.
+    :rtype: int
+    """
+
+    low = 0
+    high = min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[low:middle] == second[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _get_common_suffix_length(first: str, second: str) -> int:
+    """
+    Finds the length of the common suffix of two strings with a binary
+    search, so characters are compared by slice comparisons.
+
+    :param first: First string.
+    :type first: str
+    :param second: Second string.
+    :type second: str
+    :return: Length of common suffix.
+    :rtype: int
+    """
+
+    low = 0
+    high = min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if (first[len(first) - middle:len(first) - low]
+                == second[len(second) - middle:len(second) - low]):
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,453 @@
+"""
+Module for storing the outcomes (results or errors) of evaluations
+persistently, so they are shared by separate runs of the calculator.
+Contains an abstract base class and an SQLite implementation.
+"""
+
+import hashlib
+import io
+import pickle
+import sqlite3
+from abc import ABC, abstractmethod
+
+from calculator.logic import exceptions
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.utils import general_utils
+from calculator.utils.numeric_backend import FLOAT_BACKEND
+
+# Modules and names of the only classes stored outcomes may contain.
+_STORED_CLASSES = {
+    ('builtins', 'OverflowError'),
+    ('decimal', 'Decimal'),
+    ('fractions', 'Fraction'),
+}
+
+_RESULT_KIND = 0
+_ERROR_KIND = 1
+
+STORE_FORMAT_VERSION = 2  # Version of the format of keys and outcomes.
+
+
+class StoredOutcome:
+    """
+    Class which stores the outcome of an evaluation: either its result or
+    its error.
+    """
+
+    __slots__ = ('result', 'error')
+
+    def __init__(self, result=None, error: Exception = None):
+        """
+        :param result: Result of the evaluation.
+        :param error: Error of the evaluation.
+        :type error: Exception
+        """
+
+        self.result = result
+        self.error = error
+
+    def get_result(self):
+        """
+        :return: Result of the evaluation.
+        :raises Exception: Error of the evaluation, if it failed.
+        """
+
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ResultStore(ABC):
+    """
+    Abstract class for storing outcomes of evaluations.
+    Stores are context managers, which close them on exit.
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """
+        Abstract method for getting the stored outcome of an expression.
+
+        :param key: Key of the expression.
+        :type key: str
+        :return: Stored outcome, or None if it is not stored.
+        :rtype: StoredOutcome or None
+        """
+
+    @abstractmethod
+    def put_result(self, key: str, result):
+        """
+        Abstract method for storing the result of an expression.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param result: Result of the expression.
+        """
+
+    @abstractmethod
+    def put_error(self, key: str, error: Exception):
+        """
+        Abstract method for storing the error of an expression. Errors which
+        do not depend on the expression alone (e.g. exceeded evaluation
+        limits) are not stored.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param error: Error of the expression.
+        :type error: Exception
+        """
+
+    @abstractmethod
+    def flush(self):
+        """
+        Abstract method for writing pending outcomes.
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        Abstract method for writing pending outcomes and closing the store.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    Result store which keeps outcomes in an SQLite database file.
+    Outcomes are written in batches, and the least recently used outcomes
+    are evicted when there are more than max entries of them.
+    The file is stamped with a version of the operator registry, the
+    operators' semantics and the numeric backend: when the stamp of the
+    calculator differs from the file's (or the registry changes while
+    running), the stored outcomes are stale and they are discarded.
+    The database is opened on first usage, and a pickled store opens its
+    own connection, so a store can be sent to worker processes.
+    """
+
+    def __init__(self, path: str, registry=OPERATOR_REGISTRY,
+                 backend=FLOAT_BACKEND,
+                 max_entries: int = general_utils.RESULT_STORE_MAX_ENTRIES,
+                 batch_size: int = general_utils.RESULT_STORE_BATCH_SIZE):
+        """
+        :param path: Path of the database file.
+        :type path: str
+        :param registry: Operator registry which outcomes depend on. A
+            store of the default registry uses the registry of the process
+            it is unpickled in.
+        :type registry: OperatorRegistry
+        :param backend: Numeric backend which outcomes are evaluated with.
+        :type backend: NumericBackend
+        :param max_entries: Max amount of stored outcomes.
+        :type max_entries: int
+        :param batch_size: Amount of outcomes (and uses of outcomes) kept
+            in memory before they are written.
+        :type batch_size: int
+        """
+
+        self._path = path
+        self._registry = registry
+        self._backend = backend
+        self._max_entries = max_entries
+        self._batch_size = batch_size
+        self._connection = None
+        self._registry_version = None
+        self._clock = 0  # Order of uses, for eviction
+        self._pending = {}  # Maps key to its outcome's blob and use
+        self._used = {}  # Maps key of a stored outcome to its latest use
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self) -> dict:
+        registry = self._registry
+        if registry is OPERATOR_REGISTRY:
+            registry = None  # The process' own registry
+        return {'path': self._path, 'registry': registry,
+                'backend': self._backend, 'max_entries': self._max_entries,
+                'batch_size': self._batch_size}
+
+    def __setstate__(self, state: dict):
+        if state['registry'] is None:
+            state['registry'] = OPERATOR_REGISTRY
+        self.__init__(**state)
+
+    def get(self, key: str):
+        """
+        Gets the stored outcome of an expression and marks it as most
+        recently used.
+
+        :param key: Key of the expression.
+        :type key: str
+        :return: Stored outcome, or None if it is not stored.
+        :rtype: StoredOutcome or None
+        """
+
+        self._validate_stamp()
+        pending = self._pending.get(key)
+        if pending is not None:
+            blob = pending[0]
+        else:
+            row = self._connection.execute(
+                'SELECT outcome FROM results WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            blob = row[0]
+            self._used[key] = self._tick()
+            self._flush_if_full()
+        self.hits += 1
+        return _load_outcome(blob)
+
+    def put_result(self, key: str, result):
+        """
+        Stores the result of an expression (it is written with its batch).
+
+        :param key: Key of the expression.
+        :type key: str
+        :param result: Result of the expression.
+        """
+
+        self._put(key, (_RESULT_KIND, result))
+
+    def put_error(self, key: str, error: Exception):
+        """
+        Stores the error of an expression (it is written with its batch).
+        Only the calculator's own errors (but exceeded evaluation limits)
+        and overflows are stored.
+
+        :param key: Key of the expression.
+        :type key: str
+        :param error: Error of the expression.
+        :type error: Exception
+        """
+
+        if is_storable_error(error):
+            self._put(key, (_ERROR_KIND, error))
+
+    def flush(self):
+        """
+        Writes pending outcomes and uses of stored outcomes in a single
+        transaction, and evicts the least recently used outcomes if there
+        are more than max entries.
+        """
+
+        if self._connection is None or not (self._pending or self._used):
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                [(key, blob, used)
+                 for key, (blob, used) in self._pending.items()])
+            self._connection.executemany(
+                'UPDATE results SET used = ? WHERE key = ?',
+                [(used, key) for key, used in self._used.items()])
+            excess = self._connection.execute(
+                'SELECT COUNT(*) FROM results').fetchone()[0] \
+                - self._max_entries
+            if excess > 0:
+                self._connection.execute(
+                    'DELETE FROM results WHERE key IN '
+                    '(SELECT key FROM results ORDER BY used LIMIT ?)',
+                    (excess,))
+                self.evictions += excess
+        self._pending.clear()
+        self._used.clear()
+
+    def close(self):
+        """
+        Writes pending outcomes and closes the database.
+        """
+
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def clear(self):
+        """
+        Removes all stored (and pending) outcomes (counters are kept).
+        """
+
+        self._validate_stamp()
+        self._pending.clear()
+        self._used.clear()
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+
+    def get_stats(self) -> dict:
+        """
+        :return: Store counters.
+        :rtype: dict
+        """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pending': len(self._pending),
+            'max_entries': self._max_entries
+        }
+
+    def _put(self, key: str, outcome: tuple):
+        """
+        :param key: Key of the expression.
+        :type key: str
+        :param outcome: Kind of outcome and its result / error.
+        :type outcome: tuple
+        """
+
+        self._validate_stamp()
+        self._pending[key] = (pickle.dumps(outcome), self._tick())
+        self._used.pop(key, None)
+        self._flush_if_full()
+
+    def _tick(self) -> int:
+        """
+        :return: Order of a new use.
+        :rtype: int
+        """
+
+        self._clock += 1
+        return self._clock
+
+    def _flush_if_full(self):
+        """
+        Writes the batch if it is full.
+        """
+
+        if len(self._pending) + len(self._used) >= self._batch_size:
+            self.flush()
+
+    def _validate_stamp(self):
+        """
+        Opens the database on first usage. Discards stored outcomes if the
+        file's stamp differs from the calculator's, which is computed again
+        whenever the operator registry changes.
+        """
+
+        registry_version = self._registry.get_version()
+        if (self._connection is not None
+                and registry_version == self._registry_version):
+            return
+        if self._connection is None:
+            self._connect()
+        else:
+            self._pending.clear()  # Evaluated with the previous operators
+            self._used.clear()
+        self._registry_version = registry_version
+        stamp = create_stamp(self._registry, self._backend)
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE name = 'stamp'").fetchone()
+            if row is None or row[0] != stamp:
+                self._connection.execute('DELETE FROM results')
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('stamp', ?)",
+                    (stamp,))
+        self._clock = self._connection.execute(
+            'SELECT COALESCE(MAX(used), 0) FROM results').fetchone()[0]
+
+    def _connect(self):
+        """
+        Opens the database and creates its tables if they do not exist.
+        """
+
+        self._connection = sqlite3.connect(
+            self._path, timeout=general_utils.RESULT_STORE_TIMEOUT)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS meta '
+                '(name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, '
+                'outcome BLOB NOT NULL, used INTEGER NOT NULL)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+
+
+class _OutcomeUnpickler(pickle.Unpickler):
+    """
+    Unpickler which only loads results and the calculator's errors, so a
+    tampered database file can't run code.
+    """
+
+    def find_class(self, module: str, name: str):
+        if ((module, name) in _STORED_CLASSES
+                or (module == exceptions.__name__
+                    and isinstance(getattr(exceptions, name, None), type))):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"{module}.{name} can't be loaded")
+
+
+def _load_outcome(blob: bytes) -> StoredOutcome:
+    """
+    :param blob: Pickled kind of outcome and its result / error.
+    :type blob: bytes
+    :return: Stored outcome.
+    :rtype: StoredOutcome
+    """
+
+    kind, value = _OutcomeUnpickler(io.BytesIO(blob)).load()
+    if kind == _ERROR_KIND:
+        return StoredOutcome(error=value)
+    return StoredOutcome(result=value)
+
+
+def is_storable_error(error: Exception) -> bool:
+    """
+    :param error: Error of an evaluation.
+    :type error: Exception
+    :return: Whether the error depends on the expression alone: the
+        calculator's own errors (but exceeded evaluation limits) and
+        overflows.
+    :rtype: bool
+    """
+
+    error_class = type(error)
+    if error_class is OverflowError:
+        return True
+    return (error_class.__module__ == exceptions.__name__
+            and error_class is not exceptions.EvaluationLimitError)
+
+
+def create_stamp(registry, backend) -> str:
+    """
+    Creates the version stamp of outcomes, from the versions of the store's
+    format and of the operators' semantics, every registered operator (its
+    symbol, kind, precedence, the code of its solve function and the key of
+    its configuration) and the numeric backend.
+
+    :param registry: Operator registry.
+    :type registry: OperatorRegistry
+    :param backend: Numeric backend.
+    :type backend: NumericBackend
+    :return: Hexadecimal stamp.
+    :rtype: str
+    """
+
+    context = getattr(backend, 'context', None)  # Of decimal backends
+    digest = hashlib.sha256()
+    digest.update(f'{STORE_FORMAT_VERSION}|'
+                  f'{general_utils.OPERATOR_SEMANTICS_VERSION}|'
+                  f'{type(backend).__qualname__}|'
+                  f'{getattr(context, "prec", None)}'.encode())
+    entries = registry.get_dispatch_table().by_symbol
+    for symbol in sorted(entries):
+        entry = entries[symbol]
+        solve = getattr(entry.solve, '__func__', entry.solve)
+        operator = getattr(entry.solve, '__self__', None)
+        semantic_key = getattr(operator, 'get_semantic_key', str)()
+        digest.update(f'|{symbol}{entry.arity}{entry.fixity}'
+                      f'{entry.precedence}{solve.__qualname__}'
+                      f'|{semantic_key}'.encode())
+        code = getattr(solve, '__code__', None)
+        if code is not None:
+            digest.update(code.co_code)
+    return digest.hexdigest()
@@ -0,0 +1,168 @@
+"""
+Module for scanning a raw string into a list of tokens.
+Contains an abstract base class and an arithmetic implementation.
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+from calculator.logic.exceptions import EmptyEquationError
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.utils import general_utils
+from calculator.utils.evaluation_limits import get_budget
+
+_WHITE_SPACES = ''.join(sorted(general_utils.EMPTY_CHARACTERS))
+_NUMBER_CHARACTERS = '0123456789' + general_utils.DOT
+
+# Operand or a single non-white-space character. An operand split by white
+# spaces (e.g. '1 2') is found as separate adjacent operands.
+_TOKEN_PATTERN = re.compile(
+    f'[{re.escape(_NUMBER_CHARACTERS)}]+|[^{re.escape(_WHITE_SPACES)}]')
+
+_OPERAND = 0
+_OPERATOR = 1
+_OPEN_BRACKETS = 2
+_CLOSE_BRACKETS = 3
+
+# Maps each valid non-operand character to its kind.
+_CHARACTER_KINDS = {char: _OPERATOR
+                    for char in general_utils.VALID_INPUT_CHARACTERS
+                    if char not in _NUMBER_CHARACTERS
+                    and char not in general_utils.EMPTY_CHARACTERS}
+_CHARACTER_KINDS[general_utils.OPEN_BRACKETS] = _OPEN_BRACKETS
+_CHARACTER_KINDS[general_utils.CLOSE_BRACKETS] = _CLOSE_BRACKETS
+
+
+class Scanner(ABC):
+    """
+    Abstract class for scanning a raw string.
+    Replaces the string preprocessor, string processor and tokenizer stages.
+    """
+
+    @abstractmethod
+    def scan(self, string: str) -> list:
+        """
+        Abstract method for validating and tokenizing a raw string.
+
+        :param string: Raw string to scan.
+        :type string: str
+        :return: Tokenized string.
+        :rtype: list
+        """
+
+
+class ArithmeticScanner(Scanner):
+    """
+    Class for scanning raw arithmetic input.
+    Splits the input into tokens (skipping white spaces) with a single
+    regular expression pass, then validates characters and parentheses in
+    a single pass over the tokens.
+    The result and the raised exceptions are the same as running
+    ArithmeticStringPreprocessor, ArithmeticStringProcessor and
+    ArithmeticTokenizer one after the other.
+    """
+
+    def scan(self, string: str) -> list:
+        """
+        Validates and tokenizes a raw arithmetic string.
+
+        :param string: Raw arithmetic equation.
+        :type string: str
+        :return: Tokenized arithmetic equation.
+        :rtype: list
+        :raises InvalidInputError: if input contains forbidden chars.
+        :raises EmptyParenthesesError: if empty parentheses found.
+        :raises UnmatchedClosingParenthesesError: if unmatched closing
+            parentheses found.
+        :raises UnmatchedOpeningParenthesesError: if unmatched opening
+            parentheses found.
+        :raises EmptyEquationError: if input contains only white spaces.
+        :raises EvaluationLimitError: if evaluation limits are active and
+            there are too many tokens.
+        """
+
+        tokens = _TOKEN_PATTERN.findall(string)
+        has_split_operands = self._validate(tokens)
+        if has_split_operands is None:
+            self._raise_error(string)
+        if not tokens:
+            raise EmptyEquationError()
+        if has_split_operands:
+            tokens = self._join_split_operands(tokens)
+        budget = get_budget()
+        if budget is not None:
+            budget.check_tokens(len(tokens))
+        return tokens
+
+    @staticmethod
+    def _validate(tokens: list):
+        """
+        Checks that every token is valid and that parentheses are matched
+        and not empty.
+
+        :param tokens: Tokens found in the string.
+        :type tokens: list
+        :return: None if tokens are invalid, otherwise whether there are
+            adjacent operands which have to be joined.
+        :rtype: bool or None
+        """
+
+        get_kind = _CHARACTER_KINDS.get
+        depth = 0
+        previous_kind = None
+        has_split_operands = False
+        for token in tokens:
+            kind = get_kind(token, _OPERAND)
+            if kind == _OPERAND:
+                if token[0] not in _NUMBER_CHARACTERS:
+                    if token not in general_utils.VALID_INPUT_CHARACTERS:
+                        return None
+                    kind = _OPERATOR  # Operator registered as a plugin.
+                elif previous_kind == _OPERAND:
+                    has_split_operands = True
+            elif kind == _OPEN_BRACKETS:
+                depth += 1
+            elif kind == _CLOSE_BRACKETS:
+                if depth == 0 or previous_kind == _OPEN_BRACKETS:
+                    return None
+                depth -= 1
+            previous_kind = kind
+        if depth:
+            return None
+        return has_split_operands
+
+    @staticmethod
+    def _join_split_operands(tokens: list) -> list:
+        """
+        Joins adjacent operands (which were split by white spaces) into a
+        single operand.
+
+        :param tokens: Valid tokens.
+        :type tokens: list
+        :return: Tokens where no two operands are adjacent.
+        :rtype: list
+        """
+
+        joined_tokens = []
+        previous_is_operand = False
+        for token in tokens:
+            is_operand = token[0] in _NUMBER_CHARACTERS
+            if is_operand and previous_is_operand:
+                joined_tokens[-1] += token
+            else:
+                joined_tokens.append(token)
+            previous_is_operand = is_operand
+        return joined_tokens
+
+    @staticmethod
+    def _raise_error(string: str):
+        """
+        Raises the error of an invalid string, with the same indices the
+        string preprocessor reports. Only used once the string is known to
+        be invalid.
+
+        :param string: Invalid raw string.
+        :type string: str
+        """
+
+        ArithmeticStringPreprocessor().preprocess(string)
@@ -0,0 +1,555 @@
+"""
+Module for evaluating expressions which are read as a stream of chunks, so
+they do not have to fit in memory.
+Contains an abstract base class and an arithmetic implementation.
+"""
+
+import inspect
+import re
+from abc import ABC, abstractmethod
+
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.exceptions import EmptyEquationError, \
+    InvalidInputError, UnmatchedOpeningParenthesesError, \
+    UnmatchedClosingParenthesesError, EmptyParenthesesError, \
+    SingleDotError, MultipleDotsError, MultipleDotsOperandError, \
+    EndMinusesError, UnaryError, OperatorUsageError, \
+    WrongParenthesesUsageError, ExpectedOperandError
+from calculator.logic.token_stream import SYMBOL_KINDS, KIND_SYMBOLS, \
+    OPEN_BRACKETS_KIND, CLOSE_BRACKETS_KIND
+from calculator.utils import general_utils, operand_utils, operator_utils
+from calculator.utils.numeric_backend import NumericBackend, get_backend
+
+_NUMBER_CHARACTERS = '0123456789' + general_utils.DOT
+
+# Operand part or a single non-white-space character (as the scanner
+# splits its input).
+_TOKEN_PATTERN = re.compile(
+    f'[{re.escape(_NUMBER_CHARACTERS)}]+'
+    f'|[^{re.escape("".join(sorted(general_utils.EMPTY_CHARACTERS)))}]')
+
+# Line breaks are read as white spaces, so an expression may span lines.
+_LINE_BREAKS = str.maketrans('\r\n', '  ')
+
+
+def read_chunks(stream, chunk_size: int = general_utils.STREAM_CHUNK_SIZE):
+    """
+    Lazily reads a text stream in chunks.
+
+    :param stream: Text stream to read.
+    :type stream: TextIO
+    :param chunk_size: Amount of characters in a chunk.
+    :type chunk_size: int
+    :return: Chunks of stream, with line breaks replaced by spaces.
+    :rtype: Iterator[str]
+    """
+
+    chunk = stream.read(chunk_size)
+    while chunk:
+        yield chunk.translate(_LINE_BREAKS)
+        chunk = stream.read(chunk_size)
+
+
+class StreamEvaluator(ABC):
+    """
+    Abstract class for evaluating an expression read in chunks.
+    """
+
+    @abstractmethod
+    def evaluate(self, chunks):
+        """
+        Abstract method for evaluating an expression read in chunks.
+
+        :param chunks: Consecutive parts of the expression.
+        :type chunks: Iterable[str]
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+
+class ArithmeticStreamEvaluator(StreamEvaluator):
+    """
+    Class for evaluating an arithmetic expression read in chunks.
+    Every stage of the pipeline is a generator which looks at most one
+    token ahead: the scanner, each pass of the token processor, and a
+    shunting-yard which solves every operator as soon as it would be added
+    to the postfix representation. Memory therefore depends on the nesting
+    depth of the expression (and the length of its longest operand), not on
+    its length.
+    Results are the same as CalculatorCore.evaluate. So are errors: when a
+    stage raises an error, the earlier stages read the rest of the input
+    first, and an error they raise is raised instead, as it would be when
+    every stage runs on the whole expression.
+    """
+
+    def __init__(self, backend: NumericBackend = None):
+        """
+        :param backend: Numeric backend to parse and solve expressions with.
+            Defaults to the active backend.
+        :type backend: NumericBackend
+        """
+
+        if backend is None:
+            backend = get_backend()
+        self._backend = backend
+
+    def evaluate(self, chunks):
+        """
+        Evaluates an expression read in chunks.
+
+        :param chunks: Consecutive parts of the expression.
+        :type chunks: Iterable[str]
+        :return: Solution to expression.
+        :rtype: float
+        """
+
+        stages = [self._scan(iter(chunks))]
+        for stage in (self._check_dots, self._delete_extra_minuses,
+                      self._join_sign_minuses, self._replace_unary_minuses,
+                      self._validate_unary_operators):
+            stages.append(stage(stages[-1]))
+        try:
+            with self._backend.activate():
+                return self._solve(stages[-1])
+        except Exception as error:
+            raise self._get_first_stage_error(stages, error)
+
+    @staticmethod
+    def _get_first_stage_error(stages: list, error: Exception):
+        """
+        Finds the error which the earliest stage raises. The stages before
+        the stage which raised an error (those which did not finish) read
+        the rest of the input, and every error they raise replaces the
+        previous one, until the stages before it finish without an error.
+
+        :param stages: Generators of the stages, in pipeline order.
+        :type stages: list
+        :param error: Error raised by a stage, or while solving.
+        :type error: Exception
+        :return: Error of the earliest stage.
+        :rtype: Exception
+        """
+
+        while True:
+            failed_stage = next(
+                (index for index, stage in enumerate(stages)
+                 if inspect.getgeneratorstate(stage) == inspect.GEN_CLOSED),
+                len(stages))
+            if failed_stage == 0:
+                return error
+            try:
+                for _ in stages[failed_stage - 1]:
+                    pass
+            except Exception as earlier_error:
+                error = earlier_error
+            else:
+                return error
+
+    def _scan(self, chunks):
+        """
+        Splits chunks into tokens, validating characters and parentheses
+        like the scanner (with the same error indices).
+
+        :param chunks: Iterator of consecutive parts of the expression.
+        :type chunks: Iterator[str]
+        :return: Tokens of the expression.
+        :rtype: Iterator[str]
+        :raises InvalidInputError: if input contains forbidden chars.
+        :raises EmptyParenthesesError: if empty parentheses found.
+        :raises UnmatchedClosingParenthesesError: if unmatched closing
+            parentheses found.
+        :raises UnmatchedOpeningParenthesesError: if unmatched opening
+            parentheses found.
+        :raises EmptyEquationError: if input contains only white spaces.
+        """
+
+        open_brackets = []  # Indices of unmatched opening brackets
+        previous_is_open_brackets = False
+        is_empty = True
+        operand = general_utils.EMPTY_STR  # May continue in the next chunk
+        offset = 0
+        for chunk in chunks:
+            for match in _TOKEN_PATTERN.finditer(chunk):
+                token = match.group()
+                is_empty = False
+                if token[0] in _NUMBER_CHARACTERS:
+                    operand += token
+                    previous_is_open_brackets = False
+                    continue
+                if operand:
+                    yield operand
+                    operand = general_utils.EMPTY_STR
+                error = None
+                if token not in general_utils.VALID_INPUT_CHARACTERS:
+                    error = InvalidInputError(token)
+                elif token == general_utils.OPEN_BRACKETS:
+                    open_brackets.append(offset + match.start())
+                elif token == general_utils.CLOSE_BRACKETS:
+                    if not open_brackets:
+                        error = UnmatchedClosingParenthesesError(
+                            offset + match.start())
+                    elif previous_is_open_brackets:
+                        error = EmptyParenthesesError(open_brackets[-1],
+                                                      offset + match.start())
+                    else:
+                        open_brackets.pop()
+                if error is not None:
+                    self._raise_scan_error(error, chunk[match.start():],
+                                           chunks)
+                previous_is_open_brackets = (
+                        token == general_utils.OPEN_BRACKETS)
+                yield token
+            offset += len(chunk)
+        if operand:
+            yield operand
+        if open_brackets:
+            raise UnmatchedOpeningParenthesesError(open_brackets[0])
+        if is_empty:
+            raise EmptyEquationError()
+
+    @staticmethod
+    def _raise_scan_error(error: Exception, rest_of_chunk: str, chunks):
+        """
+        Raises an error found by the scanner. Forbidden characters are
+        reported before any other error (all of them at once), so the rest
+        of the input is checked for them first.
+
+        :param error: Error found by the scanner.
+        :type error: Exception
+        :param rest_of_chunk: Rest of the chunk the error was found in
+            (from the token which caused it).
+        :type rest_of_chunk: str
+        :param chunks: Iterator of the rest of the expression.
+        :type chunks: Iterator[str]
+        """
+
+        characters = set(rest_of_chunk)
+        for chunk in chunks:
+            characters.update(chunk)
+        forbidden_characters = (
+                characters - general_utils.VALID_INPUT_CHARACTERS)
+        if forbidden_characters:
+            raise InvalidInputError(''.join(forbidden_characters))
+        raise error
+
+    @staticmethod
+    def _check_dots(tokens):
+        """
+        Validates tokens which include dots.
+
+        :param tokens: Tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: The same tokens.
+        :rtype: Iterator[str]
+        :raises SingleDotError: when 'operand' is a single dot.
+        :raises MultipleDotsError: when 'operand' is more than a single dot.
+        :raises MultipleDotsOperandError: when 'operand' contains
+            multiple dots.
+        """
+
+        for token in tokens:
+            if token == general_utils.DOT:
+                raise SingleDotError()
+            dot_count = token.count(general_utils.DOT)
+            if dot_count > 1:
+                if not any(char.isdigit() for char in token):
+                    raise MultipleDotsError(dot_count)
+                raise MultipleDotsOperandError(token, dot_count)
+            yield token
+
+    @staticmethod
+    def _delete_extra_minuses(tokens):
+        """
+        Shortens runs of minuses like the token processor: only a run which
+        a number / bracket comes right after is shortened, to 0 or 1 minuses
+        after an operator / opening bracket (or at the start), otherwise to
+        1 or 2 minuses.
+
+        :param tokens: Tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: Tokens without extra minuses.
+        :rtype: Iterator[str]
+        :raises EndMinusesError: if there are minuses at the end.
+        """
+
+        previous_token = None
+        run_length = 0
+        for token in tokens:
+            if token == operator_utils.SUB_SYMBOL:
+                run_length += 1
+                continue
+            if run_length:
+                if (operand_utils.is_operand(token)
+                        or token == general_utils.OPEN_BRACKETS):
+                    if (previous_token is None
+                            or previous_token
+                            in operator_utils.BINARY_OPERATORS
+                            or previous_token
+                            in operator_utils.LEFT_UNARY_OPERATORS
+                            or previous_token == general_utils.OPEN_BRACKETS):
+                        run_length %= 2
+                    elif run_length > 2:
+                        run_length = 2 - run_length % 2
+                for _ in range(run_length):
+                    yield operator_utils.SUB_SYMBOL
+                run_length = 0
+            yield token
+            previous_token = token
+        if run_length:
+            raise EndMinusesError(run_length)
+
+    def _join_sign_minuses(self, tokens):
+        """
+        Joins sign minuses to the numbers after them, like the token
+        processor. A sign minus before brackets is wrapped (with the
+        brackets' content, up to the next closing bracket) in new brackets,
+        so only the amount of closing brackets to add before the next
+        closing bracket has to be kept.
+
+        :param tokens: Tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: Tokens with sign minuses joined.
+        :rtype: Iterator[str]
+        """
+
+        added_closing_brackets = 0
+        last_tokens = [None, None]  # Two last yielded tokens
+        is_first = True
+        token = next(tokens, None)
+        while token is not None:
+            if token == general_utils.CLOSE_BRACKETS:
+                for _ in range(added_closing_brackets):
+                    yield general_utils.CLOSE_BRACKETS
+                if added_closing_brackets:
+                    last_tokens = [general_utils.CLOSE_BRACKETS] * 2
+                added_closing_brackets = 0
+            if (token == operator_utils.SUB_SYMBOL and not is_first
+                    and self._is_sign_minus(*last_tokens)):
+                next_token = next(tokens, None)
+                if next_token is None:
+                    yield token
+                    return
+                if next_token == general_utils.OPEN_BRACKETS:
+                    yield general_utils.OPEN_BRACKETS
+                    yield operator_utils.SUB_SYMBOL
+                    last_tokens = [general_utils.OPEN_BRACKETS,
+                                   operator_utils.SUB_SYMBOL]
+                    added_closing_brackets += 1
+                    token = next_token
+                    continue
+                joined_token = operator_utils.SIGN_MINUS_SYMBOL + next_token
+                yield joined_token
+                last_tokens = [last_tokens[1], joined_token]
+                if (next_token == general_utils.CLOSE_BRACKETS
+                        and added_closing_brackets):
+                    # Minus was joined to an added closing bracket
+                    added_closing_brackets -= 1
+                    token = next_token
+                else:
+                    token = next(tokens, None)
+                continue
+            yield token
+            last_tokens = [last_tokens[1], token]
+            is_first = False
+            token = next(tokens, None)
+        if added_closing_brackets:
+            raise IndexError('list index out of range')
+
+    @staticmethod
+    def _is_sign_minus(before_previous_token: str,
+                       previous_token: str) -> bool:
+        """
+        :param before_previous_token: Token before previous token (None if
+            there is none).
+        :type before_previous_token: str
+        :param previous_token: Token before the minus.
+        :type previous_token: str
+        :return: Whether a minus after these tokens is a sign minus.
+        :rtype: bool
+        """
+
+        if previous_token != operator_utils.SUB_SYMBOL:
+            return (previous_token in operator_utils.BINARY_OPERATORS
+                    or previous_token in operator_utils.LEFT_UNARY_OPERATORS)
+        return (before_previous_token is not None
+                and (operand_utils.is_operand(before_previous_token)
+                     or before_previous_token == general_utils.CLOSE_BRACKETS
+                     or before_previous_token
+                     in operator_utils.RIGHT_UNARY_OPERATORS))
+
+    @staticmethod
+    def _replace_unary_minuses(tokens):
+        """
+        Replaces minuses at the start or after opening brackets with
+        unary minuses.
+
+        :param tokens: Tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: Tokens with unary minuses replaced.
+        :rtype: Iterator[str]
+        """
+
+        previous_token = None
+        for token in tokens:
+            if token == operator_utils.SUB_SYMBOL and (
+                    previous_token is None
+                    or general_utils.OPEN_BRACKETS in previous_token):
+                token = operator_utils.UNARY_MINUS_SYMBOL
+            yield token
+            previous_token = token
+
+    def _validate_unary_operators(self, tokens):
+        """
+        Checks the tokens around every unary operator.
+
+        :param tokens: Tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: The same tokens.
+        :rtype: Iterator[str]
+        :raises UnaryError: if an operator's usage is not valid.
+        """
+
+        previous_token = None
+        token = next(tokens, None)
+        while token is not None:
+            next_token = next(tokens, None)
+            if token in operator_utils.LEFT_UNARY_OPERATORS:
+                self._validate_left_unary_operator(token, previous_token,
+                                                   next_token)
+            elif token in operator_utils.RIGHT_UNARY_OPERATORS:
+                self._validate_right_unary_operator(token, previous_token,
+                                                    next_token)
+            yield token
+            previous_token = token
+            token = next_token
+
+    @staticmethod
+    def _validate_left_unary_operator(token: str, previous_token: str,
+                                      next_token: str):
+        """
+        :param token: Left unary operator's symbol.
+        :type token: str
+        :param previous_token: Token before it (None if there is none).
+        :type previous_token: str
+        :param next_token: Token after it (None if there is none).
+        :type next_token: str
+        :raises UnaryError: if operator's usage is not valid.
+        """
+
+        if (previous_token is not None
+                and previous_token not in operator_utils.BINARY_OPERATORS
+                and previous_token != general_utils.OPEN_BRACKETS):
+            raise UnaryError(token, True)
+        if (next_token is not None
+                and not operand_utils.is_operand(next_token)
+                and next_token != general_utils.OPEN_BRACKETS):
+            raise UnaryError(token, False)
+
+    @staticmethod
+    def _validate_right_unary_operator(token: str, previous_token: str,
+                                       next_token: str):
+        """
+        :param token: Right unary operator's symbol.
+        :type token: str
+        :param previous_token: Token before it (None if there is none).
+        :type previous_token: str
+        :param next_token: Token after it (None if there is none).
+        :type next_token: str
+        :raises UnaryError: if operator's usage is not valid.
+        """
+
+        if (previous_token is not None
+                and not operand_utils.is_operand(previous_token)
+                and previous_token
+                not in operator_utils.ALLOWED_BEFORE_RIGHT_UNARY):
+            raise UnaryError(token, True)
+        if (next_token is not None and next_token
+                not in operator_utils.ALLOWED_AFTER_RIGHT_UNARY):
+            raise UnaryError(token, False)
+
+    def _solve(self, tokens):
+        """
+        Solves processed tokens with a shunting-yard which solves every
+        operator as soon as it would be added to the postfix representation.
+
+        :param tokens: Processed tokens of the expression.
+        :type tokens: Iterator[str]
+        :return: Solution to expression.
+        :rtype: float
+        :raises OperatorUsageError: If misused operators exist.
+        :raises WrongParenthesesUsageError: if equations contains wrong
+            parentheses usage.
+        :raises ExpectedOperandError: If an operand is not a valid number.
+        """
+
+        parse = get_backend().parse
+        dispatch_table = OPERATOR_REGISTRY.get_dispatch_table()
+        precedences = dispatch_table.precedences
+        get_kind = SYMBOL_KINDS.get
+        operators = []
+        operands = []
+        for token in tokens:
+            kind = get_kind(token)
+            if kind is None:  # Operand
+                fixed_token = token.replace(operator_utils.SIGN_MINUS_SYMBOL,
+                                            operator_utils.SUB_SYMBOL)
+                try:
+                    value = parse(fixed_token)
+                except ValueError:
+                    raise ExpectedOperandError(fixed_token)
+                if value == -0:
+                    value = 0
+                operands.append(value)
+            elif kind == OPEN_BRACKETS_KIND:
+                operators.append(kind)
+            elif kind == CLOSE_BRACKETS_KIND:
+                while operators[-1] != OPEN_BRACKETS_KIND:
+                    self._apply(operators.pop(), operands, dispatch_table)
+                operators.pop()
+            else:  # Operator
+                precedence = (precedences[kind] if kind < len(precedences)
+                              else None)
+                if precedence is None:  # No registered operator.
+                    raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                             "Not a registered operator")
+                while (operators and operators[-1] != OPEN_BRACKETS_KIND
+                       and precedence <= precedences[operators[-1]]):
+                    self._apply(operators.pop(), operands, dispatch_table)
+                operators.append(kind)
+        while operators:
+            self._apply(operators.pop(), operands, dispatch_table)
+        if len(operands) >= 2:
+            raise WrongParenthesesUsageError()
+        return operands[0] if operands else "Nothing to calculate."
+
+    @staticmethod
+    def _apply(kind: int, operands: list, dispatch_table):
+        """
+        Solves an operator on the operands at the top of the stack, like
+        the equation solver solves a postfix operator.
+
+        :param kind: Kind of the operator.
+        :type kind: int
+        :param operands: Stack of operands.
+        :type operands: list
+        :param dispatch_table: Dispatch table of the operator registry.
+        :type dispatch_table: DispatchTable
+        :raises OperatorUsageError: If the operator is missing operands.
+        """
+
+        arity = dispatch_table.arities[kind]
+        try:
+            operand1 = operands.pop()
+        except IndexError:
+            if arity == 1:
+                raise OperatorUsageError(KIND_SYMBOLS[kind], "No operand")
+            raise OperatorUsageError(KIND_SYMBOLS[kind], "No operands")
+        if arity == 1:
+            operands.append(dispatch_table.solvers[kind](operand1))
+        elif arity == 2:
+            try:
+                operand2 = operands.pop()
+            except IndexError:
+                raise OperatorUsageError(KIND_SYMBOLS[kind],
+                                         "Missing operand")
+            operands.append(dispatch_table.solvers[kind](operand2, operand1))
@@ -53,36 +53,50 @@ class ArithmeticStringPreprocessor(StringPreprocessor):
 
         self._equation = string
 
-    def preprocess(self, string: str):
+    def preprocess(self, string: str = None):
         """
         Determines the order of the pre-process logic.
         Validates the user's input by performing string-based tests:
         checks for invalid characters and parentheses.
-        Redefines equation.
+        The string is passed from test to test rather than stored, so the
+        preprocessor is reentrant.
+
+        :param string: String to preprocess. If not provided, the equation
+            the preprocessor was created with is preprocessed.
+        :type string: str
         """
-        self._equation = string
-        self._validate_input()
-        self._validate_parentheses()
+        if string is None:
+            string = self._equation
+        self._validate_input(string)
+        self._validate_parentheses(string)
 
-    def _validate_input(self):
+    @staticmethod
+    def _validate_input(equation: str):
         """
         Checks if there are forbidden chars in the user input
 
+        :param equation: User's input.
+        :type equation: str
+
         :return: Whether equation contains
             forbidden chars or not
         :rtype: bool
         :raises InvalidInputError: if input contains forbidden chars
         """
 
-        if not set(self._equation).issubset(
+        if not set(equation).issubset(
                 general_utils.VALID_INPUT_CHARACTERS):
-            raise InvalidInputError(self._equation)
+            raise InvalidInputError(equation)
 
-    def _validate_parentheses(self):
+    @staticmethod
+    def _validate_parentheses(equation: str):
         """
         Validate parentheses are correctly matched and no empty parentheses
             exist
 
+        :param equation: User's input.
+        :type equation: str
+
         :raises EmptyParenthesesError: if empty parentheses found
         :raises UnmatchedClosingParenthesesError: if unmatched closing
             parentheses found
@@ -92,8 +106,8 @@ class ArithmeticStringPreprocessor(StringPreprocessor):
 
         stack = []  # Tracks opening parentheses ny index
         is_empty = False
-        for index in range(len(self._equation)):
-            char = self._equation[index]
+        for index in range(len(equation)):
+            char = equation[index]
             if char == general_utils.OPEN_BRACKETS:
                 is_empty = True
                 stack.append(index)
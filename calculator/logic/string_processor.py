@@ -52,34 +52,47 @@ class ArithmeticStringProcessor(StringProcessor):
 
         self._equation = string
 
-    def process(self, string: str) -> str:
+    def process(self, string: str = None) -> str:
         """
         Determines the order of the process logic.
-        Processes (fixes format) of user's input.
-        Redefines equation.
+        Processes (fixes format) of user's input. The string is passed from
+        step to step rather than stored, so the processor is reentrant.
 
+        :param string: String to process. If not provided, the equation the
+            processor was created with is processed.
+        :type string: str
         :return: Processed user's input (equation with fixed format).
         :rtype: str
         """
 
-        self._equation = string
-        self._remove_white_spaces()
-        self._not_empty_validator()
-        return self._equation
+        if string is None:
+            string = self._equation
+        equation = self._remove_white_spaces(string)
+        self._not_empty_validator(equation)
+        return equation
 
-    def _remove_white_spaces(self):
+    @staticmethod
+    def _remove_white_spaces(equation: str) -> str:
         """
         Removes white spaces from str equation.
+
+        :param equation: User's input.
+        :type equation: str
+        :return: Equation without white spaces.
+        :rtype: str
         """
 
-        self._equation = ''.join(c for c in self._equation if
-                                 c not in general_utils.EMPTY_CHARACTERS)
+        return ''.join(c for c in equation if
+                       c not in general_utils.EMPTY_CHARACTERS)
 
-    def _not_empty_validator(self):
+    @staticmethod
+    def _not_empty_validator(equation: str):
         """
         Validates that user's input is not empty after removal of white spaces.
+        :param equation: Equation without white spaces.
+        :type equation: str
         :raises EmptyEquationError: if processed equation is empty.
         """
 
-        if self._equation == '':
+        if equation == '':
             raise EmptyEquationError()
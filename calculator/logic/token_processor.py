@@ -9,6 +9,7 @@ from calculator.logic.exceptions import UnaryError, \
     MultipleDotsError, MultipleDotsOperandError, \
     SingleDotError, EndMinusesError
 from calculator.utils import operand_utils, operator_utils, general_utils
+from calculator.utils.evaluation_limits import get_budget
 
 
 class TokenProcessor(ABC):
@@ -52,27 +53,44 @@ class ArithmeticTokenProcessor(TokenProcessor):
         self._tokens = tokens
 
     def process(self, tokens: list = None) -> list:
-        if tokens is not None:
-            self._tokens = tokens
-        self._handle_dots()
-        self._delete_extra_minuses()
-        self._validate_minuses_at_end()
-        self._join_sign_minuses()
-        self._replace_unary_minuses()
-        self._validate()
-
-        return self._tokens
+        """
+        Processes a list of tokens. Every step gets the tokens of the
+        previous step and builds new ones in locals, so the processor is
+        reentrant: it can process lists of several threads at once.
 
-    def _handle_dots(self):
+        :param tokens: tokenized sequence. If not provided, the tokens the
+            processor was created with are processed.
+        :type tokens: list
+        :return: processed list of tokens.
+        :rtype: list
+        """
+        if tokens is None:
+            tokens = self._tokens
+        budget = get_budget()
+        if budget is not None:  # Evaluation limits are active
+            budget.check_depth(tokens)
+        self._handle_dots(tokens)
+        tokens = self._delete_extra_minuses(tokens)
+        self._validate_minuses_at_end(tokens)
+        tokens = self._join_sign_minuses(tokens)
+        self._replace_unary_minuses(tokens)
+        self._validate(tokens)
+
+        return tokens
+
+    @staticmethod
+    def _handle_dots(tokens: list):
         """
         Validates tokens which include dots, raises exceptions if needed.
+        :param tokens: tokens to validate.
+        :type tokens: list
         :raises SingleDotError: when 'operand' is a single dot.
         :raises MultipleDotsError: when 'operand' is more than a single dot.
         :raises MultipleDotsOperandError: when 'operand' contains
             multiple dots.
         """
 
-        for token in self._tokens:
+        for token in tokens:
             if token == general_utils.DOT:
                 raise SingleDotError()
             dot_count = token.count(general_utils.DOT)
@@ -81,156 +99,248 @@ class ArithmeticTokenProcessor(TokenProcessor):
                     raise MultipleDotsError(dot_count)
                 raise MultipleDotsOperandError(token, dot_count)
 
-    def _delete_extra_minuses(
-            self):
+    @staticmethod
+    def _delete_extra_minuses(previous_tokens: list) -> list:
         """
-        Delete multiple appearances of minus in a row from self._tokens.
+        Delete multiple appearances of minus in a row from tokens.
         After end of function, there are no more than 2 minuses in a row in
-        self._tokens.
+        the tokens.
+        A run of minuses is only shortened if a number/bracket comes to its
+        right. If an operator / opening bracket (or nothing) comes to its
+        left, minuses are deleted in pairs as long as there are at least two
+        of them; otherwise, pairs are deleted as long as at least three
+        minuses remain.
+        Builds a new tokens list in a single pass.
+
+        :param previous_tokens: tokens to delete minuses from.
+        :type previous_tokens: list
+        :return: new list of tokens.
+        :rtype: list
         """
 
         tokens = []
-        number = ''
-        for index in range(len(self._tokens) - 2, 0, -1):
-            if (self._tokens[index] == operator_utils.SUB_SYMBOL and
-                    self._tokens[index - 1] == operator_utils.SUB_SYMBOL):
-                # Check for context: number/bracket to the right, operator
-                # to the left
-                if ((operand_utils.is_operand(self._tokens[index + 1]) or
-                     self._tokens[
-                         index + 1] == general_utils.OPEN_BRACKETS) and
-                        (index - 2 < 0 or self._tokens[index - 2]
-                         in operator_utils.BINARY_OPERATORS or
-                         self._tokens[index - 2]
-                         in operator_utils.LEFT_UNARY_OPERATORS or
-                         self._tokens[
-                             index - 2] == general_utils.OPEN_BRACKETS)):
-                    # Remove the two minuses
-                    del self._tokens[index]
-                    del self._tokens[index - 1]
-                    index -= 1
-
-    def _validate_minuses_at_end(self):
+        index = 0
+        length = len(previous_tokens)
+        while index < length:
+            token = previous_tokens[index]
+            if token != operator_utils.SUB_SYMBOL:
+                tokens.append(token)
+                index += 1
+                continue
+            run_end = index
+            while (run_end < length
+                   and previous_tokens[run_end] == operator_utils.SUB_SYMBOL):
+                run_end += 1
+            run_length = run_end - index
+            # Check for context: number/bracket to the right, operator
+            # to the left
+            if (run_end < length
+                    and (operand_utils.is_operand(previous_tokens[run_end])
+                         or previous_tokens[run_end]
+                         == general_utils.OPEN_BRACKETS)):
+                if (not tokens
+                        or tokens[-1] in operator_utils.BINARY_OPERATORS
+                        or tokens[-1] in operator_utils.LEFT_UNARY_OPERATORS
+                        or tokens[-1] == general_utils.OPEN_BRACKETS):
+                    run_length %= 2
+                elif run_length > 2:
+                    run_length = 2 - run_length % 2
+            tokens.extend([operator_utils.SUB_SYMBOL] * run_length)
+            index = run_end
+        return tokens
+
+    @staticmethod
+    def _validate_minuses_at_end(tokens: list):
         """
         Validates there are no minuses at end of equation.
+        :param tokens: tokens to validate.
+        :type tokens: list
         :raises EndMinusesError: if there are end minuses.
         """
-        if self._tokens and self._tokens[-1] == operator_utils.SUB_SYMBOL:
+        if tokens and tokens[-1] == operator_utils.SUB_SYMBOL:
             count = 0
-            index = len(self._tokens) - 1
+            index = len(tokens) - 1
             while (index >= 0
-                   and self._tokens[index] == operator_utils.SUB_SYMBOL):
+                   and tokens[index] == operator_utils.SUB_SYMBOL):
                 count += 1
                 index -= 1
             raise EndMinusesError(count)
 
-    def _join_sign_minuses(self):
+    def _join_sign_minuses(self, previous_tokens: list) -> list:
         """
         Joins sign minuses directly to numbers.
+        A sign minus before brackets is wrapped (together with the
+        brackets' content, up to the first closing bracket) in a new set of
+        brackets instead.
+        Builds a new tokens list in a single pass. Closing brackets which
+        have to be added are counted per closing bracket of the previous
+        tokens and added once it is reached.
+
+        :param previous_tokens: tokens to join sign minuses in.
+        :type previous_tokens: list
+        :return: new list of tokens.
+        :rtype: list
         """
-        index = 1
-        while index < len(self._tokens) - 1:
-            if (self._tokens[index] == operator_utils.SUB_SYMBOL
-                    and (self._prev_token_is_a_non_minus_valid_operand(index)
-                         or self._prev_token_is_a_valid_minus_operand(index))):
-                if general_utils.OPEN_BRACKETS == self._tokens[index + 1]:
+
+        next_closing_brackets = self._find_next_closing_brackets(
+            previous_tokens)
+        added_closing_brackets = {}
+        tokens = []
+        index = 0
+        length = len(previous_tokens)
+        while index < length:
+            token = previous_tokens[index]
+            if token == general_utils.CLOSE_BRACKETS:
+                tokens.extend([general_utils.CLOSE_BRACKETS]
+                              * added_closing_brackets.pop(index, 0))
+            if (token == operator_utils.SUB_SYMBOL
+                    and 0 < index < length - 1
+                    and (self._prev_token_is_a_non_minus_valid_operand(tokens)
+                         or self._prev_token_is_a_valid_minus_operand(
+                            tokens))):
+                next_token = previous_tokens[index + 1]
+                if general_utils.OPEN_BRACKETS == next_token:
                     # NOTE: replaced in with ==
                     #  If an opening bracket comes after current unary minus
-                    self._minus_brackets_handle(index)
+                    self._minus_brackets_handle(index, tokens,
+                                                next_closing_brackets,
+                                                added_closing_brackets)
+                    index += 1
+                    continue
+                tokens.append(operator_utils.SIGN_MINUS_SYMBOL + next_token)
+                if added_closing_brackets.get(index + 1):
+                    # Minus was joined to an added closing bracket
+                    added_closing_brackets[index + 1] -= 1
+                    index += 1
                 else:
-                    self._tokens[index + 1] = (operator_utils.SIGN_MINUS_SYMBOL
-                                               + self._tokens[index + 1])
-                    del self._tokens[index]
-                    index -= 1
+                    index += 2
+                continue
+            tokens.append(token)
             index += 1
+        return tokens
 
-    def _prev_token_is_a_non_minus_valid_operand(self, index: int) -> bool:
+    @staticmethod
+    def _find_next_closing_brackets(tokens: list) -> list:
+        """
+        Finds, for every index of tokens, the index of the first closing
+        bracket at that index or after it.
+
+        :param tokens: tokens to search.
+        :type tokens: list
+        :return: Index of next closing bracket per index (None if there is
+            no closing bracket after index).
+        :rtype: list
+        """
+
+        next_closing_brackets = [None] * (len(tokens) + 1)
+        for index in range(len(tokens) - 1, -1, -1):
+            if tokens[index] == general_utils.CLOSE_BRACKETS:
+                next_closing_brackets[index] = index
+            else:
+                next_closing_brackets[index] = next_closing_brackets[index + 1]
+        return next_closing_brackets
+
+    @staticmethod
+    def _prev_token_is_a_non_minus_valid_operand(tokens: list) -> bool:
         """
         checks if previous token is valid to appear before a sign minus
         (other than a minus).
 
-        :param index: index of relevant token in tokens list.
-        :type index: str
+        :param tokens: tokens which come before the minus.
+        :type tokens: list
         :return: if previous token is a valid to appear before a sign minus.
         :rtype: bool
         """
 
-        prev_token = self._tokens[index - 1]
+        prev_token = tokens[-1]
         return ((prev_token in operator_utils.BINARY_OPERATORS or
                  prev_token in operator_utils.LEFT_UNARY_OPERATORS)
                 and prev_token != operator_utils.SUB_SYMBOL)
 
-    def _prev_token_is_a_valid_minus_operand(self, index: int) -> bool:
+    @staticmethod
+    def _prev_token_is_a_valid_minus_operand(tokens: list) -> bool:
         """
         checks if previous token is a minus, and if the token before that,
-        makes the token in current index a sign minus.
+        makes the current token a sign minus.
 
-        :param index: index of relevant token in tokens list.
-        :type index: str
+        :param tokens: tokens which come before the minus.
+        :type tokens: list
         :return: if previous token is a minus, and if the token before that,
-            makes the token in current index a sign minus.
+            makes the current token a sign minus.
         :rtype: bool
         """
 
-        return (self._tokens[index - 1] ==
+        return (tokens[-1] ==
                 operator_utils.SUB_SYMBOL
-                and index - 2 >= 0
-                and (operand_utils.is_operand(self._tokens[index - 2])
-                     or general_utils.CLOSE_BRACKETS ==
-                     self._tokens[index - 2]
-                     or self._tokens[index - 2]
-                     in operator_utils.RIGHT_UNARY_OPERATORS))
-
-    def _minus_brackets_handle(self, index: int):
+                and len(tokens) >= 2
+                and (operand_utils.is_operand(tokens[-2])
+                     or general_utils.CLOSE_BRACKETS == tokens[-2]
+                     or tokens[-2] in operator_utils.RIGHT_UNARY_OPERATORS))
+
+    @staticmethod
+    def _minus_brackets_handle(index: int, tokens: list,
+                               next_closing_brackets: list,
+                               added_closing_brackets: dict):
         """
         Handle brackets with unary minus before them correctly
         by adding a new set of brackets (before and after current ones -
         including the unary minus).
+        The new closing bracket is added before the first closing bracket
+        which comes after the current opening bracket.
 
-        :param index: index of minus in self._tokens.
+        :param index: index of minus in the previous tokens.
         :type index: int
+        :param tokens: tokens which come before the minus.
+        :type tokens: list
+        :param next_closing_brackets: index of next closing bracket per index
+            of the previous tokens.
+        :type next_closing_brackets: list
+        :param added_closing_brackets: amount of closing brackets to add
+            per closing bracket index of the previous tokens.
+        :type added_closing_brackets: dict
         """
 
-        self._tokens.insert(index, general_utils.OPEN_BRACKETS)
-        index += 3
-        track_brackets = [general_utils.OPEN_BRACKETS]
-        while track_brackets:
-            if self._tokens[index] == general_utils.OPEN_BRACKETS:
-                track_brackets.append(general_utils.OPEN_BRACKETS)
-            if self._tokens[index] == general_utils.CLOSE_BRACKETS:
-                if track_brackets:
-                    self._tokens.insert(index, general_utils.CLOSE_BRACKETS)
-                    return
-                else:
-                    track_brackets.pop()
-            index += 1
+        tokens.append(general_utils.OPEN_BRACKETS)
+        tokens.append(operator_utils.SUB_SYMBOL)
+        closing_index = next_closing_brackets[index + 2]
+        if closing_index is None:
+            raise IndexError('list index out of range')
+        added_closing_brackets[closing_index] = (
+                added_closing_brackets.get(closing_index, 0) + 1)
 
-    def _replace_unary_minuses(self):
+    @staticmethod
+    def _replace_unary_minuses(tokens: list):
         """
         Replaces all appearances of unary minuses with SIGN_UNARY_MINUS [';'].
+        :param tokens: tokens to replace minuses in (in place).
+        :type tokens: list
         """
 
-        for index in range(0, len(self._tokens) - 1, 1):
-            if self._tokens[index] == '-' and (
+        for index in range(0, len(tokens) - 1, 1):
+            if tokens[index] == '-' and (
                     index == 0 or
-                    general_utils.OPEN_BRACKETS in self._tokens[index - 1]):
-                self._tokens[index] = operator_utils.UNARY_MINUS_SYMBOL
+                    general_utils.OPEN_BRACKETS in tokens[index - 1]):
+                tokens[index] = operator_utils.UNARY_MINUS_SYMBOL
 
-    def _validate(self):
+    def _validate(self, tokens: list):
         """
         Checks for errors in tokenized equation.
+        :param tokens: tokens to validate.
+        :type tokens: list
         """
 
         index = 0
-        for token in self._tokens:
+        for token in tokens:
             if token in operator_utils.ALL_UNARY_OPERATORS:
-                self._validate_unary_operator(token, index)
+                self._validate_unary_operator(tokens, token, index)
             index += 1
 
-    def _validate_unary_operator(self, token: str, index: int):
+    def _validate_unary_operator(self, tokens: list, token: str, index: int):
         """
         Validates unary operator as part of equation.
 
+        :param tokens: tokens of equation.
+        :type tokens: list
         :param token: unary operator's symbol.
         :type token: str
         :param index: index of current token in tokens list.
@@ -238,14 +348,17 @@ class ArithmeticTokenProcessor(TokenProcessor):
         """
 
         if token in operator_utils.LEFT_UNARY_OPERATORS:  # Left unary operator
-            self._validate_left_unary_operator(token, index)
+            self._validate_left_unary_operator(tokens, token, index)
         else:  # Right unary operator
-            self._validate_right_unary_operator(token, index)
+            self._validate_right_unary_operator(tokens, token, index)
 
-    def _validate_left_unary_operator(self, token, index):
+    @staticmethod
+    def _validate_left_unary_operator(tokens, token, index):
         """
         Validates left unary operator as part of equation.
 
+        :param tokens: tokens of equation.
+        :type tokens: list
         :param token: left unary operator's symbol.
         :type token: str
         :param index: index of current token in tokens list.
@@ -254,20 +367,22 @@ class ArithmeticTokenProcessor(TokenProcessor):
         """
 
         if (index > 0  # Check token to the left
-                and self._tokens[index - 1]
+                and tokens[index - 1]
                 not in operator_utils.BINARY_OPERATORS
-                and self._tokens[index - 1] != general_utils.OPEN_BRACKETS):
+                and tokens[index - 1] != general_utils.OPEN_BRACKETS):
             raise UnaryError(token,  True)
-        if (index < len(self._tokens) - 1  # Check token to the right
-                and (not operand_utils.is_operand(self._tokens[index + 1])
-                     and self._tokens[
-                         index + 1] != general_utils.OPEN_BRACKETS)):
+        if (index < len(tokens) - 1  # Check token to the right
+                and (not operand_utils.is_operand(tokens[index + 1])
+                     and tokens[index + 1] != general_utils.OPEN_BRACKETS)):
             raise UnaryError(token,  False)
 
-    def _validate_right_unary_operator(self, token, index):
+    @staticmethod
+    def _validate_right_unary_operator(tokens, token, index):
         """
         Validates right unary operator as part of equation.
 
+        :param tokens: Tokens of equation.
+        :type tokens: list
         :param token: Right unary operator's symbol.
         :type token: str
         :param index: Index of current token in tokens list.
@@ -276,11 +391,11 @@ class ArithmeticTokenProcessor(TokenProcessor):
         """
 
         if (index > 0  # Check token to the left
-                and not operand_utils.is_operand(self._tokens[index - 1])
-                and self._tokens[index - 1] not in
+                and not operand_utils.is_operand(tokens[index - 1])
+                and tokens[index - 1] not in
                 operator_utils.ALLOWED_BEFORE_RIGHT_UNARY):
             raise UnaryError(token,  True)
-        if (index < len(self._tokens) - 1  # Check token to the right
-                and self._tokens[index + 1]
+        if (index < len(tokens) - 1  # Check token to the right
+                and tokens[index + 1]
                 not in operator_utils.ALLOWED_AFTER_RIGHT_UNARY):
             raise UnaryError(token,  False)
@@ -0,0 +1,162 @@
+"""
+Module for a compact, typed representation of a tokenized equation.
+Each token is stored as an integer kind, and operands also store their
+numeric value (parsed once, when the stream is created).
+Float values are stored in an array of doubles; values of other numeric
+backends (Decimal, Fraction) are stored in a list.
+"""
+
+from array import array
+
+from calculator.utils import general_utils, operator_utils
+
+# Token kinds
+OPERAND_KIND = 0
+INVALID_OPERAND_KIND = 1  # Operand-like token which is not a valid number.
+OPEN_BRACKETS_KIND = 2
+CLOSE_BRACKETS_KIND = 3
+FIRST_OPERATOR_KIND = 4
+
+# Maps symbol of each operator / bracket to its kind, and back. Operators
+# registered later get their kind from get_symbol_kind.
+KIND_SYMBOLS = ([None, None, general_utils.OPEN_BRACKETS,
+                 general_utils.CLOSE_BRACKETS]
+                + sorted(operator_utils.ALL_OPERATORS))
+SYMBOL_KINDS = {symbol: kind for kind, symbol in enumerate(KIND_SYMBOLS)
+                if symbol is not None}
+
+
+def get_symbol_kind(symbol: str) -> int:
+    """
+    Gets kind of an operator / bracket symbol. A new kind is added for
+    symbols which do not have one yet (operators registered as plugins).
+
+    :param symbol: Symbol of operator or bracket.
+    :type symbol: str
+    :return: Kind of symbol.
+    :rtype: int
+    """
+
+    kind = SYMBOL_KINDS.get(symbol)
+    if kind is None:
+        kind = len(KIND_SYMBOLS)
+        KIND_SYMBOLS.append(symbol)
+        SYMBOL_KINDS[symbol] = kind
+    return kind
+
+
+class TokenStream:
+    """
+    Class which stores tokens in two parallel arrays: token kinds
+    (array of signed chars) and operand values (array of doubles).
+    Operand tokens which can not be parsed keep their text, so the error
+    is raised only when they are evaluated.
+    """
+
+    __slots__ = ('kinds', 'values', 'invalid_operands')
+
+    def __init__(self, kinds: array = None, values: array = None,
+                 invalid_operands: dict = None):
+        """
+        :param kinds: Kind of each token.
+        :type kinds: array
+        :param values: Value of each token (0 for non-operands).
+        :type values: array or list
+        :param invalid_operands: Maps index of each invalid operand to its
+            text.
+        :type invalid_operands: dict
+        """
+
+        self.kinds = array('b') if kinds is None else kinds
+        self.values = array('d') if values is None else values
+        self.invalid_operands = ({} if invalid_operands is None
+                                 else invalid_operands)
+
+    @classmethod
+    def from_tokens(cls, tokens: list, parse=float):
+        """
+        Creates a token stream from a list of string tokens.
+        Sign minuses ('_') are parsed as part of their operand.
+
+        :param tokens: Tokenized equation.
+        :type tokens: list
+        :param parse: Function which parses an operand, raising ValueError
+            for invalid operands.
+        :type parse: Callable
+        :return: Token stream of the equation.
+        :rtype: TokenStream
+        """
+
+        kinds = []
+        values = []
+        invalid_operands = {}
+        get_kind = SYMBOL_KINDS.get
+        for index, token in enumerate(tokens):
+            kind = get_kind(token)
+            value = 0.0
+            if kind is None:
+                kind = OPERAND_KIND
+                fixed_token = token.replace(operator_utils.SIGN_MINUS_SYMBOL,
+                                            operator_utils.SUB_SYMBOL)
+                try:
+                    value = parse(fixed_token)
+                except ValueError:
+                    kind = INVALID_OPERAND_KIND
+                    invalid_operands[index] = fixed_token
+            kinds.append(kind)
+            values.append(value)
+        if parse is float:
+            values = array('d', values)
+        return cls(array('b', kinds), values, invalid_operands)
+
+    def append(self, kind: int, value: float = 0.0, text: str = None):
+        """
+        Appends a token to the stream.
+
+        :param kind: Kind of the token.
+        :type kind: int
+        :param value: Value of the token (operands only).
+        :type value: float
+        :param text: Text of the token (invalid operands only).
+        :type text: str
+        """
+
+        if kind == INVALID_OPERAND_KIND:
+            self.invalid_operands[len(self.kinds)] = text
+        self.kinds.append(kind)
+        self.values.append(value)
+
+    def to_tokens(self) -> list:
+        """
+        :return: String representation of each token.
+        :rtype: list
+        """
+
+        tokens = []
+        for index, kind in enumerate(self.kinds):
+            if kind == OPERAND_KIND:
+                tokens.append(str(self.values[index]))
+            elif kind == INVALID_OPERAND_KIND:
+                tokens.append(self.invalid_operands[index])
+            else:
+                tokens.append(KIND_SYMBOLS[kind])
+        return tokens
+
+    def __len__(self) -> int:
+        """
+        :return: Amount of tokens in the stream.
+        :rtype: int
+        """
+
+        return len(self.kinds)
+
+    def __eq__(self, other) -> bool:
+        """
+        :return: Whether both streams contain the same tokens.
+        :rtype: bool
+        """
+
+        return (isinstance(other, TokenStream)
+                and self.kinds == other.kinds
+                and self.values == other.values
+                and self.invalid_operands == other.invalid_operands)
@@ -6,6 +6,7 @@ Contains an abstract base class and an arithmetic implementation.
 from abc import ABC, abstractmethod
 
 from calculator.utils import general_utils
+from calculator.utils.evaluation_limits import get_budget
 
 
 class Tokenizer(ABC):
@@ -33,6 +34,8 @@ class ArithmeticTokenizer(Tokenizer):
         :type string: str
         :return: tokenized arithmetic equation.
         :rtype: list
+        :raises EvaluationLimitError: if evaluation limits are active and
+            there are too many tokens.
         """
 
         tokens: [str] = []
@@ -48,4 +51,7 @@ class ArithmeticTokenizer(Tokenizer):
                     tokens.append(char)
         if number:
             tokens.append(number)
+        budget = get_budget()
+        if budget is not None:
+            budget.check_tokens(len(tokens))
         return tokens
@@ -0,0 +1,125 @@
+"""
+Module for compiling expression trees into Python functions.
+Contains an abstract base class and an implementation which generates
+Python source for a tree and compiles it once with compile().
+"""
+
+from abc import ABC, abstractmethod
+
+from calculator.logic.expression_tree import ExpressionTree, OperatorNode
+from calculator.utils import general_utils
+from calculator.utils.evaluation_limits import get_budget
+from calculator.utils.operators import Add, Sub, Mul, UMin, Neg
+
+# Operators whose solve is a single Python operation are inlined instead of
+# called. Keyed by the solve function, so a subclass which overrides solve
+# is called like any other operator.
+_INLINE_TEMPLATES = {
+    Add.solve: '{0} + {1}',
+    Sub.solve: '{0} - {1}',
+    Mul.solve: '{0} * {1}',
+    UMin.solve: '-{0}',
+    Neg.solve: '-{0}',
+}
+
+
+class TreeCompiler(ABC):
+    """
+    Abstract class for compiling an expression tree.
+    """
+
+    @abstractmethod
+    def compile(self, tree: ExpressionTree):
+        """
+        Abstract method for compiling an expression tree into a function
+        which evaluates it.
+
+        :param tree: Tree to compile.
+        :type tree: ExpressionTree
+        :return: Function without parameters, which returns the same result
+            and raises the same errors as tree.evaluate.
+        :rtype: Callable
+        """
+
+
+class PythonTreeCompiler(TreeCompiler):
+    """
+    Class for compiling an expression tree into generated Python source.
+    Every operator node becomes a single statement which stores its result
+    in a local variable, so shared nodes are still solved once, in the same
+    order as the tree solves them. Solve functions and constants are bound
+    as default arguments, which makes them local variables as well.
+    If there is an active evaluation budget, the function solves the tree
+    instead, which checks the deadline before every operation.
+    Trees which are not worth compiling (constant, invalid or too large)
+    are returned as their own evaluate method.
+    """
+
+    def __init__(self, max_operations: int =
+                 general_utils.TREE_COMPILE_MAX_OPERATIONS):
+        """
+        :param max_operations: Maximal amount of operator nodes of a
+            compiled tree.
+        :type max_operations: int
+        """
+
+        self._max_operations = max_operations
+
+    def compile(self, tree: ExpressionTree):
+        """
+        Compiles an expression tree into a Python function.
+
+        :param tree: Tree to compile.
+        :type tree: ExpressionTree
+        :return: Function which evaluates tree.
+        :rtype: Callable
+        """
+
+        if (not isinstance(tree.root, OperatorNode)
+                or len(tree.operations) > self._max_operations):
+            return tree.evaluate
+
+        namespace = {'get_budget': get_budget,
+                     'evaluate_tree': tree.evaluate}
+        names = {}  # Node -> name of its local variable
+        statements = ["    if get_budget() is not None:\n",
+                      "        return evaluate_tree()\n"]
+        for index, node in enumerate(tree.operations):
+            operands = [self._get_name(operand, names, namespace)
+                        for operand in node.operands]
+            template = _INLINE_TEMPLATES.get(
+                getattr(node.solve, '__func__', None))
+            if template is None:
+                solve_name = f's{index}'
+                namespace[solve_name] = node.solve
+                operation = f"{solve_name}({', '.join(operands)})"
+            else:
+                operation = template.format(*operands)
+            names[node] = f'r{index}'
+            statements.append(f"    r{index} = {operation}\n")
+
+        parameters = ', '.join(f'{name}={name}' for name in namespace)
+        source = (f"def evaluate({parameters}):\n" + ''.join(statements)
+                  + f"    return {names[tree.root]}\n")
+        exec(compile(source, '<expression>', 'exec'), namespace)
+        return namespace['evaluate']
+
+    @staticmethod
+    def _get_name(node, names: dict, namespace: dict) -> str:
+        """
+        :param node: Operand node.
+        :type node: ConstantNode or OperatorNode
+        :param names: Node -> name of its local variable. Constant nodes
+            are given a name (and bound in namespace) on first use.
+        :type names: dict
+        :param namespace: Name -> value of bound default arguments.
+        :type namespace: dict
+        :return: Name of node's local variable.
+        :rtype: str
+        """
+
+        name = names.get(node)
+        if name is None:
+            name = names[node] = f'c{len(names)}'
+            namespace[name] = node.value
+        return name
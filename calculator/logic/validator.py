@@ -0,0 +1,621 @@
+"""
+Module for validating expressions without raising exceptions.
+Contains the diagnostic and result classes, an abstract base class and an
+arithmetic implementation.
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.exceptions import EmptyEquationError, \
+    InvalidInputError, UnmatchedOpeningParenthesesError, \
+    UnmatchedClosingParenthesesError, EmptyParenthesesError, \
+    SingleDotError, MultipleDotsError, MultipleDotsOperandError, \
+    EndMinusesError, UnaryError, OperatorUsageError, \
+    WrongParenthesesUsageError, ExpectedOperandError
+from calculator.logic.token_stream import SYMBOL_KINDS, \
+    OPEN_BRACKETS_KIND, CLOSE_BRACKETS_KIND
+from calculator.utils import general_utils, operand_utils, operator_utils
+from calculator.utils.numeric_backend import NumericBackend, get_backend
+
+_NUMBER_CHARACTERS = '0123456789' + general_utils.DOT
+
+# Operand part or a single non-white-space character (as the scanner
+# splits its input).
+_TOKEN_PATTERN = re.compile(
+    f'[{re.escape(_NUMBER_CHARACTERS)}]+'
+    f'|[^{re.escape("".join(sorted(general_utils.EMPTY_CHARACTERS)))}]')
+
+
+class Diagnostic:
+    """
+    Class which describes a single error of an expression: its code (the
+    name of the exception the pipeline raises for it), its span in the
+    expression, and how to create its exception (so its message is only
+    created when it is needed).
+    """
+
+    __slots__ = ('code', 'start', 'end', '_error_class', '_arguments')
+
+    def __init__(self, error_class: type, arguments: tuple, start: int,
+                 end: int):
+        """
+        :param error_class: Class of the exception of the error.
+        :type error_class: type
+        :param arguments: Arguments of the exception.
+        :type arguments: tuple
+        :param start: Index of the first character of the error.
+        :type start: int
+        :param end: Index after the last character of the error.
+        :type end: int
+        """
+
+        self.code = error_class.__name__
+        self.start = start
+        self.end = end
+        self._error_class = error_class
+        self._arguments = arguments
+
+    def create_error(self) -> Exception:
+        """
+        :return: Exception of the error.
+        :rtype: Exception
+        """
+
+        return self._error_class(*self._arguments)
+
+    def get_message(self) -> str:
+        """
+        :return: Message which describes the error.
+        :rtype: str
+        """
+
+        return str(self.create_error())
+
+    def to_dict(self) -> dict:
+        """
+        :return: Code, span and message of the error.
+        :rtype: dict
+        """
+
+        return {'code': self.code, 'start': self.start, 'end': self.end,
+                'message': self.get_message()}
+
+
+class ValidationResult:
+    """
+    Class which stores the diagnostics of a validated expression.
+    """
+
+    __slots__ = ('expression', 'diagnostics')
+
+    def __init__(self, expression: str):
+        """
+        :param expression: Validated expression.
+        :type expression: str
+        """
+
+        self.expression = expression
+        self.diagnostics = []
+
+    def is_valid(self) -> bool:
+        """
+        :return: Whether no errors were found.
+        :rtype: bool
+        """
+
+        return not self.diagnostics
+
+    def get_error(self):
+        """
+        :return: Exception of the first error (the one evaluating the
+            expression raises), or None if expression is valid.
+        :rtype: Exception or None
+        """
+
+        if not self.diagnostics:
+            return None
+        return self.diagnostics[0].create_error()
+
+
+class Validator(ABC):
+    """
+    Abstract class for validating an expression.
+    """
+
+    @abstractmethod
+    def validate(self, expression: str,
+                 collect_all: bool = False) -> ValidationResult:
+        """
+        Abstract method for validating an expression without raising.
+
+        :param expression: Expression to validate.
+        :type expression: str
+        :param collect_all: Whether to collect every error, instead of
+            stopping at the first one.
+        :type collect_all: bool
+        :return: Diagnostics of expression.
+        :rtype: ValidationResult
+        """
+
+
+class ArithmeticValidator(Validator):
+    """
+    Class for validating arithmetic expressions.
+    Runs the checks of the scanner, the token processor and the (structural)
+    checks of the equation solver, in the order of the pipeline, on tokens
+    which keep their span in the expression. Errors of the operators'
+    calculations (e.g. division by zero) depend on values, so they are not
+    checked.
+    In fail-fast mode, validation stops after the first stage which found
+    errors, and the diagnostic is the error evaluating the expression
+    raises. In collect-all mode, every stage reports every error it finds,
+    and recovers from it (forbidden characters and unmatched brackets are
+    skipped, end minuses are dropped, and so on). The structural checks
+    only run when no other stage found errors, since any other error
+    changes the structure of the expression.
+    """
+
+    def __init__(self, backend: NumericBackend = None):
+        """
+        :param backend: Numeric backend to check operands with. Defaults to
+            the active backend.
+        :type backend: NumericBackend
+        """
+
+        if backend is None:
+            backend = get_backend()
+        self._backend = backend
+
+    def validate(self, expression: str,
+                 collect_all: bool = False) -> ValidationResult:
+        """
+        Validates an arithmetic expression without raising.
+
+        :param expression: Expression to validate.
+        :type expression: str
+        :param collect_all: Whether to collect every error, instead of
+            stopping at the first one.
+        :type collect_all: bool
+        :return: Diagnostics of expression.
+        :rtype: ValidationResult
+        """
+
+        result = ValidationResult(expression)
+        diagnostics = result.diagnostics
+        tokens = self._scan(expression, diagnostics, collect_all)
+        for stage in (self._check_dots, self._delete_extra_minuses,
+                      self._join_sign_minuses, self._replace_unary_minuses,
+                      self._validate_unary_operators):
+            if not tokens or (diagnostics and not collect_all):
+                break
+            tokens = stage(tokens, diagnostics)
+        if tokens and not diagnostics:
+            self._check_structure(tokens, expression, diagnostics)
+        if not collect_all:
+            del diagnostics[1:]
+        return result
+
+    @staticmethod
+    def _scan(expression: str, diagnostics: list, collect_all: bool) -> list:
+        """
+        Splits an expression into tokens (with their spans), checking its
+        characters and parentheses like the scanner.
+
+        :param expression: Expression to scan.
+        :type expression: str
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :param collect_all: Whether to collect every error.
+        :type collect_all: bool
+        :return: Tokens, as (text, start, end), without forbidden characters
+            and unmatched or empty brackets.
+        :rtype: list
+        """
+
+        tokens = []
+        forbidden_indices = []
+        bracket_diagnostics = []
+        open_brackets = []  # Indices of tokens of unmatched '('
+        previous_text = None  # Including forbidden characters.
+        valid_characters = general_utils.VALID_INPUT_CHARACTERS
+        for match in _TOKEN_PATTERN.finditer(expression):
+            text = match.group()
+            start, end = match.span()
+            if text[0] in _NUMBER_CHARACTERS:
+                if previous_text is not None and (
+                        previous_text[0] in _NUMBER_CHARACTERS):
+                    # Operand split by white spaces.
+                    previous_token = tokens[-1]
+                    tokens[-1] = (previous_token[0] + text, previous_token[1],
+                                  end)
+                else:
+                    tokens.append((text, start, end))
+            elif text not in valid_characters:
+                forbidden_indices.append(start)
+            elif text == general_utils.OPEN_BRACKETS:
+                open_brackets.append(len(tokens))
+                tokens.append((text, start, end))
+            elif text == general_utils.CLOSE_BRACKETS:
+                if not open_brackets:
+                    bracket_diagnostics.append(Diagnostic(
+                        UnmatchedClosingParenthesesError, (start,), start,
+                        start + 1))
+                elif previous_text == general_utils.OPEN_BRACKETS:
+                    opening_index = tokens.pop()[1]
+                    open_brackets.pop()
+                    bracket_diagnostics.append(Diagnostic(
+                        EmptyParenthesesError, (opening_index, start),
+                        opening_index, start + 1))
+                else:
+                    open_brackets.pop()
+                    tokens.append((text, start, end))
+            else:
+                tokens.append((text, start, end))
+            previous_text = text
+
+        if forbidden_indices:
+            if collect_all:
+                diagnostics.extend(
+                    Diagnostic(InvalidInputError, (expression[index],),
+                               index, index + 1)
+                    for index in forbidden_indices)
+            else:
+                diagnostics.append(Diagnostic(
+                    InvalidInputError, (expression,), forbidden_indices[0],
+                    forbidden_indices[0] + 1))
+        diagnostics.extend(bracket_diagnostics)
+        if open_brackets:
+            diagnostics.extend(
+                Diagnostic(UnmatchedOpeningParenthesesError,
+                           (tokens[index][1],), tokens[index][1],
+                           tokens[index][1] + 1)
+                for index in open_brackets)
+            unmatched = set(open_brackets)
+            tokens = [token for index, token in enumerate(tokens)
+                      if index not in unmatched]
+        if not tokens and not forbidden_indices:
+            diagnostics.append(Diagnostic(EmptyEquationError, (), 0,
+                                          len(expression)))
+        return tokens
+
+    @staticmethod
+    def _check_dots(tokens: list, diagnostics: list) -> list:
+        """
+        Checks tokens which include dots, like the token processor.
+
+        :param tokens: Tokens, as (text, start, end).
+        :type tokens: list
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :return: The same tokens.
+        :rtype: list
+        """
+
+        for text, start, end in tokens:
+            if text == general_utils.DOT:
+                diagnostics.append(Diagnostic(SingleDotError, (), start, end))
+                continue
+            dot_count = text.count(general_utils.DOT)
+            if dot_count > 1:
+                if not any(char.isdigit() for char in text):
+                    diagnostics.append(Diagnostic(
+                        MultipleDotsError, (dot_count,), start, end))
+                else:
+                    diagnostics.append(Diagnostic(
+                        MultipleDotsOperandError, (text, dot_count), start,
+                        end))
+        return tokens
+
+    @staticmethod
+    def _delete_extra_minuses(tokens: list, diagnostics: list) -> list:
+        """
+        Shortens runs of minuses like the token processor (keeping the
+        minuses closest to what comes after them), and checks there are no
+        minuses at the end.
+
+        :param tokens: Tokens, as (text, start, end).
+        :type tokens: list
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :return: Tokens without extra minuses (and without end minuses).
+        :rtype: list
+        """
+
+        shortened_tokens = []
+        index = 0
+        length = len(tokens)
+        while index < length:
+            token = tokens[index]
+            if token[0] != operator_utils.SUB_SYMBOL:
+                shortened_tokens.append(token)
+                index += 1
+                continue
+            run_end = index
+            while (run_end < length
+                   and tokens[run_end][0] == operator_utils.SUB_SYMBOL):
+                run_end += 1
+            run_length = run_end - index
+            if run_end < length and (
+                    operand_utils.is_operand(tokens[run_end][0])
+                    or tokens[run_end][0] == general_utils.OPEN_BRACKETS):
+                if (not shortened_tokens
+                        or shortened_tokens[-1][0]
+                        in operator_utils.BINARY_OPERATORS
+                        or shortened_tokens[-1][0]
+                        in operator_utils.LEFT_UNARY_OPERATORS
+                        or shortened_tokens[-1][0]
+                        == general_utils.OPEN_BRACKETS):
+                    run_length %= 2
+                elif run_length > 2:
+                    run_length = 2 - run_length % 2
+            shortened_tokens.extend(tokens[run_end - run_length:run_end])
+            index = run_end
+
+        end_minuses = 0
+        while (end_minuses < len(shortened_tokens)
+               and shortened_tokens[-1 - end_minuses][0]
+               == operator_utils.SUB_SYMBOL):
+            end_minuses += 1
+        if end_minuses:
+            diagnostics.append(Diagnostic(
+                EndMinusesError, (end_minuses,),
+                shortened_tokens[-end_minuses][1],
+                shortened_tokens[-1][2]))
+            del shortened_tokens[-end_minuses:]
+        return shortened_tokens
+
+    @staticmethod
+    def _join_sign_minuses(tokens: list, diagnostics: list) -> list:
+        """
+        Joins sign minuses to the tokens after them like the token
+        processor, wrapping a sign minus before brackets (with the
+        brackets' content, up to the next closing bracket) in new brackets.
+        Added brackets have empty spans.
+
+        :param tokens: Tokens, as (text, start, end).
+        :type tokens: list
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :return: Tokens with sign minuses joined.
+        :rtype: list
+        """
+
+        length = len(tokens)
+        next_closing_brackets = [None] * (length + 1)
+        for index in range(length - 1, -1, -1):
+            if tokens[index][0] == general_utils.CLOSE_BRACKETS:
+                next_closing_brackets[index] = index
+            else:
+                next_closing_brackets[index] = next_closing_brackets[index + 1]
+
+        added_closing_brackets = {}
+        joined_tokens = []
+        index = 0
+        while index < length:
+            token = tokens[index]
+            text, start, end = token
+            if text == general_utils.CLOSE_BRACKETS:
+                joined_tokens.extend(
+                    [(general_utils.CLOSE_BRACKETS, start, start)]
+                    * added_closing_brackets.pop(index, 0))
+            if (text == operator_utils.SUB_SYMBOL
+                    and 0 < index < length - 1
+                    and _is_sign_minus(joined_tokens)):
+                next_text, _, next_end = tokens[index + 1]
+                if next_text == general_utils.OPEN_BRACKETS:
+                    closing_index = next_closing_brackets[index + 2]
+                    if closing_index is None:
+                        diagnostics.append(Diagnostic(
+                            IndexError, ('list index out of range',), start,
+                            end))
+                        joined_tokens.append(token)
+                    else:
+                        joined_tokens.append(
+                            (general_utils.OPEN_BRACKETS, start, start))
+                        joined_tokens.append(token)
+                        added_closing_brackets[closing_index] = (
+                                added_closing_brackets.get(closing_index, 0)
+                                + 1)
+                    index += 1
+                    continue
+                joined_tokens.append((operator_utils.SIGN_MINUS_SYMBOL
+                                      + next_text, start, next_end))
+                if added_closing_brackets.get(index + 1):
+                    # Minus was joined to an added closing bracket
+                    added_closing_brackets[index + 1] -= 1
+                    index += 1
+                else:
+                    index += 2
+                continue
+            joined_tokens.append(token)
+            index += 1
+        return joined_tokens
+
+    @staticmethod
+    def _replace_unary_minuses(tokens: list, diagnostics: list) -> list:
+        """
+        Replaces minuses at the start or after opening brackets with unary
+        minuses, like the token processor.
+
+        :param tokens: Tokens, as (text, start, end).
+        :type tokens: list
+        :param diagnostics: Diagnostics to add errors to (no errors).
+        :type diagnostics: list
+        :return: Tokens with unary minuses replaced.
+        :rtype: list
+        """
+
+        for index in range(len(tokens) - 1):
+            text, start, end = tokens[index]
+            if text == operator_utils.SUB_SYMBOL and (
+                    index == 0
+                    or general_utils.OPEN_BRACKETS in tokens[index - 1][0]):
+                tokens[index] = (operator_utils.UNARY_MINUS_SYMBOL, start,
+                                 end)
+        return tokens
+
+    @staticmethod
+    def _validate_unary_operators(tokens: list, diagnostics: list) -> list:
+        """
+        Checks the tokens around every unary operator, like the token
+        processor.
+
+        :param tokens: Tokens, as (text, start, end).
+        :type tokens: list
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :return: The same tokens.
+        :rtype: list
+        """
+
+        last_index = len(tokens) - 1
+        for index, (text, start, end) in enumerate(tokens):
+            if text in operator_utils.LEFT_UNARY_OPERATORS:
+                if index > 0 and (
+                        tokens[index - 1][0]
+                        not in operator_utils.BINARY_OPERATORS
+                        and tokens[index - 1][0]
+                        != general_utils.OPEN_BRACKETS):
+                    diagnostics.append(Diagnostic(UnaryError, (text, True),
+                                                  start, end))
+                if index < last_index and (
+                        not operand_utils.is_operand(tokens[index + 1][0])
+                        and tokens[index + 1][0]
+                        != general_utils.OPEN_BRACKETS):
+                    diagnostics.append(Diagnostic(UnaryError, (text, False),
+                                                  start, end))
+            elif text in operator_utils.RIGHT_UNARY_OPERATORS:
+                if index > 0 and (
+                        not operand_utils.is_operand(tokens[index - 1][0])
+                        and tokens[index - 1][0]
+                        not in operator_utils.ALLOWED_BEFORE_RIGHT_UNARY):
+                    diagnostics.append(Diagnostic(UnaryError, (text, True),
+                                                  start, end))
+                if index < last_index and (
+                        tokens[index + 1][0]
+                        not in operator_utils.ALLOWED_AFTER_RIGHT_UNARY):
+                    diagnostics.append(Diagnostic(UnaryError, (text, False),
+                                                  start, end))
+        return tokens
+
+    def _check_structure(self, tokens: list, expression: str,
+                         diagnostics: list):
+        """
+        Checks that every operand is a valid number and that every operator
+        has its operands, like the equation solver (in the order it solves
+        operators), by counting operands instead of solving.
+
+        :param tokens: Processed tokens, as (text, start, end).
+        :type tokens: list
+        :param expression: Validated expression.
+        :type expression: str
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        """
+
+        parse = self._backend.parse
+        dispatch_table = OPERATOR_REGISTRY.get_dispatch_table()
+        precedences = dispatch_table.precedences
+        get_kind = SYMBOL_KINDS.get
+        operators = []  # (kind, token)
+        operand_count = 0
+        for token in tokens:
+            text = token[0]
+            kind = get_kind(text)
+            if kind is None:  # Operand
+                fixed_text = text.replace(operator_utils.SIGN_MINUS_SYMBOL,
+                                          operator_utils.SUB_SYMBOL)
+                try:
+                    parse(fixed_text)
+                except ValueError:
+                    diagnostics.append(Diagnostic(
+                        ExpectedOperandError, (fixed_text,), token[1],
+                        token[2]))
+                operand_count += 1
+            elif kind == OPEN_BRACKETS_KIND:
+                operators.append((kind, token))
+            elif kind == CLOSE_BRACKETS_KIND:
+                while operators and operators[-1][0] != OPEN_BRACKETS_KIND:
+                    operand_count = self._count_operator(
+                        operators.pop(), operand_count, dispatch_table,
+                        diagnostics)
+                if operators:
+                    operators.pop()
+            else:  # Operator
+                precedence = (precedences[kind] if kind < len(precedences)
+                              else None)
+                if precedence is None:  # No registered operator.
+                    diagnostics.append(Diagnostic(
+                        OperatorUsageError,
+                        (token[0], "Not a registered operator"), token[1],
+                        token[2]))
+                    continue
+                while (operators and operators[-1][0] != OPEN_BRACKETS_KIND
+                       and precedence <= precedences[operators[-1][0]]):
+                    operand_count = self._count_operator(
+                        operators.pop(), operand_count, dispatch_table,
+                        diagnostics)
+                operators.append((kind, token))
+        while operators:
+            operand_count = self._count_operator(
+                operators.pop(), operand_count, dispatch_table, diagnostics)
+        if operand_count >= 2:
+            diagnostics.append(Diagnostic(WrongParenthesesUsageError, (), 0,
+                                          len(expression)))
+
+    @staticmethod
+    def _count_operator(operator: tuple, operand_count: int, dispatch_table,
+                        diagnostics: list) -> int:
+        """
+        Counts the operands left after solving an operator, like the
+        equation solver solves a postfix operator. Missing operands are
+        reported, and counted as if they were there.
+
+        :param operator: Kind and token of operator.
+        :type operator: tuple
+        :param operand_count: Amount of operands before solving operator.
+        :type operand_count: int
+        :param dispatch_table: Dispatch table of the operator registry.
+        :type dispatch_table: DispatchTable
+        :param diagnostics: Diagnostics to add errors to.
+        :type diagnostics: list
+        :return: Amount of operands after solving operator.
+        :rtype: int
+        """
+
+        kind, (text, start, end) = operator
+        arity = dispatch_table.arities[kind]
+        if operand_count == 0:
+            diagnostics.append(Diagnostic(
+                OperatorUsageError,
+                (text, "No operand" if arity == 1 else "No operands"),
+                start, end))
+            operand_count = arity if arity in (1, 2) else 1
+        elif arity == 2 and operand_count == 1:
+            diagnostics.append(Diagnostic(
+                OperatorUsageError, (text, "Missing operand"), start, end))
+            operand_count = 2
+        if arity in (1, 2):
+            return operand_count - arity + 1
+        return operand_count - 1
+
+
+def _is_sign_minus(tokens: list) -> bool:
+    """
+    :param tokens: Tokens before a minus, as (text, start, end).
+    :type tokens: list
+    :return: Whether the minus is a sign minus, like the token processor
+        decides.
+    :rtype: bool
+    """
+
+    previous_text = tokens[-1][0]
+    if previous_text != operator_utils.SUB_SYMBOL:
+        return (previous_text in operator_utils.BINARY_OPERATORS
+                or previous_text in operator_utils.LEFT_UNARY_OPERATORS)
+    return len(tokens) >= 2 and (
+            operand_utils.is_operand(tokens[-2][0])
+            or tokens[-2][0] == general_utils.CLOSE_BRACKETS
+            or tokens[-2][0] in operator_utils.RIGHT_UNARY_OPERATORS)
@@ -0,0 +1,413 @@
+"""
+Module for sessions of named variables, which are assigned expressions
+(formulas) that may use other variables.
+Contains an abstract base class and an implementation which keeps the
+dependency graph of the variables, so an assignment recomputes only the
+variables downstream of it.
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+from calculator.logic.equation_solver import EquationSolver, \
+    OPERATOR_REGISTRY
+from calculator.logic.exceptions import InvalidAssignmentError, \
+    UndefinedVariableError, CyclicDependencyError
+from calculator.logic.expression_cache import POSITIONAL_ERRORS
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.token_stream import TokenStream, SYMBOL_KINDS, \
+    OPERAND_KIND, INVALID_OPERAND_KIND
+from calculator.utils import general_utils
+from calculator.utils.numeric_backend import get_backend
+
+_NAME_PATTERN = re.compile('[A-Za-z_][A-Za-z0-9_]*')
+_WHITE_SPACES = general_utils.EMPTY_STR.join(general_utils.EMPTY_CHARACTERS)
+
+# Operands which stand for references while a formula is compiled. The
+# formula is processed with both of them, and the operands which differ
+# are the references.
+_FIRST_PLACEHOLDER = '(0)'
+_SECOND_PLACEHOLDER = '(1)'
+
+
+class _Variable:
+    """
+    Assigned variable: its formula, the compiled form of the formula and
+    the outcome (value or error) of its last computation.
+    The compiled form is the postfix stream of the formula, where every
+    reference is an operand (a slot), which gets the value of the variable
+    it refers to before the stream is solved.
+    """
+
+    __slots__ = ('formula', 'postfix', 'slots', 'references',
+                 'dependencies', 'value', 'error')
+
+    def __init__(self, formula: str):
+        """
+        :param formula: Expression the variable was assigned.
+        :type formula: str
+        """
+
+        self.formula = formula
+        self.postfix = None
+        self.slots = ()  # Index of every slot in the postfix stream
+        self.references = ()  # Name of the variable of every slot
+        self.dependencies = frozenset()
+        self.value = None
+        self.error = None
+
+
+class VariableSession(ABC):
+    """
+    Abstract class for evaluating lines which assign and use variables.
+    """
+
+    @abstractmethod
+    def execute(self, line: str, process, fallback):
+        """
+        Abstract method for executing a line: an assignment
+        (name = expression), or an expression which may use variables.
+
+        :param line: Line to execute.
+        :type line: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param fallback: Function which evaluates the line through the
+            whole pipeline, for lines which do not use variables.
+        :type fallback: Callable
+        :return: Value of the assigned variable, or solution to expression.
+        :rtype: float
+        """
+
+
+class DependencyGraphSession(VariableSession):
+    """
+    Class for a session of variables, which keeps their dependency graph
+    (edges from every variable to the variables which use it).
+    A reference to a variable stands for its value as a parenthesized
+    operand, so 'rate * 12' is solved like '(3.5) * 12'.
+    Every formula is compiled once, when it is assigned. An assignment
+    recomputes the assigned variable and the variables downstream of it, in
+    topological order, and a variable is only recomputed when a variable it
+    uses changed, so its cost depends on the affected part of the graph and
+    not on the amount of variables.
+    Variables may use variables which are not assigned yet (their outcome
+    is an UndefinedVariableError until they are), and the error of a
+    variable is the outcome of the variables which use it.
+    """
+
+    def __init__(self):
+        self._variables = {}  # Name -> variable
+        self._dependents = {}  # Name -> names of variables which use it
+        self._backend = None
+        self._registry_version = None
+        self.compilations = 0
+        self.computations = 0
+
+    def execute(self, line: str, process, fallback):
+        """
+        Executes a line with the active numeric backend.
+
+        :param line: Line to execute.
+        :type line: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param fallback: Function which evaluates the line through the
+            whole pipeline, for lines which do not use variables.
+        :type fallback: Callable
+        :return: Value of the assigned variable, or solution to expression.
+        :rtype: float
+        :raises InvalidAssignmentError: if something which is not a name is
+            assigned.
+        :raises CyclicDependencyError: if the assigned variable would
+            depend on itself.
+        :raises UndefinedVariableError: if a used variable is not assigned.
+        """
+
+        target, assignment, formula = line.partition(
+            general_utils.ASSIGNMENT_STR)
+        if not assignment:
+            if _NAME_PATTERN.search(line) is None:
+                return fallback()
+            self._validate_variables(process)
+            name = line.strip(_WHITE_SPACES)
+            if _NAME_PATTERN.fullmatch(name) is not None:
+                return self.get_value(name)
+            return self._compute(self._compile(line, process, 0))
+        name = target.strip(_WHITE_SPACES)
+        if (_NAME_PATTERN.fullmatch(name) is None
+                or name == general_utils.QUIT_STR):
+            raise InvalidAssignmentError(name)
+        self._validate_variables(process)
+        self.assign(name, formula, process, len(target) + len(assignment))
+        return self.get_value(name)
+
+    def assign(self, name: str, formula: str, process, offset: int = 0):
+        """
+        Assigns a formula to a variable, and recomputes the variables which
+        are affected. The outcome of the variable (an error, if the formula
+        could not be computed) is kept, but a formula which can not be
+        compiled is not assigned.
+
+        :param name: Name of the variable.
+        :type name: str
+        :param formula: Expression to assign.
+        :type formula: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param offset: Index of formula in the line it was entered in,
+            which indexes of errors are relative to.
+        :type offset: int
+        :raises CyclicDependencyError: if the variable would depend on
+            itself.
+        """
+
+        variable = self._compile(formula, process, offset)
+        order = self._sort_downstream((name,))
+        if not variable.dependencies.isdisjoint(order):
+            raise CyclicDependencyError(name)
+        previous_variable = self._variables.get(name)
+        if previous_variable is not None:
+            # Variables which use it are recomputed only if its outcome
+            # changes.
+            variable.value = previous_variable.value
+            variable.error = previous_variable.error
+            for dependency in previous_variable.dependencies:
+                dependents = self._dependents[dependency]
+                dependents.discard(name)
+                if not dependents:
+                    del self._dependents[dependency]
+        for dependency in variable.dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+        self._variables[name] = variable
+        self._recompute(order, {name})
+
+    def get_value(self, name: str):
+        """
+        :param name: Name of a variable.
+        :type name: str
+        :return: Value of the variable.
+        :rtype: float
+        :raises UndefinedVariableError: if the variable is not assigned.
+        """
+
+        variable = self._variables.get(name)
+        if variable is None:
+            raise UndefinedVariableError(name)
+        if variable.error is not None:
+            raise variable.error.with_traceback(None)
+        return variable.value
+
+    def get_names(self) -> list:
+        """
+        :return: Names of the assigned variables, in assignment order.
+        :rtype: list
+        """
+
+        return list(self._variables)
+
+    def _validate_variables(self, process):
+        """
+        Compiles and computes every variable again if the numeric backend
+        or the operator registry changed since they were compiled.
+
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        """
+
+        backend = get_backend()
+        registry_version = OPERATOR_REGISTRY.get_version()
+        if (backend is self._backend
+                and registry_version == self._registry_version):
+            return
+        self._backend = backend
+        self._registry_version = registry_version
+        for name, variable in self._variables.items():
+            try:
+                compiled_variable = self._compile(variable.formula, process,
+                                                  0)
+            except Exception as error:  # The formula is no longer valid.
+                variable.postfix = None
+                variable.error = error
+                continue
+            self._variables[name] = compiled_variable
+        self._recompute(self._sort_downstream(self._variables),
+                        set(self._variables))
+
+    def _compile(self, formula: str, process, offset: int) -> _Variable:
+        """
+        Compiles a formula to a postfix stream, with a slot for every
+        reference.
+
+        :param formula: Expression to compile.
+        :type formula: str
+        :param process: Function which runs an expression through the
+            scanning and token processing stages.
+        :type process: Callable
+        :param offset: Index of formula in the line it was entered in.
+        :type offset: int
+        :return: Variable of the formula, which was not computed yet.
+        :rtype: _Variable
+        """
+
+        self.compilations += 1
+        variable = _Variable(formula)
+        references = _NAME_PATTERN.findall(formula)
+        try:
+            tokens = process(_NAME_PATTERN.sub(_FIRST_PLACEHOLDER, formula))
+        except POSITIONAL_ERRORS as error:
+            # Its indexes are of the formula with placeholders for names.
+            raise type(error)(*[_locate(index, formula, offset)
+                                for index in error.get_indexes()]) from None
+        solver = EquationSolver(tokens)
+        variable.postfix = solver.compile()
+        if not references:
+            return variable
+
+        # Operands keep their order in the postfix stream.
+        other_tokens = process(_NAME_PATTERN.sub(_SECOND_PLACEHOLDER,
+                                                 formula))
+        is_operator = SYMBOL_KINDS.__contains__
+        reference_operands = []
+        operand_count = 0
+        for token, other_token in zip(tokens, other_tokens):
+            if not is_operator(token):
+                if token != other_token:
+                    reference_operands.append(operand_count)
+                operand_count += 1
+        operand_indices = [index for index, kind
+                           in enumerate(variable.postfix.kinds)
+                           if kind == OPERAND_KIND
+                           or kind == INVALID_OPERAND_KIND]
+        variable.slots = tuple(operand_indices[operand]
+                               for operand in reference_operands)
+        variable.references = tuple(references)
+        variable.dependencies = frozenset(references)
+        return variable
+
+    def _compute(self, variable: _Variable):
+        """
+        Solves the compiled formula of a variable with the values of the
+        variables it uses.
+
+        :param variable: Variable to compute.
+        :type variable: _Variable
+        :return: Value of the formula.
+        :rtype: float
+        """
+
+        self.computations += 1
+        postfix = variable.postfix
+        if postfix is None:
+            raise variable.error.with_traceback(None)
+        values = postfix.values
+        if variable.slots:
+            values = values[:]
+            for index, name in zip(variable.slots, variable.references):
+                values[index] = self.get_value(name)
+        return ExpressionTree.from_postfix(TokenStream(
+            postfix.kinds, values, postfix.invalid_operands)).evaluate()
+
+    def _recompute(self, order: list, names: set):
+        """
+        Recomputes variables in topological order: the given ones, and the
+        ones which use a variable whose outcome changed.
+
+        :param order: Names of variables, in topological order.
+        :type order: list
+        :param names: Names of variables which are recomputed anyway.
+        :type names: set
+        """
+
+        changed = set()
+        for name in order:
+            variable = self._variables.get(name)
+            if variable is None or (name not in names and changed.isdisjoint(
+                    variable.dependencies)):
+                continue
+            value, error = variable.value, variable.error
+            try:
+                variable.value = self._compute(variable)
+                variable.error = None
+            except Exception as computation_error:
+                variable.value = None
+                variable.error = computation_error
+            if not (_is_same_outcome(value, variable.value)
+                    and error is variable.error):
+                changed.add(name)
+
+    def _sort_downstream(self, names) -> list:
+        """
+        Sorts variables and the variables downstream of them (which use
+        them, directly or not) topologically, with a depth-first search.
+
+        :param names: Names of variables to start from.
+        :type names: Iterable
+        :return: Names of the reached variables, every one before the
+            variables which use it.
+        :rtype: list
+        """
+
+        dependents = self._dependents
+        order = []
+        visited = set()
+        for name in names:
+            if name in visited:
+                continue
+            visited.add(name)
+            stack = [(name, iter(dependents.get(name, ())))]
+            while stack:
+                current_name, remaining_dependents = stack[-1]
+                for dependent in remaining_dependents:
+                    if dependent not in visited:
+                        visited.add(dependent)
+                        stack.append((dependent,
+                                      iter(dependents.get(dependent, ()))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(current_name)
+        order.reverse()
+        return order
+
+
+def _is_same_outcome(value, other_value) -> bool:
+    """
+    :param value: Value of a variable (None if it failed).
+    :param other_value: Other value of the variable.
+    :return: Whether the values are the same, including their type and
+        text (1.0 and 1 are different decimals, 0.0 and -0.0 are different
+        floats).
+    :rtype: bool
+    """
+
+    return value is other_value or (value.__class__ is other_value.__class__
+                                    and repr(value) == repr(other_value))
+
+
+def _locate(index: int, formula: str, offset: int) -> int:
+    """
+    :param index: Index in the formula with placeholders for names.
+    :type index: int
+    :param formula: Formula as it was entered.
+    :type formula: str
+    :param offset: Index of formula in the line it was entered in.
+    :type offset: int
+    :return: Index in the line (of the name, for an index in a
+        placeholder).
+    :rtype: int
+    """
+
+    shift = 0  # How much longer the formula got before index.
+    for match in _NAME_PATTERN.finditer(formula):
+        start = match.start() + shift
+        if index < start:
+            break
+        if index < start + len(_FIRST_PLACEHOLDER):
+            return offset + match.start()
+        shift += len(_FIRST_PLACEHOLDER) - len(match.group())
+    return offset + index - shift
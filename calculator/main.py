@@ -12,25 +12,437 @@ Modules initialized:
 - ConsoleInputHandler: Handles input collection from the user through the console.
 - ArithmeticTokenizer: Tokenizes mathematical expressions.
 - ArithmeticTokenProcessor: Processes the arithmetic tokenized list.
+- LRUExpressionCache: Caches compiled expressions between inputs.
+
+When run with --batch FILE (or --batch - for standard input), expressions are
+evaluated one per line without interaction, and a JSON record is written to
+standard output for each of them. --workers N spreads the evaluation over N
+worker processes, and --unordered writes records as soon as they are ready.
+Input files are memory-mapped, and standard input is read in large blocks.
+
+--backend decimal (with --precision N) or --backend fraction calculates with
+decimal.Decimal or exact fractions.Fraction instead of floats.
+
+--stream FILE (or --stream - for standard input) evaluates the whole input as
+a single expression, which may span lines and does not have to fit in memory,
+and writes a single JSON record to standard output.
+
+--serve runs an asyncio TCP server (on --host and --port) which evaluates
+newline-delimited JSON requests (see calculator.evaluation_server), with
+long expressions evaluated on --workers N worker processes.
+
+--stats FILE (or --stats - for standard error) times every pipeline stage
+and writes the per-stage statistics as JSON when the program exits.
+
+--deadline SECONDS, --max-tokens N, --max-depth N and --max-operations N
+limit every evaluation (except in stream mode); an evaluation which exceeds
+a limit fails with an EvaluationLimitError.
+
+When neither standard input nor standard output is a terminal, interactive
+mode reads expressions line by line until the input ends, and writes results
+without prompts or colors, through a buffer. --digits N rounds float results
+to N significant digits, and --integers writes integral results without
+their fraction part (in interactive and one-shot modes).
+
+--cache FILE keeps the outcomes (results or errors) of evaluations in an
+SQLite file, so later runs over the same expressions skip the pipeline
+(in batch, interactive and one-shot modes). Outcomes are discarded when the
+operators or the numeric backend change.
+
+Interactive mode keeps named variables: 'rate = 3.5' assigns an expression
+to a variable, which later expressions and assignments may use (e.g.
+'total = rate * 12'). Assigning a variable recomputes only the variables
+which use it, directly or not.
+
+--eval EXPRESSION evaluates a single expression, writes its result to
+standard output (or its error to standard error, with exit status 1) and
+exits, without the welcome message and the interactive handlers.
+
+Modules which only some modes need (asyncio, worker processes, colorama and
+so on) are imported by the functions of those modes, so a one-shot --eval
+starts fast.
 
 The main function is executed when the module is run as the main program.
 """
 
-from calculator.calculator_core import CalculatorCore
-from calculator.interaction.input_handler import ConsoleInputHandler
-from calculator.interaction.message_handler import ConsoleMessageHandler
-from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
-from calculator.logic.string_processor import ArithmeticStringProcessor
-from calculator.logic.token_processor import ArithmeticTokenProcessor
-from calculator.logic.tokenizer import ArithmeticTokenizer
+import argparse
+import functools
+import sys
+from contextlib import contextmanager
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.utils import general_utils
+from calculator.utils.evaluation_limits import EvaluationLimits
+from calculator.utils.numeric_backend import FloatBackend, DecimalBackend, \
+    FractionBackend, create_backend
+
+
+def parse_count(text: str, minimum: int) -> int:
+    """
+    Parses an integer command line argument which can not be less than a
+    minimum.
+
+    :param text: Text of argument.
+    :type text: str
+    :param minimum: Least valid value.
+    :type minimum: int
+    :return: Value of argument.
+    :rtype: int
+    :raises argparse.ArgumentTypeError: If text is not an integer, or if
+        it is less than minimum.
+    """
+
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    if value < minimum:
+        raise argparse.ArgumentTypeError(
+            f"must be at least {minimum}, got {value}")
+    return value
+
+
+def parse_arguments():
+    """
+    Parses command line arguments.
+
+    :return: Parsed arguments.
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m calculator.main')
+    parser.add_argument('--eval', metavar='EXPRESSION',
+                        help="evaluate EXPRESSION, write its result (or "
+                             "error) and exit")
+    parser.add_argument('--batch', metavar='FILE|-',
+                        help="evaluate expressions from FILE (or standard "
+                             "input for '-'), one per line, and write JSON "
+                             "records to standard output")
+    parser.add_argument('--stream', metavar='FILE|-',
+                        help="evaluate all of FILE (or standard input for "
+                             "'-') as a single expression, reading it in "
+                             "chunks, and write a JSON record to standard "
+                             "output")
+    parser.add_argument('--serve', action='store_true',
+                        help="serve newline-delimited JSON evaluation "
+                             "requests over TCP")
+    parser.add_argument('--host', default=general_utils.SERVER_HOST,
+                        help="address the server binds")
+    parser.add_argument('--port', type=int, default=general_utils.SERVER_PORT,
+                        help="port the server binds")
+    parser.add_argument('--workers', default=1, metavar='N',
+                        type=functools.partial(parse_count, minimum=0),
+                        help="amount of worker processes used in batch mode "
+                             "or for long expressions of the server (0 for "
+                             "one per CPU)")
+    parser.add_argument('--chunk-size',
+                        type=functools.partial(parse_count, minimum=1),
+                        default=general_utils.PARALLEL_CHUNK_SIZE,
+                        metavar='N',
+                        help="amount of expressions sent to a worker at once")
+    parser.add_argument('--unordered', action='store_true',
+                        help="write batch records as soon as they are ready "
+                             "instead of in input order")
+    parser.add_argument('--backend', default=FloatBackend.name,
+                        choices=[FloatBackend.name, DecimalBackend.name,
+                                 FractionBackend.name],
+                        help="numeric backend to calculate with")
+    parser.add_argument('--precision', type=int,
+                        default=general_utils.DECIMAL_PRECISION, metavar='N',
+                        help="significant digits of the decimal backend")
+    parser.add_argument('--stats', metavar='FILE|-',
+                        help="time every pipeline stage and write the "
+                             "statistics as JSON to FILE (or standard error "
+                             "for '-') on exit. Worker processes, server "
+                             "and stream modes are not timed")
+    parser.add_argument('--digits', type=int, metavar='N',
+                        help="significant digits of displayed float "
+                             "results")
+    parser.add_argument('--integers', action='store_true',
+                        help="display integral results without their "
+                             "fraction part")
+    parser.add_argument('--cache', metavar='FILE',
+                        help="keep outcomes of evaluations in an SQLite "
+                             "FILE, which later runs reuse (in batch, "
+                             "interactive and one-shot modes)")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help="wall-clock time every evaluation may take")
+    parser.add_argument('--max-tokens', type=int, metavar='N',
+                        help="max amount of tokens of an expression")
+    parser.add_argument('--max-depth', type=int, metavar='N',
+                        help="max nesting depth of parentheses")
+    parser.add_argument('--max-operations', type=int, metavar='N',
+                        help="max amount of operations an evaluation may "
+                             "execute")
+    return parser.parse_args()
+
+
+def create_limits(arguments):
+    """
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: Limits of every evaluation, or None if no limit was given.
+    :rtype: EvaluationLimits
+    """
+
+    if (arguments.deadline is None and arguments.max_tokens is None
+            and arguments.max_depth is None
+            and arguments.max_operations is None):
+        return None
+    return EvaluationLimits(deadline=arguments.deadline,
+                            max_tokens=arguments.max_tokens,
+                            max_depth=arguments.max_depth,
+                            max_operations=arguments.max_operations)
+
+
+@contextmanager
+def collect_statistics(path: str):
+    """
+    Creates stage statistics, and writes them when the context exits.
+
+    :param path: File to write the statistics to ('-' for standard error),
+        or None to not collect statistics.
+    :type path: str
+    :return: Context manager which yields the statistics (or None).
+    :rtype: ContextManager[StageStatistics]
+    """
+
+    if path is None:
+        yield None
+        return
+
+    from calculator.instrumentation import StageStatistics
+
+    statistics = StageStatistics()
+    try:
+        yield statistics
+    finally:
+        if path == '-':
+            statistics.dump(sys.stderr)
+        else:
+            with open(path, 'w', encoding='utf-8') as stats_file:
+                statistics.dump(stats_file)
+
+
+@contextmanager
+def open_result_store(path: str, backend):
+    """
+    Opens a persistent result store, and closes it when the context exits.
+
+    :param path: File of the store, or None to not store results.
+    :type path: str
+    :param backend: Numeric backend of the stored results.
+    :type backend: NumericBackend
+    :return: Context manager which yields the store (or None).
+    :rtype: ContextManager[ResultStore]
+    """
+
+    if path is None:
+        yield None
+        return
+
+    from calculator.logic.result_store import SQLiteResultStore
+
+    with SQLiteResultStore(path, backend=backend) as result_store:
+        yield result_store
+
+
+def create_result_formatter(arguments):
+    """
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :return: Formatter of displayed results.
+    :rtype: ResultFormatter
+    """
+
+    from calculator.interaction.result_formatter import \
+        NumericResultFormatter
+
+    return NumericResultFormatter(digits=arguments.digits,
+                                  integers=arguments.integers)
+
+
+def run_eval(arguments, statistics=None) -> int:
+    """
+    Evaluates a single expression, and writes its result to standard output
+    or its error to standard error.
+
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :param statistics: Statistics of the evaluation.
+    :type statistics: StageStatistics
+    :return: Exit status: 0 if the expression was evaluated, otherwise 1.
+    :rtype: int
+    """
+
+    numeric_backend = create_backend(arguments.backend, arguments.precision)
+    with open_result_store(arguments.cache, numeric_backend) as result_store:
+        calculator_core = create_calculator_core(
+            numeric_backend=numeric_backend,
+            instrumentation=statistics,
+            limits=create_limits(arguments),
+            result_store=result_store)
+        try:
+            solution = calculator_core.evaluate(arguments.eval)
+            if solution is not None:
+                # Formatting a huge exact result may fail too.
+                solution = create_result_formatter(arguments).format(
+                    solution)
+        except Exception as error:
+            print(calculator_core.get_error_message(error), file=sys.stderr)
+            return 1
+    if solution is not None:
+        print(solution)
+    return 0
+
+
+def run_batch(arguments, statistics=None):
+    """
+    Runs the calculator in batch mode.
+
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :param statistics: Statistics of the evaluations made in this process.
+    :type statistics: StageStatistics
+    """
+
+    from calculator.batch_runner import BatchRunner
+    from calculator.interaction.input_handler import open_input_handler
+    from calculator.parallel_evaluator import ParallelEvaluator
+
+    numeric_backend = create_backend(arguments.backend, arguments.precision)
+    output_stream = open(sys.stdout.fileno(), 'w', encoding='utf-8',
+                         buffering=general_utils.BATCH_IO_BUFFER_SIZE,
+                         closefd=False)
+    with open_result_store(arguments.cache, numeric_backend) \
+            as result_store, \
+            open_input_handler(arguments.batch) as input_handler, \
+            output_stream:
+        # Worker processes get copies of the store, with connections of
+        # their own.
+        core_factory = functools.partial(
+            create_calculator_core,
+            numeric_backend=numeric_backend,
+            limits=create_limits(arguments),
+            result_store=result_store)
+        parallel_evaluator = None
+        if arguments.workers != 1:
+            parallel_evaluator = ParallelEvaluator(
+                workers=arguments.workers or None,
+                chunk_size=arguments.chunk_size,
+                ordered=not arguments.unordered,
+                core_factory=core_factory)
+        BatchRunner(core_factory(instrumentation=statistics), output_stream,
+                    report_stream=sys.stderr,
+                    parallel_evaluator=parallel_evaluator).run(
+            input_handler.lines())
+
+
+def run_stream(arguments):
+    """
+    Evaluates the whole input as a single expression, in stream mode.
+
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    """
+
+    import json
+
+    from calculator.batch_runner import open_batch_input, describe_evaluation
+    from calculator.logic.stream_evaluator import \
+        ArithmeticStreamEvaluator, read_chunks
+
+    stream_evaluator = ArithmeticStreamEvaluator(
+        create_backend(arguments.backend, arguments.precision))
+    with open_batch_input(arguments.stream) as input_stream:
+        record = describe_evaluation(stream_evaluator.evaluate,
+                                     read_chunks(input_stream))
+    print(json.dumps(record))
+
+
+async def serve(arguments):
+    """
+    Runs the evaluation server until interrupted.
+
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    """
+
+    from calculator.evaluation_server import EvaluationServer
+
+    evaluation_server = EvaluationServer(
+        core_factory=functools.partial(
+            create_calculator_core,
+            numeric_backend=create_backend(arguments.backend,
+                                           arguments.precision),
+            limits=create_limits(arguments)),
+        workers=arguments.workers or None)
+    await evaluation_server.start(arguments.host, arguments.port)
+    print(f"Serving on {arguments.host}:{evaluation_server.get_port()}",
+          file=sys.stderr)
+    try:
+        await evaluation_server.serve_forever()
+    finally:
+        await evaluation_server.close()
+
+
+def run_interactive(arguments, statistics=None):
+    """
+    Runs the calculator interactively, in the console. When neither the
+    standard input nor the standard output is a terminal, lines are read
+    until the input ends, and messages are written through a buffer.
+
+    :param arguments: Parsed command line arguments.
+    :type arguments: argparse.Namespace
+    :param statistics: Statistics of the evaluations.
+    :type statistics: StageStatistics
+    """
+
+    from calculator.interaction.input_handler import ConsoleInputHandler, \
+        BlockInputHandler
+    from calculator.interaction.message_handler import \
+        ConsoleMessageHandler, BufferedMessageHandler
+
+    result_formatter = create_result_formatter(arguments)
+    is_pipeline = not (sys.stdin.isatty() or sys.stdout.isatty())
+    if is_pipeline:
+        message_handler = BufferedMessageHandler(
+            result_formatter=result_formatter)
+        input_handler = BlockInputHandler()
+    else:
+        message_handler = ConsoleMessageHandler(
+            result_formatter=result_formatter)
+        input_handler = ConsoleInputHandler()
+    numeric_backend = create_backend(arguments.backend, arguments.precision)
+    with open_result_store(arguments.cache, numeric_backend) as result_store:
+        calculator_core = create_calculator_core(
+            message_handler=message_handler,
+            input_handler=input_handler,
+            numeric_backend=numeric_backend,
+            instrumentation=statistics,
+            incremental=not is_pipeline,
+            limits=create_limits(arguments),
+            result_store=result_store,
+            variables=True
+        )
+        calculator_core.run()
+
 
 if __name__ == "__main__":
-    calculator_core = CalculatorCore(
-        message_handler=ConsoleMessageHandler(),
-        input_handler=ConsoleInputHandler(),
-        string_preprocessor=ArithmeticStringPreprocessor(),
-        string_processor=ArithmeticStringProcessor(),
-        tokenizer=ArithmeticTokenizer(),
-        token_processor=ArithmeticTokenProcessor()
-    )
-    calculator_core.run()
+    arguments = parse_arguments()
+    with collect_statistics(arguments.stats) as statistics:
+        if arguments.eval is not None:
+            sys.exit(run_eval(arguments, statistics))
+        elif arguments.serve:
+            import asyncio
+
+            try:
+                asyncio.run(serve(arguments))
+            except KeyboardInterrupt:
+                pass
+        elif arguments.batch is not None:
+            run_batch(arguments, statistics)
+        elif arguments.stream is not None:
+            run_stream(arguments)
+        else:
+            run_interactive(arguments, statistics)
@@ -0,0 +1,340 @@
+"""
+Module contains ParallelEvaluator class which evaluates large batches of
+expressions on a pool of worker processes.
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from calculator.batch_runner import create_record
+from calculator.calculator_factory import create_calculator_core
+from calculator.utils import general_utils
+
+# Calculator core of the current worker process, built once per worker.
+_worker_calculator_core = None
+
+
+def _init_worker(core_factory):
+    """
+    Builds the calculator core of a worker process.
+
+    :param core_factory: Function which creates a calculator core.
+    :type core_factory: Callable[[], CalculatorCore]
+    """
+
+    global _worker_calculator_core
+    _worker_calculator_core = core_factory()
+
+
+def _evaluate_chunk(start_index: int, expressions: list) -> list:
+    """
+    Evaluates a chunk of expressions in a worker process.
+
+    :param start_index: Index of the first expression in the chunk.
+    :type start_index: int
+    :param expressions: Expressions to evaluate.
+    :type expressions: list
+    :return: Records of evaluations.
+    :rtype: list
+    """
+
+    records = [create_record(_worker_calculator_core, index, expression)
+               for index, expression in enumerate(expressions, start_index)]
+    if _worker_calculator_core.result_store is not None:
+        _worker_calculator_core.result_store.flush()  # A batch per chunk
+    return records
+
+
+class _Chunk:
+    """
+    Class which stores a chunk of expressions and the future of its records.
+    """
+
+    __slots__ = ('start_index', 'expressions', 'future', 'is_retried')
+
+    def __init__(self, start_index: int, expressions: list):
+        """
+        :param start_index: Index of the first expression in the chunk.
+        :type start_index: int
+        :param expressions: Expressions to evaluate.
+        :type expressions: list
+        """
+
+        self.start_index = start_index
+        self.expressions = expressions
+        self.future = None
+        self.is_retried = False  # Whether it was resubmitted once already
+
+
+class ParallelEvaluator:
+    """
+    Class responsible for splitting expressions into chunks and evaluating
+    them on worker processes.
+    Expressions are consumed lazily and only a bounded amount of chunks is
+    in flight at a time, so memory usage does not depend on input size.
+    An error in a chunk only affects the records of that chunk. A worker
+    which dies breaks the whole pool, so chunks which were in flight are
+    resubmitted to a replacement pool. A chunk whose pool breaks again is
+    evaluated alone, so only the chunk which kills its worker gets error
+    records.
+    """
+
+    def __init__(self, workers: int = None,
+                 chunk_size: int = general_utils.PARALLEL_CHUNK_SIZE,
+                 ordered: bool = True,
+                 core_factory=create_calculator_core):
+        """
+        :param workers: Amount of worker processes. Defaults to the amount
+            of CPUs.
+        :type workers: int
+        :param chunk_size: Amount of expressions sent to a worker at once.
+        :type chunk_size: int
+        :param ordered: Whether records are delivered in input order (True)
+            or as soon as their chunk is done (False).
+        :type ordered: bool
+        :param core_factory: Picklable function which creates the
+            calculator core of each worker.
+        :type core_factory: Callable[[], CalculatorCore]
+        """
+
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._ordered = ordered
+        self._core_factory = core_factory
+        self._max_pending = (self._workers
+                             * general_utils.PARALLEL_PENDING_CHUNKS)
+        self._executor = None
+
+    def evaluate(self, expressions):
+        """
+        Evaluates expressions on worker processes.
+
+        :param expressions: Expressions to evaluate.
+        :type expressions: Iterable[str]
+        :return: Records of evaluations (see batch_runner.create_record).
+        :rtype: Iterator[dict]
+        """
+
+        self._executor = self._create_executor()
+        try:
+            if self._ordered:
+                yield from self._evaluate_ordered(expressions)
+            else:
+                yield from self._evaluate_unordered(expressions)
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _evaluate_ordered(self, expressions):
+        """
+        Evaluates expressions and delivers records in input order.
+
+        :param expressions: Expressions to evaluate.
+        :type expressions: Iterable[str]
+        :return: Records of evaluations.
+        :rtype: Iterator[dict]
+        """
+
+        pending = deque()
+        for chunk in self._split(expressions):
+            self._submit(chunk)
+            pending.append(chunk)
+            if len(pending) >= self._max_pending:
+                yield from self._collect_first(pending)
+        while pending:
+            yield from self._collect_first(pending)
+
+    def _collect_first(self, pending: deque) -> list:
+        """
+        Waits for the first pending chunk and delivers its records.
+
+        :param pending: Pending chunks, in input order.
+        :type pending: deque
+        :return: Records of evaluations.
+        :rtype: list
+        """
+
+        chunk = pending[0]
+        records = self._chunk_records(chunk)
+        while records is None:  # The pool broke, so it was resubmitted.
+            for other_chunk in pending:
+                if (other_chunk is not chunk and not other_chunk.is_retried
+                        and _is_broken(other_chunk.future)):
+                    self._retry(other_chunk)
+            records = self._chunk_records(chunk)
+        pending.popleft()
+        return records
+
+    def _evaluate_unordered(self, expressions):
+        """
+        Evaluates expressions and delivers records as soon as their chunk
+        is done.
+
+        :param expressions: Expressions to evaluate.
+        :type expressions: Iterable[str]
+        :return: Records of evaluations.
+        :rtype: Iterator[dict]
+        """
+
+        pending = {}
+        for chunk in self._split(expressions):
+            self._submit(chunk)
+            pending[chunk.future] = chunk
+            if len(pending) >= self._max_pending:
+                yield from self._collect_done(pending)
+        while pending:
+            yield from self._collect_done(pending)
+
+    def _collect_done(self, pending: dict):
+        """
+        Waits for at least one pending chunk and delivers records of every
+        done chunk.
+
+        :param pending: Maps future of a chunk to the chunk.
+        :type pending: dict
+        :return: Records of evaluations.
+        :rtype: Iterator[dict]
+        """
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = pending.pop(future)
+            records = self._chunk_records(chunk)
+            if records is None:  # The pool broke, so it was resubmitted.
+                pending[chunk.future] = chunk
+            else:
+                yield from records
+
+    def _split(self, expressions):
+        """
+        Lazily splits expressions into chunks.
+
+        :param expressions: Expressions to split.
+        :type expressions: Iterable[str]
+        :return: Every chunk.
+        :rtype: Iterator[_Chunk]
+        """
+
+        iterator = iter(expressions)
+        start_index = 0
+        expressions = list(itertools.islice(iterator, self._chunk_size))
+        while expressions:
+            yield _Chunk(start_index, expressions)
+            start_index += len(expressions)
+            expressions = list(itertools.islice(iterator, self._chunk_size))
+
+    def _submit(self, chunk: _Chunk):
+        """
+        Sends a chunk to the worker pool, replacing the pool if one of its
+        workers died.
+
+        :param chunk: Chunk to evaluate.
+        :type chunk: _Chunk
+        """
+
+        try:
+            chunk.future = self._executor.submit(
+                _evaluate_chunk, chunk.start_index, chunk.expressions)
+        except BrokenProcessPool:
+            self._executor.shutdown(wait=False)
+            self._executor = self._create_executor()
+            chunk.future = self._executor.submit(
+                _evaluate_chunk, chunk.start_index, chunk.expressions)
+
+    def _retry(self, chunk: _Chunk):
+        """
+        Resubmits a chunk which was in flight when the pool broke.
+
+        :param chunk: Chunk to evaluate again.
+        :type chunk: _Chunk
+        """
+
+        chunk.is_retried = True
+        self._submit(chunk)
+
+    def _create_executor(self, workers: int = None) -> ProcessPoolExecutor:
+        """
+        :param workers: Amount of worker processes. Defaults to the
+            evaluator's amount.
+        :type workers: int
+        :return: Pool of worker processes, each with its own calculator core.
+        :rtype: ProcessPoolExecutor
+        """
+
+        return ProcessPoolExecutor(max_workers=workers or self._workers,
+                                   initializer=_init_worker,
+                                   initargs=(self._core_factory,))
+
+    def _chunk_records(self, chunk: _Chunk):
+        """
+        Gets the records of a chunk. If the pool broke while the chunk was
+        in flight for the first time, it is resubmitted; if it broke again,
+        the chunk is evaluated alone. If the chunk failed as a whole, an
+        error record is created for each of its expressions.
+
+        :param chunk: Chunk whose records to get.
+        :type chunk: _Chunk
+        :return: Records of evaluations, or None if chunk was resubmitted.
+        :rtype: list or None
+        """
+
+        try:
+            return chunk.future.result()
+        except BrokenProcessPool:
+            if chunk.is_retried:
+                return self._evaluate_alone(chunk)
+            self._retry(chunk)
+            return None
+        except Exception as e:
+            return _create_error_records(chunk, e)
+
+    def _evaluate_alone(self, chunk: _Chunk) -> list:
+        """
+        Evaluates a chunk on a pool of its own, so if it kills its worker
+        no other chunk is affected.
+
+        :param chunk: Chunk to evaluate.
+        :type chunk: _Chunk
+        :return: Records of evaluations.
+        :rtype: list
+        """
+
+        executor = self._create_executor(workers=1)
+        try:
+            return executor.submit(_evaluate_chunk, chunk.start_index,
+                                   chunk.expressions).result()
+        except Exception as e:
+            return _create_error_records(chunk, e)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def _is_broken(future) -> bool:
+    """
+    :param future: Future of a chunk's records.
+    :type future: Future
+    :return: Whether the chunk failed because its pool broke.
+    :rtype: bool
+    """
+
+    return (future.done() and not future.cancelled()
+            and isinstance(future.exception(), BrokenProcessPool))
+
+
+def _create_error_records(chunk: _Chunk, error: Exception) -> list:
+    """
+    :param chunk: Chunk which failed as a whole.
+    :type chunk: _Chunk
+    :param error: Error of the chunk.
+    :type error: Exception
+    :return: Error record of each expression of the chunk.
+    :rtype: list
+    """
+
+    return [{'index': index, 'error': type(error).__name__,
+             'message': f"Error! Chunk evaluation failed: {error}"}
+            for index in range(chunk.start_index,
+                               chunk.start_index + len(chunk.expressions))]
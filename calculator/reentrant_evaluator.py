@@ -0,0 +1,114 @@
+"""
+Module for evaluating expressions from many threads at once (a thread pool,
+or free-threaded Python), through a single shared evaluator.
+
+Usage:
+    from concurrent.futures import ThreadPoolExecutor
+    from calculator.reentrant_evaluator import evaluate
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(evaluate, ['1+2', '3!^2', '7@9']))
+"""
+
+import threading
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.utils.evaluation_limits import EvaluationLimits
+from calculator.utils.numeric_backend import NumericBackend, FLOAT_BACKEND
+
+_default_evaluator = None
+_default_evaluator_lock = threading.Lock()
+
+
+class ReentrantEvaluator:
+    """
+    Class which evaluates expressions reentrantly: any amount of threads
+    may call evaluate on the same instance at once.
+    It wraps a calculator core made of reentrant components only. The
+    scanner and the token processor keep the state of a call in locals,
+    every call gets an equation solver and a tree of its own, the shared
+    expression cache, operator registry and factorial memo are locked, and
+    the numeric backend and the evaluation limits are activated in the
+    context of the calling thread.
+    Components which keep state between calls (the incremental evaluator,
+    the variable session, the result store and stage instrumentation) are
+    left out.
+    """
+
+    def __init__(self, numeric_backend: NumericBackend = FLOAT_BACKEND,
+                 limits: EvaluationLimits = None, cached: bool = True):
+        """
+        :param numeric_backend: Backend to parse operands and calculate
+            with.
+        :type numeric_backend: NumericBackend
+        :param limits: Limits of every evaluation (every call gets a budget
+            of its own). If not provided, evaluations are not limited.
+        :type limits: EvaluationLimits
+        :param cached: Whether compiled expressions are cached (and shared
+            by the threads). Threads of a corpus without repeated
+            expressions only contend for the cache's lock.
+        :type cached: bool
+        """
+
+        calculator_core = create_calculator_core(
+            numeric_backend=numeric_backend, limits=limits)
+        if not cached:
+            calculator_core.expression_cache = None
+        self._calculator_core = calculator_core
+
+    def evaluate(self, expression: str):
+        """
+        Evaluates a single expression. Safe to call from several threads at
+        once.
+
+        :param expression: Expression to evaluate.
+        :type expression: str
+        :return: Solution to expression.
+        :rtype: float
+        :raises EvaluationLimitError: If the evaluation exceeded its limits.
+        """
+
+        return self._calculator_core.evaluate(expression)
+
+    def get_cache_stats(self):
+        """
+        :return: Counters and occupancy of the expression cache, or None if
+            expressions are not cached.
+        :rtype: dict or None
+        """
+
+        expression_cache = self._calculator_core.expression_cache
+        if expression_cache is None:
+            return None
+        return expression_cache.get_stats()
+
+
+def evaluate(expression: str):
+    """
+    Evaluates a single expression with a default evaluator (float backend,
+    no limits), which is shared by every thread. Safe to call from several
+    threads at once.
+
+    :param expression: Expression to evaluate.
+    :type expression: str
+    :return: Solution to expression.
+    :rtype: float
+    """
+
+    return get_default_evaluator().evaluate(expression)
+
+
+def get_default_evaluator() -> ReentrantEvaluator:
+    """
+    :return: The default evaluator, which is created on first usage.
+    :rtype: ReentrantEvaluator
+    """
+
+    global _default_evaluator
+    evaluator = _default_evaluator
+    if evaluator is None:
+        with _default_evaluator_lock:
+            if _default_evaluator is None:
+                _default_evaluator = ReentrantEvaluator()
+            evaluator = _default_evaluator
+    return evaluator
@@ -0,0 +1,176 @@
+"""
+Module contains the limits of a single evaluation: a wall-clock deadline,
+and maximal amounts of tokens, nesting depth and executed operations.
+Evaluation activates its limits, which starts an evaluation budget, and the
+stages check the active budget (with get_budget) cooperatively: tokenizing
+checks the amount of tokens, token processing checks the nesting depth,
+and solving spends operations. The deadline is checked along the way.
+"""
+
+import time
+from contextvars import ContextVar
+
+from calculator.logic.exceptions import EvaluationLimitError
+from calculator.utils import general_utils
+
+DEADLINE_LIMIT = 'deadline'
+TOKENS_LIMIT = 'tokens'
+DEPTH_LIMIT = 'depth'
+OPERATIONS_LIMIT = 'operations'
+
+
+class EvaluationLimits:
+    """
+    Class which stores the limits of a single evaluation. A limit which is
+    None is not enforced.
+    """
+
+    __slots__ = ('deadline', 'max_tokens', 'max_depth', 'max_operations')
+
+    def __init__(self, deadline: float = None, max_tokens: int = None,
+                 max_depth: int = None, max_operations: int = None):
+        """
+        :param deadline: Wall-clock time an evaluation may take, in seconds.
+        :type deadline: float
+        :param max_tokens: Max amount of tokens of an expression.
+        :type max_tokens: int
+        :param max_depth: Max nesting depth of parentheses.
+        :type max_depth: int
+        :param max_operations: Max amount of operations an evaluation may
+            execute.
+        :type max_operations: int
+        """
+
+        self.deadline = deadline
+        self.max_tokens = max_tokens
+        self.max_depth = max_depth
+        self.max_operations = max_operations
+
+    def activate(self):
+        """
+        :return: Context manager which starts a budget of these limits and
+            makes it the active budget.
+        :rtype: BudgetActivation
+        """
+
+        return BudgetActivation(EvaluationBudget(self))
+
+
+class EvaluationBudget:
+    """
+    Class which tracks how much of its limits an evaluation used.
+    """
+
+    __slots__ = ('limits', '_end_time', '_operations_left')
+
+    def __init__(self, limits: EvaluationLimits):
+        """
+        Starts the budget (and its deadline).
+
+        :param limits: Limits of the evaluation.
+        :type limits: EvaluationLimits
+        """
+
+        self.limits = limits
+        self._end_time = None
+        if limits.deadline is not None:
+            self._end_time = time.perf_counter() + limits.deadline
+        self._operations_left = limits.max_operations
+        if self._operations_left is None:
+            self._operations_left = float('inf')
+
+    def check_deadline(self):
+        """
+        :raises EvaluationLimitError: If the deadline passed.
+        """
+
+        if self._end_time is not None and time.perf_counter() > self._end_time:
+            raise EvaluationLimitError(DEADLINE_LIMIT, self.limits.deadline)
+
+    def check_tokens(self, amount: int):
+        """
+        :param amount: Amount of tokens of the expression.
+        :type amount: int
+        :raises EvaluationLimitError: If there are too many tokens, or if the
+            deadline passed.
+        """
+
+        max_tokens = self.limits.max_tokens
+        if max_tokens is not None and amount > max_tokens:
+            raise EvaluationLimitError(TOKENS_LIMIT, max_tokens)
+        self.check_deadline()
+
+    def check_depth(self, tokens: list):
+        """
+        :param tokens: Tokens of the expression.
+        :type tokens: list
+        :raises EvaluationLimitError: If parentheses are nested too deep, or
+            if the deadline passed.
+        """
+
+        max_depth = self.limits.max_depth
+        if max_depth is not None:
+            depth = 0
+            for token in tokens:
+                if token == general_utils.OPEN_BRACKETS:
+                    depth += 1
+                    if depth > max_depth:
+                        raise EvaluationLimitError(DEPTH_LIMIT, max_depth)
+                elif token == general_utils.CLOSE_BRACKETS:
+                    depth -= 1
+        self.check_deadline()
+
+    def spend(self, operations: int = 1):
+        """
+        Spends operations which are about to be executed. The deadline is
+        checked on every call, since a single operation on large numbers
+        may take longer than the whole deadline.
+
+        :param operations: Amount of operations.
+        :type operations: int
+        :raises EvaluationLimitError: If too many operations were executed,
+            or if the deadline passed.
+        """
+
+        self._operations_left -= operations
+        if self._operations_left < 0:
+            raise EvaluationLimitError(OPERATIONS_LIMIT,
+                                       self.limits.max_operations)
+        self.check_deadline()
+
+
+class BudgetActivation:
+    """
+    Context manager which makes a budget the active budget.
+    """
+
+    __slots__ = ('_budget', '_token')
+
+    def __init__(self, budget: EvaluationBudget):
+        """
+        :param budget: Budget to activate.
+        :type budget: EvaluationBudget
+        """
+
+        self._budget = budget
+        self._token = None
+
+    def __enter__(self) -> EvaluationBudget:
+        self._token = _ACTIVE_BUDGET.set(self._budget)
+        return self._budget
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE_BUDGET.reset(self._token)
+
+
+_ACTIVE_BUDGET = ContextVar('active_evaluation_budget', default=None)
+
+
+def get_budget():
+    """
+    :return: The active evaluation budget (None if no limits were
+        activated).
+    :rtype: EvaluationBudget or None
+    """
+
+    return _ACTIVE_BUDGET.get()
@@ -0,0 +1,171 @@
+"""
+Module contains engines which calculate factorials for the factorial
+operator.
+The table engine looks factorials up in a precomputed table, and is limited
+to operands whose factorial fits in a float. The exact engine calculates
+factorials of larger operands as big integers.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right, insort
+
+from calculator.utils import operator_utils
+
+
+def _create_factorial_table(size: int) -> tuple:
+    """
+    :param size: Amount of factorials in table.
+    :type size: int
+    :return: Factorials of 0 to size - 1.
+    :rtype: tuple
+    """
+
+    table = [1]
+    for index in range(1, size):
+        table.append(table[-1] * index)
+    return tuple(table)
+
+
+# Factorials of 0 to FACTORIAL_MAX_OPERAND.
+FACTORIAL_TABLE = _create_factorial_table(
+    operator_utils.FACTORIAL_MAX_OPERAND + 1)
+
+
+class FactorialEngine(ABC):
+    """
+    Abstract class for factorial engine.
+    """
+
+    def __init__(self, max_operand: int):
+        """
+        :param max_operand: Max operand allowed in factorial operation.
+        :type max_operand: int
+        """
+
+        self.max_operand = max_operand
+
+    @abstractmethod
+    def factorial(self, operand: int) -> int:
+        """
+        Abstract method for calculating factorial of an operand.
+
+        :param operand: Integer between 0 and max_operand.
+        :type operand: int
+        :return: Factorial of operand.
+        :rtype: int
+        """
+
+
+class TableFactorialEngine(FactorialEngine):
+    """
+    Factorial engine which looks factorials up in FACTORIAL_TABLE.
+    """
+
+    def __init__(self):
+        super().__init__(operator_utils.FACTORIAL_MAX_OPERAND)
+
+    def factorial(self, operand: int) -> int:
+        """
+        :param operand: Integer between 0 and max_operand.
+        :type operand: int
+        :return: Factorial of operand.
+        :rtype: int
+        """
+
+        return FACTORIAL_TABLE[operand]
+
+
+class ExactFactorialEngine(FactorialEngine):
+    """
+    Factorial engine which calculates exact factorials of large operands.
+    Factorials are calculated from the closest smaller factorial which is
+    known (a table entry or a memoized result), by multiplying the rest of
+    the range with binary splitting (product of each half, recursively), so
+    the multiplied numbers stay balanced in size.
+    The memo is shared by the threads which use the engine: it is only
+    looked up and changed while its lock is held, and products are
+    multiplied outside of it.
+    """
+
+    def __init__(self,
+                 max_operand: int = operator_utils.FACTORIAL_EXACT_MAX_OPERAND,
+                 memo_size: int = operator_utils.FACTORIAL_MEMO_SIZE):
+        """
+        :param max_operand: Max operand allowed in factorial operation.
+        :type max_operand: int
+        :param memo_size: Max amount of memoized factorials.
+        :type memo_size: int
+        """
+
+        super().__init__(max_operand)
+        self._memo_size = memo_size
+        self._memo = {}  # Operand -> factorial, in order of memoization.
+        self._memo_operands = []  # Sorted memoized operands.
+        self._lock = threading.Lock()
+
+    def factorial(self, operand: int) -> int:
+        """
+        :param operand: Integer between 0 and max_operand.
+        :type operand: int
+        :return: Factorial of operand.
+        :rtype: int
+        """
+
+        if operand < len(FACTORIAL_TABLE):
+            return FACTORIAL_TABLE[operand]
+        with self._lock:
+            result = self._memo.get(operand)
+            if result is not None:
+                return result
+            start = len(FACTORIAL_TABLE) - 1
+            result = FACTORIAL_TABLE[start]
+            position = bisect_right(self._memo_operands, operand)
+            if position:
+                start = self._memo_operands[position - 1]
+                result = self._memo[start]
+        result *= self._range_product(start + 1, operand)
+        with self._lock:
+            if operand not in self._memo:  # Unless another thread added it
+                self._memoize(operand, result)
+        return result
+
+    def _memoize(self, operand: int, result: int):
+        """
+        Memoizes a factorial, forgetting the oldest one if memo is full.
+        The lock has to be held.
+
+        :param operand: Operand of factorial.
+        :type operand: int
+        :param result: Factorial of operand.
+        :type result: int
+        """
+
+        if self._memo_size <= 0:
+            return
+        if len(self._memo) >= self._memo_size:
+            oldest_operand = next(iter(self._memo))
+            del self._memo[oldest_operand]
+            self._memo_operands.remove(oldest_operand)
+        self._memo[operand] = result
+        insort(self._memo_operands, operand)
+
+    @classmethod
+    def _range_product(cls, low: int, high: int) -> int:
+        """
+        :param low: First integer of range.
+        :type low: int
+        :param high: Last integer of range.
+        :type high: int
+        :return: Product of all integers from low to high.
+        :rtype: int
+        """
+
+        if high - low < 8:
+            result = 1
+            for index in range(low, high + 1):
+                result *= index
+            return result
+        middle = (low + high) // 2
+        return cls._range_product(low, middle) * cls._range_product(
+            middle + 1, high)
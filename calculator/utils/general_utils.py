@@ -40,3 +40,65 @@ VALID_INPUT_CHARACTERS = (
             ' ',
             '\t'})
 )
+
+ASSIGNMENT_STR = '='  # separates a variable's name from its expression.
+
+EXPRESSION_CACHE_CAPACITY = 1024  # Max amount of cached compiled expressions.
+
+EXPRESSION_CACHE_MAX_SIZE = 1_000_000  # Max total size of cached entries.
+
+TREE_COMPILE_THRESHOLD = 32  # Evaluations of a cached tree before compiling.
+
+TREE_COMPILE_MAX_OPERATIONS = 10_000  # Larger trees are not compiled.
+
+INCREMENTAL_MAX_SPANS = 100_000  # Max memoized spans of incremental mode.
+
+STREAM_CHUNK_SIZE = 1 << 16  # Characters read at once in stream mode.
+
+OUTPUT_BLOCK_LINES = 8192  # Lines a buffered message handler writes at once.
+
+INPUT_BLOCK_SIZE = 1 << 20  # Bytes a bulk input handler reads at once.
+
+RESULT_STORE_MAX_ENTRIES = 1_000_000  # Max results of a persistent cache.
+
+RESULT_STORE_BATCH_SIZE = 1000  # Results kept in memory before writing.
+
+RESULT_STORE_TIMEOUT = 30.0  # Seconds to wait for a locked cache file.
+
+EXACT_KEY_PREFIX = '='  # Prefix of result store keys of exact expressions.
+
+CANONICAL_KEY_PREFIX = '#'  # Prefix of result store keys of canonical forms.
+
+# Version of operators' semantics, which persistent caches are stamped with.
+# Bump it whenever a change makes an operator return different results.
+OPERATOR_SEMANTICS_VERSION = 1
+
+STDIN_PATH = '-'  # path which stands for standard input in batch mode.
+
+BATCH_FLUSH_SIZE = 4096  # Records kept in memory before writing output.
+
+BATCH_IO_BUFFER_SIZE = 1 << 20  # Buffer size of batch mode input / output.
+
+PARALLEL_CHUNK_SIZE = 1000  # Expressions sent to a worker process at once.
+
+PARALLEL_PENDING_CHUNKS = 2  # Chunks in flight per worker process.
+
+DECIMAL_PRECISION = 28  # Default significant digits of decimal backend.
+
+# Max bits of an exact fraction power. Results stay below the interpreter's
+# limit of integer string conversion (4300 digits, about 14284 bits).
+FRACTION_MAX_POWER_BITS = 14_000
+
+SERVER_HOST = '127.0.0.1'  # Default address the evaluation server binds.
+
+SERVER_PORT = 8765  # Default port of the evaluation server.
+
+SERVER_MAX_LINE_SIZE = 1 << 24  # Max size of a request line, in bytes.
+
+SERVER_MAX_PENDING = 256  # Requests in flight per connection.
+
+SERVER_OFFLOAD_SIZE = 4096  # Expressions this costly go to worker processes.
+
+# Cost of a factorial in the server's estimate, in characters: its result is
+# an exact integer, and products of those grow without a bound.
+SERVER_FACTORIAL_COST = 64
@@ -0,0 +1,448 @@
+"""
+Module contains the numeric backends which operands are parsed with and
+operators calculate with.
+The float backend is the default (and fastest) one. The decimal backend
+calculates with decimal.Decimal in a configurable precision, and the
+fraction backend calculates exact rationals with fractions.Fraction.
+Evaluation activates a backend, and operators get the active backend with
+get_backend.
+"""
+
+import decimal
+import math
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from fractions import Fraction
+
+from calculator.utils import general_utils
+
+
+class NumericBackend(ABC):
+    """
+    Abstract class for numeric backend.
+    Arithmetic which behaves the same for every number type (addition,
+    multiplication, comparison...) is done with the number's own
+    operators; a backend only implements what differs between types.
+    """
+
+    name = None
+
+    @abstractmethod
+    def parse(self, text: str):
+        """
+        Abstract method for parsing an operand.
+
+        :param text: Text of operand.
+        :type text: str
+        :return: Operand as a number of the backend.
+        :raises ValueError: If text is not a valid number.
+        """
+
+    @abstractmethod
+    def from_int(self, value: int):
+        """
+        Abstract method for converting an integer result to a number of
+        the backend.
+
+        :param value: Integer to convert.
+        :type value: int
+        :return: Value as a number of the backend.
+        """
+
+    @abstractmethod
+    def is_integer(self, number) -> bool:
+        """
+        Abstract method for checking whether a number is an integer.
+
+        :param number: Number to check.
+        :return: Whether number is an integer.
+        :rtype: bool
+        """
+
+    @abstractmethod
+    def power(self, base, exponent):
+        """
+        Abstract method for raising base to the power of exponent.
+
+        :param base: Power operation's base.
+        :param exponent: Power operation's exponent.
+        :return: Result of base to the power of exponent.
+        :raises OverflowError: If result is out of backend's range.
+        """
+
+    def modulo(self, dividend, divisor):
+        """
+        Calculates dividend modulo divisor. The result has the sign of the
+        divisor.
+
+        :param dividend: Operand to the left of modulo.
+        :param divisor: Operand to the right of modulo.
+        :return: Result of dividend modulo divisor.
+        :raises ZeroDivisionError: If divisor is zero.
+        """
+
+        return dividend % divisor
+
+    def to_string(self, number) -> str:
+        """
+        :param number: Number to convert.
+        :return: Decimal representation of number (lower case 'e' marks an
+            exponent).
+        :rtype: str
+        """
+
+        return str(number)
+
+    def activate(self):
+        """
+        :return: Context manager which makes this backend the active
+            backend.
+        :rtype: BackendActivation
+        """
+
+        return BackendActivation(self)
+
+
+class FloatBackend(NumericBackend):
+    """
+    Numeric backend which calculates with floats.
+    """
+
+    name = 'float'
+
+    def parse(self, text: str) -> float:
+        """
+        :param text: Text of operand.
+        :type text: str
+        :return: Operand as a float.
+        :rtype: float
+        :raises ValueError: If text is not a valid number.
+        """
+
+        return float(text)
+
+    def from_int(self, value: int) -> float:
+        """
+        :param value: Integer to convert.
+        :type value: int
+        :return: Value as a float.
+        :rtype: float
+        """
+
+        return float(value)
+
+    def is_integer(self, number) -> bool:
+        """
+        :param number: Number to check.
+        :type number: float
+        :return: Whether number is an integer.
+        :rtype: bool
+        """
+
+        return number.is_integer()
+
+    def power(self, base, exponent) -> float:
+        """
+        :param base: Power operation's base.
+        :type base: float
+        :param exponent: Power operation's exponent.
+        :type exponent: float
+        :return: Result of base to the power of exponent.
+        :rtype: float
+        """
+
+        return math.pow(base, exponent)
+
+
+class DecimalBackend(NumericBackend):
+    """
+    Numeric backend which calculates with decimal.Decimal, rounded to a
+    configurable amount of significant digits.
+    """
+
+    name = 'decimal'
+
+    def __init__(self, precision: int = general_utils.DECIMAL_PRECISION):
+        """
+        :param precision: Significant digits of results.
+        :type precision: int
+        """
+
+        self.context = decimal.Context(prec=precision)
+
+    def parse(self, text: str) -> decimal.Decimal:
+        """
+        :param text: Text of operand.
+        :type text: str
+        :return: Operand as a decimal (exact, not rounded).
+        :rtype: decimal.Decimal
+        :raises ValueError: If text is not a valid number.
+        """
+
+        try:
+            return decimal.Decimal(text)
+        except decimal.InvalidOperation:
+            raise ValueError(f"Invalid decimal: {text!r}")
+
+    def from_int(self, value: int) -> decimal.Decimal:
+        """
+        :param value: Integer to convert.
+        :type value: int
+        :return: Value as a decimal.
+        :rtype: decimal.Decimal
+        """
+
+        return decimal.Decimal(value)
+
+    def is_integer(self, number) -> bool:
+        """
+        :param number: Number to check.
+        :type number: decimal.Decimal or int
+        :return: Whether number is an integer.
+        :rtype: bool
+        """
+
+        if isinstance(number, int):
+            return True
+        return number == number.to_integral_value()
+
+    def power(self, base, exponent) -> decimal.Decimal:
+        """
+        :param base: Power operation's base.
+        :type base: decimal.Decimal or int
+        :param exponent: Power operation's exponent.
+        :type exponent: decimal.Decimal or int
+        :return: Result of base to the power of exponent.
+        :rtype: decimal.Decimal
+        :raises OverflowError: If result is out of backend's range.
+        """
+
+        if base == 0 and exponent == 0:
+            return decimal.Decimal(1)  # Decimal raises for 0 ** 0
+        try:
+            return decimal.Decimal(base) ** exponent
+        except decimal.Overflow:
+            raise OverflowError('math range error')
+
+    def modulo(self, dividend, divisor) -> decimal.Decimal:
+        """
+        Calculates dividend modulo divisor. Unlike Decimal's own modulo,
+        the result has the sign of the divisor (as with floats).
+
+        :param dividend: Operand to the left of modulo.
+        :type dividend: decimal.Decimal or int
+        :param divisor: Operand to the right of modulo.
+        :type divisor: decimal.Decimal or int
+        :return: Result of dividend modulo divisor.
+        :rtype: decimal.Decimal
+        :raises ZeroDivisionError: If divisor is zero.
+        """
+
+        if divisor == 0:
+            raise ZeroDivisionError('decimal modulo')
+        remainder = decimal.Decimal(dividend) % divisor
+        if remainder and (remainder < 0) != (divisor < 0):
+            remainder += divisor
+        return remainder
+
+    def to_string(self, number) -> str:
+        """
+        :param number: Number to convert.
+        :type number: decimal.Decimal or int
+        :return: Decimal representation of number (lower case 'e' marks an
+            exponent).
+        :rtype: str
+        """
+
+        return str(number).lower()
+
+    def activate(self):
+        """
+        :return: Context manager which makes this backend the active
+            backend, and its precision the decimal context's precision.
+        :rtype: BackendActivation
+        """
+
+        return BackendActivation(self, DecimalErrorContext(self.context))
+
+
+class DecimalErrorContext:
+    """
+    Context manager which makes a decimal context the current context, and
+    raises the decimal errors of calculations in it as OverflowError (as
+    floats do): with Overflow trapped, invalid operations are those whose
+    results exceed the context's precision, like modulo of a number too
+    large for its integer quotient.
+    """
+
+    __slots__ = ('_context', '_local_context')
+
+    def __init__(self, context: decimal.Context):
+        """
+        :param context: Decimal context to make the current context.
+        :type context: decimal.Context
+        """
+
+        self._context = context
+        self._local_context = None
+
+    def __enter__(self) -> decimal.Context:
+        self._local_context = decimal.localcontext(self._context)
+        return self._local_context.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._local_context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None and issubclass(
+                exc_type, (decimal.Overflow, decimal.InvalidOperation)):
+            raise OverflowError('math range error') from exc_value
+
+
+class FractionBackend(NumericBackend):
+    """
+    Numeric backend which calculates exact rationals with
+    fractions.Fraction. Powers with a non-integer exponent are irrational in
+    general, so they are calculated (and continue) as floats.
+    """
+
+    name = 'fraction'
+
+    def parse(self, text: str) -> Fraction:
+        """
+        :param text: Text of operand.
+        :type text: str
+        :return: Operand as a fraction.
+        :rtype: Fraction
+        :raises ValueError: If text is not a valid number.
+        """
+
+        return Fraction(text)
+
+    def from_int(self, value: int) -> Fraction:
+        """
+        :param value: Integer to convert.
+        :type value: int
+        :return: Value as a fraction.
+        :rtype: Fraction
+        """
+
+        return Fraction(value)
+
+    def is_integer(self, number) -> bool:
+        """
+        :param number: Number to check.
+        :type number: Fraction or int or float
+        :return: Whether number is an integer.
+        :rtype: bool
+        """
+
+        return number == int(number)
+
+    def power(self, base, exponent):
+        """
+        :param base: Power operation's base.
+        :type base: Fraction or int or float
+        :param exponent: Power operation's exponent.
+        :type exponent: Fraction or int or float
+        :return: Result of base to the power of exponent (a float if the
+            exponent is not an integer).
+        :rtype: Fraction or float
+        :raises OverflowError: If exact result would be larger than
+            FRACTION_MAX_POWER_BITS.
+        """
+
+        if not (isinstance(base, (Fraction, int))
+                and isinstance(exponent, (Fraction, int))
+                and self.is_integer(exponent)):
+            return math.pow(base, exponent)
+        base = Fraction(base)
+        exponent = int(exponent)
+        size = max(base.numerator.bit_length(),
+                   base.denominator.bit_length())
+        if abs(exponent) * size > general_utils.FRACTION_MAX_POWER_BITS:
+            raise OverflowError('math range error')
+        return base ** exponent
+
+    def to_string(self, number) -> str:
+        """
+        :param number: Number to convert.
+        :type number: Fraction or int or float
+        :return: Decimal representation of number (lower case 'e' marks an
+            exponent).
+        :rtype: str
+        """
+
+        if isinstance(number, Fraction):
+            number = float(number)
+        return str(number)
+
+
+class BackendActivation:
+    """
+    Context manager which makes a backend the active backend (and enters
+    an additional context manager the backend needs, if there is one).
+    """
+
+    __slots__ = ('_backend', '_context', '_token')
+
+    def __init__(self, backend: NumericBackend, context=None):
+        """
+        :param backend: Backend to activate.
+        :type backend: NumericBackend
+        :param context: Additional context manager to enter.
+        :type context: ContextManager
+        """
+
+        self._backend = backend
+        self._context = context
+        self._token = None
+
+    def __enter__(self) -> NumericBackend:
+        if self._context is not None:
+            self._context.__enter__()
+        self._token = _ACTIVE_BACKEND.set(self._backend)
+        return self._backend
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE_BACKEND.reset(self._token)
+        if self._context is not None:
+            self._context.__exit__(exc_type, exc_value, traceback)
+
+
+FLOAT_BACKEND = FloatBackend()
+FRACTION_BACKEND = FractionBackend()
+
+_ACTIVE_BACKEND = ContextVar('active_numeric_backend', default=FLOAT_BACKEND)
+
+
+def get_backend() -> NumericBackend:
+    """
+    :return: The active numeric backend (float backend if none was
+        activated).
+    :rtype: NumericBackend
+    """
+
+    return _ACTIVE_BACKEND.get()
+
+
+def create_backend(name: str,
+                   precision: int = general_utils.DECIMAL_PRECISION
+                   ) -> NumericBackend:
+    """
+    Creates a numeric backend by its name.
+
+    :param name: Name of backend: 'float', 'decimal' or 'fraction'.
+    :type name: str
+    :param precision: Significant digits of decimal backend.
+    :type precision: int
+    :return: Numeric backend.
+    :rtype: NumericBackend
+    :raises ValueError: If there is no backend by that name.
+    """
+
+    if name == FloatBackend.name:
+        return FLOAT_BACKEND
+    if name == DecimalBackend.name:
+        return DecimalBackend(precision)
+    if name == FractionBackend.name:
+        return FRACTION_BACKEND
+    raise ValueError(f"Unknown numeric backend: {name!r}")
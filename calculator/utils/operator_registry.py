@@ -2,9 +2,55 @@
 Module which maintains a dictionary which maps each operand symbol
 to its class.
 contains methods to ease the usage of the classes.
+The registry compiles its operators into an immutable dispatch table, which
+is rebuilt only when operators are registered with register_operator.
+Registration and rebuilding are serialized by a lock, so threads which share
+the registry always get a complete table.
+Only the calculator's registry (which owns the operator symbols the rest of
+the calculator validates input with) can register operators of new symbols.
 """
+import threading
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Callable, NamedTuple
+
+from calculator.logic.token_stream import KIND_SYMBOLS, get_symbol_kind
+from calculator.utils import general_utils, operator_utils
 from calculator.utils.operators import Add, Sub, Mul, Div, UMin, Pow, Mod, \
-    Max, Min, Avg, Neg, Fac, Sum
+    Max, Min, Avg, Neg, Fac, Sum, Operator, UnaryOperator, BinaryOperator
+
+# Symbols which are part of operands / parentheses, and can not be operators.
+RESERVED_SYMBOLS = ({str(i) for i in range(10)}
+                    | general_utils.EMPTY_CHARACTERS
+                    | {general_utils.DOT, general_utils.OPEN_BRACKETS,
+                       general_utils.CLOSE_BRACKETS,
+                       operator_utils.SIGN_MINUS_SYMBOL})
+
+
+class OperatorEntry(NamedTuple):
+    """
+    Compiled form of a single operator.
+    """
+
+    arity: int
+    fixity: str
+    precedence: int
+    solve: Callable
+
+
+class DispatchTable(NamedTuple):
+    """
+    Immutable dispatch table of all registered operators.
+    Besides mapping each symbol to its entry, the table keeps arity,
+    precedence and solve function of each operator in tuples indexed by
+    token kind (0 / None for kinds which are not operators), so the equation
+    solver can dispatch without looking symbols up.
+    """
+
+    by_symbol: MappingProxyType
+    arities: tuple
+    precedences: tuple
+    solvers: tuple
 
 
 class OperatorRegistry:
@@ -13,10 +59,16 @@ class OperatorRegistry:
     (Using Dictionaries). Separate dictionaries for unary / binary operators.
     """
 
-    def __init__(self):
+    def __init__(self, owns_symbols: bool = False):
         """
         Initialize the operator dictionaries (separated by unary /
         binary) with default binary and unary operators.
+
+        :param owns_symbols: Whether the registry owns the operator symbols
+            of the calculator, so registering an operator of a new symbol
+            makes it valid input (only the calculator's registry does).
+            Other registries can only register operators of known symbols.
+        :type owns_symbols: bool
         """
 
         self._left_unary_operators_funcs = {
@@ -38,6 +90,10 @@ class OperatorRegistry:
             '&': Min(),
             '@': Avg()
         }
+        self._owns_symbols = owns_symbols
+        self._version = 0
+        self._dispatch_table = None
+        self._lock = threading.Lock()
 
     def get_unary_operators(self) -> dict:
         """
@@ -51,35 +107,41 @@ class OperatorRegistry:
                              **self._right_unary_operators_funcs}
         return merged_unary_dict
 
-    def get_left_unary_operators(self) -> dict:
+    def get_left_unary_operators(self) -> 'OperatorsView':
         """
-        Get left unary operators dict which maps str symbol to class.
+        Get left unary operators view which maps str symbol to class. Setting
+        or deleting its items registers or unregisters operators.
 
-        :return: Left unary operators dict which maps str symbol to class.
-        :rtype: dict
+        :return: Left unary operators view which maps str symbol to class.
+        :rtype: OperatorsView
         """
 
-        return self._left_unary_operators_funcs
+        return OperatorsView(self, self._left_unary_operators_funcs,
+                             operator_utils.PREFIX_FIXITY)
 
-    def get_right_unary_operators(self) -> dict:
+    def get_right_unary_operators(self) -> 'OperatorsView':
         """
-        Get right unary operators dict which maps str symbol to class.
+        Get right unary operators view which maps str symbol to class. Setting
+        or deleting its items registers or unregisters operators.
 
-        :return: Right unary operators dict which maps str symbol to class.
-        :rtype: dict
+        :return: Right unary operators view which maps str symbol to class.
+        :rtype: OperatorsView
         """
 
-        return self._right_unary_operators_funcs
+        return OperatorsView(self, self._right_unary_operators_funcs,
+                             operator_utils.POSTFIX_FIXITY)
 
-    def get_binary_operators(self) -> dict:
+    def get_binary_operators(self) -> 'OperatorsView':
         """
-        Get binary operators dict which maps str symbol to class.
+        Get binary operators view which maps str symbol to class. Setting
+        or deleting its items registers or unregisters operators.
 
-        :return: Binary operators dict which maps str symbol to class.
-        :rtype: dict
+        :return: Binary operators view which maps str symbol to class.
+        :rtype: OperatorsView
         """
 
-        return self._binary_operators_funcs
+        return OperatorsView(self, self._binary_operators_funcs,
+                             operator_utils.INFIX_FIXITY)
 
     def get_all_operators(self) -> dict:
         """
@@ -102,12 +164,286 @@ class OperatorRegistry:
         :rtype: int or None
         """
 
-        if operator in self._left_unary_operators_funcs:
-            return self._left_unary_operators_funcs.get(
-                operator).get_precedence()
-        if operator in self._right_unary_operators_funcs:
-            return self._right_unary_operators_funcs.get(
-                operator).get_precedence()
-        if operator in self._binary_operators_funcs:
-            return self._binary_operators_funcs.get(operator).get_precedence()
-        return None
+        entry = self.get_dispatch_table().by_symbol.get(operator)
+        if entry is None:
+            return None
+        return entry.precedence
+
+    def get_version(self) -> int:
+        """
+        Get version of registry's contents. The version changes whenever an
+        operator is registered.
+
+        :return: Version of registry's contents.
+        :rtype: int
+        """
+
+        return self._version
+
+    def get_dispatch_table(self) -> DispatchTable:
+        """
+        Get the compiled dispatch table of registry's operators. The table
+        is built on first usage, and rebuilt only after an operator is
+        registered.
+
+        :return: Dispatch table of registry's operators.
+        :rtype: DispatchTable
+        """
+
+        dispatch_table = self._dispatch_table
+        if dispatch_table is None:
+            with self._lock:
+                # Another thread may have built it while this one waited.
+                if self._dispatch_table is None:
+                    self._dispatch_table = self._compile()
+                dispatch_table = self._dispatch_table
+        return dispatch_table
+
+    def register_operator(self, symbol: str, operator: Operator):
+        """
+        Registers an operator, replacing the operator of the same symbol if
+        there is one. The kind of operator (left unary / right unary /
+        binary) is taken from its class.
+        New symbols become valid input characters of the calculator, so
+        only a registry which owns the calculator's symbols can register
+        them.
+        Operators should be registered before threads start evaluating with
+        the registry: an evaluation which is running while an operator is
+        registered may see the symbols of the operator but not its entry.
+
+        :param symbol: Single-character symbol of operator.
+        :type symbol: str
+        :param operator: Operator to register.
+        :type operator: Operator
+        :raises TypeError: if operator is not a unary / binary operator.
+        :raises ValueError: if symbol can not be used as an operator, if
+            it is already used by an operator of another kind, or if it is a
+            new symbol and registry does not own the calculator's symbols.
+        """
+
+        fixity = _get_operator_fixity(operator)
+        if fixity == operator_utils.INFIX_FIXITY:
+            operators_funcs = self._binary_operators_funcs
+        elif fixity == operator_utils.PREFIX_FIXITY:
+            operators_funcs = self._left_unary_operators_funcs
+        else:
+            operators_funcs = self._right_unary_operators_funcs
+        if len(symbol) != 1 or symbol in RESERVED_SYMBOLS:
+            raise ValueError(f"{symbol!r} can not be used as an operator")
+        if (symbol in operator_utils.ALL_OPERATORS
+                and _get_fixity(symbol) != fixity):
+            raise ValueError(f"{symbol!r} is already a "
+                             f"{_get_fixity(symbol)} operator")
+        if (symbol not in operator_utils.ALL_OPERATORS
+                and not self._owns_symbols):
+            raise ValueError(f"{symbol!r} is not an operator symbol, and "
+                             f"only the calculator's registry can add "
+                             f"symbols")
+
+        with self._lock:
+            if self._owns_symbols:
+                _add_operator_symbol(symbol, fixity)
+            operators_funcs[symbol] = operator
+            self._version += 1
+            self._dispatch_table = None
+
+    def unregister_operator(self, symbol: str):
+        """
+        Removes the operator of a symbol. If registry owns the calculator's
+        symbols, symbol stops being a valid input character.
+
+        :param symbol: Symbol of operator.
+        :type symbol: str
+        :raises ValueError: if no operator of symbol is registered.
+        """
+
+        with self._lock:
+            for operators_funcs in (self._left_unary_operators_funcs,
+                                    self._right_unary_operators_funcs,
+                                    self._binary_operators_funcs):
+                if operators_funcs.pop(symbol, None) is not None:
+                    break
+            else:
+                raise ValueError(f"{symbol!r} is not a registered operator")
+            if self._owns_symbols:
+                _remove_operator_symbol(symbol)
+            self._version += 1
+            self._dispatch_table = None
+
+    def _compile(self) -> DispatchTable:
+        """
+        Compiles registry's operators into a dispatch table.
+
+        :return: Dispatch table of registry's operators.
+        :rtype: DispatchTable
+        """
+
+        by_symbol = {}
+        for operators_funcs, arity, fixity in (
+                (self._left_unary_operators_funcs, 1,
+                 operator_utils.PREFIX_FIXITY),
+                (self._right_unary_operators_funcs, 1,
+                 operator_utils.POSTFIX_FIXITY),
+                (self._binary_operators_funcs, 2,
+                 operator_utils.INFIX_FIXITY)):
+            for symbol, operator in operators_funcs.items():
+                get_symbol_kind(symbol)
+                by_symbol[symbol] = OperatorEntry(
+                    arity, fixity, operator.get_precedence(), operator.solve)
+
+        entries = [by_symbol.get(symbol) for symbol in KIND_SYMBOLS]
+        return DispatchTable(
+            by_symbol=MappingProxyType(by_symbol),
+            arities=tuple(entry.arity if entry else 0 for entry in entries),
+            precedences=tuple(entry.precedence if entry else None
+                              for entry in entries),
+            solvers=tuple(entry.solve if entry else None
+                          for entry in entries))
+
+
+class OperatorsView(MutableMapping):
+    """
+    Live view of a registry's operators of a single kind (left unary /
+    right unary / binary). Setting an item registers the operator, and
+    deleting one unregisters it, so the registry's version and dispatch
+    table follow every change made through the view.
+    """
+
+    __slots__ = ('_registry', '_operators_funcs', '_fixity')
+
+    def __init__(self, registry: OperatorRegistry, operators_funcs: dict,
+                 fixity: str):
+        """
+        :param registry: Registry of the operators.
+        :type registry: OperatorRegistry
+        :param operators_funcs: Registry's dict of operators of the kind.
+        :type operators_funcs: dict
+        :param fixity: Fixity of the kind of operators.
+        :type fixity: str
+        """
+
+        self._registry = registry
+        self._operators_funcs = operators_funcs
+        self._fixity = fixity
+
+    def __getitem__(self, symbol: str) -> Operator:
+        return self._operators_funcs[symbol]
+
+    def __setitem__(self, symbol: str, operator: Operator):
+        """
+        Registers operator.
+
+        :raises TypeError: if operator is not a unary / binary operator.
+        :raises ValueError: if operator is of another kind than the view's,
+            or if registry can not register it (see register_operator).
+        """
+
+        fixity = _get_operator_fixity(operator)
+        if fixity != self._fixity:
+            raise ValueError(f"Operator of {symbol!r} must be a "
+                             f"{self._fixity} operator, got a {fixity} "
+                             f"operator")
+        self._registry.register_operator(symbol, operator)
+
+    def __delitem__(self, symbol: str):
+        """
+        Unregisters the operator of symbol.
+
+        :raises KeyError: if symbol has no operator of the view's kind.
+        """
+
+        if symbol not in self._operators_funcs:
+            raise KeyError(symbol)
+        self._registry.unregister_operator(symbol)
+
+    def __iter__(self):
+        return iter(self._operators_funcs)
+
+    def __len__(self) -> int:
+        return len(self._operators_funcs)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._operators_funcs!r})'
+
+
+def _get_operator_fixity(operator: Operator) -> str:
+    """
+    :param operator: Operator.
+    :type operator: Operator
+    :return: Fixity of operator, from its class.
+    :rtype: str
+    :raises TypeError: if operator is not a unary / binary operator.
+    """
+
+    if isinstance(operator, BinaryOperator):
+        return operator_utils.INFIX_FIXITY
+    if isinstance(operator, UnaryOperator):
+        if operator.is_left():
+            return operator_utils.PREFIX_FIXITY
+        return operator_utils.POSTFIX_FIXITY
+    raise TypeError(f"Operator must be a UnaryOperator or a "
+                    f"BinaryOperator, got {type(operator).__name__}")
+
+
+def _get_fixity(symbol: str) -> str:
+    """
+    :param symbol: Symbol of a known operator.
+    :type symbol: str
+    :return: Fixity of operator.
+    :rtype: str
+    """
+
+    if symbol in operator_utils.LEFT_UNARY_OPERATORS:
+        return operator_utils.PREFIX_FIXITY
+    if symbol in operator_utils.RIGHT_UNARY_OPERATORS:
+        return operator_utils.POSTFIX_FIXITY
+    return operator_utils.INFIX_FIXITY
+
+
+def _add_operator_symbol(symbol: str, fixity: str):
+    """
+    Adds a new symbol to the operator sets which the rest of the calculator
+    validates input with.
+
+    :param symbol: Symbol of operator.
+    :type symbol: str
+    :param fixity: Fixity of operator.
+    :type fixity: str
+    """
+
+    if symbol in operator_utils.ALL_OPERATORS:
+        return
+    if fixity == operator_utils.PREFIX_FIXITY:
+        operator_utils.LEFT_UNARY_OPERATORS.add(symbol)
+        operator_utils.ALL_UNARY_OPERATORS.add(symbol)
+    elif fixity == operator_utils.POSTFIX_FIXITY:
+        operator_utils.RIGHT_UNARY_OPERATORS.add(symbol)
+        operator_utils.ALL_UNARY_OPERATORS.add(symbol)
+        operator_utils.ALLOWED_BEFORE_RIGHT_UNARY.add(symbol)
+        operator_utils.ALLOWED_AFTER_RIGHT_UNARY.add(symbol)
+    else:
+        operator_utils.BINARY_OPERATORS.add(symbol)
+        operator_utils.ALLOWED_AFTER_RIGHT_UNARY.add(symbol)
+    operator_utils.ALL_OPERATORS.add(symbol)
+    general_utils.VALID_INPUT_CHARACTERS.add(symbol)
+    get_symbol_kind(symbol)
+
+
+def _remove_operator_symbol(symbol: str):
+    """
+    Removes a symbol from the operator sets which the rest of the calculator
+    validates input with.
+
+    :param symbol: Symbol of operator.
+    :type symbol: str
+    """
+
+    for symbols in (operator_utils.LEFT_UNARY_OPERATORS,
+                    operator_utils.RIGHT_UNARY_OPERATORS,
+                    operator_utils.ALL_UNARY_OPERATORS,
+                    operator_utils.BINARY_OPERATORS,
+                    operator_utils.ALLOWED_BEFORE_RIGHT_UNARY,
+                    operator_utils.ALLOWED_AFTER_RIGHT_UNARY,
+                    operator_utils.ALL_OPERATORS,
+                    general_utils.VALID_INPUT_CHARACTERS):
+        symbols.discard(symbol)
@@ -28,6 +28,15 @@ BINARY_OPERATORS = {ADD_SYMBOL, SUB_SYMBOL, MUL_SYMBOL, DIV_SYMBOL, POW_SYMBOL,
                     MOD_SYMBOL, MAX_SYMBOL, MIN_SYMBOL, AVG_SYMBOL}
 ALL_UNARY_OPERATORS = LEFT_UNARY_OPERATORS | RIGHT_UNARY_OPERATORS
 ALL_OPERATORS = ALL_UNARY_OPERATORS | BINARY_OPERATORS
+# Binary operators whose result does not depend on the order of operands.
+# Max and min are not: of equal operands (6 and 6.0, 0 and -0.0) they return
+# the first one, which shows in results.
+COMMUTATIVE_OPERATORS = {ADD_SYMBOL, MUL_SYMBOL, AVG_SYMBOL}
+
+# Fixity of operators (where operator is placed relative to its operands)
+PREFIX_FIXITY = 'prefix'  # Left unary operators.
+POSTFIX_FIXITY = 'postfix'  # Right unary operators.
+INFIX_FIXITY = 'infix'  # Binary operators.
 
 
 ALLOWED_BEFORE_RIGHT_UNARY = (
@@ -39,3 +48,7 @@ ALLOWED_AFTER_RIGHT_UNARY = (RIGHT_UNARY_OPERATORS.union(BINARY_OPERATORS)
                              .union({')'}))
 
 FACTORIAL_MAX_OPERAND = 170  # Max operand allowed in factorial operation.
+
+FACTORIAL_EXACT_MAX_OPERAND = 1000  # Default max operand of exact factorial.
+
+FACTORIAL_MEMO_SIZE = 64  # Max amount of memoized exact factorials.
@@ -6,14 +6,16 @@ Unary operators only got is_left method which returns bool True if
 the operand is left-sided, False otherwise
 """
 
-import math
 from abc import ABC, abstractmethod
 
 from calculator.logic.exceptions import NegativeFactorialError, \
     NegativeSumError, LargeSumError, LargeFactorialError, \
     NonIntFactorialError, NegativeRootError, ZeroBaseNegExError, \
     DivisionByZeroError, ModuloByZeroError
-from calculator.utils import general_utils, operator_utils
+from calculator.utils import general_utils
+from calculator.utils.factorial_engine import FactorialEngine, \
+    TableFactorialEngine
+from calculator.utils.numeric_backend import get_backend
 
 
 class Operator(ABC):
@@ -29,6 +31,17 @@ class Operator(ABC):
 
         pass
 
+    def get_semantic_key(self) -> str:
+        """
+        Method returns key of operator's configuration, which changes
+        whenever the configuration changes operator's results.
+
+        :return: Key of operator's configuration, empty by default.
+        :rtype: str
+        """
+
+        return ''
+
 
 class UnaryOperator(Operator):
     """
@@ -163,11 +176,12 @@ class Pow(BinaryOperator):
         :rtype: float
         """
 
+        backend = get_backend()
         if operand1 == 0 and operand2 < 0:
             raise ZeroBaseNegExError(operand2)
-        if operand1 < 0 and not operand2.is_integer():
+        if operand1 < 0 and not backend.is_integer(operand2):
             raise NegativeRootError(operand1, operand2)
-        return math.pow(operand1, operand2)
+        return backend.power(operand1, operand2)
 
 
 class Mod(BinaryOperator):
@@ -193,7 +207,7 @@ class Mod(BinaryOperator):
         """
 
         try:
-            return operand1 % operand2
+            return get_backend().modulo(operand1, operand2)
         except ZeroDivisionError:
             raise ModuloByZeroError(operand1)
 
@@ -300,6 +314,18 @@ class Neg(UnaryOperator):
 
 
 class Fac(UnaryOperator):
+    def __init__(self, engine: FactorialEngine = None):
+        """
+        :param engine: Engine which calculates factorials. Defaults to a
+            table engine, limited to operands whose factorial fits in a
+            float. An ExactFactorialEngine lifts that limit.
+        :type engine: FactorialEngine
+        """
+
+        if engine is None:
+            engine = TableFactorialEngine()
+        self._engine = engine
+
     def get_precedence(self) -> int:
         """
         :return: Operator's precedence.
@@ -308,6 +334,15 @@ class Fac(UnaryOperator):
 
         return 7
 
+    def get_semantic_key(self) -> str:
+        """
+        :return: Key of factorial engine's class and max operand.
+        :rtype: str
+        """
+
+        return (f'{type(self._engine).__qualname__}'
+                f'({self._engine.max_operand})')
+
     def is_left(self) -> bool:
         """
         :return: If unary operator is a left operator.
@@ -333,14 +368,11 @@ class Fac(UnaryOperator):
 
         if operand < 0:
             raise NegativeFactorialError(operand)
-        if operand > operator_utils.FACTORIAL_MAX_OPERAND:
+        if operand > self._engine.max_operand:
             raise LargeFactorialError(operand)
-        if not operand.is_integer():
+        if not get_backend().is_integer(operand):
             raise NonIntFactorialError(operand)
-        result = 1
-        for index in range(1, int(operand) + 1):
-            result = result * index
-        return result
+        return self._engine.factorial(int(operand))
 
 
 class Sum(UnaryOperator):
@@ -372,14 +404,16 @@ class Sum(UnaryOperator):
         :raises LargeSumError: if operand is too large.
         """
 
+        backend = get_backend()
         if operand < 0:
             raise NegativeSumError(operand)
-        if 'e' in str(operand):
+        operand_as_str = backend.to_string(operand)
+        if 'e' in operand_as_str:
             raise LargeSumError(operand)
-        operand_as_str = str(operand).replace(general_utils.DOT,
-                                              general_utils.EMPTY_STR)
+        operand_as_str = operand_as_str.replace(general_utils.DOT,
+                                                general_utils.EMPTY_STR)
         result = 0.0
 
         for char in operand_as_str:
             result += float(char)
-        return result
+        return backend.from_int(int(result))
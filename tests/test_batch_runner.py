@@ -0,0 +1,131 @@
+"""
+Module for testing batch mode using pytest
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+from calculator.batch_runner import BatchRunner, describe_evaluation, \
+    open_batch_input
+from calculator.calculator_factory import create_calculator_core
+from calculator.calculator_core import CalculatorCore
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+from calculator.parallel_evaluator import ParallelEvaluator
+from calculator.utils.numeric_backend import FRACTION_BACKEND
+
+
+def test_batch_records():
+    calculator_core = CalculatorCore(
+        message_handler=None,
+        input_handler=None,
+        string_preprocessor=ArithmeticStringPreprocessor(),
+        string_processor=ArithmeticStringProcessor(),
+        tokenizer=ArithmeticTokenizer(),
+        token_processor=ArithmeticTokenProcessor()
+    )
+    output_stream = io.StringIO()
+    batch_runner = BatchRunner(calculator_core, output_stream, flush_size=2)
+    count = batch_runner.run(io.StringIO("1+2\r\n5/0\n  \n6!\n"))
+
+    records = [json.loads(line)
+               for line in output_stream.getvalue().splitlines()]
+    assert count == 4
+    assert records == [
+        {'index': 0, 'result': 3},
+        {'index': 1, 'error': 'DivisionByZeroError',
+         'message': "Error! Can't divide operand 5.0 by zero"},
+        {'index': 2, 'error': 'EmptyEquationError',
+         'message': 'Nothing To Calculate!'},
+        {'index': 3, 'result': 720},
+    ]
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("2^(3!^7)", 'OverflowError'),
+    ("2^6000*2^6000*2^6000", 'ValueError'),  # Too long to convert.
+    ("*".join(["170!"] * 20), 'ValueError'),  # An exact integer.
+])
+def test_unprintable_results_are_errors(expression, error):
+    calculator_core = create_calculator_core(
+        numeric_backend=FRACTION_BACKEND)
+    assert describe_evaluation(calculator_core.evaluate,
+                               expression)['error'] == error
+
+
+def test_results_out_of_range_are_errors():
+    output_stream = io.StringIO()
+    BatchRunner(create_calculator_core(), output_stream).run(
+        io.StringIO("99^99*99^99\n(99^99*99^99)-(99^99*99^99)\n"))
+    records = [json.loads(line)
+               for line in output_stream.getvalue().splitlines()]
+    assert records == [
+        {'index': index, 'error': 'OverflowError',
+         'message': "Error! result is out of calculator's range"}
+        for index in range(2)]
+
+
+def test_input_which_is_not_utf8_is_evaluated(tmp_path):
+    path = tmp_path / "expressions.txt"
+    path.write_bytes(b"1+\xff2\n3\n")
+    output_stream = io.StringIO()
+    with open_batch_input(str(path)) as input_stream:
+        BatchRunner(create_calculator_core(), output_stream).run(
+            input_stream)
+    records = [json.loads(line)
+               for line in output_stream.getvalue().splitlines()]
+    assert records[0]['error'] == 'InvalidInputError'
+    assert records[1] == {'index': 1, 'result': 3}
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_records(ordered):
+    expressions = [f"{index}*2" for index in range(50)] + ["5/0", "abc"]
+    parallel_evaluator = ParallelEvaluator(workers=2, chunk_size=7,
+                                           ordered=ordered)
+    records = list(parallel_evaluator.evaluate(expressions))
+    if ordered:
+        assert [record['index'] for record in records] == list(range(52))
+    records.sort(key=lambda record: record['index'])
+    assert [record['result'] for record in records[:50]] == [
+        index * 2 for index in range(50)]
+    assert records[50]['error'] == 'DivisionByZeroError'
+    assert records[51]['error'] == 'InvalidInputError'
+
+
+class CrashingCore:
+    """
+    Core of a worker which dies when it evaluates "crash".
+    """
+
+    result_store = None
+
+    def __init__(self):
+        self._calculator_core = create_calculator_core()
+
+    def evaluate(self, expression):
+        if expression == "crash":
+            os._exit(1)
+        return self._calculator_core.evaluate(expression)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_crashed_worker_fails_only_its_chunk(ordered):
+    expressions = [f"{index}*2" for index in range(60)]
+    expressions[3] = "crash"
+    parallel_evaluator = ParallelEvaluator(workers=2, chunk_size=5,
+                                           ordered=ordered,
+                                           core_factory=CrashingCore)
+    records = sorted(parallel_evaluator.evaluate(expressions),
+                     key=lambda record: record['index'])
+    assert [record['index'] for record in records] == list(range(60))
+    failed = [record['index'] for record in records if 'error' in record]
+    assert failed == list(range(5))
+    assert records[0]['error'] == 'BrokenProcessPool'
+    assert all(record['result'] == record['index'] * 2
+               for record in records if 'result' in record)
@@ -0,0 +1,37 @@
+"""
+Module for testing the stage benchmark suite's generators and baseline
+comparison using pytest
+"""
+
+import pytest
+
+from benchmarks.bench_stages import MIXES, generate_expression, compare
+from calculator.calculator_factory import create_calculator_core
+
+
+@pytest.mark.parametrize("mix", list(MIXES))
+def test_generated_expressions_are_valid(mix):
+    calculator_core = create_calculator_core()
+    for size in [10, 1_000]:
+        result = calculator_core.evaluate(generate_expression(mix, size))
+        assert abs(result) < float('inf')
+
+
+def create_results(stages, size='1000'):
+    return {'results': {'additive': {size: {'tokens': int(size),
+                                             'stages': stages}}}}
+
+
+def test_compare_finds_regressions():
+    baseline = create_results({'tokenizer': 100.0, 'scanner': 100.0})
+    results = create_results({'tokenizer': 140.0, 'scanner': 160.0,
+                              'new_stage': 1000.0})
+    assert compare(results, baseline, threshold=0.5) == [
+        ('additive', 1000, 'scanner', 100.0, 160.0)]
+
+
+def test_compare_skips_small_and_missing_sizes():
+    baseline = create_results({'tokenizer': 100.0}, size='10')
+    results = create_results({'tokenizer': 1000.0}, size='10')
+    assert compare(results, baseline, min_size=100) == []
+    assert compare(create_results({'tokenizer': 1000.0}), baseline) == []
@@ -0,0 +1,95 @@
+"""
+Module for testing the expression canonicalizer using pytest
+"""
+
+import random
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.canonicalizer import ArithmeticCanonicalizer
+from calculator.logic.equation_solver import EquationSolver
+from calculator.utils.numeric_backend import DecimalBackend
+
+CALCULATOR_CORE = create_calculator_core()
+CANONICALIZER = ArithmeticCanonicalizer()
+
+
+def canonicalize(expression, backend=None):
+    with (backend or CALCULATOR_CORE.numeric_backend).activate():
+        return CANONICALIZER.canonicalize(
+            EquationSolver(CALCULATOR_CORE.process(expression)).compile())
+
+
+@pytest.mark.parametrize("expression, equivalent", [
+    ("2+3", " 3 + 2"),
+    ("--5", "5"),
+    ("-(-(5))", "05."),
+    ("((2+3))*(4)", "4*(3+2)"),
+    ("2*-3", "-(3)*2"),
+    ("(1@2.5)!", "(2.5@1)!"),
+    ("~2+(3^2)%4", "(3^2)%4+~2"),
+])
+def test_equivalent_expressions(expression, equivalent):
+    canonical_form = canonicalize(expression)
+    equivalent_form = canonicalize(equivalent)
+    assert canonical_form == equivalent_form
+    assert canonical_form.hash == equivalent_form.hash < 1 << 64
+
+
+@pytest.mark.parametrize("expression, other", [
+    ("2-3", "3-2"),
+    ("3!$6", "6$3!"),  # Max of equal operands returns the first one.
+    ("1+2+3", "1+(2+3)"),  # Float addition is not associative.
+    ("-(0)", "0"),
+    ("2^3", "3^2"),
+])
+def test_different_expressions(expression, other):
+    assert canonicalize(expression) != canonicalize(other)
+
+
+def test_decimal_operands_keep_their_exponent():
+    backend = DecimalBackend(5)
+    assert canonicalize("2.0+3", backend) == canonicalize("3+2.0", backend)
+    assert canonicalize("2.0+3", backend) != canonicalize("2+3", backend)
+
+
+def test_equal_forms_have_equal_results():
+    generator = random.Random(0)
+
+    def generate(depth):
+        if depth == 0 or generator.random() < 0.3:
+            return str(generator.choice([0, 1, 2.5, 3, 0.1, 7]))
+        operator = generator.choice('+*@-/^$&%')
+        return f"({generate(depth - 1)}){operator}({generate(depth - 1)})"
+
+    def rewrite(expression):
+        if generator.random() < 0.5:
+            expression = f" ( {expression} ) "
+        if generator.random() < 0.5:
+            expression = f"(-(-({expression})))"
+        return expression
+
+    for _ in range(300):
+        left, right = generate(3), generate(3)
+        operator = generator.choice('+*@')
+        expression = f"({left}){operator}({right})"
+        equivalent = f"({rewrite(right)}){operator}({rewrite(left)})"
+        assert canonicalize(expression) == canonicalize(equivalent)
+        try:
+            result = repr(CALCULATOR_CORE.evaluate(expression))
+        except Exception:
+            result = None  # Which error depends on the order of operands.
+        try:
+            equivalent_result = repr(CALCULATOR_CORE.evaluate(equivalent))
+        except Exception:
+            equivalent_result = None
+        assert result == equivalent_result
+
+
+@pytest.mark.parametrize("expression", ["(1..2)+3", "(1)(2)"])
+def test_invalid_expressions_have_no_form(expression):
+    try:
+        assert canonicalize(expression) is None
+    except Exception:
+        pass  # Rejected while processing, before canonicalization.
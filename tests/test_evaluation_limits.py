@@ -0,0 +1,122 @@
+"""
+Module for testing evaluation limits using pytest
+"""
+
+import itertools
+import pickle
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.exceptions import DivisionByZeroError, \
+    EvaluationLimitError
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tree_compiler import PythonTreeCompiler
+from calculator.utils import evaluation_limits
+from calculator.utils.evaluation_limits import EvaluationLimits, get_budget
+from calculator.utils.numeric_backend import FRACTION_BACKEND
+
+
+def evaluate_limited(expression, **limits):
+    return create_calculator_core(
+        limits=EvaluationLimits(**limits)).evaluate(expression)
+
+
+@pytest.mark.parametrize("expression, limits, limit", [
+    ("1+2+3", {'max_tokens': 4}, 'tokens'),
+    ("((1)+2)", {'max_depth': 1}, 'depth'),
+    ("1+2*3-4", {'max_operations': 2}, 'operations'),
+    ("1" + "+1" * 10_000, {'deadline': 0}, 'deadline'),
+])
+def test_exceeded_limit_is_reported(expression, limits, limit):
+    with pytest.raises(EvaluationLimitError) as error_info:
+        evaluate_limited(expression, **limits)
+    assert error_info.value.limit == limit
+
+
+@pytest.mark.parametrize("expression, limits, result", [
+    ("1+2+3", {'max_tokens': 5}, 6),
+    ("((1)+2)", {'max_depth': 2}, 3),
+    ("1+2*3-4", {'max_operations': 3}, 3),
+    ("1+2*3-4", {'deadline': 10.0}, 3),
+])
+def test_expressions_within_limits(expression, limits, result):
+    assert evaluate_limited(expression, **limits) == result
+
+
+def test_error_message():
+    assert str(EvaluationLimitError('operations', 10)) == (
+        "Error! Evaluation exceeded its operations limit (10)")
+
+
+def test_cached_expressions_spend_their_operations():
+    calculator_core = create_calculator_core(
+        limits=EvaluationLimits(max_operations=5))
+    assert calculator_core.evaluate("(1+2) @ (3+4) $ (1/3)") == 5
+    # Folded when it was compiled, so it has no operations left.
+    calculator_core.limits = EvaluationLimits(max_operations=0)
+    assert calculator_core.evaluate("(1+2) @ (3+4) $ (1/3)") == 5
+
+
+def test_compiled_trees_spend_their_operations():
+    calculator_core = create_calculator_core(
+        limits=EvaluationLimits(max_operations=3))
+    for _ in range(100):  # Cached, then compiled once it is hot.
+        with pytest.raises(DivisionByZeroError):
+            calculator_core.evaluate("2+(1/0)")
+    calculator_core.limits = EvaluationLimits(max_operations=1)
+    with pytest.raises(EvaluationLimitError):
+        calculator_core.evaluate("2+(1/0)")
+
+
+def test_deadline_is_checked_before_every_operation(monkeypatch):
+    # Every reading of the clock is a second later than the previous one.
+    monkeypatch.setattr(evaluation_limits.time, 'perf_counter',
+                        itertools.count().__next__)
+    expression = "+".join(["1"] * 200)
+    with pytest.raises(EvaluationLimitError):
+        evaluate_limited(expression, deadline=50)
+    tree = ExpressionTree.from_postfix(EquationSolver(
+        ArithmeticTokenProcessor().process(
+            ArithmeticScanner().scan(expression))).compile(), fold=False)
+    for evaluate in (tree.evaluate, PythonTreeCompiler().compile(tree)):
+        with EvaluationLimits(deadline=50).activate():
+            with pytest.raises(EvaluationLimitError):
+                evaluate()
+
+
+def test_solver_spends_operations_of_invalid_trees():
+    with pytest.raises(EvaluationLimitError):
+        evaluate_limited("(1)(2)+3+4", max_operations=2)
+
+
+def test_limits_apply_to_other_backends():
+    calculator_core = create_calculator_core(
+        limits=EvaluationLimits(max_operations=1))
+    with pytest.raises(EvaluationLimitError):
+        calculator_core.evaluate("1/3+1/3", FRACTION_BACKEND)
+
+
+def test_incremental_evaluator_is_not_used_with_limits():
+    calculator_core = create_calculator_core(
+        incremental=True, limits=EvaluationLimits(max_operations=1))
+    with pytest.raises(EvaluationLimitError):
+        calculator_core.evaluate("(1+2)*(3+4)")
+    assert calculator_core.incremental_evaluator.full_parses == 0
+
+
+def test_budget_is_only_active_during_evaluation():
+    calculator_core = create_calculator_core(
+        limits=EvaluationLimits(max_tokens=1))
+    with pytest.raises(EvaluationLimitError):
+        calculator_core.evaluate("1+2")
+    assert get_budget() is None
+
+
+def test_limits_are_picklable():
+    limits = pickle.loads(pickle.dumps(EvaluationLimits(1.5, 10, 2, 5)))
+    assert (limits.deadline, limits.max_tokens, limits.max_depth,
+            limits.max_operations) == (1.5, 10, 2, 5)
@@ -0,0 +1,109 @@
+"""
+Module for testing the asyncio evaluation server using pytest
+"""
+
+import asyncio
+import functools
+import json
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.evaluation_server import EvaluationServer
+from calculator.utils.numeric_backend import FLOAT_BACKEND, \
+    FRACTION_BACKEND
+
+
+async def exchange(port: int, lines: list) -> list:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(''.join(line + '\n' for line in lines).encode())
+    await writer.drain()
+    writer.write_eof()
+    responses = [json.loads(line) async for line in reader]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def run_with_server(client, **server_options):
+    async def run():
+        evaluation_server = EvaluationServer(workers=1, **server_options)
+        await evaluation_server.start('127.0.0.1', 0)
+        try:
+            return (await client(evaluation_server.get_port()),
+                    evaluation_server._executor is not None)
+        finally:
+            await evaluation_server.close()
+
+    return asyncio.run(run())
+
+
+def test_pipelined_requests_are_answered_in_order():
+    requests = [json.dumps({'id': index, 'expression': f"{index}*2"})
+                for index in range(300)]
+    responses, _ = run_with_server(lambda port: exchange(port, requests),
+                                max_pending=16)
+    assert responses == [{'id': index, 'result': index * 2}
+                         for index in range(300)]
+
+
+def test_errors_and_invalid_requests():
+    requests = ['{"id": "a", "expression": "5/0"}', 'not json', '[1]',
+                '', '{"id": 2}', '[' * 100000, '{"expression": "2^3"}']
+    responses, _ = run_with_server(lambda port: exchange(port, requests))
+    assert responses[0]['id'] == 'a'
+    assert responses[0]['error'] == 'DivisionByZeroError'
+    assert [response['error'] for response in responses[1:5]] == [
+        'InvalidRequestError'] * 4
+    assert responses[5] == {'id': None, 'result': 8}
+
+
+def test_non_finite_numbers_are_not_written():
+    requests = ['{"id": 0, "expression": "99^99*99^99"}',
+                '{"id": NaN, "expression": "1"}']
+    responses, _ = run_with_server(lambda port: exchange(port, requests))
+    assert responses == [
+        {'id': 0, 'error': 'OverflowError',
+         'message': "Error! result is out of calculator's range"},
+        {'id': None, 'error': 'InvalidRequestError',
+         'message': 'Request must not contain NaN'}]
+
+
+def test_long_expressions_are_offloaded_in_order():
+    long_expression = '+'.join(['1'] * 100)
+    requests = [json.dumps({'id': 0, 'expression': long_expression}),
+                json.dumps({'id': 1, 'expression': '1+1'}),
+                json.dumps({'id': 2, 'expression': long_expression + '/0'})]
+    responses, _ = run_with_server(lambda port: exchange(port, requests),
+                                offload_size=50)
+    assert responses[:2] == [{'id': 0, 'result': 100}, {'id': 1, 'result': 2}]
+    assert responses[2]['error'] == 'DivisionByZeroError'
+
+
+def test_concurrent_connections():
+    async def client(port):
+        return await asyncio.gather(*(
+            exchange(port, [json.dumps({'id': connection,
+                                        'expression': f"{connection}+1"})])
+            for connection in range(20)))
+
+    responses, _ = run_with_server(client)
+    assert [response[0]['result'] for response in responses] == [
+        connection + 1 for connection in range(20)]
+
+
+@pytest.mark.parametrize("backend, expression, is_offloaded", [
+    (FLOAT_BACKEND, "2^10+5!", False),
+    (FLOAT_BACKEND, "*".join(["170!"] * 64), True),
+    (FRACTION_BACKEND, "2+5!", False),
+    (FRACTION_BACKEND, "2^10", True),
+])
+def test_costly_expressions_are_offloaded(backend, expression,
+                                          is_offloaded):
+    requests = [json.dumps({'id': 0, 'expression': expression})]
+    responses, offloaded = run_with_server(
+        lambda port: exchange(port, requests),
+        core_factory=functools.partial(create_calculator_core,
+                                       numeric_backend=backend))
+    assert 'error' in responses[0] or 'result' in responses[0]
+    assert offloaded == is_offloaded
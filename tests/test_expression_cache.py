@@ -0,0 +1,78 @@
+"""
+Module for testing the compiled-expression cache using pytest
+"""
+
+import pytest
+
+from calculator.calculator_core import CalculatorCore
+from calculator.logic.exceptions import DivisionByZeroError
+from calculator.logic.expression_cache import LRUExpressionCache, \
+    CompiledExpression, make_key
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+from calculator.utils.operator_registry import OperatorRegistry
+from calculator.utils.operators import Add
+
+
+def create_calculator_core(expression_cache):
+    return CalculatorCore(
+        message_handler=None,
+        input_handler=None,
+        string_preprocessor=ArithmeticStringPreprocessor(),
+        string_processor=ArithmeticStringProcessor(),
+        tokenizer=ArithmeticTokenizer(),
+        token_processor=ArithmeticTokenProcessor(),
+        expression_cache=expression_cache
+    )
+
+
+@pytest.mark.parametrize("expression, expected_result", [
+    ("30.1+4.43", 34.53),
+    ("007^(2+--3!)#*123-99.5", 709070423.5),
+    ("(1 + 2) * 2$ 12.34#-90.51+~17", -77.51),
+])
+def test_cached_results(expression, expected_result):
+    cache = LRUExpressionCache(OperatorRegistry())
+    calculator_core = create_calculator_core(cache)
+    assert calculator_core.evaluate(expression) == expected_result
+    assert calculator_core.evaluate(
+        expression.replace('+', ' + ')) == expected_result
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_cached_errors_are_raised_again():
+    calculator_core = create_calculator_core(
+        LRUExpressionCache(OperatorRegistry()))
+    for _ in range(2):
+        with pytest.raises(DivisionByZeroError):
+            calculator_core.evaluate("5/(3-3)")
+
+
+def test_capacity_eviction():
+    cache = LRUExpressionCache(OperatorRegistry(), capacity=2)
+    for key in ("1", "2", "3"):
+        cache.put(key, CompiledExpression((key,)))
+    assert cache.get("1") is None
+    assert cache.get("3") is not None
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_size_eviction():
+    cache = LRUExpressionCache(OperatorRegistry(), max_size=10)
+    cache.put("1+2", CompiledExpression(("1", "2", "+")))
+    cache.put("3+4", CompiledExpression(("3", "4", "+")))
+    assert cache.get("1+2") is None
+    cache.put("12345678+9", CompiledExpression(("12345678", "9", "+")))
+    assert cache.get_stats()['entries'] == 1
+
+
+def test_registry_change_invalidates_cache():
+    registry = OperatorRegistry()
+    cache = LRUExpressionCache(registry)
+    cache.put(make_key("1 + 2"), CompiledExpression(("1", "2", "+")))
+    assert cache.get("1+2") is not None
+    registry.get_binary_operators()['+'] = Add()
+    assert cache.get("1+2") is None
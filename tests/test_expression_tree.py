@@ -0,0 +1,58 @@
+"""
+Module for testing the optimized expression tree using pytest
+"""
+
+import pytest
+
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.exceptions import DivisionByZeroError, \
+    OperatorUsageError, WrongParenthesesUsageError
+from calculator.logic.expression_tree import ExpressionTree, ConstantNode
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+
+
+def build_tree(expression):
+    tokens = ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+    return ExpressionTree.from_postfix(EquationSolver(tokens).compile())
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("(3!^2)@(3!^2)", 36),
+    ("2+3*4-~5", 19),
+    ("-(2^3)!#", -9),
+    ("5$3&4%3", 1),
+    ("0*2", 0),
+])
+def test_tree_is_folded(expression, expected):
+    tree = build_tree(expression)
+    assert isinstance(tree.root, ConstantNode)
+    assert len(tree) == 1
+    assert tree.evaluate() == expected
+
+
+def test_identical_subexpressions_are_shared():
+    tree = build_tree("(1/0)+(2!)+(2!)")
+    # Folding stops at 1/0, so '/', '!' and both '+' are left to solve,
+    # and the second 2! is the same node as the first one.
+    assert len(tree.operations) == 4
+    assert tree.operations[2].operands[1] is tree.operations[3].operands[1]
+    with pytest.raises(DivisionByZeroError):
+        tree.evaluate()
+
+
+@pytest.mark.parametrize("tokens, error", [
+    (['1', '+'], OperatorUsageError),
+    (['(', '1', ')', '(', '2', ')'], WrongParenthesesUsageError),
+])
+def test_invalid_tree_is_solved_as_postfix(tokens, error):
+    tree = ExpressionTree.from_postfix(EquationSolver(tokens).compile())
+    assert tree.root is None
+    with pytest.raises(error):
+        tree.evaluate()
+
+
+def test_deep_expression():
+    tree = build_tree("+".join(["1"] * 100_000))
+    assert tree.evaluate() == 100_000
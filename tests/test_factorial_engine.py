@@ -0,0 +1,36 @@
+"""
+Module for testing the factorial engines using pytest
+"""
+
+import math
+
+import pytest
+
+from calculator.logic.exceptions import LargeFactorialError
+from calculator.utils.factorial_engine import FACTORIAL_TABLE, \
+    TableFactorialEngine, ExactFactorialEngine
+from calculator.utils.operators import Fac
+
+
+def test_factorial_table():
+    assert FACTORIAL_TABLE == tuple(math.factorial(n) for n in range(171))
+    assert TableFactorialEngine().factorial(170) == math.factorial(170)
+
+
+@pytest.mark.parametrize("operands", [
+    [171, 500, 1000],
+    [1000, 500, 300, 999],
+    [0, 5, 170, 10_000, 9_999],
+])
+def test_exact_factorial(operands):
+    engine = ExactFactorialEngine(max_operand=10_000, memo_size=2)
+    for operand in operands:
+        assert engine.factorial(operand) == math.factorial(operand)
+
+
+def test_fac_limits():
+    with pytest.raises(LargeFactorialError):
+        Fac().solve(171.0)
+    assert Fac(ExactFactorialEngine()).solve(171.0) == math.factorial(171)
+    with pytest.raises(LargeFactorialError):
+        Fac(ExactFactorialEngine(max_operand=200)).solve(201.0)
@@ -0,0 +1,89 @@
+"""
+Module for testing the incremental evaluator using pytest
+"""
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.exceptions import DivisionByZeroError, \
+    MultipleDotsOperandError, OperatorUsageError
+from calculator.logic.incremental_evaluator import \
+    ArithmeticIncrementalEvaluator
+
+
+def evaluate_all(calculator_core, expressions):
+    outcomes = []
+    for expression in expressions:
+        try:
+            outcomes.append(repr(calculator_core.evaluate(expression)))
+        except Exception as error:
+            outcomes.append(f"{type(error).__name__}: {error}")
+    return outcomes
+
+
+@pytest.mark.parametrize("expressions", [
+    ["1+(2*(3-4))", "1+(2*(3-5))", "1+(2*( 3 -15))", "1+(2*(3-1.5))"],
+    ["2*-3+(4^2)", "2*-30+(4^2)", "2*-.5+(4^2)", "2*- 0+(4^2)"],
+    ["(2)*(3)+(4)", "(2)*(3)+(0)", "(2)*(3)/(0)", "(2)*(3)+(1..2)"],
+    ["2 (+3)", "2 (+4)", "2 (4)", "5!", "5!+(1)", "(1+2)!-3#"],
+    ["1/(2-3)", "1/(2-2)", "1/(2-1)", "1/(2-1)", "(~0)", "(~0)+1"],
+])
+def test_results_match_core(expressions):
+    assert (evaluate_all(create_calculator_core(incremental=True),
+                         expressions)
+            == evaluate_all(create_calculator_core(), expressions))
+
+
+def test_edited_operand_solves_only_its_spans():
+    calculator_core = create_calculator_core(incremental=True)
+    evaluator = calculator_core.incremental_evaluator
+    expression = "+".join(f"({index}*({index}+1))" for index in range(100))
+    calculator_core.evaluate(expression)
+    solved_spans = evaluator.solved_spans
+    assert calculator_core.evaluate(
+        expression.replace("(50+1)", "(50+2)")) == sum(
+        index * (index + 1) for index in range(100)) + 50
+    # The operand's span, the span which contains it and the whole
+    # expression.
+    assert evaluator.solved_spans - solved_spans == 3
+    assert evaluator.incremental_updates == 1
+
+
+def test_spans_are_memoized_by_text():
+    calculator_core = create_calculator_core(incremental=True)
+    evaluator = calculator_core.incremental_evaluator
+    calculator_core.evaluate("(1+2)*(3+4)")
+    solved_spans = evaluator.solved_spans
+    assert calculator_core.evaluate("(3+4)-( 1 + 2 )") == 4
+    assert evaluator.solved_spans - solved_spans == 1
+    assert evaluator.full_parses == 2
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("(1+2)*(3/0)", DivisionByZeroError),
+    ("(1+2)*(3/)", OperatorUsageError),
+    ("(1.2.3)", MultipleDotsOperandError),
+])
+def test_errors_of_pipeline(expression, error):
+    calculator_core = create_calculator_core(incremental=True)
+    calculator_core.evaluate("(1+2)*(3/4)")
+    with pytest.raises(error):
+        calculator_core.evaluate(expression)
+
+
+def test_deep_nesting():
+    calculator_core = create_calculator_core(incremental=True)
+    expression = "(" * 3000 + "1+2" + ")" * 3000
+    assert calculator_core.evaluate(expression) == 3
+    assert calculator_core.evaluate(expression.replace("2", "5")) == 6
+    assert calculator_core.incremental_evaluator.incremental_updates == 1
+
+
+def test_memo_is_cleared_when_full():
+    calculator_core = create_calculator_core()
+    evaluator = ArithmeticIncrementalEvaluator(max_spans=2)
+    calculator_core.incremental_evaluator = evaluator
+    assert calculator_core.evaluate("(1)+(2)+(3)") == 6
+    assert calculator_core.evaluate("(1)+(2)+(4)") == 7
+    assert evaluator.full_parses == 2
+    assert evaluator.incremental_updates == 0
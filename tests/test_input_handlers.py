@@ -0,0 +1,73 @@
+"""
+Module for testing the bulk input handlers using pytest
+"""
+
+import io
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.interaction.input_handler import BlockInputHandler, \
+    MappedFileInputHandler, split_blocks
+from calculator.interaction.message_handler import BufferedMessageHandler
+from calculator.utils import general_utils
+
+DATA = "1+2\r\n3.5é\n\n 4 * 5\r\n~6".encode('utf-8')
+LINES = ["1+2", "3.5é", "", " 4 * 5", "~6"]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 1 << 20])
+def test_block_handler_lines(block_size):
+    input_handler = BlockInputHandler(io.BytesIO(DATA), block_size)
+    assert list(input_handler.lines()) == LINES
+    input_handler = BlockInputHandler(io.BytesIO(DATA + b"\n"), block_size)
+    assert list(input_handler.lines()) == LINES
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 1 << 20])
+def test_mapped_file_handler_lines_and_views(tmp_path, block_size):
+    path = tmp_path / "expressions.txt"
+    path.write_bytes(DATA)
+    with MappedFileInputHandler(str(path), block_size) as input_handler:
+        assert list(input_handler.lines()) == LINES
+        assert [bytes(view) for view in input_handler.views()] == [
+            line.encode('utf-8') for line in LINES]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    with MappedFileInputHandler(str(path)) as input_handler:
+        assert list(input_handler.lines()) == []
+        assert list(input_handler.views()) == []
+        assert input_handler.get_input() == general_utils.QUIT_STR
+
+
+def test_lines_split_across_blocks_keep_characters():
+    blocks = [b"1+", b"2\n\xc3", b"\xa9\r", b"\n3"]
+    assert [line for lines in split_blocks(blocks) for line in lines] == [
+        "1+2", "é", "3"]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 1 << 20])
+def test_lone_carriage_returns_end_lines(block_size):
+    data = b"4\rfoo\r\n\r5\r"
+    input_handler = BlockInputHandler(io.BytesIO(data), block_size)
+    assert list(input_handler.lines()) == data.decode().splitlines()
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 1 << 20])
+def test_bytes_which_are_not_utf8_are_replaced(block_size):
+    input_handler = BlockInputHandler(io.BytesIO(b"1+\xff2\n3\xc3"),
+                                      block_size)
+    assert list(input_handler.lines()) == ["1+\ufffd2", "3\ufffd"]
+
+
+def test_piped_input_runs_until_it_ends():
+    output_stream = io.StringIO()
+    calculator_core = create_calculator_core(
+        message_handler=BufferedMessageHandler(output_stream),
+        input_handler=BlockInputHandler(io.BytesIO(b"1+2\n1/0\n(2)!"), 4))
+    calculator_core.run()
+    assert output_stream.getvalue() == (
+        "3.0\nError! Can't divide operand 1.0 by zero\n2\n")
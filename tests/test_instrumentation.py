@@ -0,0 +1,88 @@
+"""
+Module for testing the stage instrumentation of CalculatorCore using pytest
+"""
+
+import io
+import json
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.instrumentation import StageStatistics
+from calculator.logic.exceptions import DivisionByZeroError, \
+    InvalidInputError
+
+
+def test_stages_are_recorded():
+    statistics = StageStatistics()
+    calculator_core = create_calculator_core(instrumentation=statistics)
+    assert calculator_core.evaluate("1+2*3") == 7
+    stats = statistics.get_stats()
+    assert list(stats) == ['scanner', 'token_processor', 'infix_to_postfix',
+                           'tree_build', 'evaluation']
+    assert stats['scanner']['size'] == 5
+    assert stats['token_processor']['size'] == 5
+    assert all(stage['calls'] == 1 for stage in stats.values())
+    assert all(stage['p50_ns'] >= stage['mean_ns'] // 2
+               for stage in stats.values())
+
+
+def test_cache_hits_record_only_evaluation():
+    statistics = StageStatistics()
+    calculator_core = create_calculator_core(instrumentation=statistics)
+    calculator_core.evaluate("2^3")
+    calculator_core.evaluate("2^3")
+    stats = statistics.get_stats()
+    assert stats['scanner']['calls'] == 1
+    assert stats['evaluation']['calls'] == 2
+    assert sum(stats['evaluation']['histogram'].values()) == 2
+
+
+def test_separate_stages_are_recorded():
+    statistics = StageStatistics()
+    calculator_core = create_calculator_core(instrumentation=statistics)
+    calculator_core.scanner = None
+    calculator_core.expression_cache = None
+    assert calculator_core.evaluate(" 4 - 1 ") == 3
+    assert list(statistics.get_stats())[:3] == [
+        'preprocessor', 'string_processor', 'tokenizer']
+
+
+def test_errors_are_counted_by_stage():
+    statistics = StageStatistics()
+    calculator_core = create_calculator_core(instrumentation=statistics)
+    with pytest.raises(InvalidInputError):
+        calculator_core.evaluate("1+a")
+    with pytest.raises(DivisionByZeroError):
+        calculator_core.evaluate("1/0")
+    stats = statistics.get_stats()
+    assert stats['scanner']['errors'] == {'InvalidInputError': 1}
+    assert stats['scanner']['calls'] == 1
+    assert stats['evaluation']['errors'] == {'DivisionByZeroError': 1}
+    assert stats['evaluation']['calls'] == 0
+
+
+def test_error_time_is_not_in_mean_of_calls():
+    statistics = StageStatistics()
+    statistics.on_stage('evaluation', 100, 3)
+    statistics.on_error('evaluation', 1_000_000, DivisionByZeroError(1))
+    stats = statistics.get_stats()['evaluation']
+    assert (stats['calls'], stats['total_ns'], stats['mean_ns']) == (
+        1, 100, 100)
+    assert stats['error_ns'] == 1_000_000
+    assert stats['errors'] == {'DivisionByZeroError': 1}
+
+
+def test_dump_and_clear():
+    statistics = StageStatistics()
+    statistics.on_stage('scanner', 100, 3)
+    statistics.on_stage('scanner', 300, 5)
+    stream = io.StringIO()
+    statistics.dump(stream)
+    dumped = json.loads(stream.getvalue())
+    assert dumped['scanner']['histogram'] == {'128': 1, '512': 1}
+    assert dumped['scanner']['mean_ns'] == 200
+    assert dumped['scanner']['p99_ns'] == 512
+    assert 'scanner' in statistics.format_report()
+    statistics.clear()
+    assert statistics.get_stats() == {}
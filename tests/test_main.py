@@ -0,0 +1,61 @@
+"""
+Module for testing the one-shot evaluation mode of the main module using
+pytest
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_startup import FORBIDDEN_MODULES, run_once
+
+
+def run_main(*arguments):
+    return subprocess.run([sys.executable, '-m', 'calculator.main',
+                           *arguments], capture_output=True, text=True)
+
+
+@pytest.mark.parametrize("arguments, output", [
+    (["--eval", "2*(3+4)"], "14.0\n"),
+    (["--eval", "1/3", "--backend", "fraction"], "1/3\n"),
+    (["--eval", "5!"], "120\n"),
+])
+def test_eval_writes_result(arguments, output):
+    process = run_main(*arguments)
+    assert process.returncode == 0
+    assert process.stdout == output
+    assert process.stderr == ""
+
+
+def test_eval_writes_error():
+    process = run_main("--eval", "1/0")
+    assert process.returncode == 1
+    assert process.stdout == ""
+    assert process.stderr == "Error! Can't divide operand 1.0 by zero\n"
+
+
+def test_eval_writes_formatting_error():
+    process = run_main("--eval", "2^6000*2^6000*2^6000", "--backend",
+                       "fraction")
+    assert process.returncode == 1
+    assert process.stdout == ""
+    assert "integer string conversion" in process.stderr
+
+
+def test_eval_does_not_import_other_modes():
+    _, imports = run_once("1+2")
+    imported = {name for name, _, _, _ in imports}
+    assert imported.isdisjoint(FORBIDDEN_MODULES)
+    assert 'calculator.calculator_factory' in imported
+
+
+@pytest.mark.parametrize("arguments, error", [
+    (["--workers", "-1"], "--workers: must be at least 0, got -1"),
+    (["--workers", "two"], "--workers: invalid integer: 'two'"),
+    (["--chunk-size", "0"], "--chunk-size: must be at least 1, got 0"),
+])
+def test_invalid_counts_are_rejected(arguments, error):
+    process = run_main("--batch", "-", *arguments)
+    assert process.returncode == 2
+    assert process.stderr.endswith(error + "\n")
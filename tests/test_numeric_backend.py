@@ -0,0 +1,74 @@
+"""
+Module for testing the numeric backends using pytest
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.exceptions import DivisionByZeroError, \
+    ModuloByZeroError, NegativeRootError
+from calculator.utils.numeric_backend import FLOAT_BACKEND, \
+    FRACTION_BACKEND, DecimalBackend, get_backend
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("0.1+0.2", Decimal("0.3")),
+    ("1/3", Decimal("0.33333")),
+    ("~7%3", Decimal("2")),
+    ("7%~3", Decimal("-2")),
+    ("2^10", Decimal("1024")),
+    ("4^0.5", Decimal("2")),
+    ("5!#", Decimal("3")),
+    ("0^0", Decimal("1")),
+])
+def test_decimal_backend(expression, expected):
+    calculator_core = create_calculator_core(
+        numeric_backend=DecimalBackend(precision=5))
+    assert calculator_core.evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("0.1+0.2", Fraction(3, 10)),
+    ("1/3*3", 1),
+    ("(2/3)^~2", Fraction(9, 4)),
+    ("~7%3", 2),
+    ("(1/3)@(1/6)", Fraction(1, 4)),
+])
+def test_fraction_backend(expression, expected):
+    calculator_core = create_calculator_core(
+        numeric_backend=FRACTION_BACKEND)
+    assert calculator_core.evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected_exception", [
+    ("1/0", DivisionByZeroError),
+    ("0/0", DivisionByZeroError),
+    ("1%0", ModuloByZeroError),
+    ("~8^0.5", NegativeRootError),
+    ("(10^999999)*10", OverflowError),
+])
+@pytest.mark.parametrize("backend", [FLOAT_BACKEND, FRACTION_BACKEND,
+                                     DecimalBackend()])
+def test_backend_errors(backend, expression, expected_exception):
+    with pytest.raises(expected_exception):
+        create_calculator_core(numeric_backend=backend).evaluate(expression)
+
+
+def test_decimal_errors_are_overflow_errors():
+    calculator_core = create_calculator_core(
+        numeric_backend=DecimalBackend(precision=5))
+    with pytest.raises(OverflowError):
+        calculator_core.evaluate("(2^0.5)%(10^~9)")
+    assert calculator_core.evaluate("1/3") == Decimal("0.33333")
+
+
+def test_backend_per_call():
+    calculator_core = create_calculator_core()
+    assert calculator_core.evaluate("0.1+0.2") == 0.1 + 0.2
+    assert calculator_core.evaluate("0.1+0.2", FRACTION_BACKEND) == \
+        Fraction(3, 10)
+    assert calculator_core.evaluate("0.1+0.2") == 0.1 + 0.2
+    assert get_backend() is FLOAT_BACKEND
@@ -0,0 +1,148 @@
+"""
+Module for testing the operator registry and its dispatch table using pytest
+"""
+
+import math
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.exceptions import InvalidInputError, \
+    OperatorUsageError
+from calculator.logic.token_stream import SYMBOL_KINDS, get_symbol_kind
+from calculator.utils import general_utils, operator_utils
+from calculator.utils.operator_registry import OperatorRegistry
+from calculator.utils.operators import Add, Neg, BinaryOperator, \
+    UnaryOperator
+
+
+class Hypot(BinaryOperator):
+    def get_precedence(self) -> int:
+        return 2
+
+    def solve(self, operand1: float, operand2: float) -> float:
+        return math.hypot(operand1, operand2)
+
+
+class Double(UnaryOperator):
+    def get_precedence(self) -> int:
+        return 6
+
+    def is_left(self) -> bool:
+        return False
+
+    def solve(self, operand: float) -> float:
+        return operand * 2
+
+
+def test_dispatch_table_is_built_once():
+    registry = OperatorRegistry()
+    dispatch_table = registry.get_dispatch_table()
+    assert registry.get_dispatch_table() is dispatch_table
+    entry = dispatch_table.by_symbol['!']
+    assert (entry.arity, entry.fixity, entry.precedence) == \
+        (1, operator_utils.POSTFIX_FIXITY, 7)
+    assert dispatch_table.precedences[SYMBOL_KINDS['^']] == 4
+    assert dispatch_table.arities[SYMBOL_KINDS['(']] == 0
+    with pytest.raises(TypeError):
+        dispatch_table.by_symbol['!'] = entry
+
+
+def test_register_rebuilds_dispatch_table():
+    registry = OperatorRegistry()
+    dispatch_table = registry.get_dispatch_table()
+    version = registry.get_version()
+    registry.register_operator('+', Add())
+    assert registry.get_version() != version
+    assert registry.get_dispatch_table() is not dispatch_table
+
+
+def test_operator_views_register_changes():
+    registry = OperatorRegistry()
+    binary_operators = registry.get_binary_operators()
+    dispatch_table = registry.get_dispatch_table()
+    binary_operators['*'] = Hypot()
+    assert registry.get_dispatch_table().by_symbol['*'].precedence == 2
+    assert registry.get_dispatch_table() is not dispatch_table
+    with pytest.raises(ValueError):
+        registry.get_right_unary_operators()['~'] = Neg()
+    del registry.get_left_unary_operators()['~']
+    assert '~' not in registry.get_dispatch_table().by_symbol
+    with pytest.raises(KeyError):
+        del binary_operators['!']
+    assert set(binary_operators) == set(
+        OperatorRegistry().get_binary_operators())
+
+
+@pytest.mark.parametrize("symbol, operator", [
+    ('1', Hypot()),
+    ('(', Hypot()),
+    ('ab', Hypot()),
+    ('~', Hypot()),  # Already a left unary operator.
+    ('+', Neg()),  # Already a binary operator.
+])
+def test_register_invalid_symbol(symbol, operator):
+    with pytest.raises(ValueError):
+        OperatorRegistry().register_operator(symbol, operator)
+
+
+def test_only_calculator_registry_adds_symbols():
+    registry = OperatorRegistry()
+    with pytest.raises(ValueError):
+        registry.register_operator('|', Hypot())
+    assert '|' not in operator_utils.ALL_OPERATORS
+    with pytest.raises(InvalidInputError):
+        create_calculator_core().evaluate("3|4")
+
+
+def test_symbol_without_operator_is_an_error(monkeypatch):
+    # A symbol which the input is validated with, but has no operator.
+    get_symbol_kind('|')
+    for name in ('BINARY_OPERATORS', 'ALL_OPERATORS',
+                 'ALLOWED_AFTER_RIGHT_UNARY'):
+        monkeypatch.setattr(operator_utils, name,
+                            getattr(operator_utils, name) | {'|'})
+    monkeypatch.setattr(general_utils, 'VALID_INPUT_CHARACTERS',
+                        general_utils.VALID_INPUT_CHARACTERS | {'|'})
+    with pytest.raises(OperatorUsageError):
+        create_calculator_core().evaluate("3|4")
+
+
+def test_register_non_operator():
+    with pytest.raises(TypeError):
+        OperatorRegistry().register_operator('|', math.hypot)
+
+
+@pytest.fixture
+def registered_operators():
+    # Operators of the calculator's registry change its grammar, so they
+    # are removed again after the test.
+    OPERATOR_REGISTRY.register_operator('|', Hypot())
+    OPERATOR_REGISTRY.register_operator('?', Double())
+    yield
+    OPERATOR_REGISTRY.unregister_operator('|')
+    OPERATOR_REGISTRY.unregister_operator('?')
+
+
+def test_unregistered_symbols_are_invalid():
+    calculator_core = create_calculator_core()
+    with pytest.raises(InvalidInputError):
+        calculator_core.evaluate("3|4")
+
+
+def test_registered_operators_are_evaluated(registered_operators):
+    calculator_core = create_calculator_core()
+    assert calculator_core.evaluate("3|4") == 5
+    assert calculator_core.evaluate("1+3|4?") == 1 + math.hypot(3, 8)
+    assert calculator_core.evaluate("(2?)?") == 8
+
+
+def test_unregister_restores_grammar(registered_operators):
+    OPERATOR_REGISTRY.unregister_operator('?')
+    assert '?' not in operator_utils.ALL_OPERATORS
+    with pytest.raises(InvalidInputError):
+        create_calculator_core().evaluate("2?")
+    with pytest.raises(ValueError):
+        OPERATOR_REGISTRY.unregister_operator('?')
+    OPERATOR_REGISTRY.register_operator('?', Double())  # For the teardown.
@@ -0,0 +1,82 @@
+"""
+Module for testing the result formatter and the buffered message handler
+using pytest
+"""
+
+import io
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.interaction.input_handler import BlockInputHandler
+from calculator.interaction.message_handler import BufferedMessageHandler
+from calculator.interaction.result_formatter import NumericResultFormatter
+from calculator.utils.numeric_backend import FRACTION_BACKEND
+
+RESULTS = [3.0, -3.0, 0.1 + 0.2, 1e16, 1e-07, -0.0, float('inf'), 120,
+           Decimal('1.2345678'), Fraction(1, 3), "Nothing to calculate."]
+
+
+def test_default_formatting_is_str():
+    formatter = NumericResultFormatter()
+    assert formatter.format_all(RESULTS) == [str(result)
+                                            for result in RESULTS]
+    assert [formatter.format(result) for result in RESULTS] == [
+        str(result) for result in RESULTS]
+
+
+@pytest.mark.parametrize("digits, integers, expected", [
+    (None, True, ['3', '-3', '0.30000000000000004', '1e+16', '1e-07', '-0',
+                  'inf', '120', '1.2345678', '1/3']),
+    (4, False, ['3.0', '-3.0', '0.3', '1e+16', '1e-07', '-0.0', 'inf',
+                '120', '1.235', '1/3']),
+    (4, True, ['3', '-3', '0.3', '1e+16', '1e-07', '-0', 'inf', '120',
+               '1.235', '1/3']),
+])
+def test_digits_and_integers(digits, integers, expected):
+    formatter = NumericResultFormatter(digits, integers)
+    assert formatter.format_all(RESULTS[:-1]) == expected
+    assert formatter.format_all(RESULTS[:7]) == expected[:7]  # In bulk
+    assert [formatter.format(result)
+            for result in RESULTS[:-1]] == expected
+
+
+def test_buffered_handler_writes_in_blocks_and_keeps_order():
+    stream = io.StringIO()
+    message_handler = BufferedMessageHandler(stream, block_lines=3)
+    message_handler.display_input_message()
+    message_handler.display_result(1.0)
+    message_handler.display_result(2.5)
+    assert stream.getvalue() == ""
+    message_handler.display_error_message("Error!")
+    assert stream.getvalue() == "1.0\n2.5\nError!\n"
+    message_handler.display_result(4.0)
+    message_handler.display_quit_message()
+    assert stream.getvalue() == "1.0\n2.5\nError!\n4.0\n"
+
+
+def test_piped_input_runs_until_it_ends():
+    output_stream = io.StringIO()
+    calculator_core = create_calculator_core(
+        message_handler=BufferedMessageHandler(
+            output_stream, NumericResultFormatter(integers=True)),
+        input_handler=BlockInputHandler(io.BytesIO(b"1+2\r\n1/0\n  \n2^.5")))
+    calculator_core.run()
+    assert output_stream.getvalue() == (
+        "3\nError! Can't divide operand 1.0 by zero\nNothing To Calculate!\n"
+        "1.4142135623730951\n")
+
+
+def test_unprintable_results_are_errors():
+    output_stream = io.StringIO()
+    calculator_core = create_calculator_core(
+        message_handler=BufferedMessageHandler(output_stream),
+        input_handler=BlockInputHandler(
+            io.BytesIO(b"1+1\n2^6000*2^6000*2^6000\n3")),
+        numeric_backend=FRACTION_BACKEND)
+    calculator_core.run()
+    lines = output_stream.getvalue().splitlines()
+    assert lines[::2] == ["2", "3"]
+    assert "integer string conversion" in lines[1]
@@ -0,0 +1,140 @@
+"""
+Module for testing evaluation from several threads at once using pytest
+"""
+
+import math
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.exceptions import EvaluationLimitError
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.reentrant_evaluator import ReentrantEvaluator, evaluate, \
+    get_default_evaluator
+from calculator.utils.evaluation_limits import EvaluationLimits
+from calculator.utils.factorial_engine import ExactFactorialEngine
+from calculator.utils.numeric_backend import DecimalBackend
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads as often as possible, so calls interleave.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(switch_interval)
+
+
+def generate_corpus(size: int, seed: int = 0) -> list:
+    generator = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        terms = [f"{generator.choice(['', '-', '--', '~'])}"
+                 f"({generator.randint(0, 9)}{generator.choice('+-*/^%')}"
+                 f"{generator.randint(0, 9)}){generator.choice(['', '!'])}"
+                 for _ in range(generator.randint(1, 8))]
+        corpus.append(generator.choice('+*@$&').join(terms))
+    return corpus
+
+
+def describe(function, expression):
+    try:
+        return repr(function(expression))
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+
+def describe_all_in_threads(function, expressions):
+    with ThreadPoolExecutor(THREADS) as executor:
+        return list(executor.map(lambda expression: describe(function,
+                                                             expression),
+                                 expressions))
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_threads_match_sequential_core(cached):
+    corpus = generate_corpus(2000) * 2  # Cached expressions are reused.
+    calculator_core = create_calculator_core()
+    expected = [describe(calculator_core.evaluate, expression)
+                for expression in corpus]
+    evaluator = ReentrantEvaluator(cached=cached)
+    assert describe_all_in_threads(evaluator.evaluate, corpus) == expected
+
+
+def test_default_evaluator_is_shared():
+    evaluators = describe_all_in_threads(
+        lambda _: id(get_default_evaluator()), range(100))
+    assert len(set(evaluators)) == 1
+    assert evaluate("2^10") == 1024
+
+
+def test_decimal_backend_in_threads():
+    backend = DecimalBackend(6)
+    evaluator = ReentrantEvaluator(numeric_backend=backend)
+    corpus = [f"1/{index}" for index in range(1, 500)]
+    calculator_core = create_calculator_core(numeric_backend=backend)
+    assert describe_all_in_threads(evaluator.evaluate, corpus) \
+        == [describe(calculator_core.evaluate, expression)
+            for expression in corpus]
+
+
+def test_every_call_gets_its_own_budget():
+    evaluator = ReentrantEvaluator(limits=EvaluationLimits(max_operations=5),
+                                   cached=False)
+    corpus = ["1+2", "+".join(["(1/3)"] * 20)] * 200
+    outcomes = describe_all_in_threads(evaluator.evaluate, corpus)
+    assert outcomes[::2] == ['3.0'] * 200
+    assert all(outcome.startswith(EvaluationLimitError.__name__)
+               for outcome in outcomes[1::2])
+
+
+def test_stages_are_reentrant():
+    corpus = generate_corpus(500)
+    scanner = ArithmeticScanner()
+    token_processor = ArithmeticTokenProcessor()
+    string_preprocessor = ArithmeticStringPreprocessor()
+    string_processor = ArithmeticStringProcessor()
+
+    def process(expression):
+        string_preprocessor.preprocess(expression)
+        return (string_processor.process(expression),
+                token_processor.process(scanner.scan(expression)))
+
+    expected = [repr(process(expression)) for expression in corpus]
+    assert describe_all_in_threads(process, corpus) == expected
+
+
+def test_factorial_memo_is_shared_safely():
+    engine = ExactFactorialEngine(memo_size=4)
+    operands = [random.Random(index).randint(171, 600)
+                for index in range(300)]
+    assert describe_all_in_threads(engine.factorial, operands) \
+        == [repr(math.factorial(operand)) for operand in operands]
+
+
+def test_dispatch_table_is_built_once():
+    tables = describe_all_in_threads(
+        lambda _: id(OPERATOR_REGISTRY.get_dispatch_table()), range(100))
+    assert len(set(tables)) == 1
+
+
+def test_threads_finish_without_deadlock():
+    evaluator = ReentrantEvaluator()
+    threads = [threading.Thread(target=lambda: [
+        evaluator.evaluate(expression) for expression in ("1+1", "2*3")
+        for _ in range(200)]) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
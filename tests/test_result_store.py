@@ -0,0 +1,140 @@
+"""
+Module for testing the persistent result store using pytest
+"""
+
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.equation_solver import OPERATOR_REGISTRY
+from calculator.logic.exceptions import DivisionByZeroError, \
+    EvaluationLimitError
+from calculator.logic.result_store import SQLiteResultStore
+from calculator.utils.evaluation_limits import EvaluationLimits
+from calculator.utils.factorial_engine import ExactFactorialEngine
+from calculator.utils.numeric_backend import FLOAT_BACKEND, DecimalBackend
+from calculator.utils.operator_registry import OperatorRegistry
+from calculator.utils.operators import Add, Fac
+
+
+class Concat(Add):
+    def solve(self, operand1: float, operand2: float) -> float:
+        return float(f"{operand1:g}{operand2:g}")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.db")
+
+
+def evaluate_run(path, expressions, backend=FLOAT_BACKEND, **kwargs):
+    with SQLiteResultStore(path, OPERATOR_REGISTRY, backend,
+                           **kwargs) as result_store:
+        calculator_core = create_calculator_core(numeric_backend=backend,
+                                                 result_store=result_store)
+        outcomes = []
+        for expression in expressions:
+            try:
+                outcomes.append(calculator_core.evaluate(expression))
+            except Exception as error:
+                outcomes.append(type(error).__name__ + ": " + str(error))
+        return outcomes, result_store.get_stats()
+
+
+def test_outcomes_are_shared_across_runs(path):
+    expressions = ["1+2", "2 ^ .5", "1/0", "(1", "1+2"]
+    outcomes, stats = evaluate_run(path, expressions)
+    assert stats['hits'] == 1
+    assert outcomes[2] == "DivisionByZeroError: " + str(
+        DivisionByZeroError(1.0))
+    second_outcomes, stats = evaluate_run(path, expressions)
+    assert second_outcomes == outcomes
+    assert (stats['hits'], stats['misses']) == (5, 0)
+    with SQLiteResultStore(path, OPERATOR_REGISTRY,
+                           FLOAT_BACKEND) as result_store:
+        with pytest.raises(DivisionByZeroError):
+            result_store.get("=1/0").get_result()
+
+
+def test_limit_errors_are_not_stored(path):
+    with SQLiteResultStore(path, OPERATOR_REGISTRY,
+                           FLOAT_BACKEND) as result_store:
+        calculator_core = create_calculator_core(
+            limits=EvaluationLimits(max_tokens=3), result_store=result_store)
+        with pytest.raises(EvaluationLimitError):
+            calculator_core.evaluate("1+2+3")
+        calculator_core.limits = None
+        assert calculator_core.evaluate("1+2+3") == 6
+
+
+def test_least_recently_used_are_evicted(path):
+    with SQLiteResultStore(path, max_entries=2,
+                           batch_size=1) as result_store:
+        result_store.put_result("1", 1.0)
+        result_store.put_result("2", 2.0)
+        assert result_store.get("1").get_result() == 1.0
+        result_store.put_result("3", 3.0)
+        assert result_store.evictions == 1
+    with SQLiteResultStore(path) as result_store:
+        assert result_store.get("2") is None
+        assert [result_store.get(key).get_result()
+                for key in ("1", "3")] == [1.0, 3.0]
+
+
+def test_equivalent_expressions_share_results(path):
+    outcomes, stats = evaluate_run(path, ["2*(3+4)", "(1/0)+(2/0)"])
+    assert stats['hits'] == 0
+    second_outcomes, stats = evaluate_run(
+        path, [" (4 + 3) * 2", "-(-2)*(4+3)", "(2/0)+(1/0)"])
+    assert second_outcomes[:2] == outcomes[:1] * 2
+    assert stats['hits'] == 2
+    # Errors are not shared, since their messages depend on the order.
+    assert second_outcomes[2] != outcomes[1]
+
+
+def test_backend_change_discards_outcomes(path):
+    evaluate_run(path, ["1/3"])
+    outcomes, stats = evaluate_run(path, ["1/3"], DecimalBackend(5))
+    assert outcomes == [Decimal("0.33333")]
+    assert stats['hits'] == 0
+    assert evaluate_run(path, ["1/3"], DecimalBackend(5))[1]['hits'] == 1
+
+
+def test_registry_change_discards_outcomes(path):
+    registry = OperatorRegistry()
+    result_store = SQLiteResultStore(path, registry, FLOAT_BACKEND)
+    result_store.put_result("1+2", 3.0)
+    assert result_store.get("1+2").get_result() == 3.0
+    registry.register_operator('+', Concat())
+    assert result_store.get("1+2") is None
+    result_store.close()
+
+
+def test_operator_configuration_change_discards_outcomes(path):
+    for max_operand, hits in ((1000, 0), (1000, 1), (5000, 0)):
+        registry = OperatorRegistry()
+        registry.register_operator(
+            '!', Fac(ExactFactorialEngine(max_operand=max_operand)))
+        with SQLiteResultStore(path, registry,
+                               FLOAT_BACKEND) as result_store:
+            if result_store.get("3!") is None:
+                result_store.put_result("3!", 6.0)
+            assert result_store.get_stats()['hits'] == hits
+
+
+def test_store_is_picklable(path):
+    evaluate_run(path, ["6!"])
+    result_store = pickle.loads(pickle.dumps(
+        SQLiteResultStore(path, OPERATOR_REGISTRY, FLOAT_BACKEND)))
+    with result_store:
+        assert result_store.get("=6!").get_result() == 720
+
+
+def test_positional_errors_keep_their_indexes(path):
+    expressions = ["9 (", "9  (", "9(", "9  ("]
+    outcomes, _ = evaluate_run(path, expressions)
+    assert [outcome[-1] for outcome in outcomes] == ['2', '3', '1', '3']
+    second_outcomes, _ = evaluate_run(path, expressions[::-1])
+    assert second_outcomes == outcomes[::-1]
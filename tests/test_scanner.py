@@ -0,0 +1,56 @@
+"""
+Module for testing the single-pass scanner using pytest
+"""
+
+import random
+
+import pytest
+
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.string_preprocessor import ArithmeticStringPreprocessor
+from calculator.logic.string_processor import ArithmeticStringProcessor
+from calculator.logic.tokenizer import ArithmeticTokenizer
+
+
+def separate_stages(expression):
+    ArithmeticStringPreprocessor().preprocess(expression)
+    processed_expression = ArithmeticStringProcessor().process(expression)
+    return ArithmeticTokenizer().tokenize(processed_expression)
+
+
+def outcome(stages, expression):
+    try:
+        return stages(expression)
+    except Exception as e:
+        return type(e), str(e)
+
+
+@pytest.mark.parametrize("expression", [
+    "30.1+4.43",
+    "(1 + 2) * 2$ 12.34#-90.51+~17",
+    "1 2 . 3\t4+5",
+    "8.6..30+10",
+    "5+(10",
+    "(5+10))+(",
+    "20.8^( \t)+4",
+    "((1)())",
+    "123ma_kore0 hjiopo",
+    ")abc",
+    "1+2\n",
+    "",
+    " \t ",
+])
+def test_same_as_separate_stages(expression):
+    assert (outcome(ArithmeticScanner().scan, expression)
+            == outcome(separate_stages, expression))
+
+
+def test_random_inputs_same_as_separate_stages():
+    generator = random.Random(0)
+    alphabet = "0123456789.+-*/^%$&@~!#()  \tx"
+    scanner = ArithmeticScanner()
+    for _ in range(2000):
+        expression = ''.join(generator.choice(alphabet)
+                             for _ in range(generator.randint(0, 12)))
+        assert (outcome(scanner.scan, expression)
+                == outcome(separate_stages, expression)), expression
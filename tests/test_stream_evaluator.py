@@ -0,0 +1,82 @@
+"""
+Module for testing the stream evaluator using pytest
+"""
+
+import io
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.exceptions import InvalidInputError, \
+    UnmatchedOpeningParenthesesError, EmptyParenthesesError, \
+    MultipleDotsOperandError, EndMinusesError, UnaryError, \
+    OperatorUsageError, DivisionByZeroError, EmptyEquationError
+from calculator.logic.stream_evaluator import ArithmeticStreamEvaluator, \
+    read_chunks
+from calculator.utils.numeric_backend import FRACTION_BACKEND
+
+
+def split(expression, size):
+    return [expression[index:index + size]
+            for index in range(0, len(expression), size)]
+
+
+@pytest.mark.parametrize("expression", [
+    "1+2*3", "2*-(3+4)", "--3", "(1+2)!", "12 34 + 5", "~-(2^3)!#",
+    "5$3&4%3@7", "2*--(3*(4))", "3- -(2)-2", "2^-(2)", "4!-3^2^2",
+    "1 - - - - 2", "(((1.5)))*.5", "2-(-(-(3)))",
+])
+@pytest.mark.parametrize("size", [1, 2, 5, 100])
+def test_results_match_core(expression, size):
+    expected = create_calculator_core().evaluate(expression)
+    assert ArithmeticStreamEvaluator().evaluate(
+        split(expression, size)) == expected
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("", EmptyEquationError),
+    ("2+a", InvalidInputError),
+    ("(1+2", UnmatchedOpeningParenthesesError),
+    ("1+()", EmptyParenthesesError),
+    ("1..2+3", MultipleDotsOperandError),
+    ("3--", EndMinusesError),
+    ("2~3", UnaryError),
+    ("2*", OperatorUsageError),
+    ("1/(2-2)", DivisionByZeroError),
+])
+def test_errors(expression, error):
+    with pytest.raises(error):
+        ArithmeticStreamEvaluator().evaluate(split(expression, 1))
+
+
+@pytest.mark.parametrize("expression, error", [
+    # Errors of earlier stages win, even when they come later in the input
+    ("1/0+(2", UnmatchedOpeningParenthesesError),
+    ("2~3+1..2", MultipleDotsOperandError),
+    ("1/0+2~3", UnaryError),
+    ("2~3 -", EndMinusesError),
+    ("(1+(2)+3..4+a", InvalidInputError),
+])
+def test_earlier_stage_errors_win(expression, error):
+    with pytest.raises(error):
+        create_calculator_core().evaluate(expression)
+    with pytest.raises(error):
+        ArithmeticStreamEvaluator().evaluate(split(expression, 3))
+
+
+def test_error_indices_span_chunks():
+    with pytest.raises(EmptyParenthesesError) as error_info:
+        ArithmeticStreamEvaluator().evaluate(["1 + (", "  )"])
+    assert str(error_info.value).endswith("4, 7")
+
+
+def test_read_chunks_joins_lines():
+    stream = io.StringIO("1 +\n2 *\r\n3\n")
+    assert list(read_chunks(stream, 4)) == ["1 + ", "2 * ", " 3 "]
+    stream.seek(0)
+    assert ArithmeticStreamEvaluator().evaluate(read_chunks(stream, 2)) == 7
+
+
+def test_backend():
+    evaluator = ArithmeticStreamEvaluator(FRACTION_BACKEND)
+    assert str(evaluator.evaluate(["0.1+", "0.2"])) == "3/10"
@@ -0,0 +1,47 @@
+"""
+Module for testing the arithmetic token processor using pytest
+"""
+
+import time
+
+import pytest
+
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+
+
+@pytest.mark.parametrize("expression, expected_tokens", [
+    ("--5", "5"),
+    ("1---2", "1-2"),
+    ("1*----2", "1*2"),
+    ("(5)--3", "(5)-_3"),
+    ("5--(3)", "5-(;(3))"),
+    ("2*-((1+2)*3)", "2*(;((1+2))*3)"),
+    ("1*-(1*-(1*-(2)))", "1*(;(1*(;(1*(;(2))))))"),
+    ("1-(2)*-(3*-(4))-5", "1-(2)*(;(3*(;(4))))-5"),
+])
+def test_sign_minuses(expression, expected_tokens):
+    tokens = ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+    assert ''.join(tokens) == expected_tokens
+
+
+def best_process_time(tokens):
+    best_time = float('inf')
+    for _ in range(3):
+        start_time = time.perf_counter()
+        ArithmeticTokenProcessor().process(list(tokens))
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time
+
+
+@pytest.mark.parametrize("create_expression", [
+    lambda size: '--'.join(['1'] * (size // 3)),
+    lambda size: '2*-(' * (size // 5) + '1' + ')' * (size // 5),
+])
+def test_linear_scaling(create_expression):
+    small_tokens = ArithmeticScanner().scan(create_expression(10 ** 4))
+    large_tokens = ArithmeticScanner().scan(create_expression(10 ** 5))
+    # 10 times more tokens: linear ~10 times slower, quadratic ~100 times.
+    assert (best_process_time(large_tokens)
+            < 30 * best_process_time(small_tokens))
@@ -0,0 +1,39 @@
+"""
+Module for testing the typed token stream using pytest
+"""
+
+import pytest
+
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.exceptions import ExpectedOperandError
+from calculator.logic.token_stream import TokenStream, OPERAND_KIND, \
+    INVALID_OPERAND_KIND, SYMBOL_KINDS
+
+
+def test_from_tokens_parses_operands_once():
+    stream = TokenStream.from_tokens(['_2', '+', '3.5', '*', '(', '4', ')'])
+    assert list(stream.kinds) == [OPERAND_KIND, SYMBOL_KINDS['+'],
+                                  OPERAND_KIND, SYMBOL_KINDS['*'],
+                                  SYMBOL_KINDS['('], OPERAND_KIND,
+                                  SYMBOL_KINDS[')']]
+    assert list(stream.values) == [-2.0, 0.0, 3.5, 0.0, 0.0, 4.0, 0.0]
+    assert len(stream) == 7
+
+
+def test_invalid_operand_is_raised_only_when_solved():
+    stream = TokenStream.from_tokens(['1', '+', '_)'])
+    assert stream.kinds[2] == INVALID_OPERAND_KIND
+    assert stream.invalid_operands == {2: '-)'}
+    with pytest.raises(ExpectedOperandError):
+        EquationSolver(stream).solve()
+
+
+@pytest.mark.parametrize("tokens, expected", [
+    (['2', '+', '3', '*', '4'], 14),
+    (['(', '2', '+', '3', ')', '^', '2'], 25),
+    (['3', '!', '#'], 6),
+])
+def test_compiled_stream_is_reusable(tokens, expected):
+    postfix = EquationSolver(tokens).compile()
+    assert EquationSolver([]).solve_compiled(postfix) == expected
+    assert EquationSolver([]).solve_compiled(postfix) == expected
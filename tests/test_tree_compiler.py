@@ -0,0 +1,80 @@
+"""
+Module for testing the compilation of expression trees using pytest
+"""
+
+import pytest
+
+from calculator.logic.equation_solver import EquationSolver
+from calculator.logic.exceptions import DivisionByZeroError, \
+    NegativeRootError, NegativeFactorialError, ModuloByZeroError, \
+    OperatorUsageError
+from calculator.logic.expression_cache import CompiledExpression
+from calculator.logic.expression_tree import ExpressionTree
+from calculator.logic.scanner import ArithmeticScanner
+from calculator.logic.token_processor import ArithmeticTokenProcessor
+from calculator.logic.tree_compiler import PythonTreeCompiler
+from calculator.utils.numeric_backend import DecimalBackend
+
+
+def build_tree(expression, fold=False):
+    tokens = ArithmeticTokenProcessor().process(
+        ArithmeticScanner().scan(expression))
+    return ExpressionTree.from_postfix(EquationSolver(tokens).compile(),
+                                       fold)
+
+
+@pytest.mark.parametrize("expression", [
+    "2+3*4-~5", "-(2^3)!#", "5$3&4%3@7", "(1.5*2)+(1.5*2)/3", "--3-2",
+    "4!-3^2^2", "0.1+0.2",
+])
+def test_compiled_results_match_tree(expression):
+    tree = build_tree(expression)
+    function = PythonTreeCompiler().compile(tree)
+    assert function() == tree.evaluate()
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("1+2/(3-3)", DivisionByZeroError),
+    ("(~8)^0.5", NegativeRootError),
+    ("2*(~3)!", NegativeFactorialError),
+    ("7%(2-2)", ModuloByZeroError),
+])
+def test_compiled_errors_match_tree(expression, error):
+    function = PythonTreeCompiler().compile(build_tree(expression))
+    with pytest.raises(error):
+        function()
+
+
+def test_compiled_decimal_results():
+    backend = DecimalBackend(10)
+    with backend.activate():
+        tree = build_tree("1/3+2*1.5")
+        assert PythonTreeCompiler().compile(tree)() == tree.evaluate()
+        assert str(tree.evaluate()) == '3.333333333'
+
+
+def test_uncompiled_trees():
+    compiler = PythonTreeCompiler(max_operations=3)
+    folded_tree = build_tree("1+2", fold=True)
+    invalid_tree = ExpressionTree.from_postfix(
+        EquationSolver(['1', '+']).compile())
+    large_tree = build_tree("1+2+3+4+5")
+    assert compiler.compile(folded_tree) == folded_tree.evaluate
+    assert compiler.compile(large_tree) == large_tree.evaluate
+    with pytest.raises(OperatorUsageError):
+        compiler.compile(invalid_tree)()
+
+
+def test_tiered_evaluation():
+    class CountingCompiler(PythonTreeCompiler):
+        compilations = 0
+
+        def compile(self, tree):
+            CountingCompiler.compilations += 1
+            return super().compile(tree)
+
+    compiled_expression = CompiledExpression(
+        build_tree("2^10-24"), CountingCompiler(), compile_threshold=3)
+    results = [compiled_expression.evaluate() for _ in range(5)]
+    assert results == [1000] * 5
+    assert CountingCompiler.compilations == 1
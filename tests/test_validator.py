@@ -0,0 +1,68 @@
+"""
+Module for testing the validator using pytest
+"""
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.exceptions import DivisionByZeroError, \
+    InvalidInputError
+from calculator.logic.validator import ArithmeticValidator
+
+
+@pytest.mark.parametrize("expression", [
+    "", "  ", "1+a", "1+2)", "(1+2", "()", "(.)", "1..2", "...", "2-",
+    "3~", "2!3", "1+(2", "-(3", "5*", "*5", "(1)(2)", "~", "1+(-)",
+])
+def test_fail_fast_reports_the_error_of_the_pipeline(expression):
+    with pytest.raises(Exception) as error_info:
+        create_calculator_core().evaluate(expression)
+    diagnostics = ArithmeticValidator().validate(expression).diagnostics
+    assert len(diagnostics) == 1
+    assert diagnostics[0].code == type(error_info.value).__name__
+    assert diagnostics[0].get_message() == str(error_info.value)
+
+
+@pytest.mark.parametrize("expression", [
+    "1+2", "-(3)", "2 5*--4", "(~3)!", "3!#+2", "1/0", "4.5^.5",
+])
+def test_valid_expressions(expression):
+    assert ArithmeticValidator().validate(expression).is_valid()
+    assert ArithmeticValidator().validate(expression,
+                                          collect_all=True).is_valid()
+
+
+def test_collect_all_reports_every_error_with_spans():
+    result = ArithmeticValidator().validate("1+a+(2*b)+3..4+()--",
+                                            collect_all=True)
+    assert [(diagnostic.code, diagnostic.start, diagnostic.end)
+            for diagnostic in result.diagnostics] == [
+        ('InvalidInputError', 2, 3),
+        ('InvalidInputError', 7, 8),
+        ('EmptyParenthesesError', 15, 17),
+        ('MultipleDotsOperandError', 10, 14),
+        ('EndMinusesError', 17, 19),
+    ]
+    assert result.diagnostics[0].get_message() == str(
+        InvalidInputError('a'))
+
+
+def test_fail_fast_stops_at_first_error():
+    result = ArithmeticValidator().validate("1+a+(2*b")
+    assert len(result.diagnostics) == 1
+    assert isinstance(result.get_error(), InvalidInputError)
+    assert (result.diagnostics[0].start, result.diagnostics[0].end) == (2, 3)
+
+
+def test_structural_errors_are_collected():
+    result = ArithmeticValidator().validate("(1+)*(*2)", collect_all=True)
+    assert [(diagnostic.code, diagnostic.start)
+            for diagnostic in result.diagnostics] == [
+        ('OperatorUsageError', 2), ('OperatorUsageError', 4)]
+
+
+def test_calculation_errors_are_not_checked():
+    result = ArithmeticValidator().validate("1/0")
+    assert result.get_error() is None
+    with pytest.raises(DivisionByZeroError):
+        create_calculator_core().evaluate("1/0")
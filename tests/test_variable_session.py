@@ -0,0 +1,155 @@
+"""
+Module for testing the variable session using pytest
+"""
+
+import random
+
+import pytest
+
+from calculator.calculator_factory import create_calculator_core
+from calculator.logic.exceptions import CyclicDependencyError, \
+    DivisionByZeroError, InvalidAssignmentError, InvalidInputError, \
+    UndefinedVariableError, UnmatchedOpeningParenthesesError
+from calculator.utils.numeric_backend import DecimalBackend
+
+
+def execute_all(calculator_core, lines):
+    outcomes = []
+    for line in lines:
+        try:
+            outcomes.append(repr(calculator_core.evaluate(line)))
+        except Exception as error:
+            outcomes.append(type(error).__name__)
+    return outcomes
+
+
+def test_assignments_and_references():
+    calculator_core = create_calculator_core(variables=True)
+    assert execute_all(calculator_core, [
+        "rate = 3.5", "total = rate * 12", "total", " total*2 + rate ",
+        "neg = -rate^2", "product = 2*-rate", "rate = 4", "total", "neg",
+        "product", "3+4",
+    ]) == ['3.5', '42.0', '42.0', '87.5', '-12.25', '-7.0', '4.0', '48.0',
+           '-16.0', '-8.0', '7.0']
+
+
+@pytest.mark.parametrize("line, error", [
+    ("2 = 3", InvalidAssignmentError),
+    ("a b = 3", InvalidAssignmentError),
+    ("quit = 3", InvalidAssignmentError),
+    ("x = 1 = 2", InvalidInputError),
+    ("x = (1", UnmatchedOpeningParenthesesError),
+    ("missing + 1", UndefinedVariableError),
+    ("x = x + 1", CyclicDependencyError),
+])
+def test_errors(line, error):
+    calculator_core = create_calculator_core(variables=True)
+    with pytest.raises(error):
+        calculator_core.evaluate(line)
+
+
+def test_rejected_assignments_keep_previous_formula():
+    calculator_core = create_calculator_core(variables=True)
+    calculator_core.evaluate("a = 1")
+    calculator_core.evaluate("b = a + 1")
+    with pytest.raises(CyclicDependencyError):
+        calculator_core.evaluate("a = b * 2")
+    with pytest.raises(UnmatchedOpeningParenthesesError):
+        calculator_core.evaluate("a = (3")
+    assert calculator_core.evaluate("a = 5") == 5
+    assert calculator_core.evaluate("b") == 6
+
+
+def test_errors_and_undefined_variables_propagate():
+    calculator_core = create_calculator_core(variables=True)
+    assert execute_all(calculator_core, [
+        "later = early * 2", "early = 1 / zero", "zero = 0", "later",
+        "zero = 4", "later", "early",
+    ]) == ['UndefinedVariableError', 'UndefinedVariableError',
+           '0', 'DivisionByZeroError', '4.0', '0.5',
+           '0.25']
+    assert calculator_core.evaluate("zero = 0") == 0
+    with pytest.raises(DivisionByZeroError):
+        calculator_core.evaluate("later")
+
+
+def test_assignment_recomputes_only_affected_variables():
+    calculator_core = create_calculator_core(variables=True)
+    session = calculator_core.variable_session
+    for group in range(100):
+        calculator_core.evaluate(f"input{group} = {group}")
+        calculator_core.evaluate(f"double{group} = input{group} * 2")
+        calculator_core.evaluate(
+            f"sum{group} = double{group} + input{group}")
+    computations = session.computations
+    compilations = session.compilations
+    assert calculator_core.evaluate("input7 = 10") == 10
+    assert session.computations - computations == 3
+    assert session.compilations - compilations == 1
+    assert calculator_core.evaluate("sum7") == 30
+
+    # Unchanged values do not recompute the variables which use them.
+    computations = session.computations
+    calculator_core.evaluate("double7 = input7 + input7")
+    assert session.computations - computations == 1
+
+
+def test_formulas_match_substituted_expressions():
+    generator = random.Random(0)
+    calculator_core = create_calculator_core(variables=True)
+    plain_core = create_calculator_core()
+    values = {}
+
+    def generate(depth):
+        if depth == 0 or generator.random() < 0.3:
+            if values and generator.random() < 0.5:
+                return generator.choice(sorted(values))
+            return str(generator.choice([0, 1, 2.5, 3, 0.1, 7]))
+        operator = generator.choice('+-*/^$&@%')
+        prefix = generator.choice(['', '-', '--', '~'])
+        return (f"{prefix}({generate(depth - 1)}){operator}"
+                f"{generate(depth - 1)}")
+
+    for index in range(300):
+        name = f"v{index}"
+        formula = generate(3)
+        substituted = formula
+        for reference in sorted(values, key=len, reverse=True):
+            substituted = substituted.replace(reference,
+                                              f"({values[reference]})")
+        try:
+            expected = repr(plain_core.evaluate(substituted))
+        except Exception as error:
+            expected = type(error).__name__
+        assert execute_all(calculator_core, [f"{name} = {formula}"]) \
+            == [expected]
+        if (expected[0].isdigit() or expected[0] == '-') \
+                and 'e' not in expected and 'inf' not in expected:
+            values[name] = expected  # Written as the substituted operand.
+
+
+def test_decimal_variables():
+    calculator_core = create_calculator_core(
+        numeric_backend=DecimalBackend(5), variables=True)
+    assert execute_all(calculator_core, ["third = 1/3", "third * 3"]) \
+        == ["Decimal('0.33333')", "Decimal('0.99999')"]
+
+
+def test_cores_without_session_reject_names():
+    with pytest.raises(InvalidInputError):
+        create_calculator_core().evaluate("rate = 3.5")
+
+
+@pytest.mark.parametrize("line, index", [
+    ("zz = rate * 2 + (", "16"),
+    ("x = (1", "4"),
+    ("rate + (", "7"),
+    ("q = rate)", "8"),
+    ("abc = () + rate", "6, 7"),
+])
+def test_error_indexes_are_of_the_line(line, index):
+    calculator_core = create_calculator_core(variables=True)
+    calculator_core.evaluate("rate = 2")
+    with pytest.raises(Exception) as error_info:
+        calculator_core.evaluate(line)
+    assert str(error_info.value).endswith(f" {index}")